@@ -2,6 +2,7 @@ import logging
 
 from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db import transaction
 from django.http import HttpResponseRedirect
 from django.urls import path, reverse
 from django.utils.html import format_html
@@ -65,25 +66,18 @@ class UserAdmin(BaseUserAdmin):
         if user.is_active:
             self.message_user(request, f"{user.email} est déjà actif.", level=messages.WARNING)
         else:
-            user.is_active = True
-            user.save(update_fields=["is_active"])
-            try:
+            with transaction.atomic():
+                user.is_active = True
+                user.save(update_fields=["is_active"])
                 send_account_activation_email(
                     display_name=user.display_name or user.email,
                     email=user.email,
                 )
-                self.message_user(
-                    request,
-                    f"Compte activé et email envoyé à {user.email}.",
-                    level=messages.SUCCESS,
-                )
-            except Exception as exc:
-                logger.exception("Failed to send activation email to %s", user.email)
-                self.message_user(
-                    request,
-                    f"Compte activé mais l'email n'a pas pu être envoyé ({exc}).",
-                    level=messages.WARNING,
-                )
+            self.message_user(
+                request,
+                f"Compte activé ; email d'activation en cours d'envoi à {user.email}.",
+                level=messages.SUCCESS,
+            )
 
         return HttpResponseRedirect(
             reverse("admin:accounts_user_change", args=[user_id])
@@ -92,26 +86,23 @@ class UserAdmin(BaseUserAdmin):
     @admin.action(description="Activer les comptes sélectionnés et envoyer l'email")
     def activate_accounts(self, request, queryset):
         """Action de liste pour activer plusieurs comptes d'un coup."""
-        from common.mail_service import send_account_activation_email
-
-        to_activate = queryset.filter(is_active=False)
-        activated = 0
-        email_errors = 0
+        from common.mail_service import render_account_activation_email, send_email_batch
 
+        to_activate = list(queryset.filter(is_active=False))
         for user in to_activate:
             user.is_active = True
-            user.save(update_fields=["is_active"])
-            try:
-                send_account_activation_email(
-                    display_name=user.display_name or user.email,
-                    email=user.email,
-                )
-            except Exception:
-                logger.exception("Failed to send activation email to %s", user.email)
-                email_errors += 1
-            activated += 1
-
-        msg = f"{activated} compte(s) activé(s)."
-        if email_errors:
-            msg += f" {email_errors} email(s) n'ont pas pu être envoyés."
-        self.message_user(request, msg, level=messages.SUCCESS if not email_errors else messages.WARNING)
+
+        # Activation and emails in one transaction: the emails are queued in
+        # the outbox and sent in the background, by Resend batches, once it commits
+        with transaction.atomic():
+            User.objects.bulk_update(to_activate, ["is_active"])
+            send_email_batch([
+                render_account_activation_email(display_name=user.display_name or user.email, email=user.email)
+                for user in to_activate
+            ])
+
+        self.message_user(
+            request,
+            f"{len(to_activate)} compte(s) activé(s) ; emails d'activation en cours d'envoi.",
+            level=messages.SUCCESS,
+        )
@@ -0,0 +1,92 @@
+"""
+Micro-benchmark du rendu des emails transactionnels (sans envoi).
+
+Compare, sur l'email de consentement candidat, le rendu par templates
+compilés et en cache (common.mail_service) à l'ancien rendu (lecture du
+fichier puis un str.replace par placeholder), et vérifie que les deux
+produisent le même HTML. --recipients estime le coût du rendu d'un envoi
+en masse.
+
+Exemples:
+    python manage.py benchmark_email_templates
+    python manage.py benchmark_email_templates --iterations 20000 --recipients 5000
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common import mail_service
+
+CONSENT_EMAIL = {
+    "candidate_name": "Alex Martin",
+    "candidate_email": "alex.martin@example.com",
+    "job_title": "Head of Growth",
+    "referrer_name": "Camille Dupont",
+    "organization_name": "Korum",
+    "consent_token": "0b8c6f3e-5a1d-4c2e-9f7a-2d6e8b1c4a90",
+    "referrer_email": "camille.dupont@example.com",
+    "referrer_experience_years": 12,
+    "job_location": "Geneve, Suisse",
+    "job_contract_types": ["CDI", "Temps plein"],
+    "job_experience_level": "Top Management",
+    "job_reward": "5'000 Points",
+    "job_description": "Pilotage de la strategie de croissance et acceleration commerciale en Europe.",
+}
+
+
+def _legacy_render_template(template_name, context):
+    html = (mail_service._TEMPLATES_DIR / template_name).read_text(encoding="utf-8")
+    for key, value in context.items():
+        html = html.replace(f"{{{{{key}}}}}", value)
+    return html
+
+
+class _LegacyTemplates:
+    """Remplace le moteur compilé par l'ancien rendu le temps d'une mesure."""
+
+    def __enter__(self):
+        self._saved = mail_service._render_email, mail_service._render_content_template
+        mail_service._render_content_template = _legacy_render_template
+        mail_service._render_email = lambda content, footer=None: _legacy_render_template(
+            mail_service._BASE_TEMPLATE_NAME,
+            {"CONTENT": content, "FOOTER_TEXT": footer or mail_service._DEFAULT_FOOTER},
+        )
+
+    def __exit__(self, *exc):
+        mail_service._render_email, mail_service._render_content_template = self._saved
+
+
+class Command(BaseCommand):
+    help = "Mesure le coût de rendu de l'email de consentement (templates compilés vs ancien rendu)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=5000, help="Rendus mesurés par variante")
+        parser.add_argument("--recipients", type=int, default=1000, help="Taille d'envoi en masse à estimer")
+
+    def handle(self, *args, **options):
+        iterations = max(1, options["iterations"])
+
+        compiled_html = mail_service.render_candidate_consent_email(**CONSENT_EMAIL)["html"]
+        with _LegacyTemplates():
+            legacy_html = mail_service.render_candidate_consent_email(**CONSENT_EMAIL)["html"]
+            legacy = self._measure(iterations)
+        if compiled_html != legacy_html:
+            raise CommandError("Compiled and legacy rendering differ")
+        compiled = self._measure(iterations)
+
+        self.stdout.write(f"Consent email: {len(compiled_html)} chars, {iterations} renders per variant")
+        for label, seconds in (("legacy (read + replace)", legacy), ("compiled + cached", compiled)):
+            per_render = seconds / iterations
+            self.stdout.write(
+                f"  {label:<24} {per_render * 1e6:8.1f} µs/render  {1 / per_render:10.0f} renders/s  "
+                f"{options['recipients']} recipients: {per_render * options['recipients'] * 1000:.1f} ms"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Speedup: x{legacy / compiled:.1f}"))
+
+    @staticmethod
+    def _measure(iterations: int) -> float:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            mail_service.render_candidate_consent_email(**CONSENT_EMAIL)
+        return time.perf_counter() - started
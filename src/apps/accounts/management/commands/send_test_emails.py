@@ -6,8 +6,10 @@ Exemple:
 """
 
 from django.core.management.base import BaseCommand, CommandError
-from time import sleep
+from time import monotonic, sleep
 
+from apps.notifications.models import EmailOutbox
+from apps.notifications.services.email_outbox import send_pending_emails
 from common.mail_service import (
     send_account_activation_email,
     send_candidate_consent_email,
@@ -41,7 +43,7 @@ class Command(BaseCommand):
                 email=to_email,
             )
             sent.append(("account_activation", activation_result))
-            self.stdout.write(self.style.SUCCESS("Email account_activation envoye"))
+            self.stdout.write(self.style.SUCCESS("Email account_activation en file"))
         except Exception as exc:
             raise CommandError(f"Echec envoi account_activation: {exc}") from exc
 
@@ -65,7 +67,7 @@ class Command(BaseCommand):
                 ),
             )
             sent.append(("candidate_consent", consent_result))
-            self.stdout.write(self.style.SUCCESS("Email candidate_consent envoye"))
+            self.stdout.write(self.style.SUCCESS("Email candidate_consent en file"))
         except Exception as exc:
             raise CommandError(f"Echec envoi candidate_consent: {exc}") from exc
 
@@ -79,11 +81,26 @@ class Command(BaseCommand):
                 job_location="Zurich, Suisse",
             )
             sent.append(("new_opportunity", opportunity_result))
-            self.stdout.write(self.style.SUCCESS("Email new_opportunity envoye"))
+            self.stdout.write(self.style.SUCCESS("Email new_opportunity en file"))
         except Exception as exc:
             raise CommandError(f"Echec envoi new_opportunity: {exc}") from exc
 
+        # Les emails passent par l'outbox : attendre leur envoi effectif
+        outbox_ids = {result["outbox_id"]: key for key, result in sent}
+        deadline = monotonic() + 60
+        while True:
+            send_pending_emails()
+            emails = list(EmailOutbox.objects.filter(id__in=outbox_ids))
+            done = all(e.status in (EmailOutbox.Status.SENT, EmailOutbox.Status.DEAD) for e in emails)
+            if done or monotonic() > deadline:
+                break
+            sleep(1)
+
         self.stdout.write("")
+        for email in emails:
+            line = f"- {outbox_ids[email.id]}: {email.status} {email.provider_id or email.last_error}"
+            style = self.style.SUCCESS if email.status == EmailOutbox.Status.SENT else self.style.ERROR
+            self.stdout.write(style(line))
+        if not all(e.status == EmailOutbox.Status.SENT for e in emails):
+            raise CommandError("Certains emails de test n'ont pas ete envoyes (voir l'outbox dans l'admin)")
         self.stdout.write(self.style.SUCCESS("Tous les emails de test ont ete envoyes."))
-        for key, result in sent:
-            self.stdout.write(f"- {key}: {result}")
@@ -0,0 +1,24 @@
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "to", "subject", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status", "kind")
+    search_fields = ("to", "subject", "provider_id")
+    readonly_fields = ("claim_token", "provider_id", "created_at", "sent_at")
+    actions = ["requeue"]
+
+    @admin.action(description="Renvoyer les emails sélectionnés")
+    def requeue(self, request, queryset):
+        """Remet en file, pour un envoi immédiat, les emails abandonnés ou en attente."""
+        count = queryset.filter(status__in=[EmailOutbox.Status.PENDING, EmailOutbox.Status.DEAD]).update(
+            status=EmailOutbox.Status.PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+            claim_token=None,
+        )
+        self.message_user(request, f"{count} email(s) remis en file d'envoi.", level=messages.SUCCESS)
@@ -0,0 +1,83 @@
+"""
+Serveur Resend local (voir services/resend_stub).
+
+Exemples:
+    python manage.py run_resend_stub
+    python manage.py run_resend_stub --latency 0.1 --jitter 0.05 --rate-limit 2 --error-rate 0.02
+    python manage.py run_resend_stub --benchmark 500   # envoi par lots vs un appel par email
+    python manage.py run_resend_stub --benchmark 500 --client-rps 20
+
+Puis, côté application :
+    RESEND_API_URL=http://127.0.0.1:8767 RESEND_API_KEY=stub python manage.py runserver
+"""
+
+import time
+
+from django.test import override_settings
+
+from apps.notifications.services.resend_stub import ResendStubConfig, make_resend_stub_server
+from common import mail_service
+from common.ratelimit import RateLimiter
+from common.stub_server import BaseStubCommand, serving
+
+
+class Command(BaseStubCommand):
+    help = "Lance un serveur Resend local, ou mesure l'envoi en masse contre lui"
+    service_name = "Resend"
+    default_port = 8767
+    config_class = ResendStubConfig
+    error_rate_help = "Part de réponses 500 (0-1)"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--rate-limit", type=float, default=0.0, help="Requêtes par seconde avant 429 (0 = sans limite)")
+        parser.add_argument("--benchmark", type=int, metavar="N", help="Envoyer N emails d'activation sur un serveur éphémère")
+        parser.add_argument(
+            "--client-rps", type=float,
+            help="Débit client pendant le benchmark (défaut : RESEND_REQUESTS_PER_SECOND)",
+        )
+
+    def make_server(self, host, port, config):
+        return make_resend_stub_server(host, port, config)
+
+    def benchmark(self, count, config, options):
+        server = make_resend_stub_server(port=0, config=config)
+        messages = []
+        for i in range(count):
+            message = mail_service.render_account_activation_email(f"Utilisateur {i}", f"user{i}@example.com")
+            messages.append({
+                "to": [message["to"]],
+                "subject": message["subject"],
+                "html": message["html"],
+                "from_email": "Korum <noreply@example.com>",
+            })
+
+        limiter = mail_service._resend_limiter
+        if options["client_rps"]:
+            mail_service._resend_limiter = RateLimiter(options["client_rps"])
+        try:
+            with serving(server) as base_url, override_settings(RESEND_API_URL=base_url, RESEND_API_KEY="stub"):
+                self._run(server, "batch", lambda: mail_service.deliver_email_batch(messages))
+                self._run(server, "one call per email", lambda: [self._deliver_one(m) for m in messages])
+        finally:
+            mail_service._resend_limiter = limiter
+
+    @staticmethod
+    def _deliver_one(message):
+        try:
+            return mail_service.BatchDelivery(id=mail_service.deliver_email(**message)["id"])
+        except Exception as exc:
+            return mail_service.BatchDelivery(error=exc)
+
+    def _run(self, server, label, send):
+        requests_before, limited_before, sent_before = server.requests_count, server.rate_limited_count, len(server.sent)
+        started = time.monotonic()
+        deliveries = send()
+        elapsed = time.monotonic() - started
+        failed = sum(1 for delivery in deliveries if delivery.error is not None)
+        self.stdout.write(
+            f"{label}: {len(deliveries)} emails in {elapsed:.2f}s, "
+            f"{server.requests_count - requests_before} HTTP calls "
+            f"({server.rate_limited_count - limited_before} rate-limited), "
+            f"{len(server.sent) - sent_before} accepted, {failed} failed"
+        )
@@ -0,0 +1,50 @@
+"""
+Envoi des emails en attente dans l'outbox (voir services/email_outbox).
+
+Les emails sont normalement envoyés en arrière-plan juste après le commit ;
+cette commande rattrape les nouveaux essais (backoff) et les emails d'un
+process arrêté avant l'envoi. Avec --loop, elle tourne en continu.
+
+Exemples:
+    python manage.py send_outbox_emails
+    python manage.py send_outbox_emails --loop --interval 10
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.notifications.models import EmailOutbox
+from apps.notifications.services.email_outbox import EMAIL_OUTBOX_BATCH_SIZE, OutboxStats, send_pending_emails
+
+
+class Command(BaseCommand):
+    help = "Envoie les emails transactionnels en attente dans l'outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=EMAIL_OUTBOX_BATCH_SIZE, help="Emails réservés par lot")
+        parser.add_argument("--loop", action="store_true", help="Tourner en continu")
+        parser.add_argument("--interval", type=float, default=10.0, help="Pause entre deux passes avec --loop (secondes)")
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        total = OutboxStats()
+
+        try:
+            while True:
+                close_old_connections()
+                stats = send_pending_emails(batch_size=batch_size)
+                total.add(stats)
+                if stats.sent or stats.retried or stats.dead:
+                    self.stdout.write(f"Sent {stats.sent}, retry scheduled {stats.retried}, dead {stats.dead}")
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+        dead = EmailOutbox.objects.filter(status=EmailOutbox.Status.DEAD).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {total.sent} sent, {total.retried} retry scheduled, {total.dead} dead ({dead} dead in the outbox)"
+        ))
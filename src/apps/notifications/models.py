@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils import timezone
+
+
+class EmailOutbox(models.Model):
+    """
+    Email transactionnel en attente d'envoi (outbox).
+
+    Écrit dans la même transaction que le changement métier qui le déclenche,
+    puis envoyé via Resend par services.email_outbox : un email n'est envoyé
+    que si la transaction est commitée, et n'est pas perdu si le process
+    s'arrête avant l'envoi.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "En attente"
+        SENDING = "SENDING", "En cours d'envoi"
+        SENT = "SENT", "Envoyé"
+        DEAD = "DEAD", "Abandonné"
+
+    kind = models.CharField(max_length=50, blank=True)
+    to = models.JSONField()
+    from_email = models.CharField(max_length=255)
+    reply_to = models.CharField(max_length=255, blank=True)
+    subject = models.TextField()
+    html = models.TextField()
+
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # Next attempt for PENDING, end of the worker's lease for SENDING
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.UUIDField(null=True, blank=True, db_index=True)
+    last_error = models.TextField(blank=True)
+    provider_id = models.CharField(max_length=100, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "email_outbox"
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind or 'email'} → {', '.join(self.to)} ({self.status})"
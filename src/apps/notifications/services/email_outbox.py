@@ -0,0 +1,228 @@
+"""
+File d'envoi des emails transactionnels (outbox).
+
+- enqueue_emails (appelé par common.mail_service.send_email et
+  send_email_batch) écrit les emails dans EmailOutbox, dans la transaction
+  courante, et demande un envoi au commit : la requête n'attend jamais
+  Resend. Les emails d'une même transaction partagent un seul envoi en
+  arrière-plan, dans un thread dédié (pas derrière l'enrichissement et le
+  scoring du pool partagé de common.background).
+- send_pending_emails envoie les emails dus par lots de
+  EMAIL_OUTBOX_BATCH_SIZE, en appels batch Resend (voir
+  mail_service.deliver_email_batch). Un lot est réservé par un UPDATE
+  conditionnel (claim_token, bail de EMAIL_OUTBOX_LEASE_SECONDS) : plusieurs
+  workers ne s'envoient pas le même email, et un email réservé par un
+  process arrêté est repris à l'expiration du bail.
+- En cas d'échec, nouvel essai après un backoff exponentiel avec jitter
+  (EMAIL_OUTBOX_BACKOFF_SECONDS, plafonné à EMAIL_OUTBOX_MAX_BACKOFF_SECONDS).
+  Après EMAIL_OUTBOX_MAX_ATTEMPTS essais, ou sur une erreur définitive de
+  Resend (requête invalide), l'email passe en DEAD : il reste visible dans
+  l'admin, qui permet de le renvoyer.
+
+La commande send_outbox_emails rattrape les envois (nouveaux essais, process
+arrêtés) ; la lancer en boucle ou en cron.
+
+Un email peut être envoyé deux fois si le process s'arrête entre la réponse
+de Resend et l'enregistrement du statut (at-least-once).
+"""
+
+import logging
+import os
+import random
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import List, Optional
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.notifications.models import EmailOutbox
+from common import metrics
+from common.background import BackgroundPool
+
+logger = logging.getLogger(__name__)
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
+EMAIL_OUTBOX_BACKOFF_SECONDS = float(os.environ.get("EMAIL_OUTBOX_BACKOFF_SECONDS", "30"))
+EMAIL_OUTBOX_MAX_BACKOFF_SECONDS = float(os.environ.get("EMAIL_OUTBOX_MAX_BACKOFF_SECONDS", "3600"))
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.environ.get("EMAIL_OUTBOX_LEASE_SECONDS", "300"))
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get("EMAIL_OUTBOX_BATCH_SIZE", "100"))
+
+# Resend rejected the request itself: retrying cannot succeed
+PERMANENT_ERROR_CODES = {"400", "401", "403", "422"}
+
+DUE_STATUSES = (EmailOutbox.Status.PENDING, EmailOutbox.Status.SENDING)
+
+# One sender is enough: Resend calls are batched and rate-limited
+_outbox_pool = BackgroundPool("email-outbox", 1)
+_drain_lock = threading.Lock()
+_drain_requested = False
+
+
+@dataclass
+class OutboxStats:
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+
+    def add(self, other: "OutboxStats") -> None:
+        self.sent += other.sent
+        self.retried += other.retried
+        self.dead += other.dead
+
+
+def enqueue_emails(messages: List[dict]) -> List[EmailOutbox]:
+    """
+    Met des emails en file en une écriture (champs de EmailOutbox : to,
+    subject, html, from_email, reply_to, kind) ; ils sont envoyés après le
+    commit de la transaction courante.
+    """
+    emails = EmailOutbox.objects.bulk_create([
+        EmailOutbox(**{**message, "reply_to": message.get("reply_to") or ""}) for message in messages
+    ])
+    for email in emails:
+        logger.info("Queued email %s to %s — subject: %s", email.id, email.to, email.subject)
+    transaction.on_commit(_request_drain)
+    return emails
+
+
+def _request_drain() -> None:
+    """Lance un envoi en arrière-plan, sauf s'il y en a déjà un en attente de démarrage."""
+    global _drain_requested
+    with _drain_lock:
+        if _drain_requested:
+            return
+        _drain_requested = True
+    _outbox_pool.submit(_drain)
+
+
+def _drain() -> None:
+    global _drain_requested
+    with _drain_lock:
+        # Emails queued from now on need another pass: let them request it
+        _drain_requested = False
+    send_pending_emails()
+
+
+def claim_due_emails(batch_size: int = EMAIL_OUTBOX_BATCH_SIZE) -> List[EmailOutbox]:
+    """Réserve jusqu'à batch_size emails dus pour ce worker."""
+    now = timezone.now()
+    due = EmailOutbox.objects.filter(status__in=DUE_STATUSES, next_attempt_at__lte=now)
+    ids = list(due.order_by("next_attempt_at").values_list("id", flat=True)[:batch_size])
+    if not ids:
+        return []
+
+    token = uuid.uuid4()
+    # Conditional update: rows claimed meanwhile by another worker no longer match
+    claimed = due.filter(id__in=ids).update(
+        status=EmailOutbox.Status.SENDING,
+        claim_token=token,
+        next_attempt_at=now + timedelta(seconds=EMAIL_OUTBOX_LEASE_SECONDS),
+        attempts=F("attempts") + 1,
+    )
+    if not claimed:
+        return []
+    return list(EmailOutbox.objects.filter(claim_token=token).order_by("id"))
+
+
+def _backoff(attempts: int) -> float:
+    delay = min(EMAIL_OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1), EMAIL_OUTBOX_MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _is_permanent(exc: Exception) -> bool:
+    return str(getattr(exc, "code", "")) in PERMANENT_ERROR_CODES
+
+
+def _finish(email: EmailOutbox, **fields) -> None:
+    # Only the worker holding the claim may record the outcome
+    EmailOutbox.objects.filter(id=email.id, claim_token=email.claim_token).update(**fields)
+
+
+def _record_sent(email: EmailOutbox, provider_id: Optional[str]) -> None:
+    _finish(
+        email,
+        status=EmailOutbox.Status.SENT,
+        sent_at=timezone.now(),
+        provider_id=provider_id or "",
+        last_error="",
+        claim_token=None,
+    )
+
+
+def _record_failure(email: EmailOutbox, exc: Exception) -> str:
+    """Enregistre l'échec ; retourne "retry" ou "dead"."""
+    error = f"{type(exc).__name__}: {exc}"[:2000]
+    if _is_permanent(exc) or email.attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS:
+        logger.error("Email %s dead after %s attempt(s): %s", email.id, email.attempts, error)
+        _finish(email, status=EmailOutbox.Status.DEAD, last_error=error, claim_token=None)
+        return "dead"
+
+    delay = _backoff(email.attempts)
+    logger.warning("Email %s failed (attempt %s), retry in %.0fs: %s", email.id, email.attempts, delay, error)
+    _finish(
+        email,
+        status=EmailOutbox.Status.PENDING,
+        next_attempt_at=timezone.now() + timedelta(seconds=delay),
+        last_error=error,
+        claim_token=None,
+    )
+    return "retry"
+
+
+def deliver_batch(emails: List[EmailOutbox]) -> List[str]:
+    """
+    Envoie des emails réservés par appels batch Resend ; retourne pour chacun
+    "sent", "retry" ou "dead".
+    """
+    from common.mail_service import deliver_email_batch
+
+    messages = [
+        {
+            "to": email.to,
+            "subject": email.subject,
+            "html": email.html,
+            "from_email": email.from_email,
+            "reply_to": email.reply_to or None,
+        }
+        for email in emails
+    ]
+    try:
+        deliveries = deliver_email_batch(messages, keys=[f"outbox-{email.id}" for email in emails])
+    except Exception as exc:
+        # Not configured (no API key): every email is retried later
+        outcomes = [_record_failure(email, exc) for email in emails]
+    else:
+        outcomes = []
+        for email, delivery in zip(emails, deliveries):
+            if delivery.error is not None:
+                outcomes.append(_record_failure(email, delivery.error))
+            else:
+                _record_sent(email, delivery.id)
+                outcomes.append("sent")
+
+    for email, outcome in zip(emails, outcomes):
+        metrics.increment("email_outbox_deliveries_total", outcome=outcome, kind=email.kind or "other")
+    return outcomes
+
+
+def send_pending_emails(batch_size: int = EMAIL_OUTBOX_BATCH_SIZE, max_batches: Optional[int] = None) -> OutboxStats:
+    """Envoie les emails dus, lot par lot, jusqu'à ce qu'il n'y en ait plus."""
+    stats = OutboxStats()
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        emails = claim_due_emails(batch_size)
+        if not emails:
+            break
+        batches += 1
+        for outcome in deliver_batch(emails):
+            if outcome == "sent":
+                stats.sent += 1
+            elif outcome == "retry":
+                stats.retried += 1
+            else:
+                stats.dead += 1
+    return stats
@@ -0,0 +1,170 @@
+"""
+Serveur Resend local, pour les tests et les mesures d'envoi en masse.
+
+Répond comme l'API réelle à :
+- POST /emails : un email, {"id": ...} ;
+- POST /emails/batch : jusqu'à MAX_BATCH_SIZE emails, {"data": [{"id"}, ...]}.
+  En-tête x-batch-validation: permissive : les emails invalides sont
+  signalés dans "errors" ([{"index", "message"}]) et les autres envoyés ;
+  sinon (strict) un seul email invalide fait rejeter le lot (422).
+
+Un destinataire est invalide s'il n'a pas de "@" ou se termine par
+INVALID_DOMAIN. L'en-tête Authorization: Bearer est exigé (401 sinon).
+Une requête acceptée avec un en-tête Idempotency-Key déjà vu reçoit la même
+réponse, sans nouvel envoi.
+
+Latence, taux de réponses 500 et limite de débit (429 avec retry-after au-delà
+de rate_limit requêtes par seconde) sont configurables. Les emails acceptés
+sont gardés dans server.sent. Lancé par la commande run_resend_stub
+(voir common/stub_server).
+"""
+
+import json
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from common.stub_server import BaseStubConfig, BaseStubHandler, BaseStubServer
+
+MAX_BATCH_SIZE = 100
+INVALID_DOMAIN = "@invalid.test"
+
+
+@dataclass
+class ResendStubConfig(BaseStubConfig):
+    rate_limit: float = 0.0
+
+
+def _recipient_error(email: Dict[str, Any]) -> Optional[str]:
+    to = email.get("to")
+    recipients = [to] if isinstance(to, str) else to
+    if not recipients or not email.get("from") or not email.get("subject"):
+        return "Missing `to`, `from` or `subject` field."
+    for address in recipients:
+        if "@" not in str(address) or str(address).endswith(INVALID_DOMAIN):
+            return f"Invalid `to` field: {address}"
+    return None
+
+
+class ResendStubRequestHandler(BaseStubHandler):
+    server: "ResendStubServer"
+    service_name = "Resend"
+
+    def _send_error(self, status: int, name: str, message: str, headers: Optional[Dict[str, str]] = None):
+        self.send_json(status, {"statusCode": status, "name": name, "message": message}, headers)
+
+    def send_not_found(self):
+        self._send_error(404, "not_found", "Not found")
+
+    def route_post(self, body: bytes):
+        if self.path not in ("/emails", "/emails/batch"):
+            self.send_not_found()
+            return
+        if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+            self._send_error(401, "missing_api_key", "Missing API key in the authorization header.")
+            return
+
+        retry_after = self.server.admit()
+        if retry_after is not None:
+            self._send_error(
+                429, "rate_limit_exceeded", "Too many requests.",
+                {"retry-after": f"{max(retry_after, 0.05):.2f}", "ratelimit-limit": f"{self.server.config.rate_limit:g}"},
+            )
+            return
+
+        time.sleep(self.server.latency())
+        if self.server.draw() < self.server.config.error_rate:
+            self._send_error(500, "application_error", "Simulated failure")
+            return
+
+        idempotency_key = self.headers.get("Idempotency-Key")
+        replayed = self.server.replay(idempotency_key)
+        if replayed is not None:
+            self.send_json(200, replayed)
+            return
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._send_error(400, "validation_error", "Invalid JSON body")
+            return
+
+        if self.path == "/emails":
+            error = _recipient_error(payload)
+            if error:
+                self._send_error(422, "validation_error", error)
+                return
+            self._send_accepted(idempotency_key, {"id": self.server.accept(payload)})
+            return
+
+        if not isinstance(payload, list) or not 0 < len(payload) <= MAX_BATCH_SIZE:
+            self._send_error(422, "validation_error", f"A batch holds 1 to {MAX_BATCH_SIZE} emails.")
+            return
+        errors = [
+            {"index": index, "message": error}
+            for index, error in ((i, _recipient_error(email)) for i, email in enumerate(payload))
+            if error
+        ]
+        permissive = self.headers.get("x-batch-validation") == "permissive"
+        if errors and not permissive:
+            self._send_error(422, "validation_error", f"emails[{errors[0]['index']}]: {errors[0]['message']}")
+            return
+
+        rejected = {error["index"] for error in errors}
+        data = [{"id": self.server.accept(email)} for i, email in enumerate(payload) if i not in rejected]
+        self._send_accepted(idempotency_key, {"data": data, "errors": errors} if permissive else {"data": data})
+
+    def _send_accepted(self, idempotency_key: Optional[str], body: Dict[str, Any]):
+        self.server.remember(idempotency_key, body)
+        self.send_json(200, body)
+
+
+class ResendStubServer(BaseStubServer):
+    handler_class = ResendStubRequestHandler
+
+    def __init__(self, address, config: ResendStubConfig):
+        super().__init__(address, config)
+        self._window: deque = deque()
+        self.rate_limited_count = 0
+        self.sent: List[Dict[str, Any]] = []
+        self._responses: Dict[str, Dict[str, Any]] = {}
+
+    def admit(self) -> Optional[float]:
+        """Compte la requête ; retourne le délai retry-after si elle dépasse la limite de débit."""
+        with self._lock:
+            self.requests_count += 1
+            if not self.config.rate_limit:
+                return None
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= 1.0:
+                self._window.popleft()
+            if len(self._window) >= self.config.rate_limit:
+                self.rate_limited_count += 1
+                return 1.0 - (now - self._window[0])
+            self._window.append(now)
+            return None
+
+    def replay(self, idempotency_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Réponse déjà donnée pour cette clé d'idempotence, s'il y en a une."""
+        with self._lock:
+            return self._responses.get(idempotency_key) if idempotency_key else None
+
+    def remember(self, idempotency_key: Optional[str], body: Dict[str, Any]) -> None:
+        if idempotency_key:
+            with self._lock:
+                self._responses[idempotency_key] = body
+
+    def accept(self, email: Dict[str, Any]) -> str:
+        email_id = str(uuid.uuid4())
+        with self._lock:
+            self.sent.append({**email, "id": email_id})
+        return email_id
+
+
+def make_resend_stub_server(
+    host: str = "127.0.0.1", port: int = 8767, config: Optional[ResendStubConfig] = None
+) -> ResendStubServer:
+    """Serveur prêt à servir (serve_forever) ; port 0 = port libre."""
+    return ResendStubServer((host, port), config or ResendStubConfig())
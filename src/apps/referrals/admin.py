@@ -1,13 +1,24 @@
 from django.contrib import admin
 
-from .models import Candidate, Referral, ReferralStatusEvent, RewardOutcome
+from .models import (
+    Candidate,
+    LinkedInExtractionCache,
+    LinkedInProfileCache,
+    LLMQuota,
+    LLMUsageDaily,
+    Referral,
+    ReferralStatusEvent,
+    ReferrerStats,
+    RewardOutcome,
+)
+from .services.llm_usage import invalidate_quota_cache
 
 
 @admin.register(Candidate)
 class CandidateAdmin(admin.ModelAdmin):
-    list_display = ("full_name", "email", "organization", "consent_confirmed", "created_at")
+    list_display = ("full_name", "email", "organization", "consent_confirmed", "enrichment_status", "created_at")
     search_fields = ("full_name", "email", "organization__name")
-    list_filter = ("organization", "consent_confirmed")
+    list_filter = ("organization", "consent_confirmed", "enrichment_status")
 
 
 @admin.register(Referral)
@@ -37,3 +48,39 @@ class ReferralStatusEventAdmin(admin.ModelAdmin):
 class RewardOutcomeAdmin(admin.ModelAdmin):
     list_display = ("referral", "reward_points", "reward_display_snapshot", "status", "created_at")
     list_filter = ("status", "organization")
+
+
+@admin.register(ReferrerStats)
+class ReferrerStatsAdmin(admin.ModelAdmin):
+    list_display = ("referrer", "organization", "referrals_count", "accepted_count", "hired_count", "rejected_count", "updated_at")
+    list_filter = ("organization",)
+
+
+@admin.register(LLMUsageDaily)
+class LLMUsageDailyAdmin(admin.ModelAdmin):
+    list_display = ("day", "organization", "feature", "model", "calls", "input_tokens", "output_tokens", "cost_usd")
+    list_filter = ("feature", "model", "organization")
+    date_hierarchy = "day"
+
+
+@admin.register(LLMQuota)
+class LLMQuotaAdmin(admin.ModelAdmin):
+    list_display = ("organization", "monthly_soft_tokens", "monthly_hard_tokens", "updated_at")
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Other processes pick the new limits up at cache expiry
+        invalidate_quota_cache(obj.organization_id)
+
+
+@admin.register(LinkedInProfileCache)
+class LinkedInProfileCacheAdmin(admin.ModelAdmin):
+    list_display = ("url_key", "fetched_at", "last_used_at", "hits")
+    search_fields = ("url_key",)
+
+
+@admin.register(LinkedInExtractionCache)
+class LinkedInExtractionCacheAdmin(admin.ModelAdmin):
+    list_display = ("cache_key", "prompt_version", "created_at", "last_used_at", "hits")
+    list_filter = ("prompt_version",)
+    search_fields = ("cache_key",)
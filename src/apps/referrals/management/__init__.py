@@ -0,0 +1 @@
+# management package
@@ -0,0 +1,119 @@
+"""
+Backfill des profils LinkedIn des candidats jamais enrichis
+(linkedin_scraped_at vide : créés avant l'intégration Coresignal, ou scrape
+en échec).
+
+Les candidats sont lus par id croissant en flux (.iterator), par paquets de
+--chunk-size ; dans un paquet, chaque URL canonique n'est récupérée qu'une
+fois, par --workers threads, sous un débit max de --rps appels Coresignal
+par seconde (les profils déjà en cache ne comptent pas). Chaque paquet est
+écrit en un bulk_update, puis le dernier id traité est enregistré dans
+--checkpoint : une exécution interrompue reprend après ce point.
+
+Exemples:
+    python manage.py backfill_linkedin --rps 5 --workers 4
+    python manage.py backfill_linkedin --organization 3 --limit 1000
+    python manage.py backfill_linkedin --restart          # ignore le checkpoint
+"""
+
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.referrals.models import Candidate
+from apps.referrals.services.candidate_enrichment import BULK_FIELDS, BackfillStats, backfill_profiles
+from common.ratelimit import RateLimiter
+
+DEFAULT_CHECKPOINT = Path(tempfile.gettempdir()) / "backfill_linkedin.json"
+
+
+class Command(BaseCommand):
+    help = "Récupère en masse les profils LinkedIn des candidats jamais enrichis"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Limiter à une organisation (ID)")
+        parser.add_argument("--chunk-size", type=int, default=200, help="Candidats lus et écrits par paquet")
+        parser.add_argument("--workers", type=int, default=4, help="Récupérations en parallèle")
+        parser.add_argument("--rps", type=float, default=5.0, help="Appels Coresignal par seconde (0 = sans limite)")
+        parser.add_argument("--limit", type=int, help="Nombre max de candidats traités")
+        parser.add_argument("--checkpoint", default=str(DEFAULT_CHECKPOINT), help="Fichier de reprise")
+        parser.add_argument("--restart", action="store_true", help="Ignorer le checkpoint et repartir du début")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--chunk-size and --workers must be positive")
+
+        checkpoint = Path(options["checkpoint"])
+        state = {} if options["restart"] else self._load_checkpoint(checkpoint)
+        if state.get("organization") not in (None, options["organization"]):
+            raise CommandError(f"{checkpoint} belongs to another organization: use --restart or --checkpoint")
+        last_id = state.get("last_id", 0)
+        if last_id:
+            self.stdout.write(f"Resuming after candidate {last_id}")
+
+        candidates = (
+            Candidate.objects.filter(linkedin_scraped_at__isnull=True, id__gt=last_id)
+            .exclude(linkedin_url__isnull=True)
+            .exclude(linkedin_url="")
+            .order_by("id")
+            .only("id", "linkedin_url", *BULK_FIELDS)
+        )
+        if options["organization"]:
+            candidates = candidates.filter(organization_id=options["organization"])
+        if options["limit"]:
+            candidates = candidates[:options["limit"]]
+
+        limiter = RateLimiter(options["rps"]) if options["rps"] > 0 else None
+        total = BackfillStats()
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=options["workers"], thread_name_prefix="backfill") as executor:
+            chunk = []
+            for candidate in candidates.iterator(chunk_size=options["chunk_size"]):
+                chunk.append(candidate)
+                if len(chunk) == options["chunk_size"]:
+                    self._process(chunk, executor, limiter, total, started, checkpoint, options["organization"])
+                    chunk = []
+            if chunk:
+                self._process(chunk, executor, limiter, total, started, checkpoint, options["organization"])
+
+        if not total.candidates:
+            self.stdout.write("Nothing to backfill")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Done: {self._report(total, started)}"))
+
+    def _process(self, chunk, executor, limiter, total, started, checkpoint, organization_id):
+        total.add(backfill_profiles(chunk, executor, limiter))
+        self._save_checkpoint(checkpoint, {"last_id": chunk[-1].id, "organization": organization_id})
+        self.stdout.write(f"Up to candidate {chunk[-1].id}: {self._report(total, started)}")
+
+    @staticmethod
+    def _report(stats: BackfillStats, started: float) -> str:
+        elapsed = max(time.monotonic() - started, 1e-9)
+        return (
+            f"{stats.candidates} candidates ({stats.candidates / elapsed:.1f}/s), "
+            f"{stats.urls} profiles: {stats.fetched} fetched ({stats.fetched / elapsed:.2f} calls/s), "
+            f"{stats.cached} cached, {stats.enriched} enriched, {stats.failed} failed "
+            f"({stats.error_rate:.1%} errors) in {elapsed:.1f}s"
+        )
+
+    @staticmethod
+    def _load_checkpoint(path: Path) -> dict:
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text())
+        except ValueError as e:
+            raise CommandError(f"Unreadable checkpoint {path}: {e}")
+
+    @staticmethod
+    def _save_checkpoint(path: Path, state: dict) -> None:
+        # Write then rename: an interruption never leaves a truncated checkpoint
+        tmp = path.with_name(f"{path.name}.tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, path)
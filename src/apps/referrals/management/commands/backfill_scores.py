@@ -0,0 +1,270 @@
+"""
+Backfill des CandidateScore via l'API Batch d'OpenAI.
+
+Exemples:
+    python manage.py backfill_scores --organization 3
+    python manage.py backfill_scores --job 42 --stale
+    python manage.py backfill_scores --dry-run --work-dir /tmp/backfill
+    python manage.py backfill_scores --batch-id batch_abc123   # reprend un batch soumis
+    python manage.py backfill_scores --backend local --local-dir /tmp/fake-batch
+    python manage.py backfill_scores --gate-margin 25   # pas de LLM pour les cas tranchés
+
+Les referrals dont le grade est fixé par le score par règles (voir
+candidate_scoring.is_grade_decided) sont scorés directement, sans requête Batch.
+Les organisations au-delà de leur quota LLM hard (voir llm_usage) ne reçoivent
+plus de requêtes, en comptant les tokens d'entrée estimés du batch en cours ;
+les tokens relus dans le fichier de sortie leur sont imputés.
+"""
+
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.referrals.models import CandidateScore, Referral
+from apps.referrals.services.candidate_scoring import (
+    LLM_SYSTEM_PROMPT,
+    OPENAI_MODEL_FAST,
+    build_llm_prompt,
+    _rule_breakdown,
+    combine_llm_result,
+    compute_llm_fingerprint,
+    gated_score,
+    is_llm_result_current,
+    sanitize_llm_result,
+    should_skip_llm,
+)
+from apps.referrals.services.llm_batch import (
+    LocalBatchBackend,
+    OpenAIBatchBackend,
+    build_batch_request,
+    iter_batch_results,
+    make_custom_id,
+    parse_custom_id,
+    record_batch_usage,
+    wait_for_batch,
+    write_batch_file,
+)
+from apps.referrals.services.llm_usage import get_quota_status
+from apps.referrals.services.prompt_budget import estimate_messages_tokens
+
+# Champs mis à jour lorsqu'un score existe déjà pour le referral
+UPSERT_FIELDS = [
+    "final_score",
+    "rule_score",
+    "llm_score",
+    "grade",
+    "expertise_match",
+    "experience_match",
+    "interpersonal_skills_match",
+    "technical_skills_match",
+    "referral_quality",
+    "llm_strengths",
+    "llm_gaps",
+    "llm_summary",
+    "llm_model_used",
+    "rule_fingerprint",
+    "llm_fingerprint",
+    "llm_prompt_tokens",
+    "llm_prompt_prefix_tokens",
+    "llm_skipped",
+    "updated_at",
+]
+
+
+class Command(BaseCommand):
+    help = "Calcule les scores LLM manquants (ou obsolètes) via l'API Batch d'OpenAI"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Limiter à une organisation (ID)")
+        parser.add_argument("--job", type=int, help="Limiter à un job opening (ID)")
+        parser.add_argument(
+            "--stale",
+            action="store_true",
+            help="Inclure aussi les referrals déjà scorés dont le prompt LLM a changé",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500, help="Taille des paquets DB")
+        parser.add_argument(
+            "--backend",
+            choices=["openai", "local"],
+            default="openai",
+            help="Backend Batch (local: répertoire stand-in, voir --local-dir)",
+        )
+        parser.add_argument("--local-dir", help="Répertoire du backend local")
+        parser.add_argument("--work-dir", help="Répertoire du fichier JSONL d'entrée")
+        parser.add_argument("--poll-interval", type=float, default=60.0, help="Secondes entre deux polls")
+        parser.add_argument("--timeout", type=float, help="Abandonner le poll après N secondes")
+        parser.add_argument("--batch-id", help="Reprendre un batch déjà soumis (pas de nouvelle soumission)")
+        parser.add_argument("--dry-run", action="store_true", help="Écrire le JSONL sans le soumettre")
+        parser.add_argument(
+            "--gate-margin",
+            type=int,
+            help="Pas de requête LLM si le grade est stable pour un score LLM à ±N points "
+                 "du score par règles (défaut: gating strict sur 0-100)",
+        )
+
+    def handle(self, *args, **options):
+        backend = self._get_backend(options)
+
+        batch_id = options.get("batch_id")
+        if not batch_id:
+            work_dir = Path(options.get("work_dir") or tempfile.mkdtemp(prefix="score-backfill-"))
+            work_dir.mkdir(parents=True, exist_ok=True)
+            input_path = work_dir / "score_backfill.input.jsonl"
+
+            self._gated = []
+            self._gated_count = 0
+            self._pending_tokens = {}
+            self._over_quota_count = 0
+            count = write_batch_file(input_path, self._iter_requests(options))
+            self._flush_gated(options)
+            self.stdout.write(f"{count} requête(s) écrite(s) dans {input_path}")
+            self.stdout.write(f"{self._gated_count} referral(s) scoré(s) sans LLM (grade déjà fixé)")
+            if self._over_quota_count:
+                self.stdout.write(self.style.WARNING(
+                    f"{self._over_quota_count} referral(s) ignoré(s) : quota LLM hard atteint"
+                ))
+
+            if count == 0:
+                self.stdout.write(self.style.SUCCESS("Aucun referral à scorer."))
+                return
+            if options["dry_run"]:
+                return
+
+            batch_id = backend.submit(input_path)
+            self.stdout.write(
+                self.style.WARNING(f"Batch soumis: {batch_id} (reprise possible avec --batch-id)")
+            )
+
+        try:
+            status = wait_for_batch(
+                backend,
+                batch_id,
+                poll_interval=options["poll_interval"],
+                timeout=options.get("timeout"),
+            )
+        except TimeoutError as exc:
+            raise CommandError(f"{exc}. Relancez avec --batch-id {batch_id}") from exc
+
+        if status.status != "completed":
+            raise CommandError(f"Batch {batch_id} terminé avec le statut {status.status}")
+
+        saved, failed = 0, 0
+        for chunk in iter_batch_results(backend, status, chunk_size=options["chunk_size"]):
+            chunk_saved, chunk_failed = self._upsert_chunk(chunk)
+            saved += chunk_saved
+            failed += chunk_failed
+            self.stdout.write(f"... {saved} score(s) enregistré(s)")
+
+        self.stdout.write(self.style.SUCCESS(f"{saved} score(s) enregistré(s), {failed} échec(s)."))
+
+    def _get_backend(self, options):
+        if options["backend"] == "local":
+            if not options.get("local_dir"):
+                raise CommandError("--local-dir est obligatoire avec --backend local")
+            return LocalBatchBackend(Path(options["local_dir"]))
+        return OpenAIBatchBackend()
+
+    def _iter_requests(self, options):
+        """Stream les referrals à scorer et produit une requête Batch par referral."""
+        referrals = Referral.objects.select_related("candidate", "job_opening", "score")
+        if options.get("organization"):
+            referrals = referrals.filter(organization_id=options["organization"])
+        if options.get("job"):
+            referrals = referrals.filter(job_opening_id=options["job"])
+        if not options["stale"]:
+            referrals = referrals.filter(score__isnull=True)
+
+        for referral in referrals.order_by("id").iterator(chunk_size=options["chunk_size"]):
+            prompt = build_llm_prompt(referral.candidate, referral.job_opening, referral)
+            fingerprint = compute_llm_fingerprint(prompt, OPENAI_MODEL_FAST)
+
+            existing = getattr(referral, "score", None)
+            if existing is not None and is_llm_result_current(existing.llm_fingerprint, fingerprint):
+                continue
+
+            # Same rule breakdown as live scoring (profile ranges, referrer record)
+            breakdown = _rule_breakdown(referral, existing)
+            if should_skip_llm(breakdown, referral.organization_id, options.get("gate_margin")):
+                self._gated.append(self._score_without_llm(referral, breakdown))
+                if len(self._gated) >= options["chunk_size"]:
+                    self._flush_gated(options)
+                continue
+
+            if not self._reserve_tokens(referral.organization_id, prompt):
+                self._over_quota_count += 1
+                continue
+
+            yield build_batch_request(make_custom_id(referral.id, fingerprint), prompt, OPENAI_MODEL_FAST)
+
+    def _reserve_tokens(self, organization_id, prompt):
+        """Compte la requête dans le quota de l'organisation ; False si le quota hard serait atteint."""
+        quota = get_quota_status(organization_id)
+        pending = self._pending_tokens.get(organization_id, 0)
+        if quota.hard_limit is not None and quota.used_tokens + pending >= quota.hard_limit:
+            return False
+        self._pending_tokens[organization_id] = pending + estimate_messages_tokens(LLM_SYSTEM_PROMPT, prompt)
+        return True
+
+    def _score_without_llm(self, referral, breakdown):
+        """Score d'un referral gaté : ni requête Batch, ni appel LLM direct."""
+        scoring = gated_score(referral, breakdown)
+        return CandidateScore(
+            organization_id=referral.organization_id,
+            referral=referral,
+            **scoring.to_model_fields(),
+        )
+
+    def _flush_gated(self, options):
+        """Upsert des scores calculés sans LLM (rien en --dry-run)."""
+        if self._gated and not options["dry_run"]:
+            self._bulk_upsert(self._gated)
+        self._gated_count += len(self._gated)
+        self._gated = []
+
+    def _bulk_upsert(self, scores):
+        CandidateScore.objects.bulk_create(
+            scores,
+            update_conflicts=True,
+            unique_fields=["referral"],
+            update_fields=UPSERT_FIELDS,
+        )
+
+    def _upsert_chunk(self, chunk):
+        """Impute les tokens, combine les résultats LLM avec le score par règles et upsert en bulk."""
+        parsed = {}
+        failed = 0
+        for line in chunk:
+            try:
+                referral_id, fingerprint = parse_custom_id(line.custom_id)
+            except ValueError as exc:
+                self.stderr.write(str(exc))
+                failed += 1
+                continue
+            parsed[referral_id] = (fingerprint, line)
+
+        referrals = Referral.objects.select_related("candidate", "job_opening").in_bulk(list(parsed))
+        previous_scores = CandidateScore.objects.in_bulk(list(parsed), field_name="referral_id")
+
+        scores = []
+        for referral_id, (fingerprint, line) in parsed.items():
+            referral = referrals.get(referral_id)
+            # Tokens are billed even when the answer is unusable
+            record_batch_usage(referral.organization_id if referral else None, OPENAI_MODEL_FAST, line)
+            if referral is None or line.result is None:
+                failed += 1
+                continue
+            scoring = combine_llm_result(
+                referral,
+                sanitize_llm_result(line.result, OPENAI_MODEL_FAST),
+                fingerprint,
+                previous=previous_scores.get(referral_id),
+            )
+            scores.append(CandidateScore(
+                organization_id=referral.organization_id,
+                referral=referral,
+                **scoring.to_model_fields(),
+            ))
+
+        self._bulk_upsert(scores)
+        return len(scores), failed
@@ -0,0 +1,122 @@
+"""
+Benchmark du pipeline de scoring complet (règles + LLM), sans persistance.
+
+À lancer contre le serveur local (run_llm_stub) pour mesurer débit, latence
+et comportement du disjoncteur / limiteur face aux 429 et aux pannes, sans
+clé API ni coût.
+
+Exemples:
+    python manage.py run_llm_stub --latency 0.5 --rate-limit-rate 0.1 &
+    python manage.py benchmark_scoring --provider stub --limit 500 --concurrency 16
+    python manage.py benchmark_scoring --job 42 --comparative
+"""
+
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.referrals.models import Referral
+from apps.referrals.services.candidate_scoring import compute_candidate_score
+from apps.referrals.services.comparative_scoring import score_referrals_comparatively
+from apps.referrals.services.llm_providers import (
+    HTTPStubProvider,
+    build_provider,
+    get_llm_provider,
+    set_llm_provider,
+)
+from common import metrics
+
+
+class Command(BaseCommand):
+    help = "Mesure débit et latence du scoring hybride (aucun score n'est enregistré)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Limiter à une organisation (ID)")
+        parser.add_argument("--job", type=int, help="Limiter à un job opening (ID)")
+        parser.add_argument("--limit", type=int, default=200, help="Nombre de referrals chargés")
+        parser.add_argument("--repeat", type=int, default=1, help="Passes sur les referrals chargés")
+        parser.add_argument("--concurrency", type=int, default=8, help="Scorings en parallèle")
+        parser.add_argument(
+            "--provider",
+            choices=["openai", "stub"],
+            help="Fournisseur LLM (défaut: LLM_PROVIDER)",
+        )
+        parser.add_argument("--stub-url", help="URL du serveur run_llm_stub (défaut: LLM_STUB_URL)")
+        parser.add_argument("--comparative", action="store_true", help="Scoring comparatif par job")
+        parser.add_argument("--no-llm", action="store_true", help="Score par règles uniquement")
+        parser.add_argument("--gate-margin", type=int, help="Voir backfill_scores --gate-margin")
+
+    def handle(self, *args, **options):
+        if options["stub_url"]:
+            set_llm_provider(HTTPStubProvider(options["stub_url"]))
+        elif options["provider"]:
+            set_llm_provider(build_provider(options["provider"]))
+
+        referrals_qs = Referral.objects.select_related("candidate", "job_opening").order_by("-id")
+        if options["organization"]:
+            referrals_qs = referrals_qs.filter(organization_id=options["organization"])
+        if options["job"]:
+            referrals_qs = referrals_qs.filter(job_opening_id=options["job"])
+        referrals = list(referrals_qs[:options["limit"]])
+        if not referrals:
+            raise CommandError("No referral to score")
+        referrals *= max(1, options["repeat"])
+
+        use_llm = not options["no_llm"]
+        gate_margin = options["gate_margin"]
+        provider = get_llm_provider()
+        mode = "comparative" if options["comparative"] else f"concurrency {options['concurrency']}"
+        self.stdout.write(f"Scoring {len(referrals)} referrals with provider {provider.name} ({mode})")
+
+        metrics.registry.reset()
+        latencies = []
+
+        def score(referral):
+            started = time.monotonic()
+            result = compute_candidate_score(referral, use_llm=use_llm, gate_margin=gate_margin)
+            latencies.append(time.monotonic() - started)
+            return result
+
+        started = time.monotonic()
+        if options["comparative"]:
+            results = list(score_referrals_comparatively(
+                referrals, use_llm=use_llm, gate_margin=gate_margin
+            ).values())
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, options["concurrency"])) as executor:
+                results = list(executor.map(score, referrals))
+        elapsed = time.monotonic() - started
+
+        self._report(results, latencies, elapsed, use_llm)
+
+    def _report(self, results, latencies, elapsed, use_llm):
+        self.stdout.write(f"Wall time:   {elapsed:.2f}s")
+        self.stdout.write(f"Throughput:  {len(results) / elapsed:.1f} referrals/s")
+        if len(latencies) >= 2:
+            cuts = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f"Latency:     p50 {cuts[49] * 1000:.0f}ms, p95 {cuts[94] * 1000:.0f}ms, "
+                f"max {max(latencies) * 1000:.0f}ms"
+            )
+
+        outcomes = Counter()
+        for labels, value in metrics.registry.series("llm_calls_total").items():
+            outcomes[dict(labels)["outcome"]] += int(value)
+        self.stdout.write(f"LLM calls:   {dict(outcomes) or 'none'}")
+
+        # Fallback scores have no LLM fingerprint (see _apply_llm_result)
+        fallbacks = sum(
+            1 for r in results if not r.breakdown.llm_fingerprint and not r.breakdown.llm_skipped
+        )
+        skipped = sum(1 for r in results if r.breakdown.llm_skipped)
+        grades = Counter(r.grade for r in results)
+        if use_llm:
+            self.stdout.write(f"Fallbacks:   {fallbacks}, skipped (gated): {skipped}")
+        self.stdout.write(f"Grades:      {dict(sorted(grades.items()))}")
+        self.stdout.write(
+            f"Circuit:     state {metrics.registry.get('llm_circuit_state', breaker='openai'):g}, "
+            f"concurrency limit {metrics.registry.get('llm_concurrency_limit', limiter='openai'):g}"
+        )
@@ -0,0 +1,77 @@
+"""
+Reprise de l'enrichissement des candidats (voir services/candidate_enrichment).
+
+Sans --candidate, traite les échecs retentables, les tâches perdues
+(PENDING depuis plus de ENRICHMENT_PENDING_TIMEOUT_MINUTES) et les profils
+LinkedIn plus vieux que --stale-days, par lots de --batch-size candidats
+enrichis par --concurrency threads.
+
+Exemples:
+    python manage.py enrich_candidates
+    python manage.py enrich_candidates --organization 3 --concurrency 8
+    python manage.py enrich_candidates --candidate 42 --no-score
+"""
+
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.referrals.services.candidate_enrichment import (
+    ENRICHMENT_STALE_DAYS,
+    candidates_to_enrich,
+    enrich_candidate,
+)
+
+
+class Command(BaseCommand):
+    help = "Relance l'enrichissement LinkedIn des candidats en échec, en attente ou périmés"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Limiter à une organisation (ID)")
+        parser.add_argument("--candidate", type=int, action="append", help="Candidat(s) à enrichir (ID), quel que soit leur état")
+        parser.add_argument("--stale-days", type=int, default=ENRICHMENT_STALE_DAYS, help="Âge max d'un profil enrichi (jours)")
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--concurrency", type=int, default=4, help="Candidats enrichis en parallèle")
+        parser.add_argument("--limit", type=int, help="Nombre max de candidats traités")
+        parser.add_argument("--no-score", action="store_true", help="Ne pas recalculer les scores périmés")
+
+    def handle(self, *args, **options):
+        if options["candidate"]:
+            candidate_ids = options["candidate"]
+        else:
+            candidates = candidates_to_enrich(stale_days=options["stale_days"])
+            if options["organization"]:
+                candidates = candidates.filter(organization_id=options["organization"])
+            candidate_ids = list(candidates.order_by("id").values_list("id", flat=True))
+        if options["limit"]:
+            candidate_ids = candidate_ids[:options["limit"]]
+
+        if not candidate_ids:
+            self.stdout.write("Nothing to enrich")
+            return
+
+        score = not options["no_score"]
+        batch_size = max(1, options["batch_size"])
+        statuses = Counter()
+        started = time.monotonic()
+
+        def enrich(candidate_id: int) -> str:
+            try:
+                return enrich_candidate(candidate_id, score=score)
+            finally:
+                # Each worker thread holds its own connection
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=max(1, options["concurrency"])) as executor:
+            for start in range(0, len(candidate_ids), batch_size):
+                batch = candidate_ids[start:start + batch_size]
+                statuses.update(str(status) or "DELETED" for status in executor.map(enrich, batch))
+                self.stdout.write(
+                    f"{start + len(batch)}/{len(candidate_ids)} candidates, "
+                    f"{time.monotonic() - started:.1f}s: {dict(statuses)}"
+                )
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {dict(statuses)}"))
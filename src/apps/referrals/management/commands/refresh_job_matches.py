@@ -0,0 +1,97 @@
+"""
+Recalcul des candidats suggérés (JobCandidateMatch) des postes ouverts.
+
+Le calcul est lancé automatiquement à la création et à la modification d'un
+poste ; cette commande sert au rattrapage (nouveaux candidats, tâche perdue
+au redémarrage) et à la mesure des performances.
+
+Exemples:
+    python manage.py refresh_job_matches --organization 3
+    python manage.py refresh_job_matches --job 42 --top-k 100
+    python manage.py refresh_job_matches --benchmark 100000   # vivier synthétique, sans base
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs.models import JobOpening
+from apps.referrals.services.talent_matching import (
+    TALENT_MATCH_TOP_K,
+    CandidatePool,
+    rank_pool,
+    refresh_job_matches,
+    refresh_organization_matches,
+)
+from apps.referrals.services.weight_profiles import default_profile
+
+
+class Command(BaseCommand):
+    help = "Recalcule les candidats du vivier suggérés pour les postes ouverts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Limiter à une organisation (ID)")
+        parser.add_argument("--job", type=int, help="Un seul job opening (ID)")
+        parser.add_argument("--top-k", type=int, default=TALENT_MATCH_TOP_K, help="Candidats retenus par poste")
+        parser.add_argument("--benchmark", type=int, metavar="N", help="Mesurer le rapprochement sur N candidats synthétiques")
+
+    def handle(self, *args, **options):
+        if options["benchmark"]:
+            self._benchmark(options["benchmark"], options["top_k"])
+            return
+
+        if options["job"]:
+            count = refresh_job_matches(options["job"], top_k=options["top_k"])
+            self.stdout.write(self.style.SUCCESS(f"Job {options['job']}: {count} suggested candidates"))
+            return
+
+        jobs = JobOpening.objects.filter(status=JobOpening.Status.OPEN)
+        if options["organization"]:
+            jobs = jobs.filter(organization_id=options["organization"])
+        organization_ids = sorted(set(jobs.values_list("organization_id", flat=True)))
+        if not organization_ids:
+            raise CommandError("No open job opening")
+
+        for organization_id in organization_ids:
+            started = time.monotonic()
+            counts = refresh_organization_matches(organization_id, top_k=options["top_k"])
+            self.stdout.write(
+                f"Organization {organization_id}: {len(counts)} jobs, "
+                f"{sum(counts.values())} suggestions in {time.monotonic() - started:.2f}s"
+            )
+        self.stdout.write(self.style.SUCCESS("Done"))
+
+    def _benchmark(self, size: int, top_k: int):
+        rng = random.Random(0)
+        domains = JobOpening.ExpertiseDomain.values
+        interpersonal = JobOpening.InterpersonalSkill.values
+        technical = [f"skill-{i}" for i in range(500)]
+
+        started = time.monotonic()
+        pool = CandidatePool(
+            (
+                candidate_id,
+                rng.choice(domains),
+                rng.randint(0, 40),
+                rng.sample(interpersonal, 3),
+                rng.sample(technical, 8),
+                rng.sample(technical, 5),
+            )
+            for candidate_id in range(1, size + 1)
+        )
+        encoded = time.monotonic()
+
+        job = JobOpening(
+            expertise_domain=domains[0],
+            experience_level=JobOpening.ExperienceLevel.values[0],
+            interpersonal_skills=interpersonal[:3],
+            technical_skills=technical[:6],
+        )
+        matches = rank_pool(pool, job, default_profile(), top_k=top_k)
+        ranked = time.monotonic()
+
+        self.stdout.write(
+            f"{size} candidates: encode {encoded - started:.2f}s, rank {(ranked - encoded) * 1000:.1f}ms, "
+            f"best score {matches[0].match_score if matches else '-'}"
+        )
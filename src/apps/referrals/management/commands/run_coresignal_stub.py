@@ -0,0 +1,81 @@
+"""
+Serveur Coresignal local déterministe (voir services/coresignal_stub).
+
+Exemples:
+    python manage.py run_coresignal_stub
+    python manage.py run_coresignal_stub --latency 0.4 --jitter 0.2 --error-rate 0.05 --reset-rate 0.02
+    python manage.py run_coresignal_stub --benchmark 200   # client poolé vs connexion neuve par appel
+
+Puis, côté application :
+    CORESIGNAL_BASE_URL=http://127.0.0.1:8766 CORESIGNAL_API_KEY=stub python manage.py runserver
+"""
+
+import statistics
+import time
+
+import requests
+from django.test import override_settings
+
+from apps.referrals.services import linkedin_scraper
+from apps.referrals.services.coresignal_stub import COLLECT_PATH, CoresignalStubConfig, make_coresignal_stub_server
+from common.stub_server import BaseStubCommand, serving
+
+
+class Command(BaseStubCommand):
+    help = "Lance un serveur Coresignal local (profils déterministes), ou mesure le client contre lui"
+    service_name = "Coresignal"
+    default_port = 8766
+    config_class = CoresignalStubConfig
+    error_rate_help = "Part de réponses 503 (0-1)"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--reset-rate", type=float, default=0.0, help="Part de connexions coupées (0-1)")
+        parser.add_argument("--benchmark", type=int, metavar="N", help="Mesurer N appels sur un serveur éphémère")
+
+    def make_server(self, host, port, config):
+        return make_coresignal_stub_server(host, port, config)
+
+    def benchmark(self, count, config, options):
+        server = make_coresignal_stub_server(port=0, config=config)
+        urls = [f"https://www.linkedin.com/in/benchmark-{i}" for i in range(count)]
+
+        with serving(server) as base_url:
+            with override_settings(CORESIGNAL_BASE_URL=base_url, CORESIGNAL_API_KEY="stub"):
+                connections = server.connections_count
+                started = time.monotonic()
+                pooled = []
+                failures = 0
+                for url in urls:
+                    call_started = time.monotonic()
+                    if not linkedin_scraper._scrape_with_coresignal(url).get("headline"):
+                        failures += 1
+                    pooled.append(time.monotonic() - call_started)
+                pooled_total = time.monotonic() - started
+                pooled_connections = server.connections_count - connections
+
+            connections = server.connections_count
+            started = time.monotonic()
+            fresh = []
+            for url in urls:
+                call_started = time.monotonic()
+                try:
+                    requests.get(f"{base_url}{COLLECT_PATH}{url}", headers={"apikey": "stub"}, timeout=30)
+                except requests.RequestException:
+                    pass
+                fresh.append(time.monotonic() - call_started)
+            fresh_total = time.monotonic() - started
+            fresh_connections = server.connections_count - connections
+
+        self.stdout.write(self._summary("pooled session", pooled, pooled_total, pooled_connections))
+        self.stdout.write(self._summary("requests.get", fresh, fresh_total, fresh_connections))
+        self.stdout.write(f"Pooled session failures after retries: {failures}")
+
+    @staticmethod
+    def _summary(label: str, latencies, total: float, connections: int) -> str:
+        ordered = sorted(latencies)
+        p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) >= 20 else ordered[-1]
+        return (
+            f"{label}: {len(latencies)} calls in {total:.2f}s, {connections} connections, "
+            f"mean {statistics.mean(latencies) * 1000:.2f}ms, p95 {p95 * 1000:.2f}ms"
+        )
@@ -0,0 +1,29 @@
+"""
+Serveur LLM local déterministe (voir services/llm_stub).
+
+Exemples:
+    python manage.py run_llm_stub
+    python manage.py run_llm_stub --latency 0.8 --jitter 0.3 --rate-limit-rate 0.05 --error-rate 0.02
+
+Puis, côté application :
+    LLM_PROVIDER=stub LLM_STUB_URL=http://127.0.0.1:8765 python manage.py runserver
+"""
+
+from apps.referrals.services.llm_stub import StubConfig, make_stub_server
+from common.stub_server import BaseStubCommand
+
+
+class Command(BaseStubCommand):
+    help = "Lance un serveur LLM local compatible /v1/responses (réponses JSON déterministes)"
+    service_name = "LLM"
+    default_port = 8765
+    config_class = StubConfig
+    error_rate_help = "Part de réponses 500 (0-1)"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Part de réponses 429 (0-1)")
+        parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After des 429 (secondes)")
+
+    def make_server(self, host, port, config):
+        return make_stub_server(host, port, config)
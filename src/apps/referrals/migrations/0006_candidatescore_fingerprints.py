@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('referrals', '0005_rewardoutcome_reward_points'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatescore',
+            name='llm_fingerprint',
+            field=models.CharField(blank=True, help_text='Empreinte du prompt LLM (vide si fallback)', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='candidatescore',
+            name='rule_fingerprint',
+            field=models.CharField(blank=True, help_text='Empreinte des entrées du score par règles', max_length=64),
+        ),
+    ]
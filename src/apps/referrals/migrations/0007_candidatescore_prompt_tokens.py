@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('referrals', '0006_candidatescore_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatescore',
+            name='llm_prompt_prefix_tokens',
+            field=models.PositiveIntegerField(default=0, help_text='Dont tokens du préfixe commun au poste (cache fournisseur)'),
+        ),
+        migrations.AddField(
+            model_name='candidatescore',
+            name='llm_prompt_tokens',
+            field=models.PositiveIntegerField(default=0, help_text='Tokens estimés du prompt LLM (system + user)'),
+        ),
+    ]
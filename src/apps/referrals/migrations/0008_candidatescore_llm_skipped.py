@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('referrals', '0007_candidatescore_prompt_tokens'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatescore',
+            name='llm_skipped',
+            field=models.BooleanField(default=False, help_text='Analyse LLM non lancée : le score par règles fixait le grade'),
+        ),
+    ]
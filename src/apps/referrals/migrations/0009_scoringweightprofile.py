@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        ('referrals', '0008_candidatescore_llm_skipped'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoringWeightProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('is_active', models.BooleanField(default=False)),
+                ('expertise_match', models.PositiveSmallIntegerField()),
+                ('experience_match', models.PositiveSmallIntegerField()),
+                ('interpersonal_skills_match', models.PositiveSmallIntegerField()),
+                ('technical_skills_match', models.PositiveSmallIntegerField()),
+                ('referral_quality', models.PositiveSmallIntegerField()),
+                ('rule_score_weight', models.FloatField()),
+                ('llm_score_weight', models.FloatField()),
+                ('experience_ranges', models.JSONField(blank=True, default=dict, help_text='Fourchettes d\'années par niveau d\'expérience, ex. {"C_LEVEL": [18, 25]}')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_scoring_weight_profiles', to='organizations.organizationmember')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scoring_weight_profiles', to='organizations.organization')),
+            ],
+            options={
+                'db_table': 'scoring_weight_profiles',
+                'ordering': ['-version'],
+                'constraints': [models.UniqueConstraint(fields=('organization', 'version'), name='unique_weight_profile_version'), models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('organization',), name='unique_active_weight_profile')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:44
+
+from collections import defaultdict
+
+from django.db import migrations
+
+ACCEPTED_STATUSES = {"ACCEPTED", "HIRED"}
+REVIEW_STATUSES = {"SUBMITTED", "REVIEWED"}
+
+
+def backfill_referrer_stats(apps, schema_editor):
+    """Reconstitue les compteurs à partir des referrals et de leurs événements (mêmes règles que referrer_stats)."""
+    Referral = apps.get_model("referrals", "Referral")
+    ReferralStatusEvent = apps.get_model("referrals", "ReferralStatusEvent")
+    ReferrerStats = apps.get_model("referrals", "ReferrerStats")
+
+    counters = defaultdict(lambda: defaultdict(int))
+    referrers = {}
+    for referral_id, organization_id, referrer_id in Referral.objects.values_list(
+        "id", "organization_id", "referrer_id"
+    ).iterator():
+        referrers[referral_id] = (organization_id, referrer_id)
+        counters[(organization_id, referrer_id)]["referrals_count"] += 1
+
+    accepted, hired, rejected = set(), set(), set()
+    for referral_id, from_status, to_status in ReferralStatusEvent.objects.order_by(
+        "created_at", "id"
+    ).values_list("referral_id", "from_status", "to_status").iterator():
+        from_status = (from_status or "").upper() or None
+        to_status = (to_status or "").upper()
+        if to_status in ACCEPTED_STATUSES:
+            accepted.add(referral_id)
+        if to_status == "HIRED":
+            hired.add(referral_id)
+        if to_status == "REJECTED" and from_status in REVIEW_STATUSES and referral_id not in accepted:
+            rejected.add(referral_id)
+
+    for field, referral_ids in (
+        ("accepted_count", accepted),
+        ("hired_count", hired),
+        ("rejected_count", rejected),
+    ):
+        for referral_id in referral_ids:
+            counters[referrers[referral_id]][field] += 1
+
+    ReferrerStats.objects.bulk_create(
+        [
+            ReferrerStats(organization_id=organization_id, referrer_id=referrer_id, **values)
+            for (organization_id, referrer_id), values in counters.items()
+        ],
+        batch_size=500,
+    )
+
+
+def clear_referrer_stats(apps, schema_editor):
+    apps.get_model("referrals", "ReferrerStats").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('referrals', '0010_referrerstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_referrer_stats, clear_referrer_stats),
+    ]
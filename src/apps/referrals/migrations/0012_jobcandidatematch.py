@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_alter_jobopening_reward_display'),
+        ('organizations', '0001_initial'),
+        ('referrals', '0011_backfill_referrer_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobCandidateMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField()),
+                ('match_score', models.IntegerField()),
+                ('expertise_match', models.IntegerField(default=0)),
+                ('experience_match', models.IntegerField(default=0)),
+                ('interpersonal_skills_match', models.IntegerField(default=0)),
+                ('technical_skills_match', models.IntegerField(default=0)),
+                ('job_fingerprint', models.CharField(max_length=64)),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_matches', to='referrals.candidate')),
+                ('job_opening', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candidate_matches', to='jobs.jobopening')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_candidate_matches', to='organizations.organization')),
+            ],
+            options={
+                'db_table': 'job_candidate_matches',
+                'ordering': ['rank'],
+                'indexes': [models.Index(fields=['job_opening', 'rank'], name='job_candida_job_ope_9f51a0_idx')],
+                'constraints': [models.UniqueConstraint(fields=('job_opening', 'candidate'), name='unique_job_candidate_match')],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        ('referrals', '0012_jobcandidatematch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMQuota',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('monthly_soft_tokens', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('monthly_hard_tokens', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='llm_quota', to='organizations.organization')),
+            ],
+            options={
+                'db_table': 'llm_quotas',
+            },
+        ),
+        migrations.CreateModel(
+            name='LLMUsageDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('feature', models.CharField(max_length=40)),
+                ('model', models.CharField(max_length=60)),
+                ('calls', models.PositiveIntegerField(default=0)),
+                ('input_tokens', models.BigIntegerField(default=0)),
+                ('output_tokens', models.BigIntegerField(default=0)),
+                ('latency_ms_total', models.BigIntegerField(default=0)),
+                ('cost_usd', models.FloatField(default=0)),
+                ('organization', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='llm_usage_daily', to='organizations.organization')),
+            ],
+            options={
+                'db_table': 'llm_usage_daily',
+                'ordering': ['-day', 'feature', 'model'],
+                'constraints': [models.UniqueConstraint(fields=('organization', 'day', 'feature', 'model'), name='unique_llm_usage_daily'), models.UniqueConstraint(condition=models.Q(('organization__isnull', True)), fields=('day', 'feature', 'model'), name='unique_llm_usage_daily_no_org')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LLMUsageRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feature', models.CharField(max_length=40)),
+                ('model', models.CharField(max_length=60)),
+                ('tier', models.CharField(max_length=20)),
+                ('input_tokens', models.PositiveIntegerField()),
+                ('output_tokens', models.PositiveIntegerField()),
+                ('latency_ms', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('organization', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='llm_usage_records', to='organizations.organization')),
+            ],
+            options={
+                'db_table': 'llm_usage_records',
+                'indexes': [models.Index(fields=['organization', 'created_at'], name='llm_usage_r_organiz_2a28d7_idx')],
+            },
+        ),
+    ]
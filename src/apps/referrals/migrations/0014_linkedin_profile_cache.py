@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('referrals', '0013_llm_usage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkedInProfileCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_key', models.CharField(max_length=255, unique=True)),
+                ('payload', models.JSONField()),
+                ('fetched_at', models.DateTimeField()),
+                ('last_used_at', models.DateTimeField(db_index=True)),
+                ('hits', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'linkedin_profile_cache',
+            },
+        ),
+    ]
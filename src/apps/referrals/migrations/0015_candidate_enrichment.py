@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:02
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def set_existing_enrichment_status(apps, schema_editor):
+    """Candidats existants : déjà scrapés, sans URL, ou à (re)tenter par enrich_candidates."""
+    Candidate = apps.get_model("referrals", "Candidate")
+    Candidate.objects.filter(linkedin_scraped_at__isnull=False).update(
+        enrichment_status="ENRICHED", enrichment_updated_at=models.F("linkedin_scraped_at")
+    )
+    Candidate.objects.filter(Q(linkedin_url__isnull=True) | Q(linkedin_url="")).update(
+        enrichment_status="NO_PROFILE"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        ('referrals', '0014_linkedin_profile_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='enrichment_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='enrichment_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='enrichment_status',
+            field=models.CharField(choices=[('PENDING', 'En attente'), ('ENRICHED', 'Profil LinkedIn récupéré'), ('FAILED', 'Échec'), ('NO_PROFILE', 'Pas de profil LinkedIn')], default='PENDING', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='enrichment_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['enrichment_status'], name='candidates_enrichm_087275_idx'),
+        ),
+        migrations.RunPython(set_existing_enrichment_status, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('referrals', '0016_linkedin_extraction_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoringClaim',
+            fields=[
+                ('referral', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='scoring_claim', serialize=False, to='referrals.referral')),
+                ('token', models.UUIDField()),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'scoring_claims',
+            },
+        ),
+    ]
@@ -14,6 +14,12 @@ class Candidate(models.Model):
     A candidate profile within an organization context.
     """
 
+    class EnrichmentStatus(models.TextChoices):
+        PENDING = "PENDING", "En attente"
+        ENRICHED = "ENRICHED", "Profil LinkedIn récupéré"
+        FAILED = "FAILED", "Échec"
+        NO_PROFILE = "NO_PROFILE", "Pas de profil LinkedIn"
+
     organization = models.ForeignKey(
         Organization, on_delete=models.CASCADE, related_name="candidates"
     )
@@ -39,7 +45,15 @@ class Candidate(models.Model):
     linkedin_education = models.JSONField(blank=True, null=True)
     linkedin_skills = models.JSONField(blank=True, null=True)
     linkedin_scraped_at = models.DateTimeField(null=True, blank=True)
-    
+
+    # Enrichissement en arrière-plan (voir services.candidate_enrichment)
+    enrichment_status = models.CharField(
+        max_length=20, choices=EnrichmentStatus.choices, default=EnrichmentStatus.PENDING
+    )
+    enrichment_attempts = models.PositiveSmallIntegerField(default=0)
+    enrichment_error = models.TextField(blank=True, default="")
+    enrichment_updated_at = models.DateTimeField(null=True, blank=True)
+
     consent_confirmed = models.BooleanField(default=False)
     consent_confirmed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -49,6 +63,7 @@ class Candidate(models.Model):
         indexes = [
             models.Index(fields=["organization", "email"]),
             models.Index(fields=["expertise_domain"]),
+            models.Index(fields=["enrichment_status"]),
         ]
 
     def __str__(self) -> str:
@@ -233,7 +248,26 @@ class CandidateScore(models.Model):
     scored_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     llm_model_used = models.CharField(max_length=50, blank=True, help_text="Modèle LLM utilisé")
-    
+
+    # Empreintes des entrées : un rescoring ne recalcule que la partie modifiée
+    rule_fingerprint = models.CharField(
+        max_length=64, blank=True, help_text="Empreinte des entrées du score par règles"
+    )
+    llm_fingerprint = models.CharField(
+        max_length=64, blank=True, help_text="Empreinte du prompt LLM (vide si fallback)"
+    )
+
+    # Taille estimée du prompt LLM
+    llm_prompt_tokens = models.PositiveIntegerField(
+        default=0, help_text="Tokens estimés du prompt LLM (system + user)"
+    )
+    llm_prompt_prefix_tokens = models.PositiveIntegerField(
+        default=0, help_text="Dont tokens du préfixe commun au poste (cache fournisseur)"
+    )
+    llm_skipped = models.BooleanField(
+        default=False, help_text="Analyse LLM non lancée : le score par règles fixait le grade"
+    )
+
     class Meta:
         db_table = "candidate_scores"
         indexes = [
@@ -246,6 +280,291 @@ class CandidateScore(models.Model):
         return f"Score {self.final_score} ({self.grade}) for {self.referral}"
 
 
+class ScoringClaim(models.Model):
+    """
+    Calcul de score en cours pour un referral (voir score_lifecycle) : un
+    seul process à la fois calcule le score, sans garder de transaction
+    ouverte pendant l'appel LLM. Une réservation expirée est reprise.
+    """
+
+    referral = models.OneToOneField(
+        Referral, on_delete=models.CASCADE, primary_key=True, related_name="scoring_claim"
+    )
+    token = models.UUIDField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "scoring_claims"
+
+    def __str__(self) -> str:
+        return f"Scoring claim for referral {self.referral_id} until {self.expires_at}"
+
+
+class ScoringWeightProfile(models.Model):
+    """
+    Pondération du scoring propre à une organisation, versionnée.
+    Un profil n'est jamais modifié : ajuster les poids crée une nouvelle
+    version. Au plus un profil actif par organisation ; sans profil actif,
+    les constantes de candidate_scoring s'appliquent.
+    """
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="scoring_weight_profiles"
+    )
+    version = models.PositiveIntegerField()
+    name = models.CharField(max_length=100, blank=True)
+    is_active = models.BooleanField(default=False)
+
+    # Poids des composantes règles, en points (total: 100)
+    expertise_match = models.PositiveSmallIntegerField()
+    experience_match = models.PositiveSmallIntegerField()
+    interpersonal_skills_match = models.PositiveSmallIntegerField()
+    technical_skills_match = models.PositiveSmallIntegerField()
+    referral_quality = models.PositiveSmallIntegerField()
+
+    # Combinaison hybride (total: 1)
+    rule_score_weight = models.FloatField()
+    llm_score_weight = models.FloatField()
+
+    experience_ranges = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Fourchettes d'années par niveau d'expérience, ex. {\"C_LEVEL\": [18, 25]}",
+    )
+
+    created_by = models.ForeignKey(
+        OrganizationMember,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="created_scoring_weight_profiles",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "scoring_weight_profiles"
+        ordering = ["-version"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization", "version"], name="unique_weight_profile_version"
+            ),
+            models.UniqueConstraint(
+                fields=["organization"],
+                condition=models.Q(is_active=True),
+                name="unique_active_weight_profile",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Weight profile v{self.version} for {self.organization}"
+
+
+class JobCandidateMatch(models.Model):
+    """
+    Candidat du vivier de l'organisation suggéré pour un poste (top-K du
+    score par règles, hors qualité du referral), recalculé en arrière-plan à
+    la création du poste et à chaque modification de ses critères.
+    """
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="job_candidate_matches"
+    )
+    job_opening = models.ForeignKey(
+        JobOpening, on_delete=models.CASCADE, related_name="candidate_matches"
+    )
+    candidate = models.ForeignKey(
+        Candidate, on_delete=models.CASCADE, related_name="job_matches"
+    )
+    rank = models.PositiveIntegerField()
+    # Score de correspondance 0-100 (composantes pondérées par le profil actif)
+    match_score = models.IntegerField()
+
+    # Composantes règles, à l'échelle des poids par défaut (comme CandidateScore)
+    expertise_match = models.IntegerField(default=0)
+    experience_match = models.IntegerField(default=0)
+    interpersonal_skills_match = models.IntegerField(default=0)
+    technical_skills_match = models.IntegerField(default=0)
+
+    # Empreinte des critères du poste au moment du calcul
+    job_fingerprint = models.CharField(max_length=64)
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "job_candidate_matches"
+        ordering = ["rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["job_opening", "candidate"], name="unique_job_candidate_match"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["job_opening", "rank"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Match #{self.rank} ({self.match_score}) for {self.job_opening}"
+
+
+class ReferrerStats(models.Model):
+    """
+    Historique d'un recommandeur dans une organisation, tenu à jour de façon
+    incrémentale à chaque ReferralStatusEvent (voir services.referrer_stats).
+    Lu par le scoring : pas d'agrégation sur la table referrals.
+    """
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="referrer_stats"
+    )
+    referrer = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="referrer_stats"
+    )
+    referrals_count = models.PositiveIntegerField(default=0)
+    # Referrals ayant atteint ACCEPTED ou HIRED (comptés une seule fois)
+    accepted_count = models.PositiveIntegerField(default=0)
+    hired_count = models.PositiveIntegerField(default=0)
+    # Referrals refusés par le recruteur sans avoir été acceptés
+    rejected_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "referrer_stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization", "referrer"], name="unique_referrer_stats"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Stats for {self.referrer} in {self.organization}"
+
+
+class LLMUsageRecord(models.Model):
+    """
+    Un appel LLM abouti : tokens, latence, modèle et fonctionnalité appelante.
+    Table d'audit compacte ; les agrégats se lisent dans LLMUsageDaily.
+    """
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.SET_NULL, null=True, related_name="llm_usage_records"
+    )
+    feature = models.CharField(max_length=40)
+    model = models.CharField(max_length=60)
+    tier = models.CharField(max_length=20)
+    input_tokens = models.PositiveIntegerField()
+    output_tokens = models.PositiveIntegerField()
+    latency_ms = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "llm_usage_records"
+        indexes = [
+            models.Index(fields=["organization", "created_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.feature} {self.model}: {self.input_tokens}+{self.output_tokens} tokens"
+
+
+class LLMUsageDaily(models.Model):
+    """
+    Consommation LLM agrégée par jour, organisation, fonctionnalité et modèle,
+    tenue à jour à chaque appel (voir services.llm_usage).
+    """
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.SET_NULL, null=True, related_name="llm_usage_daily"
+    )
+    day = models.DateField()
+    feature = models.CharField(max_length=40)
+    model = models.CharField(max_length=60)
+    calls = models.PositiveIntegerField(default=0)
+    input_tokens = models.BigIntegerField(default=0)
+    output_tokens = models.BigIntegerField(default=0)
+    latency_ms_total = models.BigIntegerField(default=0)
+    cost_usd = models.FloatField(default=0)
+
+    class Meta:
+        db_table = "llm_usage_daily"
+        ordering = ["-day", "feature", "model"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization", "day", "feature", "model"],
+                name="unique_llm_usage_daily",
+            ),
+            # NULL organizations are distinct in a plain unique constraint
+            models.UniqueConstraint(
+                fields=["day", "feature", "model"],
+                condition=models.Q(organization__isnull=True),
+                name="unique_llm_usage_daily_no_org",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"LLM usage {self.day} {self.feature} {self.model}"
+
+
+class LLMQuota(models.Model):
+    """
+    Quotas mensuels de tokens LLM (entrée + sortie) d'une organisation.
+    Soft : alerte et plus d'escalade vers le modèle fort ; hard : plus d'appel
+    LLM (scores de repli) jusqu'au mois suivant. Vide = pas de limite.
+    """
+
+    organization = models.OneToOneField(
+        Organization, on_delete=models.CASCADE, related_name="llm_quota"
+    )
+    monthly_soft_tokens = models.PositiveBigIntegerField(null=True, blank=True)
+    monthly_hard_tokens = models.PositiveBigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "llm_quotas"
+
+    def __str__(self) -> str:
+        return f"LLM quota for {self.organization}"
+
+
+class LinkedInProfileCache(models.Model):
+    """
+    Profil LinkedIn normalisé (sortie de _scrape_with_coresignal), partagé
+    par parseLinkedinProfile, submitReferral et les traitements d'enrichissement.
+    Clé : URL canonique du profil. Durée de vie et éviction : voir
+    services.linkedin_profile_cache.
+    """
+
+    url_key = models.CharField(max_length=255, unique=True)
+    payload = models.JSONField()
+    fetched_at = models.DateTimeField()
+    last_used_at = models.DateTimeField(db_index=True)
+    hits = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "linkedin_profile_cache"
+
+    def __str__(self) -> str:
+        return self.url_key
+
+
+class LinkedInExtractionCache(models.Model):
+    """
+    Champs de formulaire extraits par le LLM d'un profil LinkedIn, indexés
+    par le hash du prompt d'extraction (champs du profil utilisés + version
+    du prompt). Voir services.linkedin_profile_parser.
+    """
+
+    cache_key = models.CharField(max_length=64, unique=True)
+    prompt_version = models.PositiveSmallIntegerField()
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(db_index=True)
+    hits = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "linkedin_extraction_cache"
+
+    def __str__(self) -> str:
+        return f"Extraction v{self.prompt_version} {self.cache_key[:12]}"
+
+
 def _default_consent_expiry():
     return timezone.now() + timedelta(days=7)
 
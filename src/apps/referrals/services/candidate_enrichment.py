@@ -0,0 +1,275 @@
+"""
+Enrichissement des candidats en arrière-plan : profil LinkedIn puis scoring.
+
+submitReferral ne fait plus que des insertions et soumet enrich_candidate au
+commit (common.background). Le pipeline enchaîne quatre étapes :
+
+1. scrape : scrape_linkedin_profile (cache persistant, single-flight) ;
+2. normalize : profil brut -> champs linkedin_* du candidat ;
+3. persist : écriture des champs linkedin_* et de enrichment_status ;
+4. score : score des referrals du candidat, recalculé seulement s'il est
+   périmé (les champs LinkedIn entrent dans les empreintes du score).
+
+Chaque étape est idempotente : relancer le pipeline sur un candidat déjà
+enrichi relit le cache et ne recalcule aucun score à jour. Un échec de
+scrape / normalize / persist passe le candidat en FAILED (tentatives et
+erreur conservées) ; le scoring est lancé dans tous les cas, avec ou sans
+données LinkedIn. La commande enrich_candidates reprend les échecs, les
+tâches perdues (PENDING trop ancien) et les profils périmés.
+
+Chaque étape alimente candidate_enrichment_stage_total{stage, outcome} et
+candidate_enrichment_stage_seconds_total{stage}.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, fields as dataclass_fields
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import F, Q, QuerySet
+from django.utils import timezone
+
+from apps.referrals.models import Candidate, Referral
+from apps.referrals.services.linkedin_profile_cache import (
+    canonicalize_linkedin_url,
+    get_cached_profile,
+    has_profile_data,
+)
+from apps.referrals.services.linkedin_scraper import scrape_linkedin_profile
+from apps.referrals.services.score_lifecycle import refresh_referral_score
+from common import metrics
+from common.ratelimit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+ENRICHMENT_MAX_ATTEMPTS = int(os.environ.get("ENRICHMENT_MAX_ATTEMPTS", "3"))
+# Profils LinkedIn à rafraîchir au-delà de cet âge (jours)
+ENRICHMENT_STALE_DAYS = int(os.environ.get("ENRICHMENT_STALE_DAYS", "90"))
+# Un candidat PENDING depuis plus longtemps a perdu sa tâche (redémarrage)
+ENRICHMENT_PENDING_TIMEOUT_MINUTES = int(os.environ.get("ENRICHMENT_PENDING_TIMEOUT_MINUTES", "15"))
+
+HEADLINE_MAX_LENGTH = Candidate._meta.get_field("linkedin_headline").max_length
+
+
+class EnrichmentError(Exception):
+    """Échec d'une étape d'enrichissement (retentable)."""
+
+
+def _run_stage(stage: str, candidate_id: int, fn: Callable[[], Any]) -> Any:
+    started = time.monotonic()
+    try:
+        result = fn()
+    except Exception as e:
+        metrics.increment("candidate_enrichment_stage_total", stage=stage, outcome="error")
+        logger.warning(f"Enrichment of candidate {candidate_id} failed at {stage}: {e}")
+        raise
+    finally:
+        metrics.increment("candidate_enrichment_stage_seconds_total", time.monotonic() - started, stage=stage)
+    metrics.increment("candidate_enrichment_stage_total", stage=stage, outcome="success")
+    return result
+
+
+def _list_of(value: Any, item_type: type) -> list:
+    return [item for item in value if isinstance(item, item_type)] if isinstance(value, list) else []
+
+
+def normalize_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Profil brut de scrape_linkedin_profile -> champs linkedin_* du candidat."""
+    if not isinstance(profile, dict) or not has_profile_data(profile):
+        raise EnrichmentError("Empty LinkedIn profile")
+    headline = profile.get("headline")
+    return {
+        "linkedin_headline": headline[:HEADLINE_MAX_LENGTH] if isinstance(headline, str) else None,
+        "linkedin_summary": profile.get("summary") if isinstance(profile.get("summary"), str) else None,
+        "linkedin_experience": _list_of(profile.get("experience"), dict),
+        "linkedin_education": _list_of(profile.get("education"), dict),
+        "linkedin_skills": _list_of(profile.get("skills"), str),
+    }
+
+
+def _update(candidate: Candidate, **fields) -> None:
+    Candidate.objects.filter(id=candidate.id).update(**fields)
+
+
+def _score_referrals(candidate: Candidate) -> None:
+    """Score de chaque referral du candidat, recalculé s'il est absent ou périmé."""
+    referrals = Referral.objects.filter(candidate_id=candidate.id).select_related("candidate", "job_opening")
+    for referral in referrals:
+        refresh_referral_score(referral, use_llm=True, only_if_stale=True)
+
+
+def run_enrichment(candidate: Candidate, score: bool = True) -> str:
+    """Exécute le pipeline pour un candidat chargé ; retourne son enrichment_status final."""
+    if not candidate.linkedin_url or canonicalize_linkedin_url(candidate.linkedin_url) is None:
+        status = Candidate.EnrichmentStatus.NO_PROFILE
+        _update(candidate, enrichment_status=status, enrichment_updated_at=timezone.now())
+    else:
+        # Marks the attempt as in progress for the PENDING timeout (candidates_to_enrich)
+        _update(candidate, enrichment_attempts=F("enrichment_attempts") + 1, enrichment_updated_at=timezone.now())
+        try:
+            profile = _run_stage("scrape", candidate.id, lambda: scrape_linkedin_profile(candidate.linkedin_url))
+            fields = _run_stage("normalize", candidate.id, lambda: normalize_profile(profile))
+            now = timezone.now()
+            status = Candidate.EnrichmentStatus.ENRICHED
+            _run_stage("persist", candidate.id, lambda: _update(
+                candidate,
+                **fields,
+                linkedin_scraped_at=now,
+                enrichment_status=status,
+                enrichment_error="",
+                enrichment_updated_at=now,
+            ))
+        except Exception as e:
+            status = Candidate.EnrichmentStatus.FAILED
+            _update(
+                candidate,
+                enrichment_status=status,
+                enrichment_error=str(e)[:1000],
+                enrichment_updated_at=timezone.now(),
+            )
+
+    if score:
+        try:
+            _run_stage("score", candidate.id, lambda: _score_referrals(candidate))
+        except Exception:
+            # Scores stay recomputable (refreshStaleJobScores, enrich_candidates)
+            pass
+    return status
+
+
+def enrich_candidate(candidate_id: int, score: bool = True) -> str:
+    """Point d'entrée des tâches d'arrière-plan et de la commande enrich_candidates."""
+    candidate = Candidate.objects.filter(id=candidate_id).first()
+    if candidate is None:
+        logger.info(f"Candidate {candidate_id} deleted before enrichment")
+        return ""
+    return run_enrichment(candidate, score=score)
+
+
+def candidates_to_enrich(stale_days: int = ENRICHMENT_STALE_DAYS) -> QuerySet:
+    """
+    Candidats à (re)traiter : échecs retentables, tâches perdues (PENDING sans
+    activité depuis ENRICHMENT_PENDING_TIMEOUT_MINUTES), profils périmés.
+    """
+    now = timezone.now()
+    pending_cutoff = now - timedelta(minutes=ENRICHMENT_PENDING_TIMEOUT_MINUTES)
+    statuses = Candidate.EnrichmentStatus
+    return Candidate.objects.filter(
+        Q(enrichment_status=statuses.FAILED, enrichment_attempts__lt=ENRICHMENT_MAX_ATTEMPTS)
+        | Q(enrichment_status=statuses.PENDING, enrichment_updated_at__lt=pending_cutoff)
+        # Candidates created before enrichment_updated_at was set on submission
+        | Q(enrichment_status=statuses.PENDING, enrichment_updated_at__isnull=True, created_at__lt=pending_cutoff)
+        | Q(enrichment_status=statuses.ENRICHED, linkedin_scraped_at__lt=now - timedelta(days=stale_days))
+    )
+
+
+# =============================================================================
+# Backfill en masse (commande backfill_linkedin)
+# =============================================================================
+
+BULK_FIELDS = [
+    "linkedin_headline",
+    "linkedin_summary",
+    "linkedin_experience",
+    "linkedin_education",
+    "linkedin_skills",
+    "linkedin_scraped_at",
+    "enrichment_status",
+    "enrichment_attempts",
+    "enrichment_error",
+    "enrichment_updated_at",
+]
+
+
+@dataclass
+class BackfillStats:
+    candidates: int = 0
+    urls: int = 0
+    fetched: int = 0  # appels Coresignal
+    cached: int = 0
+    enriched: int = 0
+    failed: int = 0
+
+    def add(self, other: "BackfillStats") -> None:
+        for field in dataclass_fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+    @property
+    def error_rate(self) -> float:
+        return self.failed / self.candidates if self.candidates else 0.0
+
+
+def _fetch_profile(linkedin_url: str, limiter: Optional[RateLimiter]) -> Tuple[str, Any]:
+    """("cached" | "fetched", profil) ou ("error", exception). Seuls les appels Coresignal consomment le débit."""
+    try:
+        cached = get_cached_profile(linkedin_url)
+        if cached is not None:
+            return "cached", cached
+        if limiter is not None:
+            limiter.acquire()
+        return "fetched", scrape_linkedin_profile(linkedin_url)
+    except Exception as e:
+        return "error", e
+    finally:
+        # Runs in an executor thread: release its connection
+        connection.close()
+
+
+def backfill_profiles(
+    candidates: List[Candidate],
+    executor: Executor,
+    limiter: Optional[RateLimiter] = None,
+) -> BackfillStats:
+    """
+    Enrichit un paquet de candidats : une récupération par URL canonique
+    (dédupliquée dans le paquet, le cache couvrant les paquets suivants),
+    en parallèle dans executor, puis une seule écriture bulk_update.
+    Pas de scoring : les scores devenus périmés sont recalculés par les
+    chemins habituels (refreshStaleJobScores, enrich_candidates).
+    """
+    stats = BackfillStats(candidates=len(candidates))
+    now = timezone.now()
+    by_url: Dict[str, List[Candidate]] = {}
+    for candidate in candidates:
+        candidate.enrichment_attempts += 1
+        candidate.enrichment_updated_at = now
+        key = canonicalize_linkedin_url(candidate.linkedin_url or "")
+        if key is None:
+            candidate.enrichment_status = Candidate.EnrichmentStatus.NO_PROFILE
+            continue
+        by_url.setdefault(key, []).append(candidate)
+    stats.urls = len(by_url)
+
+    futures = {
+        key: executor.submit(_fetch_profile, group[0].linkedin_url, limiter)
+        for key, group in by_url.items()
+    }
+    for key, future in futures.items():
+        outcome, profile = future.result()
+        try:
+            if outcome == "error":
+                raise profile
+            setattr(stats, outcome, getattr(stats, outcome) + 1)
+            fields = normalize_profile(profile)
+        except Exception as e:
+            for candidate in by_url[key]:
+                candidate.enrichment_status = Candidate.EnrichmentStatus.FAILED
+                candidate.enrichment_error = str(e)[:1000]
+            stats.failed += len(by_url[key])
+            continue
+        for candidate in by_url[key]:
+            for field, value in fields.items():
+                setattr(candidate, field, value)
+            candidate.linkedin_scraped_at = now
+            candidate.enrichment_status = Candidate.EnrichmentStatus.ENRICHED
+            candidate.enrichment_error = ""
+        stats.enriched += len(by_url[key])
+
+    Candidate.objects.bulk_update(candidates, BULK_FIELDS)
+    metrics.increment("candidate_enrichment_stage_total", stats.enriched, stage="backfill", outcome="success")
+    metrics.increment("candidate_enrichment_stage_total", stats.failed, stage="backfill", outcome="error")
+    return stats
@@ -7,18 +7,36 @@ Combine:
 2. Score sémantique via LLM (50%)
 """
 
+import hashlib
 import json
 import logging
 import os
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import requests
-from openai import OpenAI, RateLimitError, OpenAIError
+from openai import OpenAI
 
 from apps.jobs.models import JobOpening
 from apps.referrals.models import Candidate, Referral
+from apps.referrals.services.llm_providers import (
+    OPENAI_TIMEOUT,
+    LLMRateLimited,
+    LLMRequestError,
+    LLMResponse,
+    LLMUnavailable,
+    get_llm_provider,
+)
+from apps.referrals.services.llm_resilience import AdaptiveConcurrencyLimiter, CircuitBreaker
+from apps.referrals.services.llm_usage import FEATURE_SCORING, get_quota_status, record_llm_usage
+from apps.referrals.services.prompt_budget import estimate_messages_tokens, truncate_to_tokens
+from apps.referrals.services.semantic_similarity import (
+    LOCAL_SIMILARITY_MODEL,
+    compute_similarity_score,
+    is_informative,
+)
+from common import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +49,31 @@ OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
 
+# Routage du scoring par paliers : tous les referrals passent par le modèle
+# rapide ; le modèle fort n'est appelé que pour les réponses invalides ou les
+# scores hybrides à moins de LLM_ESCALATION_MARGIN points d'une frontière de
+# grade (0 = pas d'escalade sur le score).
+OPENAI_MODEL_FAST = os.environ.get("OPENAI_MODEL_FAST", OPENAI_MODEL)
+OPENAI_MODEL_STRONG = os.environ.get("OPENAI_MODEL_STRONG", "gpt-4o")
+LLM_ESCALATION_MARGIN = int(os.environ.get("LLM_ESCALATION_MARGIN", "5"))
+
+GRADE_BOUNDARIES = (40, 60, 80)
+
+# Prix USD par million de tokens (entrée, sortie) pour le compteur de coût
+MODEL_PRICES_PER_MTOK = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+# Pré-filtre local : en dessous de ce score de similarité (0-100), l'appel LLM
+# est jugé inutile et le score local est utilisé. 0 = désactivé.
+LLM_PREFILTER_MIN_SIMILARITY = int(os.environ.get("LLM_PREFILTER_MIN_SIMILARITY", "0"))
+
+# Gating : pas d'appel LLM quand le score par règles suffit à fixer le grade
+LLM_GATING_ENABLED = os.environ.get("LLM_GATING_ENABLED", "true").lower() in ("true", "1", "yes")
+
 
 # =============================================================================
 # Weights configuration
@@ -77,6 +120,16 @@ class ScoringBreakdown:
     rule_score: int = 0
     final_score: int = 0
     
+    # Fingerprints des entrées (rescoring incrémental)
+    rule_fingerprint: str = ""
+    llm_fingerprint: str = ""
+    llm_model: str = ""
+    llm_skipped: bool = False
+    
+    # Taille estimée du prompt LLM (tokens), dont préfixe réutilisable
+    prompt_tokens: int = 0
+    prompt_prefix_tokens: int = 0
+    
     def __post_init__(self):
         if self.llm_strengths is None:
             self.llm_strengths = []
@@ -119,6 +172,30 @@ class CandidateScoringResult:
             "breakdown": self.breakdown.to_dict(),
         }
 
+    def to_model_fields(self) -> Dict[str, Any]:
+        """Valeurs des champs CandidateScore correspondant à ce résultat."""
+        breakdown = self.breakdown
+        return {
+            "final_score": self.score,
+            "rule_score": breakdown.rule_score,
+            "llm_score": breakdown.llm_score,
+            "grade": self.grade,
+            "expertise_match": breakdown.expertise_match,
+            "experience_match": breakdown.experience_match,
+            "interpersonal_skills_match": breakdown.interpersonal_skills_match,
+            "technical_skills_match": breakdown.technical_skills_match,
+            "referral_quality": breakdown.referral_quality,
+            "llm_strengths": breakdown.llm_strengths,
+            "llm_gaps": breakdown.llm_gaps,
+            "llm_summary": breakdown.llm_summary,
+            "llm_model_used": breakdown.llm_model,
+            "rule_fingerprint": breakdown.rule_fingerprint,
+            "llm_fingerprint": breakdown.llm_fingerprint,
+            "llm_prompt_tokens": breakdown.prompt_tokens,
+            "llm_prompt_prefix_tokens": breakdown.prompt_prefix_tokens,
+            "llm_skipped": breakdown.llm_skipped,
+        }
+
 
 # =============================================================================
 # Rule-based scoring
@@ -134,15 +211,20 @@ def compute_expertise_match(candidate: Candidate, job: JobOpening) -> int:
     return 0
 
 
-def compute_experience_match(candidate: Candidate, job: JobOpening) -> int:
+def compute_experience_match(
+    candidate: Candidate,
+    job: JobOpening,
+    experience_ranges: Optional[Dict[str, Tuple[int, int]]] = None,
+) -> int:
     """
     Score l'alignement du niveau d'expérience.
     Perfect match = 20, proche = 10, hors range = 0.
+    experience_ranges : fourchettes du profil de pondération (défaut: EXPERIENCE_RANGES).
     """
     if not job.experience_level:
         return WEIGHTS["experience_match"] // 2  # Partial credit if job doesn't specify
     
-    experience_range = EXPERIENCE_RANGES.get(job.experience_level)
+    experience_range = (experience_ranges or EXPERIENCE_RANGES).get(job.experience_level)
     if not experience_range:
         return WEIGHTS["experience_match"] // 2
     
@@ -196,12 +278,13 @@ def compute_technical_skills_match(candidate: Candidate, job: JobOpening) -> int
     return int(ratio * WEIGHTS["technical_skills_match"])
 
 
-def compute_referral_quality(referral: Referral) -> int:
+def compute_referral_quality(referral: Referral, referrer_adjustment: int = 0) -> int:
     """
     Score la qualité du referral lui-même.
     - Motivation remplie: +8 points
     - Supporting materials: +4 points
     - Relationship type fort: +8 points
+    - Historique du recommandeur: referrer_adjustment (voir referrer_stats)
     """
     score = 0
     
@@ -222,10 +305,17 @@ def compute_referral_quality(referral: Referral) -> int:
     elif referral.relationship_type == "ALUMNI":
         score += 4
     
-    return min(score, WEIGHTS["referral_quality"])
+    score += referrer_adjustment
+    return max(0, min(score, WEIGHTS["referral_quality"]))
 
 
-def compute_rule_score(candidate: Candidate, job: JobOpening, referral: Referral) -> ScoringBreakdown:
+def compute_rule_score(
+    candidate: Candidate,
+    job: JobOpening,
+    referral: Referral,
+    experience_ranges: Optional[Dict[str, Tuple[int, int]]] = None,
+    referrer_adjustment: int = 0,
+) -> ScoringBreakdown:
     """
     Calcule le score basé sur les règles déterministes.
     Retourne un breakdown détaillé.
@@ -233,10 +323,10 @@ def compute_rule_score(candidate: Candidate, job: JobOpening, referral: Referral
     breakdown = ScoringBreakdown()
     
     breakdown.expertise_match = compute_expertise_match(candidate, job)
-    breakdown.experience_match = compute_experience_match(candidate, job)
+    breakdown.experience_match = compute_experience_match(candidate, job, experience_ranges)
     breakdown.interpersonal_skills_match = compute_interpersonal_skills_match(candidate, job)
     breakdown.technical_skills_match = compute_technical_skills_match(candidate, job)
-    breakdown.referral_quality = compute_referral_quality(referral)
+    breakdown.referral_quality = compute_referral_quality(referral, referrer_adjustment)
     
     breakdown.rule_score = (
         breakdown.expertise_match +
@@ -249,22 +339,153 @@ def compute_rule_score(candidate: Candidate, job: JobOpening, referral: Referral
     return breakdown
 
 
+# =============================================================================
+# Input fingerprints (incremental rescoring)
+# =============================================================================
+
+def _fingerprint(payload: Any) -> str:
+    """Hash SHA-256 stable d'une structure JSON-sérialisable."""
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def compute_rule_fingerprint(
+    candidate: Candidate,
+    job: JobOpening,
+    referral: Referral,
+    experience_ranges: Optional[Dict[str, Tuple[int, int]]] = None,
+    referrer_adjustment: int = 0,
+) -> str:
+    """
+    Empreinte des entrées du score par règles.
+    Ne contient que les champs lus par compute_rule_score : modifier un champ
+    hors scoring (salaire, localisation...) ne rend pas le score obsolète.
+    """
+    return _fingerprint({
+        "weights": {
+            key: WEIGHTS[key]
+            for key in (
+                "expertise_match",
+                "experience_match",
+                "interpersonal_skills_match",
+                "technical_skills_match",
+                "referral_quality",
+            )
+        },
+        "experience_ranges": experience_ranges or EXPERIENCE_RANGES,
+        "candidate": {
+            "expertise_domain": candidate.expertise_domain,
+            "years_experience": candidate.years_experience,
+            "interpersonal_skills": candidate.interpersonal_skills or [],
+            "technical_skills": candidate.technical_skills or [],
+            "linkedin_skills": candidate.linkedin_skills or [],
+        },
+        "job": {
+            "expertise_domain": job.expertise_domain,
+            "experience_level": job.experience_level,
+            "interpersonal_skills": job.interpersonal_skills or [],
+            "technical_skills": job.technical_skills or [],
+        },
+        "referral": {
+            "profile_motivation": referral.profile_motivation or "",
+            "supporting_materials": len(referral.supporting_materials or []),
+            "relationship_type": referral.relationship_type,
+            "referrer_adjustment": referrer_adjustment,
+        },
+    })
+
+
+def compute_llm_fingerprint(prompt: str, model: str) -> str:
+    """Empreinte des entrées de l'analyse LLM (prompt complet + modèle)."""
+    return _fingerprint({"model": model, "prompt": prompt})
+
+
+def compute_prefilter_fingerprint(llm_fingerprint: str) -> str:
+    """
+    Empreinte d'un score du pré-filtre local : celle du prompt LLM plus le
+    seuil de similarité. Changer LLM_PREFILTER_MIN_SIMILARITY rend le score
+    obsolète, et l'analyse LLM est alors lancée.
+    """
+    return _fingerprint({"llm": llm_fingerprint, "prefilter_min_similarity": LLM_PREFILTER_MIN_SIMILARITY})
+
+
+def is_llm_result_current(stored_fingerprint: str, llm_fingerprint: str) -> bool:
+    """Le résultat persisté (analyse LLM ou pré-filtre au seuil actuel) correspond-il au prompt ?"""
+    return bool(stored_fingerprint) and stored_fingerprint in (
+        llm_fingerprint,
+        compute_prefilter_fingerprint(llm_fingerprint),
+    )
+
+
 # =============================================================================
 # LLM-based scoring
 # =============================================================================
 
-def build_llm_prompt(candidate: Candidate, job: JobOpening, referral: Referral) -> str:
+# Budgets (tokens estimés) des sections libres du prompt. Les sections
+# structurées (choix, compteurs) sont courtes par construction.
+PROMPT_SECTION_BUDGETS = {
+    "job_description": 600,
+    "job_list": 80,
+    "linkedin_headline": 40,
+    "linkedin_summary": 350,
+    "linkedin_experience": 150,
+    "candidate_list": 80,
+    "relationship_context": 250,
+    "profile_motivation": 250,
+}
+
+# Instructions statiques : en tête du prompt pour former, avec la section
+# poste, un préfixe identique pour tous les candidats d'un même poste
+# (réutilisable par le cache de prompt du fournisseur).
+LLM_PROMPT_INSTRUCTIONS = """Tu es un expert en recrutement exécutif. Évalue sur 100 l'alignement entre le poste et le candidat décrits ci-dessous.
+
+## INSTRUCTIONS
+Analyse en profondeur l'adéquation candidat/poste. Considère:
+1. L'alignement des compétences et de l'expérience
+2. La pertinence du parcours pour le contexte de l'entreprise
+3. La qualité et la crédibilité de la recommandation
+4. Les signaux positifs et négatifs du profil LinkedIn
+
+Réponds UNIQUEMENT avec un JSON valide (sans markdown, sans ```):
+{"score": <0-100>, "strengths": ["point fort 1", "point fort 2", "point fort 3"], "gaps": ["point faible 1", "point faible 2"], "summary": "Résumé en 2-3 phrases de l'évaluation"}
+"""
+
+
+def _budget(text: str, section: str) -> str:
+    return truncate_to_tokens(text, PROMPT_SECTION_BUDGETS[section])
+
+
+def build_job_prompt_prefix(job: JobOpening) -> str:
     """
-    Construit le prompt pour l'analyse LLM.
+    Préfixe du prompt : instructions statiques puis section poste.
+    Ne dépend que du job : octet pour octet identique pour tous ses referrals.
     """
-    # Format job info
+    return f"{LLM_PROMPT_INSTRUCTIONS}\n{build_job_section(job)}"
+
+
+def build_job_section(job: JobOpening) -> str:
+    """Section poste du prompt."""
     job_challenges = ", ".join(job.key_challenges) if job.key_challenges else "Non spécifié"
     job_skills = ", ".join(job.interpersonal_skills) if job.interpersonal_skills else "Non spécifié"
-    
+
+    return f"""## POSTE
+- **Titre**: {job.title}
+- **Description**: {_budget(job.description or 'Non spécifié', "job_description")}
+- **Secteur**: {job.get_activity_sector_display() if job.activity_sector else 'Non spécifié'}
+- **Contexte entreprise**: {job.get_company_context_display() if job.company_context else 'Non spécifié'}
+- **Enjeux clés**: {_budget(job_challenges, "job_list")}
+- **Compétences relationnelles recherchées**: {_budget(job_skills, "job_list")}
+- **Niveau d'expérience**: {job.get_experience_level_display() if job.experience_level else 'Non spécifié'}
+- **Expertise métier**: {job.get_expertise_domain_display() if job.expertise_domain else 'Non spécifié'}
+"""
+
+
+def build_candidate_prompt_section(candidate: Candidate, referral: Referral) -> str:
+    """Partie variable du prompt : candidat puis recommandation."""
     # Format candidate info
     candidate_skills = ", ".join(candidate.technical_skills) if candidate.technical_skills else "Non spécifié"
     candidate_interpersonal = ", ".join(candidate.interpersonal_skills) if candidate.interpersonal_skills else "Non spécifié"
-    
+
     # LinkedIn data
     linkedin_exp = ""
     if candidate.linkedin_experience:
@@ -272,156 +493,377 @@ def build_llm_prompt(candidate: Candidate, job: JobOpening, referral: Referral)
         for exp in experiences[:3]:  # Limit to last 3 experiences
             if isinstance(exp, dict):
                 linkedin_exp += f"- {exp.get('title', 'N/A')} chez {exp.get('company', 'N/A')}\n"
-    
+
     linkedin_skills_str = ""
     if candidate.linkedin_skills:
         skills = candidate.linkedin_skills if isinstance(candidate.linkedin_skills, list) else []
         linkedin_skills_str = ", ".join(skills[:10])  # Limit to 10 skills
-    
-    prompt = f"""Tu es un expert en recrutement exécutif. Évalue l'alignement entre ce candidat et ce poste sur 100.
-
-## POSTE
-- **Titre**: {job.title}
-- **Description**: {job.description or 'Non spécifié'}
-- **Secteur**: {job.get_activity_sector_display() if job.activity_sector else 'Non spécifié'}
-- **Contexte entreprise**: {job.get_company_context_display() if job.company_context else 'Non spécifié'}
-- **Enjeux clés**: {job_challenges}
-- **Compétences relationnelles recherchées**: {job_skills}
-- **Niveau d'expérience**: {job.get_experience_level_display() if job.experience_level else 'Non spécifié'}
-- **Expertise métier**: {job.get_expertise_domain_display() if job.expertise_domain else 'Non spécifié'}
 
+    return f"""
 ## CANDIDAT
 - **Nom**: {candidate.full_name}
 - **Années d'expérience**: {candidate.years_experience}
 - **Domaine d'expertise**: {candidate.get_expertise_domain_display() if candidate.expertise_domain else 'Non spécifié'}
-- **Compétences techniques**: {candidate_skills}
-- **Compétences relationnelles**: {candidate_interpersonal}
+- **Compétences techniques**: {_budget(candidate_skills, "candidate_list")}
+- **Compétences relationnelles**: {_budget(candidate_interpersonal, "candidate_list")}
 
 ### Données LinkedIn
-- **Headline**: {candidate.linkedin_headline or 'Non disponible'}
-- **Résumé**: {candidate.linkedin_summary or 'Non disponible'}
+- **Headline**: {_budget(candidate.linkedin_headline or 'Non disponible', "linkedin_headline")}
+- **Résumé**: {_budget(candidate.linkedin_summary or 'Non disponible', "linkedin_summary")}
 - **Expériences récentes**:
-{linkedin_exp or 'Non disponible'}
-- **Skills LinkedIn**: {linkedin_skills_str or 'Non disponible'}
+{_budget(linkedin_exp, "linkedin_experience") or 'Non disponible'}
+- **Skills LinkedIn**: {_budget(linkedin_skills_str, "candidate_list") or 'Non disponible'}
 
 ## RECOMMANDATION
 - **Type de relation**: {referral.get_relationship_type_display()}
-- **Contexte de la relation**: {referral.relationship_context}
-- **Motivation du recommandeur**: {referral.profile_motivation or 'Non spécifié'}
+- **Contexte de la relation**: {_budget(referral.relationship_context, "relationship_context")}
+- **Motivation du recommandeur**: {_budget(referral.profile_motivation or 'Non spécifié', "profile_motivation")}
 - **Matériaux de support**: {len(referral.supporting_materials or [])} document(s) fourni(s)
+"""
 
-## INSTRUCTIONS
-Analyse en profondeur l'adéquation candidat/poste. Considère:
-1. L'alignement des compétences et de l'expérience
-2. La pertinence du parcours pour le contexte de l'entreprise
-3. La qualité et la crédibilité de la recommandation
-4. Les signaux positifs et négatifs du profil LinkedIn
 
-Réponds UNIQUEMENT avec un JSON valide (sans markdown, sans ```):
-{{"score": <0-100>, "strengths": ["point fort 1", "point fort 2", "point fort 3"], "gaps": ["point faible 1", "point faible 2"], "summary": "Résumé en 2-3 phrases de l'évaluation"}}
-"""
-    return prompt
+def build_llm_prompt(candidate: Candidate, job: JobOpening, referral: Referral) -> str:
+    """
+    Construit le prompt pour l'analyse LLM.
+    Préfixe stable (instructions + poste) suivi de la partie candidat.
+    """
+    return build_job_prompt_prefix(job) + build_candidate_prompt_section(candidate, referral)
+
 
+# Disjoncteur et concurrence adaptative (voir llm_resilience)
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.environ.get("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+LLM_BREAKER_LATENCY_P95 = float(os.environ.get("LLM_BREAKER_LATENCY_P95", "20"))
+LLM_BREAKER_RESET_TIMEOUT = float(os.environ.get("LLM_BREAKER_RESET_TIMEOUT", "30"))
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "16"))
 
-OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", "3"))
-OPENAI_RETRY_BASE_DELAY = float(os.environ.get("OPENAI_RETRY_BASE_DELAY", "2.0"))
+openai_breaker = CircuitBreaker(
+    "openai",
+    failure_threshold=LLM_BREAKER_FAILURE_THRESHOLD,
+    latency_threshold=LLM_BREAKER_LATENCY_P95,
+    reset_timeout=LLM_BREAKER_RESET_TIMEOUT,
+)
+openai_limiter = AdaptiveConcurrencyLimiter(
+    "openai",
+    initial_limit=max(1, LLM_MAX_CONCURRENCY // 2),
+    max_limit=LLM_MAX_CONCURRENCY,
+)
 
-# Initialisation du client SDK (lit OPENAI_API_KEY depuis l'env)
+# Client SDK de l'API Batch (llm_batch) ; les appels synchrones passent par
+# le fournisseur LLM (llm_providers)
 _openai_client: Optional[OpenAI] = None
 
 
+LLM_SYSTEM_PROMPT = "Tu es un expert en recrutement exécutif. Tu réponds uniquement en JSON valide."
+
+
 def _get_client() -> OpenAI:
     global _openai_client
     if _openai_client is None:
-        _openai_client = OpenAI(api_key=OPENAI_API_KEY)
+        _openai_client = OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT, max_retries=0)
     return _openai_client
 
 
-def call_openai_api(prompt: str) -> Optional[Dict[str, Any]]:
+def build_llm_input(prompt: str) -> List[Dict[str, str]]:
+    """Messages envoyés à l'API (Responses API, synchrone ou Batch)."""
+    return [
+        {"role": "system", "content": LLM_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def parse_llm_json(content: str) -> Any:
     """
-    Appelle l'API OpenAI (Responses API) et parse la réponse JSON.
-    Retente jusqu'à OPENAI_MAX_RETRIES fois avec backoff exponentiel sur 429.
+    Parse la réponse texte du LLM en JSON (retire un éventuel bloc markdown).
+    Lève json.JSONDecodeError si le contenu n'est pas du JSON valide.
     """
-    if not OPENAI_API_KEY:
-        logger.warning("OPENAI_API_KEY not configured, skipping LLM scoring")
-        return None
+    content = content.strip()
 
-    for attempt in range(OPENAI_MAX_RETRIES):
-        try:
-            response = _get_client().responses.create(
-                model=OPENAI_MODEL,
-                input=[
-                    {
-                        "role": "system",
-                        "content": "Tu es un expert en recrutement exécutif. Tu réponds uniquement en JSON valide."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+    # Clean potential markdown wrapping
+    if content.startswith("```"):
+        content = content.split("```")[1]
+        if content.startswith("json"):
+            content = content[4:]
+    content = content.strip()
 
-            content = response.output_text.strip()
+    return json.loads(content)
 
-            # Clean potential markdown wrapping
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-            content = content.strip()
 
-            return json.loads(content)
+def _record_usage(
+    response: LLMResponse,
+    model: str,
+    tier: str,
+    latency: float,
+    organization_id: Optional[int],
+    feature: str,
+) -> None:
+    """Compteurs de tokens et de coût estimé par modèle / palier, et comptage par organisation."""
+    input_tokens = response.input_tokens
+    output_tokens = response.output_tokens
+    metrics.increment("llm_tokens_total", input_tokens, model=model, tier=tier, direction="input")
+    metrics.increment("llm_tokens_total", output_tokens, model=model, tier=tier, direction="output")
 
-        except RateLimitError:
-            retry_after = OPENAI_RETRY_BASE_DELAY * (2 ** attempt)
-            logger.warning(
-                f"OpenAI rate limit hit (attempt {attempt + 1}/{OPENAI_MAX_RETRIES}), "
-                f"retrying in {retry_after:.1f}s"
-            )
-            if attempt < OPENAI_MAX_RETRIES - 1:
-                time.sleep(retry_after)
-                continue
-            else:
-                logger.error("OpenAI rate limit exceeded after all retries, using fallback score")
-                return None
-        except OpenAIError as e:
-            logger.error(f"OpenAI API request failed: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {e}")
-            return None
-        except (KeyError, IndexError, AttributeError) as e:
-            logger.error(f"Unexpected OpenAI API response structure: {e}")
-            return None
-
-    return None  # Should not be reached
-
-
-def compute_llm_score(candidate: Candidate, job: JobOpening, referral: Referral) -> Dict[str, Any]:
-    """
-    Calcule le score via l'analyse LLM.
-    Retourne un dict avec score, strengths, gaps, summary.
+    cost = 0.0
+    prices = MODEL_PRICES_PER_MTOK.get(model)
+    if prices:
+        cost = (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+        metrics.increment("llm_cost_usd_total", cost, model=model, tier=tier)
+
+    record_llm_usage(
+        organization_id=organization_id,
+        feature=feature,
+        model=model,
+        tier=tier,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        latency=latency,
+        cost_usd=cost,
+    )
+
+
+def _call_llm(
+    prompt: str,
+    model: str,
+    tier: str,
+    on_delta: Optional[Callable[[str], None]] = None,
+    organization_id: Optional[int] = None,
+    feature: str = FEATURE_SCORING,
+) -> Tuple[Optional[Any], str]:
     """
-    prompt = build_llm_prompt(candidate, job, referral)
-    
-    result = call_openai_api(prompt)
-    
+    Appel au fournisseur LLM (voir llm_providers) protégé par le disjoncteur
+    et le limiteur. Retourne (JSON parsé ou None, outcome) ; outcome vaut
+    "success", "invalid_json" ou la cause de l'échec.
+    Avec on_delta, la réponse est streamée et on_delta reçoit chaque fragment.
+    organization_id / feature : imputation de la consommation et quotas (voir llm_usage).
+    """
+    provider = get_llm_provider()
+    if not provider.is_configured():
+        logger.warning(f"LLM provider {provider.name} not configured, skipping LLM scoring")
+        return None, "not_configured"
+
+    labels = {"model": model, "tier": tier}
+    quota = get_quota_status(organization_id)
+    if quota.hard_exceeded:
+        metrics.increment("llm_calls_total", outcome="quota_exceeded", **labels)
+        logger.warning(f"Organization {organization_id} is over its LLM hard quota, using fallback score")
+        return None, "quota_exceeded"
+    if quota.soft_exceeded and tier == "strong":
+        # Over the soft quota: keep the fast model's answer, no escalation
+        metrics.increment("llm_calls_total", outcome="quota_soft_exceeded", **labels)
+        return None, "quota_soft_exceeded"
+    if not openai_limiter.try_acquire():
+        metrics.increment("llm_calls_total", outcome="throttled", **labels)
+        logger.warning("LLM concurrency limit reached, using fallback score")
+        return None, "throttled"
+    if not openai_breaker.allow():
+        openai_limiter.release()
+        metrics.increment("llm_calls_total", outcome="circuit_open", **labels)
+        logger.warning("LLM circuit breaker open, using fallback score")
+        return None, "circuit_open"
+
+    started = time.monotonic()
+    try:
+        if on_delta is not None:
+            response = provider.stream(build_llm_input(prompt), model, on_delta)
+        else:
+            response = provider.complete(build_llm_input(prompt), model)
+    except LLMRateLimited as e:
+        openai_breaker.record_failure(time.monotonic() - started)
+        openai_limiter.on_overload(e.retry_after)
+        metrics.increment("llm_calls_total", outcome="rate_limited", **labels)
+        logger.warning(f"LLM rate limit hit (retry after {e.retry_after}s), using fallback score")
+        return None, "rate_limited"
+    except LLMUnavailable as e:
+        openai_breaker.record_failure(time.monotonic() - started)
+        openai_limiter.on_overload()
+        metrics.increment("llm_calls_total", outcome="unavailable", **labels)
+        logger.error(f"LLM API unavailable: {e}")
+        return None, "unavailable"
+    except LLMRequestError as e:
+        # Client-side error (bad request, auth...): the provider itself is healthy
+        openai_breaker.cancel()
+        openai_limiter.release()
+        metrics.increment("llm_calls_total", outcome="error", **labels)
+        logger.error(f"LLM API request failed: {e}")
+        return None, "error"
+    except Exception:
+        # Unexpected failure (provider bug, on_delta, response shape): like
+        # every branch above, settle the breaker and give the slot back
+        openai_breaker.record_failure(time.monotonic() - started)
+        openai_limiter.release()
+        metrics.increment("llm_calls_total", outcome="error", **labels)
+        logger.exception("LLM call failed unexpectedly, using fallback score")
+        return None, "error"
+
+    latency = time.monotonic() - started
+    openai_breaker.record_success(latency)
+    openai_limiter.on_success()
+    metrics.increment("llm_call_seconds_total", latency, **labels)
+    _record_usage(response, model, tier, latency, organization_id, feature)
+
+    try:
+        result = parse_llm_json(response.text)
+    except json.JSONDecodeError as e:
+        metrics.increment("llm_calls_total", outcome="invalid_json", **labels)
+        logger.error(f"Failed to parse LLM response as JSON: {e}")
+        return None, "invalid_json"
+
+    metrics.increment("llm_calls_total", outcome="success", **labels)
+    return result, "success"
+
+
+def call_openai_api(
+    prompt: str,
+    model: Optional[str] = None,
+    tier: str = "default",
+    organization_id: Optional[int] = None,
+    feature: str = FEATURE_SCORING,
+) -> Optional[Dict[str, Any]]:
+    """
+    Appelle le fournisseur LLM configuré (OpenAI par défaut) et parse la réponse JSON.
+
+    Retourne None (score de fallback) sans attendre si le disjoncteur est
+    ouvert, si la limite de concurrence est atteinte, si le quota de
+    l'organisation est épuisé ou si l'appel échoue.
+    """
+    return _call_llm(
+        prompt, model or OPENAI_MODEL, tier, organization_id=organization_id, feature=feature
+    )[0]
+
+
+def is_valid_llm_result(result: Any) -> bool:
+    """True si la réponse respecte le format attendu (score 0-100, listes)."""
+    if not isinstance(result, dict):
+        return False
+    try:
+        score = int(result["score"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    if not 0 <= score <= 100:
+        return False
+    return all(isinstance(result.get(key, []), list) for key in ("strengths", "gaps"))
+
+
+def is_near_grade_boundary(score: int, margin: int) -> bool:
+    """True si score est à moins de margin points d'un changement de grade."""
+    return any(boundary - margin <= score < boundary + margin for boundary in GRADE_BOUNDARIES)
+
+
+def _escalation_reason(result: Any, rule_score: Optional[int]) -> Optional[str]:
+    """Raison d'escalader vers le modèle fort, ou None."""
+    if not OPENAI_MODEL_STRONG or OPENAI_MODEL_STRONG == OPENAI_MODEL_FAST:
+        return None
     if result is None:
+        return None  # API unavailable: the strong model would not fare better
+    if not is_valid_llm_result(result):
+        return "invalid_json"
+    if rule_score is not None and LLM_ESCALATION_MARGIN:
+        final = combine_scores(rule_score, int(result["score"]))
+        if is_near_grade_boundary(final, LLM_ESCALATION_MARGIN):
+            return "borderline"
+    return None
+
+
+def route_llm_call(
+    prompt: str,
+    rule_score: Optional[int] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+    organization_id: Optional[int] = None,
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Routage par paliers : modèle rapide d'abord, modèle fort uniquement si la
+    réponse est invalide ou si le score hybride tombe près d'une frontière de grade.
+    Retourne (réponse valide ou None, modèle ayant produit la réponse).
+    on_delta : streaming de la réponse du modèle rapide (voir _call_llm).
+    """
+    result, outcome = _call_llm(
+        prompt, OPENAI_MODEL_FAST, tier="fast", on_delta=on_delta, organization_id=organization_id
+    )
+    if outcome == "invalid_json":
+        result = {}  # parsed nothing usable, but the API answered
+
+    reason = _escalation_reason(result, rule_score)
+    if reason is not None:
+        metrics.increment("llm_escalations_total", reason=reason)
+        strong, _ = _call_llm(prompt, OPENAI_MODEL_STRONG, tier="strong", organization_id=organization_id)
+        if is_valid_llm_result(strong):
+            return strong, OPENAI_MODEL_STRONG
+
+    if is_valid_llm_result(result):
+        return result, OPENAI_MODEL_FAST
+    return None, ""
+
+
+def compute_llm_score(
+    candidate: Candidate,
+    job: JobOpening,
+    referral: Referral,
+    prompt: Optional[str] = None,
+    rule_score: Optional[int] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Calcule le score via l'analyse LLM (voir route_llm_call).
+    Retourne un dict avec score, strengths, gaps, summary, model et fallback.
+
+    Le score de similarité locale remplace l'appel LLM quand le profil est
+    trop éloigné du poste (pré-filtre) ou quand l'API est indisponible.
+    """
+    if LLM_PREFILTER_MIN_SIMILARITY and is_informative(candidate):
+        similarity = compute_similarity_score(candidate, job)
+        if similarity < LLM_PREFILTER_MIN_SIMILARITY:
+            return {
+                "score": similarity,
+                "strengths": [],
+                "gaps": [],
+                "summary": "Profil peu aligné avec le poste (similarité locale) : analyse LLM non lancée.",
+                "model": LOCAL_SIMILARITY_MODEL,
+                "fallback": False,
+            }
+
+    if prompt is None:
+        prompt = build_llm_prompt(candidate, job, referral)
+
+    result, model = route_llm_call(
+        prompt, rule_score, on_delta=on_delta, organization_id=job.organization_id
+    )
+    if result is None and is_informative(candidate):
+        # Degraded mode: local similarity instead of a constant neutral score
+        return {
+            "score": compute_similarity_score(candidate, job),
+            "strengths": [],
+            "gaps": [],
+            "summary": "Analyse LLM non disponible : score de similarité locale.",
+            "model": LOCAL_SIMILARITY_MODEL,
+            "fallback": True,
+        }
+
+    return sanitize_llm_result(result, model)
+
+
+def sanitize_llm_result(result: Optional[Dict[str, Any]], model: str) -> Dict[str, Any]:
+    """
+    Valide et normalise une réponse LLM brute.
+    Retourne le score neutre de fallback si result est None ou invalide.
+    """
+    if result is None or not is_valid_llm_result(result):
         # Fallback: return neutral score
         return {
             "score": 50,
             "strengths": [],
             "gaps": [],
-            "summary": "Analyse LLM non disponible."
+            "summary": "Analyse LLM non disponible.",
+            "model": "",
+            "fallback": True,
         }
-    
+
     # Validate and sanitize response
     return {
         "score": max(0, min(100, int(result.get("score", 50)))),
         "strengths": result.get("strengths", [])[:5],
         "gaps": result.get("gaps", [])[:5],
         "summary": str(result.get("summary", ""))[:500],
+        "model": model,
+        "fallback": False,
     }
 
 
@@ -440,59 +882,260 @@ def score_to_grade(score: int) -> str:
     return "D"
 
 
+def combine_scores(rule_score: int, llm_score: int, weights: Optional[Dict[str, float]] = None) -> int:
+    """Score hybride final (weights : poids hybrides, WEIGHTS par défaut)."""
+    weights = weights or WEIGHTS
+    return int(
+        rule_score * weights["rule_score_weight"] +
+        llm_score * weights["llm_score_weight"]
+    )
+
+
+def is_grade_decided(
+    rule_score: int, margin: Optional[int] = None, weights: Optional[Dict[str, float]] = None
+) -> bool:
+    """
+    True si le grade final ne peut pas dépendre du score LLM.
+
+    Sans margin, tout score LLM de 0 à 100 est envisagé (gating strict).
+    Avec margin, le score LLM est supposé à ±margin points du score par
+    règles (gating approximatif, pour les traitements en lot).
+    weights : poids hybrides à appliquer (WEIGHTS par défaut).
+    """
+    if margin is None:
+        low, high = 0, 100
+    else:
+        low, high = max(0, rule_score - margin), min(100, rule_score + margin)
+    # The final score is monotonic in the LLM score: both ends are enough
+    return score_to_grade(combine_scores(rule_score, low, weights)) == score_to_grade(
+        combine_scores(rule_score, high, weights)
+    )
+
+
+def _copy_rule_components(breakdown: ScoringBreakdown, previous: Any) -> None:
+    """Reprend les composantes règles d'un score déjà persisté."""
+    breakdown.expertise_match = previous.expertise_match
+    breakdown.experience_match = previous.experience_match
+    breakdown.interpersonal_skills_match = previous.interpersonal_skills_match
+    breakdown.technical_skills_match = previous.technical_skills_match
+    breakdown.referral_quality = previous.referral_quality
+    breakdown.rule_score = previous.rule_score
+
+
+def _experience_ranges(referral: Referral) -> Dict[str, Tuple[int, int]]:
+    """Fourchettes d'expérience du profil de pondération actif de l'organisation."""
+    from apps.referrals.services.weight_profiles import get_active_profile
+
+    return get_active_profile(referral.organization_id).experience_ranges
+
+
+def _referrer_adjustment(referral: Referral) -> int:
+    """Ajustement de referral_quality selon l'historique du recommandeur."""
+    from apps.referrals.services.referrer_stats import get_track_record
+
+    return get_track_record(referral.organization_id, referral.referrer_id).quality_adjustment()
+
+
+def _rule_breakdown(referral: Referral, previous: Optional[Any]) -> ScoringBreakdown:
+    """Step 1: score par règles, repris de previous si ses entrées sont inchangées."""
+    candidate = referral.candidate
+    job = referral.job_opening
+    experience_ranges = _experience_ranges(referral)
+    referrer_adjustment = _referrer_adjustment(referral)
+
+    rule_fingerprint = compute_rule_fingerprint(
+        candidate, job, referral, experience_ranges, referrer_adjustment
+    )
+    if previous is not None and previous.rule_fingerprint == rule_fingerprint:
+        breakdown = ScoringBreakdown()
+        _copy_rule_components(breakdown, previous)
+    else:
+        breakdown = compute_rule_score(candidate, job, referral, experience_ranges, referrer_adjustment)
+    breakdown.rule_fingerprint = rule_fingerprint
+    return breakdown
+
+
+def _apply_llm_result(
+    breakdown: ScoringBreakdown, llm_result: Dict[str, Any], llm_fingerprint: str
+) -> None:
+    """Step 2: reporte un résultat LLM normalisé (voir sanitize_llm_result) dans le breakdown."""
+    breakdown.llm_score = llm_result["score"]
+    breakdown.llm_strengths = llm_result["strengths"]
+    breakdown.llm_gaps = llm_result["gaps"]
+    breakdown.llm_summary = llm_result["summary"]
+    breakdown.llm_model = llm_result["model"]
+    # A fallback score is not a real analysis: leave it stale so the next
+    # rescore retries the LLM. A prefilter score is only current for the
+    # threshold that produced it.
+    if llm_result["fallback"]:
+        breakdown.llm_fingerprint = ""
+    elif llm_result["model"] == LOCAL_SIMILARITY_MODEL:
+        breakdown.llm_fingerprint = compute_prefilter_fingerprint(llm_fingerprint)
+    else:
+        breakdown.llm_fingerprint = llm_fingerprint
+
+
+def _set_prompt_tokens(breakdown: ScoringBreakdown, job: JobOpening, prompt: str) -> None:
+    """Enregistre la taille estimée du prompt et de son préfixe réutilisable."""
+    breakdown.prompt_tokens = estimate_messages_tokens(LLM_SYSTEM_PROMPT, prompt)
+    breakdown.prompt_prefix_tokens = estimate_messages_tokens(
+        LLM_SYSTEM_PROMPT, build_job_prompt_prefix(job)
+    )
+
+
+def _finalize(referral: Referral, breakdown: ScoringBreakdown) -> CandidateScoringResult:
+    """Step 3: score hybride final et grade."""
+    breakdown.final_score = combine_scores(breakdown.rule_score, breakdown.llm_score)
+
+    return CandidateScoringResult(
+        referral_id=referral.id,
+        candidate_id=referral.candidate_id,
+        job_opening_id=referral.job_opening_id,
+        score=breakdown.final_score,
+        grade=score_to_grade(breakdown.final_score),
+        breakdown=breakdown,
+    )
+
+
 def compute_candidate_score(
     referral: Referral,
-    use_llm: bool = True
+    use_llm: bool = True,
+    previous: Optional[Any] = None,
+    gate_margin: Optional[int] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
 ) -> CandidateScoringResult:
     """
     Calcule le score hybride complet pour un referral.
-    
+
     Args:
         referral: Le referral à scorer
         use_llm: Si True, utilise l'analyse LLM (peut être désactivé pour les tests)
-        
+        previous: CandidateScore existant. Chaque composante (règles / LLM) dont
+            l'empreinte des entrées n'a pas changé est reprise telle quelle
+            au lieu d'être recalculée.
+        gate_margin: Voir is_grade_decided. None = gating strict.
+        on_delta: Reçoit au fil de l'eau le texte brut de la réponse LLM
+            (affichage progressif, voir score_streaming).
+
     Returns:
         CandidateScoringResult avec le score final et le breakdown
     """
     candidate = referral.candidate
     job = referral.job_opening
-    
-    # Step 1: Compute rule-based score
-    breakdown = compute_rule_score(candidate, job, referral)
-    
-    # Step 2: Compute LLM score (if enabled)
-    if use_llm:
-        llm_result = compute_llm_score(candidate, job, referral)
-        breakdown.llm_score = llm_result["score"]
-        breakdown.llm_strengths = llm_result["strengths"]
-        breakdown.llm_gaps = llm_result["gaps"]
-        breakdown.llm_summary = llm_result["summary"]
-    else:
+
+    breakdown = _rule_breakdown(referral, previous)
+
+    prompt = build_llm_prompt(candidate, job, referral)
+    if needs_llm_call(breakdown, previous, job, prompt, use_llm, gate_margin):
+        llm_result = compute_llm_score(
+            candidate, job, referral, prompt=prompt, rule_score=breakdown.rule_score, on_delta=on_delta
+        )
+        _apply_llm_result(breakdown, llm_result, compute_llm_fingerprint(prompt, OPENAI_MODEL_FAST))
+        _set_prompt_tokens(breakdown, job, prompt)
+
+    return _finalize(referral, breakdown)
+
+
+def needs_llm_call(
+    breakdown: ScoringBreakdown,
+    previous: Optional[Any],
+    job: JobOpening,
+    prompt: str,
+    use_llm: bool,
+    gate_margin: Optional[int] = None,
+) -> bool:
+    """
+    Étapes sans appel LLM : reprise du score LLM précédent si le prompt est
+    inchangé, mode règles seules, puis gating. Renseigne la partie LLM du
+    breakdown dans ces cas et retourne True si une analyse LLM reste nécessaire.
+    """
+    llm_fingerprint = compute_llm_fingerprint(prompt, OPENAI_MODEL_FAST)
+    if previous is not None and is_llm_result_current(previous.llm_fingerprint, llm_fingerprint):
+        breakdown.llm_score = previous.llm_score
+        breakdown.llm_strengths = previous.llm_strengths
+        breakdown.llm_gaps = previous.llm_gaps
+        breakdown.llm_summary = previous.llm_summary
+        breakdown.llm_model = previous.llm_model_used
+        breakdown.llm_fingerprint = previous.llm_fingerprint
+        _set_prompt_tokens(breakdown, job, prompt)
+        return False
+
+    if not use_llm:
         breakdown.llm_score = breakdown.rule_score  # Use rule score as fallback
-    
-    # Step 3: Compute final hybrid score
-    breakdown.final_score = int(
-        breakdown.rule_score * WEIGHTS["rule_score_weight"] +
-        breakdown.llm_score * WEIGHTS["llm_score_weight"]
-    )
-    
-    return CandidateScoringResult(
-        referral_id=referral.id,
-        candidate_id=candidate.id,
-        job_opening_id=job.id,
-        score=breakdown.final_score,
-        grade=score_to_grade(breakdown.final_score),
-        breakdown=breakdown,
+        return False
+
+    if should_skip_llm(breakdown, job.organization_id, gate_margin):
+        _skip_llm(breakdown)
+        return False
+
+    return True
+
+
+def should_skip_llm(
+    breakdown: Any, organization_id: Optional[int], gate_margin: Optional[int] = None
+) -> bool:
+    """
+    Étape de gating : True si l'appel LLM ne peut pas changer le grade, tel
+    qu'il est lu avec le profil de pondération actif de l'organisation
+    (voir weight_profiles). breakdown : ScoringBreakdown ou CandidateScore.
+    """
+    if not LLM_GATING_ENABLED:
+        return False
+    from apps.referrals.services.weight_profiles import get_active_profile
+
+    profile = get_active_profile(organization_id)
+    return is_grade_decided(profile.weighted_rule_score(breakdown), gate_margin, profile.weights)
+
+
+def _skip_llm(breakdown: ScoringBreakdown) -> None:
+    """
+    Grade déjà fixé : le score par règles tient lieu de score LLM (à la
+    lecture, le score règles repondéré, voir WeightProfile.weighted_final_score).
+    """
+    breakdown.llm_score = breakdown.rule_score
+    breakdown.llm_skipped = True
+    metrics.increment("llm_gated_total")
+
+
+def gated_score(referral: Referral, breakdown: ScoringBreakdown) -> CandidateScoringResult:
+    """
+    Score final d'un referral dont should_skip_llm a fixé le grade, sans
+    appel LLM (traitements en lot, voir backfill_scores).
+    """
+    _skip_llm(breakdown)
+    return _finalize(referral, breakdown)
+
+
+def combine_llm_result(
+    referral: Referral,
+    llm_result: Dict[str, Any],
+    llm_fingerprint: str,
+    previous: Optional[Any] = None,
+) -> CandidateScoringResult:
+    """
+    Construit le score hybride à partir d'un résultat LLM obtenu hors ligne
+    (ex: Batch API). llm_fingerprint est l'empreinte du prompt effectivement envoyé.
+    """
+    breakdown = _rule_breakdown(referral, previous)
+    _apply_llm_result(breakdown, llm_result, llm_fingerprint)
+    _set_prompt_tokens(
+        breakdown,
+        referral.job_opening,
+        build_llm_prompt(referral.candidate, referral.job_opening, referral),
     )
+    return _finalize(referral, breakdown)
 
 
-def score_referrals_for_job(job_opening_id: int, use_llm: bool = True) -> List[CandidateScoringResult]:
+def score_referrals_for_job(
+    job_opening_id: int, use_llm: bool = True, comparative: bool = False
+) -> List[CandidateScoringResult]:
     """
     Score tous les referrals pour un job et les retourne triés par score décroissant.
     
     Args:
         job_opening_id: ID du job
         use_llm: Si True, utilise l'analyse LLM
+        comparative: Si True, plusieurs candidats par appel LLM (voir comparative_scoring)
         
     Returns:
         Liste de CandidateScoringResult triés par score décroissant
@@ -500,6 +1143,12 @@ def score_referrals_for_job(job_opening_id: int, use_llm: bool = True) -> List[C
     referrals = Referral.objects.select_related(
         'candidate', 'job_opening'
     ).filter(job_opening_id=job_opening_id)
+
+    if comparative:
+        from apps.referrals.services.comparative_scoring import score_referrals_comparatively
+        results = list(score_referrals_comparatively(referrals, use_llm=use_llm).values())
+        results.sort(key=lambda x: x.score, reverse=True)
+        return results
     
     results = []
     for referral in referrals:
@@ -512,5 +1161,31 @@ def score_referrals_for_job(job_opening_id: int, use_llm: bool = True) -> List[C
     
     # Sort by score descending
     results.sort(key=lambda x: x.score, reverse=True)
-    
+
     return results
+
+
+def is_score_stale(
+    score: Any, referral: Referral, use_llm: bool = True, gate_margin: Optional[int] = None
+) -> bool:
+    """
+    Indique si un CandidateScore persisté ne correspond plus aux entrées
+    actuelles du referral (règles, et prompt LLM si use_llm).
+
+    Un score gaté (llm_skipped) n'a pas d'empreinte LLM : il reste à jour
+    tant que ses règles le sont et que le grade reste fixé (gate_margin,
+    profil de pondération actif).
+    """
+    candidate = referral.candidate
+    job = referral.job_opening
+    rule_fingerprint = compute_rule_fingerprint(
+        candidate, job, referral, _experience_ranges(referral), _referrer_adjustment(referral)
+    )
+    if score.rule_fingerprint != rule_fingerprint:
+        return True
+    if not use_llm:
+        return False
+    if score.llm_skipped:
+        return not should_skip_llm(score, referral.organization_id, gate_margin)
+    prompt = build_llm_prompt(candidate, job, referral)
+    return not is_llm_result_current(score.llm_fingerprint, compute_llm_fingerprint(prompt, OPENAI_MODEL_FAST))
@@ -0,0 +1,190 @@
+"""
+Scoring LLM comparatif : plusieurs candidats d'un même poste par appel.
+
+Pour le scoring en masse d'un job, la section poste n'est envoyée qu'une fois
+suivie de K dossiers candidats ; le LLM renvoie un tableau JSON d'évaluations
+(une par dossier). Chaque entrée est validée individuellement : les dossiers
+absents ou invalides sont rescorés avec le prompt individuel habituel, et les
+scores proches d'une frontière de grade sont escaladés comme en mode individuel.
+
+Les empreintes LLM stockées sont celles du prompt individuel : un score obtenu
+en mode comparatif n'est pas considéré obsolète par is_score_stale.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from apps.referrals.models import Referral
+from apps.referrals.services.candidate_scoring import (
+    CandidateScoringResult,
+    OPENAI_MODEL_FAST,
+    OPENAI_MODEL_STRONG,
+    _apply_llm_result,
+    _call_llm,
+    _escalation_reason,
+    _finalize,
+    _rule_breakdown,
+    _set_prompt_tokens,
+    build_candidate_prompt_section,
+    build_job_section,
+    build_llm_prompt,
+    compute_llm_fingerprint,
+    compute_llm_score,
+    is_valid_llm_result,
+    needs_llm_call,
+    sanitize_llm_result,
+)
+from common import metrics
+
+logger = logging.getLogger(__name__)
+
+# Nombre de dossiers candidats par appel comparatif
+COMPARATIVE_GROUP_SIZE = int(os.environ.get("LLM_COMPARATIVE_GROUP_SIZE", "8"))
+
+COMPARATIVE_INSTRUCTIONS = """Tu es un expert en recrutement exécutif. Évalue sur 100, indépendamment les uns des autres, l'alignement de chacun des dossiers candidats ci-dessous avec le poste décrit.
+
+## INSTRUCTIONS
+Pour chaque dossier, analyse en profondeur l'adéquation candidat/poste. Considère:
+1. L'alignement des compétences et de l'expérience
+2. La pertinence du parcours pour le contexte de l'entreprise
+3. La qualité et la crédibilité de la recommandation
+4. Les signaux positifs et négatifs du profil LinkedIn
+
+Réponds UNIQUEMENT avec un tableau JSON valide (sans markdown, sans ```), un élément par dossier, dans l'ordre :
+[{"id": "<identifiant du dossier>", "score": <0-100>, "strengths": ["point fort 1", "point fort 2"], "gaps": ["point faible 1"], "summary": "Résumé en 2-3 phrases"}]
+"""
+
+
+def _dossier_id(index: int) -> str:
+    return f"D{index + 1}"
+
+
+def build_comparative_prompt(referrals: Sequence[Referral]) -> str:
+    """Prompt comparatif : instructions, section poste unique, puis un dossier par referral."""
+    job = referrals[0].job_opening
+    dossiers = "".join(
+        f"\n# DOSSIER {_dossier_id(i)}\n{build_candidate_prompt_section(r.candidate, r)}"
+        for i, r in enumerate(referrals)
+    )
+    return f"{COMPARATIVE_INSTRUCTIONS}\n{build_job_section(job)}{dossiers}"
+
+
+def parse_comparative_response(result: Any, count: int) -> Dict[int, Dict[str, Any]]:
+    """
+    Associe les entrées valides de la réponse à l'index de leur dossier.
+    Les entrées invalides, dupliquées ou inconnues sont ignorées.
+    """
+    if isinstance(result, dict):
+        result = result.get("results", result.get("candidates"))
+    if not isinstance(result, list):
+        return {}
+
+    ids = {_dossier_id(i): i for i in range(count)}
+    entries: Dict[int, Dict[str, Any]] = {}
+    for entry in result:
+        if not isinstance(entry, dict):
+            continue
+        index = ids.get(str(entry.get("id", "")).strip().upper())
+        if index is None or index in entries or not is_valid_llm_result(entry):
+            continue
+        entries[index] = entry
+    return entries
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _score_group(group: List[Referral], breakdowns: Dict[int, Any]) -> Dict[int, Dict[str, Any]]:
+    """Un appel comparatif ; retourne {referral_id: résultat LLM normalisé} pour les entrées valides."""
+    if len(group) == 1:
+        return {}
+    organization_id = group[0].organization_id
+    result, outcome = _call_llm(
+        build_comparative_prompt(group), OPENAI_MODEL_FAST, tier="comparative", organization_id=organization_id
+    )
+    entries = parse_comparative_response(result, len(group))
+    metrics.increment("llm_comparative_entries_total", len(entries), outcome="valid")
+    metrics.increment("llm_comparative_entries_total", len(group) - len(entries), outcome="fallback")
+    if len(entries) < len(group):
+        logger.info(
+            f"Comparative scoring ({outcome}): {len(group) - len(entries)}/{len(group)} "
+            f"entries fall back to single prompts"
+        )
+
+    scored = {}
+    for index, entry in entries.items():
+        referral = group[index]
+        rule_score = breakdowns[referral.id].rule_score
+        model = OPENAI_MODEL_FAST
+        if _escalation_reason(entry, rule_score) is not None:
+            metrics.increment("llm_escalations_total", reason="borderline")
+            strong, _ = _call_llm(
+                build_llm_prompt(referral.candidate, referral.job_opening, referral),
+                OPENAI_MODEL_STRONG,
+                tier="strong",
+                organization_id=organization_id,
+            )
+            if is_valid_llm_result(strong):
+                entry, model = strong, OPENAI_MODEL_STRONG
+        scored[referral.id] = sanitize_llm_result(entry, model)
+    return scored
+
+
+def score_referrals_comparatively(
+    referrals: Iterable[Referral],
+    previous_scores: Optional[Dict[int, Any]] = None,
+    use_llm: bool = True,
+    gate_margin: Optional[int] = None,
+    group_size: int = COMPARATIVE_GROUP_SIZE,
+) -> Dict[int, CandidateScoringResult]:
+    """
+    Score hybride de plusieurs referrals, avec appels LLM comparatifs par job.
+
+    Même sémantique que compute_candidate_score appelé sur chaque referral
+    (reprise des composantes inchangées, gating), mais les analyses LLM
+    restantes sont groupées par paquets de group_size dossiers d'un même job.
+
+    Returns:
+        {referral_id: CandidateScoringResult}
+    """
+    previous_scores = previous_scores or {}
+    breakdowns: Dict[int, Any] = {}
+    prompts: Dict[int, str] = {}
+    pending: Dict[int, List[Referral]] = {}
+    referrals_by_id: Dict[int, Referral] = {}
+
+    for referral in referrals:
+        referrals_by_id[referral.id] = referral
+        previous = previous_scores.get(referral.id)
+        breakdown = breakdowns[referral.id] = _rule_breakdown(referral, previous)
+
+        prompt = prompts[referral.id] = build_llm_prompt(referral.candidate, referral.job_opening, referral)
+        if needs_llm_call(breakdown, previous, referral.job_opening, prompt, use_llm, gate_margin):
+            pending.setdefault(referral.job_opening_id, []).append(referral)
+
+    for job_referrals in pending.values():
+        for group in _chunks(job_referrals, group_size):
+            scored = _score_group(group, breakdowns)
+            for referral in group:
+                breakdown = breakdowns[referral.id]
+                llm_result = scored.get(referral.id)
+                if llm_result is None:
+                    # Missing or invalid entry: usual single-candidate prompt
+                    llm_result = compute_llm_score(
+                        referral.candidate,
+                        referral.job_opening,
+                        referral,
+                        prompt=prompts[referral.id],
+                        rule_score=breakdown.rule_score,
+                    )
+                prompt = prompts[referral.id]
+                _apply_llm_result(breakdown, llm_result, compute_llm_fingerprint(prompt, OPENAI_MODEL_FAST))
+                _set_prompt_tokens(breakdown, referral.job_opening, prompt)
+
+    return {
+        referral_id: _finalize(referrals_by_id[referral_id], breakdown)
+        for referral_id, breakdown in breakdowns.items()
+    }
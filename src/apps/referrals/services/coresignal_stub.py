@@ -0,0 +1,118 @@
+"""
+Serveur Coresignal local déterministe, pour les tests et les mesures.
+
+Répond à GET /cdapi/v2/employee_multi_source/collect/<url LinkedIn> avec un
+profil au format Coresignal dérivé d'un hash de l'URL (même URL, même
+profil). L'en-tête apikey est exigé (401 sinon), comme l'API réelle.
+
+Latence, taux de réponses 503 et de connexions coupées sans réponse sont
+configurables pour reproduire les modes de panne que le client retente.
+Lancé par la commande run_coresignal_stub (voir common/stub_server).
+"""
+
+import hashlib
+import socket
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any, ClassVar, Dict, Optional, Tuple
+from urllib.parse import unquote
+
+from common.stub_server import BaseStubConfig, BaseStubHandler, BaseStubServer
+
+COLLECT_PATH = "/cdapi/v2/employee_multi_source/collect/"
+
+FIRST_NAMES = ["Claire", "Thomas", "Sophie", "Nicolas", "Isabelle", "Marc"]
+LAST_NAMES = ["Martin", "Bernard", "Durand", "Lefebvre", "Moreau", "Laurent"]
+TITLES = ["Directeur Financier", "Directrice des Opérations", "Head of Treasury", "DAF Groupe", "CFO"]
+COMPANIES = ["Groupe Alpha", "Beta Industries", "Gamma Conseil", "Delta Capital", "Epsilon SA"]
+SCHOOLS = ["HEC Paris", "ESSEC", "ESCP", "Université Paris-Dauphine"]
+SKILLS = ["Consolidation", "IFRS", "SAP", "Contrôle de gestion", "M&A", "Trésorerie", "Reporting", "Leadership"]
+
+
+@dataclass
+class CoresignalStubConfig(BaseStubConfig):
+    reset_rate: float = 0.0
+
+    failure_rates: ClassVar[Tuple[str, ...]] = ("error_rate", "reset_rate")
+
+
+def stub_profile(linkedin_url: str) -> Dict[str, Any]:
+    """Profil déterministe au format employee_multi_source de Coresignal."""
+    digest = int(hashlib.sha256(linkedin_url.encode("utf-8")).hexdigest()[:12], 16)
+    first_name = FIRST_NAMES[digest % len(FIRST_NAMES)]
+    last_name = LAST_NAMES[(digest // 7) % len(LAST_NAMES)]
+    start_year = 1995 + digest % 15
+    return {
+        "full_name": f"{first_name} {last_name}",
+        "first_name": first_name,
+        "last_name": last_name,
+        "headline": f"{TITLES[digest % len(TITLES)]} chez {COMPANIES[digest % len(COMPANIES)]}",
+        "summary": "Profil simulé par le serveur Coresignal de test.",
+        "experience": [
+            {
+                "position_title": TITLES[(digest + i) % len(TITLES)],
+                "company_name": COMPANIES[(digest + i) % len(COMPANIES)],
+                "date_from_year": start_year + 6 * i,
+                "date_to_year": None if i == 2 else start_year + 6 * (i + 1),
+                "description": "Pilotage financier et reporting groupe.",
+            }
+            for i in range(3)
+        ],
+        "education": [
+            {
+                "institution_name": SCHOOLS[digest % len(SCHOOLS)],
+                "degree": "Master",
+                "field_of_study": "Finance",
+                "date_from_year": start_year - 5,
+                "date_to_year": start_year - 1,
+            }
+        ],
+        "skills": [SKILLS[(digest + i) % len(SKILLS)] for i in range(4)],
+    }
+
+
+class CoresignalStubRequestHandler(BaseStubHandler):
+    server: "CoresignalStubServer"
+    service_name = "Coresignal"
+
+    def send_not_found(self):
+        self.send_json(404, {"message": "Not found"})
+
+    def _reset_connection(self):
+        # SO_LINGER 0: closing sends a TCP RST instead of a FIN
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        self.close_connection = True
+
+    def route_get(self):
+        if not self.path.startswith(COLLECT_PATH):
+            self.send_not_found()
+            return
+        if not self.headers.get("apikey"):
+            self.send_json(401, {"message": "Missing API key"})
+            return
+
+        config = self.server.config
+        time.sleep(self.server.latency())
+
+        self.server.count_request()
+        draw = self.server.draw()
+        if draw < config.reset_rate:
+            self._reset_connection()
+            return
+        if draw < config.reset_rate + config.error_rate:
+            self.send_json(503, {"message": "Simulated failure"})
+            return
+
+        self.send_json(200, stub_profile(unquote(self.path[len(COLLECT_PATH):])))
+
+
+class CoresignalStubServer(BaseStubServer):
+    handler_class = CoresignalStubRequestHandler
+
+
+def make_coresignal_stub_server(
+    host: str = "127.0.0.1", port: int = 8766, config: Optional[CoresignalStubConfig] = None
+) -> CoresignalStubServer:
+    """Serveur prêt à servir (serve_forever) ; port 0 = port libre."""
+    return CoresignalStubServer((host, port), config or CoresignalStubConfig())
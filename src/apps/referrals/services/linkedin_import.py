@@ -0,0 +1,101 @@
+"""
+Import d'un profil LinkedIn dans le formulaire de recommandation, par étapes
+(flux SSE, voir views_linkedin).
+
+parseLinkedinProfile attend Coresignal puis le LLM avant de répondre ; ici
+chaque étape est publiée dès qu'elle est terminée, pour que le formulaire se
+remplisse progressivement. Séquence produite par stream_linkedin_import :
+- ("validated", {"linkedinUrl"}) : URL de profil reconnue ;
+- ("profile", {...}) : profil brut récupéré (nom, titre, compétences
+  LinkedIn), dès la fin du scrape ;
+- ("extraction", {...}) : champs extraits par le LLM, mêmes clés que
+  LinkedInProfileData, puis fin du flux ;
+- ("error", {"message", "code"}) en cas d'échec, puis fin du flux ;
+- ("keepalive", None) pendant les attentes.
+
+Les étapes tournent dans un thread dédié : si le client se déconnecte, le
+profil et l'extraction sont tout de même mis en cache, et un nouvel essai
+répond immédiatement.
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from django.db import connections
+
+from apps.referrals.services.linkedin_profile_cache import has_profile_data
+from apps.referrals.services.linkedin_profile_parser import extract_candidate_from_linkedin_profile
+from apps.referrals.services.linkedin_scraper import _is_valid_linkedin_url, scrape_linkedin_profile
+from common.sse import KEEPALIVE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+def _error(message: str, code: str) -> Tuple[str, Dict[str, str]]:
+    return "error", {"message": message, "code": code}
+
+
+def _profile_payload(raw_profile: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "fullName": raw_profile.get("name") or None,
+        "headline": raw_profile.get("headline"),
+        "skills": [s for s in (raw_profile.get("skills") or []) if isinstance(s, str)],
+    }
+
+
+def _run_stages(linkedin_url: str, organization_id: Optional[int], emit) -> None:
+    try:
+        raw_profile = scrape_linkedin_profile(linkedin_url)
+    except Exception as exc:
+        logger.error(f"LinkedIn scraping failed for {linkedin_url}: {exc}")
+        emit(_error("Impossible de récupérer le profil LinkedIn. Vérifiez l'URL.", "SCRAPING_FAILED"))
+        return
+    if not has_profile_data(raw_profile):
+        emit(_error("Aucune donnée trouvée sur ce profil LinkedIn.", "PROFILE_EMPTY"))
+        return
+    emit(("profile", _profile_payload(raw_profile)))
+
+    try:
+        extracted = extract_candidate_from_linkedin_profile(raw_profile, organization_id=organization_id)
+    except Exception as exc:
+        logger.error(f"AI extraction failed: {exc}")
+        emit(_error("L'extraction automatique a échoué. Remplissez le formulaire manuellement.", "EXTRACTION_FAILED"))
+        return
+    emit(("extraction", extracted))
+
+
+def stream_linkedin_import(linkedin_url: str, organization_id: Optional[int] = None) -> Iterator[Tuple[str, Any]]:
+    """Événements (type, contenu) de l'import d'un profil ; voir le docstring du module."""
+    url = (linkedin_url or "").strip()
+    if not url:
+        yield _error("L'URL LinkedIn est requise.", "LINKEDIN_URL_REQUIRED")
+        return
+    if not _is_valid_linkedin_url(url):
+        yield _error("Cette URL n'est pas un profil LinkedIn.", "INVALID_LINKEDIN_URL")
+        return
+    yield "validated", {"linkedinUrl": url}
+
+    events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+
+    def run() -> None:
+        try:
+            _run_stages(url, organization_id, events.put)
+        except Exception:
+            logger.exception(f"LinkedIn import failed for {url}")
+            events.put(_error("L'import du profil LinkedIn a échoué.", "IMPORT_FAILED"))
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=run, name="linkedin-import", daemon=True).start()
+
+    while True:
+        try:
+            kind, payload = events.get(timeout=KEEPALIVE_INTERVAL)
+        except queue.Empty:
+            yield "keepalive", None
+            continue
+        yield kind, payload
+        if kind in ("extraction", "error"):
+            return
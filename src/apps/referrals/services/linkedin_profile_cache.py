@@ -0,0 +1,131 @@
+"""
+Cache persistant des profils LinkedIn récupérés via Coresignal.
+
+Le formulaire de recommandation appelle parseLinkedinProfile puis, une
+minute plus tard, submitReferral sur la même URL : sans cache, le profil est
+payé et attendu deux fois. scrape_linkedin_profile lit donc d'abord ici.
+
+- Clé : URL canonique (canonicalize_linkedin_url), insensible au schéma, au
+  sous-domaine, à la casse, aux paramètres et au slash final.
+- Durée de vie : LINKEDIN_PROFILE_CACHE_TTL secondes depuis la récupération.
+- Taille : au plus LINKEDIN_PROFILE_CACHE_MAX_ENTRIES profils ; à chaque
+  écriture, les entrées expirées puis les moins récemment lues sont supprimées.
+
+Seuls les profils non vides sont mis en cache : une erreur Coresignal (clé
+absente, statut HTTP, timeout) est retentée au prochain appel.
+
+Les champs de formulaire extraits d'un profil par le LLM
+(linkedin_profile_parser) sont mis en cache à part, indexés par le hash du
+prompt d'extraction : tant que le profil et EXTRACTION_PROMPT_VERSION ne
+changent pas, parseLinkedinProfile ne rappelle pas le LLM. Taille bornée à
+LINKEDIN_EXTRACTION_CACHE_MAX_ENTRIES, sans expiration.
+"""
+
+import logging
+import os
+from datetime import timedelta
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from django.db.models import F
+from django.utils import timezone
+
+from apps.referrals.models import LinkedInExtractionCache, LinkedInProfileCache
+
+logger = logging.getLogger(__name__)
+
+LINKEDIN_PROFILE_CACHE_TTL = int(os.environ.get("LINKEDIN_PROFILE_CACHE_TTL", str(7 * 24 * 3600)))
+LINKEDIN_PROFILE_CACHE_MAX_ENTRIES = int(os.environ.get("LINKEDIN_PROFILE_CACHE_MAX_ENTRIES", "10000"))
+LINKEDIN_EXTRACTION_CACHE_MAX_ENTRIES = int(os.environ.get("LINKEDIN_EXTRACTION_CACHE_MAX_ENTRIES", "20000"))
+
+PROFILE_FIELDS = ("headline", "summary", "experience", "skills")
+
+
+def canonicalize_linkedin_url(url: str) -> Optional[str]:
+    """
+    "https://FR.linkedin.com/in/Jane-Doe/?trk=x" -> "linkedin.com/in/jane-doe".
+    None si l'URL n'est pas une URL linkedin.com exploitable.
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip() if "://" in url else f"https://{url.strip()}")
+    host = (parts.hostname or "").lower()
+    if host != "linkedin.com" and not host.endswith(".linkedin.com"):
+        return None
+    path = parts.path.rstrip("/").lower()
+    if not path:
+        return None
+    return f"linkedin.com{path}"[:255]
+
+
+def has_profile_data(profile: Dict[str, Any]) -> bool:
+    return any(profile.get(field) for field in PROFILE_FIELDS)
+
+
+def _is_fresh(fetched_at) -> bool:
+    return fetched_at >= timezone.now() - timedelta(seconds=LINKEDIN_PROFILE_CACHE_TTL)
+
+
+def get_cached_profile(linkedin_url: str) -> Optional[Dict[str, Any]]:
+    """Profil en cache non expiré, ou None."""
+    key = canonicalize_linkedin_url(linkedin_url)
+    if key is None:
+        return None
+    entry = LinkedInProfileCache.objects.filter(url_key=key).only("id", "payload", "fetched_at").first()
+    if entry is None or not _is_fresh(entry.fetched_at):
+        return None
+    LinkedInProfileCache.objects.filter(id=entry.id).update(
+        last_used_at=timezone.now(), hits=F("hits") + 1
+    )
+    return entry.payload
+
+
+def store_profile(linkedin_url: str, profile: Dict[str, Any]) -> None:
+    """Met en cache un profil récupéré (ignoré s'il est vide)."""
+    key = canonicalize_linkedin_url(linkedin_url)
+    if key is None or not has_profile_data(profile):
+        return
+    now = timezone.now()
+    LinkedInProfileCache.objects.update_or_create(
+        url_key=key,
+        defaults={"payload": profile, "fetched_at": now, "last_used_at": now},
+    )
+    _evict()
+
+
+def _evict() -> None:
+    expired_before = timezone.now() - timedelta(seconds=LINKEDIN_PROFILE_CACHE_TTL)
+    LinkedInProfileCache.objects.filter(fetched_at__lt=expired_before).delete()
+
+    excess = LinkedInProfileCache.objects.count() - LINKEDIN_PROFILE_CACHE_MAX_ENTRIES
+    if excess > 0:
+        oldest = LinkedInProfileCache.objects.order_by("last_used_at").values_list("id", flat=True)[:excess]
+        deleted, _ = LinkedInProfileCache.objects.filter(id__in=list(oldest)).delete()
+        logger.info(f"Evicted {deleted} LinkedIn profiles from the cache")
+
+
+def get_cached_extraction(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Extraction en cache pour ce hash de prompt, ou None."""
+    entry = LinkedInExtractionCache.objects.filter(cache_key=cache_key).only("id", "result").first()
+    if entry is None:
+        return None
+    LinkedInExtractionCache.objects.filter(id=entry.id).update(
+        last_used_at=timezone.now(), hits=F("hits") + 1
+    )
+    return entry.result
+
+
+def store_extraction(cache_key: str, prompt_version: int, result: Dict[str, Any]) -> None:
+    now = timezone.now()
+    LinkedInExtractionCache.objects.update_or_create(
+        cache_key=cache_key,
+        defaults={"prompt_version": prompt_version, "result": result, "last_used_at": now},
+    )
+
+    # Results of older prompt versions can no longer be hit
+    LinkedInExtractionCache.objects.exclude(prompt_version=prompt_version).delete()
+    excess = LinkedInExtractionCache.objects.count() - LINKEDIN_EXTRACTION_CACHE_MAX_ENTRIES
+    if excess > 0:
+        oldest = LinkedInExtractionCache.objects.order_by("last_used_at").values_list("id", flat=True)[:excess]
+        deleted, _ = LinkedInExtractionCache.objects.filter(id__in=list(oldest)).delete()
+        logger.info(f"Evicted {deleted} LinkedIn extractions from the cache")
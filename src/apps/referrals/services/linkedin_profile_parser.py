@@ -1,13 +1,35 @@
 """
 Service d'extraction de données candidat depuis un profil LinkedIn scrappé.
 Utilise OpenAI pour mapper les données brutes vers les champs du formulaire.
+
+Le résultat normalisé est mis en cache (voir linkedin_profile_cache), indexé
+par le hash du prompt : il contient exactement les champs du profil envoyés
+au LLM (nom, titre, résumé, expériences, compétences, tronqués), et
+EXTRACTION_PROMPT_VERSION y est ajoutée. Incrémenter la version dès que les
+instructions ou la normalisation changent invalide les extractions en cache.
 """
 
+import hashlib
 import logging
+import os
+import zlib
 from typing import Any, Dict, List, Optional
 
+from common import metrics
+from common.locks import LockTimeout, compute_once
+from common.singleflight import SingleFlight
+
+from .linkedin_profile_cache import get_cached_extraction, store_extraction
+
 logger = logging.getLogger(__name__)
 
+EXTRACTION_PROMPT_VERSION = 1
+EXTRACTION_LOCK_NAMESPACE = "linkedin_extraction"
+# Attente max d'une extraction faite par un autre process (appel LLM compris)
+EXTRACTION_WAIT_SECONDS = float(os.environ.get("LINKEDIN_EXTRACTION_WAIT_SECONDS", "60"))
+
+_extraction_flight = SingleFlight()
+
 VALID_EXPERTISE_DOMAINS = {
     "AUDIT_CONSULTING",
     "FINANCE",
@@ -74,36 +96,96 @@ Réponds UNIQUEMENT avec un JSON valide et UNIQUEMENT en français (sans markdow
 {{"fullName": "<nom complet ou null>", "yearsExperience": <entier ou null>, "expertiseDomain": "<valeur enum ou null>", "technicalSkills": ["..."], "interpersonalSkills": ["..."], "searchCriteria": "<phrase ou null>"}}"""
 
 
+def extraction_cache_key(prompt: str) -> str:
+    return hashlib.sha256(f"v{EXTRACTION_PROMPT_VERSION}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+def _empty_extraction() -> Dict[str, Any]:
+    return {
+        "fullName": None,
+        "yearsExperience": None,
+        "expertiseDomain": None,
+        "technicalSkills": [],
+        "interpersonalSkills": [],
+        "searchCriteria": None,
+    }
+
+
 def extract_candidate_from_linkedin_profile(
     raw_profile: Dict[str, Any],
+    organization_id: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Prend le dict brut de scrape_linkedin_profile() et retourne les champs
     candidat pré-remplis via OpenAI.
+    organization_id : organisation à laquelle imputer l'appel LLM (quotas).
+    Un profil déjà extrait est relu depuis le cache sans appel LLM ; les
+    extractions concurrentes d'un même profil partagent un seul appel.
 
     Tous les champs peuvent être None/vide — l'appelant doit gérer gracieusement.
     """
-    empty: Dict[str, Any] = {
-        "fullName": None,
-        "yearsExperience": None,
-        "expertiseDomain": None,
-        "technicalSkills": [],
-        "interpersonalSkills": [],
-        "searchCriteria": None,
-    }
+    prompt = _build_extraction_prompt(raw_profile)
+    cache_key = extraction_cache_key(prompt)
+
+    cached = get_cached_extraction(cache_key)
+    if cached is not None:
+        metrics.increment("linkedin_extraction_cache_total", outcome="hit")
+        return cached
+    metrics.increment("linkedin_extraction_cache_total", outcome="miss")
 
+    # Same profile extracted concurrently (double click, several referrers):
+    # one LLM call, charged to the first caller's organization
+    return _extraction_flight.do(
+        (EXTRACTION_LOCK_NAMESPACE, cache_key),
+        lambda: _extract_and_store(raw_profile, prompt, cache_key, organization_id),
+    )
+
+
+def _extract_and_store(
+    raw_profile: Dict[str, Any],
+    prompt: str,
+    cache_key: str,
+    organization_id: Optional[int],
+) -> Dict[str, Any]:
+    """
+    Un seul appel LLM entre process, hors transaction : les autres appelants
+    relisent l'extraction mise en cache par le premier, ou reçoivent une
+    extraction vide s'il a échoué (sans refaire l'appel chacun leur tour).
+    """
     try:
         from apps.referrals.services.candidate_scoring import call_openai_api
+        from apps.referrals.services.llm_usage import FEATURE_LINKEDIN_EXTRACTION
     except ImportError as e:
         logger.error(f"Cannot import call_openai_api: {e}")
-        return empty
+        return _empty_extraction()
 
-    prompt = _build_extraction_prompt(raw_profile)
+    def extract():
+        result = call_openai_api(
+            prompt, organization_id=organization_id, feature=FEATURE_LINKEDIN_EXTRACTION
+        )
+        if not result:
+            # LLM error or quota: not cached, retried on the next call
+            return None
 
-    result = call_openai_api(prompt)
-    if not result:
-        return empty
+        extracted = _normalize_extraction(result, raw_profile)
+        store_extraction(cache_key, EXTRACTION_PROMPT_VERSION, extracted)
+        return extracted
 
+    try:
+        extracted = compute_once(
+            EXTRACTION_LOCK_NAMESPACE,
+            zlib.crc32(cache_key.encode("utf-8")),
+            lambda: get_cached_extraction(cache_key),
+            extract,
+            EXTRACTION_WAIT_SECONDS,
+        )
+    except LockTimeout as e:
+        logger.warning(f"LinkedIn extraction not done in time by another process: {e}")
+        return _empty_extraction()
+    return extracted if extracted is not None else _empty_extraction()
+
+
+def _normalize_extraction(result: Dict[str, Any], raw_profile: Dict[str, Any]) -> Dict[str, Any]:
     # Valider et nettoyer chaque champ
     full_name = result.get("fullName")
     if not isinstance(full_name, str) or not full_name.strip():
@@ -4,17 +4,60 @@ Utilise des techniques de scraping respectueuses pour extraire les informations
 """
 
 import re
+import threading
+import time
+import zlib
 from typing import Dict, Optional, List, Any
 from datetime import datetime
 import logging
+import os
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from apps.referrals.services.linkedin_profile_cache import (
+    canonicalize_linkedin_url,
+    get_cached_profile,
+    store_profile,
+)
+from common import metrics
+from common.locks import LockTimeout, compute_once
+from common.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Client Coresignal : connexions réutilisées (keep-alive) et retentatives
+# bornées avec backoff aléatoire sur les 5xx et les connexions coupées.
+# Le timeout de connexion est court : un hôte injoignable échoue vite, seul
+# le temps de réponse de l'API peut approcher CORESIGNAL_READ_TIMEOUT.
+CORESIGNAL_CONNECT_TIMEOUT = float(os.environ.get("CORESIGNAL_CONNECT_TIMEOUT", "3.05"))
+CORESIGNAL_READ_TIMEOUT = float(os.environ.get("CORESIGNAL_READ_TIMEOUT", "30"))
+CORESIGNAL_MAX_RETRIES = int(os.environ.get("CORESIGNAL_MAX_RETRIES", "2"))
+CORESIGNAL_BACKOFF = float(os.environ.get("CORESIGNAL_BACKOFF", "0.5"))
+
+COLLECT_PATH = "/cdapi/v2/employee_multi_source/collect/"
+
+_local = threading.local()
+
+PROFILE_LOCK_NAMESPACE = "linkedin_profile"
+# Attente max d'un profil récupéré par un autre process (appel et retentatives compris)
+PROFILE_WAIT_SECONDS = float(os.environ.get("LINKEDIN_PROFILE_WAIT_SECONDS", "120"))
+
+_profile_flight = SingleFlight()
+
 
 def scrape_linkedin_profile(linkedin_url: str) -> Dict[str, Any]:
     """
     Scrape un profil LinkedIn et retourne les données structurées.
     
+    Les profils déjà récupérés sont lus dans le cache persistant (voir
+    linkedin_profile_cache) : un profil n'est payé qu'une fois par TTL.
+    Les appels concurrents pour un même profil n'en déclenchent qu'un :
+    single-flight dans le process, verrou de session entre process (voir
+    common.locks.compute_once).
+
     Args:
         linkedin_url: URL du profil LinkedIn
         
@@ -51,9 +94,14 @@ def scrape_linkedin_profile(linkedin_url: str) -> Dict[str, Any]:
     # return _scrape_with_linkedin_api(linkedin_url)
     
     # Pour l'instant, retourner des données de test
-    logger.info(f"LinkedIn profile scraping called for: {linkedin_url}")
+    cached = get_cached_profile(linkedin_url)
+    if cached is not None:
+        logger.info(f"LinkedIn profile cache hit for: {linkedin_url}")
+        return cached
 
-    result = _scrape_with_coresignal(linkedin_url)
+    # Concurrent scrapes of the same profile share one Coresignal call
+    key = canonicalize_linkedin_url(linkedin_url) or linkedin_url
+    result = _profile_flight.do(("linkedin_profile", key), lambda: _scrape_and_store(linkedin_url, key))
 
     if result:
         return result
@@ -84,6 +132,33 @@ def scrape_linkedin_profile(linkedin_url: str) -> Dict[str, Any]:
     }
 
 
+def _scrape_and_store(linkedin_url: str, key: str) -> Dict[str, Any]:
+    """
+    Un seul appel Coresignal entre process, hors transaction : les autres
+    appelants relisent le profil mis en cache par le premier, ou reçoivent
+    le profil vide s'il a échoué.
+    """
+    def scrape():
+        logger.info(f"LinkedIn profile scraping called for: {linkedin_url}")
+        result = _scrape_with_coresignal(linkedin_url)
+        if result:
+            store_profile(linkedin_url, result)
+        return result
+
+    try:
+        result = compute_once(
+            PROFILE_LOCK_NAMESPACE,
+            zlib.crc32(key.encode("utf-8")),
+            lambda: get_cached_profile(linkedin_url),
+            scrape,
+            PROFILE_WAIT_SECONDS,
+        )
+    except LockTimeout as e:
+        logger.warning(f"LinkedIn profile {linkedin_url} not fetched in time by another process: {e}")
+        return _get_empty_profile()
+    return result if result is not None else _get_empty_profile()
+
+
 def _is_valid_linkedin_url(url: str) -> bool:
     """
     Valide qu'une URL est bien une URL de profil LinkedIn.
@@ -104,88 +179,154 @@ def _is_valid_linkedin_url(url: str) -> bool:
     return False
 
 
+def _coresignal_retry() -> Retry:
+    return Retry(
+        total=CORESIGNAL_MAX_RETRIES,
+        backoff_factor=CORESIGNAL_BACKOFF,
+        backoff_jitter=CORESIGNAL_BACKOFF,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+
+
+def _coresignal_session() -> requests.Session:
+    # requests.Session is not thread-safe: one per thread, each with its own pool
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+        adapter = HTTPAdapter(max_retries=_coresignal_retry())
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return session
+
+
 # Implémentation avec Coresignal (API payante mais fiable)
 def _scrape_with_coresignal(linkedin_url: str) -> Dict[str, Any]:
     """
     Utilise l'API coresignal pour scraper LinkedIn de manière fiable.
     Documentation: https://docs.coresignal.com/api-introduction/apis-overview
     
-    Nécessite: pip install requests
-    et une clé API coresignal (apikey dans les headers authorisation)
+    Nécessite une clé API coresignal (CORESIGNAL_API_KEY, en-tête apikey).
+    CORESIGNAL_BASE_URL permet de viser le serveur local (run_coresignal_stub).
     """
+    api_key = getattr(settings, "CORESIGNAL_API_KEY", None)
+    if not api_key:
+        logger.error("CORESIGNAL_API_KEY not configured in settings")
+        return _get_empty_profile()
+
+    headers = {
+        "accept": "application/json",
+        "apikey": api_key
+    }
+
+    # Construire l'URL de l'API Coresignal avec l'URL LinkedIn
+    api_url = f"{settings.CORESIGNAL_BASE_URL.rstrip('/')}{COLLECT_PATH}{linkedin_url}"
+
+    started = time.monotonic()
     try:
-        import requests
-        from django.conf import settings
-        
-        api_key = getattr(settings, "CORESIGNAL_API_KEY", None)
-        if not api_key:
-            logger.error("CORESIGNAL_API_KEY not configured in settings")
-            return _get_empty_profile()
-        
-        headers = {
-            "accept": "application/json",
-            "apikey": api_key
-        }
-        
-        # Construire l'URL de l'API Coresignal avec l'URL LinkedIn
-        api_url = f"https://api.coresignal.com/cdapi/v2/employee_multi_source/collect/{linkedin_url}"
-        
-        response = requests.get(
+        response = _coresignal_session().get(
             api_url,
             headers=headers,
-            timeout=30
+            timeout=(CORESIGNAL_CONNECT_TIMEOUT, CORESIGNAL_READ_TIMEOUT),
         )
+    except requests.RequestException as e:
+        _log_coresignal_call(linkedin_url, "unavailable", started, error=type(e).__name__)
+        return _get_empty_profile()
+    except Exception as e:
+        # urllib3 errors that requests does not wrap
+        _log_coresignal_call(linkedin_url, "error", started, error=f"{type(e).__name__}: {e}"[:200])
+        return _get_empty_profile()
 
-        
-        if response.status_code != 200:
-            logger.error(f"coresignal API error: {response.status_code} - {response.text}")
-            return _get_empty_profile()
-        
-        data = response.json()
-        print(data)
-        
-        full_name = (
-            data.get("full_name")
-            or f"{data.get('first_name', '')} {data.get('last_name', '')}".strip()
-            or None
-        )
+    if response.status_code != 200:
+        outcome = "unavailable" if response.status_code >= 500 else "error"
+        _log_coresignal_call(linkedin_url, outcome, started, status=response.status_code, error=response.text[:200])
+        return _get_empty_profile()
 
-        # Transformer les données Coresignal dans notre format
-        return {
-            "name": full_name,
-            "headline": data.get("headline"),
-            "summary": data.get("summary"),
-            "experience": [
-                {
-                    "title": exp.get("position_title"),
-                    "company": exp.get("company_name"),
-                    "start_date": exp.get("date_from_year", None),
-                    "end_date": exp.get("date_to_year", None),
-                    "description": exp.get("description"),
-                }
-                for exp in data.get("experience", [])
-            ],
-            "education": [
-                {
-                    "school": edu.get("institution_name"),
-                    "degree": edu.get("degree"),
-                    "field": edu.get("field_of_study", None),
-                    "start_year": edu.get("date_from_year", None),
-                    "end_year": edu.get("date_to_year", None),
-                }
-                for edu in data.get("education", [])
-            ],
-            "skills": data.get("skills", []),
-            "scraped_at": datetime.now().isoformat(),
-        }
-        
-    except ImportError:
-        logger.error("requests library not installed")
+    try:
+        data = response.json()
+    except ValueError:
+        _log_coresignal_call(linkedin_url, "invalid_json", started, status=response.status_code)
         return _get_empty_profile()
+
+    try:
+        profile = _normalize_coresignal_profile(data)
     except Exception as e:
-        logger.error(f"Error scraping LinkedIn with Proxycurl: {e}")
+        # Unexpected payload shape: same empty profile as any other failure
+        _log_coresignal_call(
+            linkedin_url, "invalid_payload", started, status=response.status_code,
+            error=f"{type(e).__name__}: {e}"[:200],
+        )
         return _get_empty_profile()
 
+    _log_coresignal_call(linkedin_url, "success", started, status=response.status_code)
+    return profile
+
+
+def _normalize_coresignal_profile(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Profil au format de _get_empty_profile, depuis une réponse Coresignal."""
+    full_name = (
+        data.get("full_name")
+        or f"{data.get('first_name', '')} {data.get('last_name', '')}".strip()
+        or None
+    )
+
+    # Transformer les données Coresignal dans notre format
+    return {
+        "name": full_name,
+        "headline": data.get("headline"),
+        "summary": data.get("summary"),
+        "experience": [
+            {
+                "title": exp.get("position_title"),
+                "company": exp.get("company_name"),
+                "start_date": exp.get("date_from_year", None),
+                "end_date": exp.get("date_to_year", None),
+                "description": exp.get("description"),
+            }
+            for exp in data.get("experience") or []
+        ],
+        "education": [
+            {
+                "school": edu.get("institution_name"),
+                "degree": edu.get("degree"),
+                "field": edu.get("field_of_study", None),
+                "start_year": edu.get("date_from_year", None),
+                "end_year": edu.get("date_to_year", None),
+            }
+            for edu in data.get("education") or []
+        ],
+        "skills": data.get("skills") or [],
+        "scraped_at": datetime.now().isoformat(),
+    }
+
+
+def _log_coresignal_call(
+    linkedin_url: str,
+    outcome: str,
+    started: float,
+    status: Optional[int] = None,
+    error: Optional[str] = None,
+) -> None:
+    """Une ligne de log par appel (champs aussi passés en extra) et compteurs."""
+    elapsed = time.monotonic() - started
+    metrics.increment("coresignal_requests_total", outcome=outcome)
+    metrics.increment("coresignal_request_seconds_total", elapsed, outcome=outcome)
+    fields = {
+        "provider": "coresignal",
+        "linkedin_url": linkedin_url,
+        "outcome": outcome,
+        "status": status,
+        "elapsed_ms": int(elapsed * 1000),
+    }
+    if error:
+        fields["error"] = error
+    message = "Coresignal call " + " ".join(f"{key}={value}" for key, value in fields.items())
+    if outcome == "success":
+        logger.info(message, extra=fields)
+    else:
+        logger.error(message, extra=fields)
+
 
 def _get_empty_profile() -> Dict[str, Any]:
     """Retourne une structure de profil vide."""
@@ -0,0 +1,316 @@
+"""
+Scoring LLM hors ligne via l'API Batch d'OpenAI.
+
+Utilisé pour les backfills de CandidateScore : les prompts sont écrits dans un
+fichier JSONL (un appel /v1/responses par ligne), soumis en un seul batch, puis
+les résultats sont relus et rattachés aux referrals via leur custom_id.
+Les batches sont facturés à moitié prix et ne consomment pas le quota de
+rate-limit utilisé par le trafic temps réel. Leurs tokens sont en revanche
+imputés aux organisations comme les appels directs (voir record_batch_usage).
+
+Deux backends partagent la même interface :
+- OpenAIBatchBackend : l'API Batch réelle (Files + Batches).
+- LocalBatchBackend : un répertoire local qui accepte le JSONL d'entrée et
+  renvoie un JSONL de sortie au même format (tests, développement).
+"""
+
+import json
+import logging
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from apps.referrals.services.candidate_scoring import (
+    MODEL_PRICES_PER_MTOK,
+    _get_client,
+    build_llm_input,
+    parse_llm_json,
+)
+from apps.referrals.services.llm_usage import FEATURE_SCORING, record_llm_usage
+from apps.referrals.services.prompt_budget import estimate_messages_tokens, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/responses"
+BATCH_COMPLETION_WINDOW = "24h"
+
+# Statuts terminaux de l'API Batch
+BATCH_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Remise de l'API Batch sur le prix des tokens
+BATCH_PRICE_FACTOR = 0.5
+
+
+# =============================================================================
+# Format JSONL
+# =============================================================================
+
+def make_custom_id(referral_id: int, llm_fingerprint: str) -> str:
+    """custom_id d'une ligne de batch : referral + empreinte du prompt envoyé."""
+    return f"referral-{referral_id}:{llm_fingerprint}"
+
+
+def parse_custom_id(custom_id: str) -> Tuple[int, str]:
+    """Inverse de make_custom_id. Lève ValueError si le format est inconnu."""
+    prefix, _, fingerprint = custom_id.partition(":")
+    if not prefix.startswith("referral-"):
+        raise ValueError(f"Unexpected batch custom_id: {custom_id!r}")
+    return int(prefix[len("referral-"):]), fingerprint
+
+
+def build_batch_request(custom_id: str, prompt: str, model: str) -> Dict[str, Any]:
+    """Une ligne du fichier d'entrée Batch API."""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": model,
+            "input": build_llm_input(prompt),
+        },
+    }
+
+
+def _extract_output_text(body: Dict[str, Any]) -> str:
+    """Concatène le texte de sortie d'une réponse /v1/responses."""
+    if isinstance(body.get("output_text"), str):
+        return body["output_text"]
+
+    parts = []
+    for item in body.get("output") or []:
+        if item.get("type") != "message":
+            continue
+        for content in item.get("content") or []:
+            if content.get("type") == "output_text":
+                parts.append(content.get("text", ""))
+    return "".join(parts)
+
+
+@dataclass
+class BatchResult:
+    """Une ligne de sortie : résultat JSON du LLM (None en cas d'échec) et tokens facturés."""
+    custom_id: str
+    result: Optional[Dict[str, Any]]
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+def parse_batch_output_line(line: str) -> BatchResult:
+    """
+    Parse une ligne du fichier de sortie.
+    result vaut None en cas d'erreur de la requête ou de réponse non parsable ;
+    les tokens sont relevés même quand la réponse est inutilisable.
+    """
+    record = json.loads(line)
+    custom_id = record.get("custom_id", "")
+
+    if record.get("error"):
+        logger.error(f"Batch request {custom_id} failed: {record['error']}")
+        return BatchResult(custom_id, None)
+
+    response = record.get("response") or {}
+    body = response.get("body") or {}
+    usage = body.get("usage") or {}
+    parsed = BatchResult(
+        custom_id,
+        None,
+        input_tokens=usage.get("input_tokens") or 0,
+        output_tokens=usage.get("output_tokens") or 0,
+    )
+    if response.get("status_code") != 200:
+        logger.error(f"Batch request {custom_id} returned HTTP {response.get('status_code')}")
+        return parsed
+
+    try:
+        result = parse_llm_json(_extract_output_text(body))
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse batch LLM response for {custom_id}: {e}")
+        return parsed
+
+    if not isinstance(result, dict):
+        logger.error(f"Unexpected batch LLM response structure for {custom_id}")
+        return parsed
+    parsed.result = result
+    return parsed
+
+
+def record_batch_usage(organization_id: Optional[int], model: str, parsed: BatchResult) -> None:
+    """Impute les tokens d'une ligne de sortie à l'organisation (palier "batch", coût remisé)."""
+    cost = 0.0
+    prices = MODEL_PRICES_PER_MTOK.get(model)
+    if prices:
+        cost = (parsed.input_tokens * prices[0] + parsed.output_tokens * prices[1]) / 1_000_000
+    record_llm_usage(
+        organization_id=organization_id,
+        feature=FEATURE_SCORING,
+        model=model,
+        tier="batch",
+        input_tokens=parsed.input_tokens,
+        output_tokens=parsed.output_tokens,
+        # Per-request latency is not reported by the Batch API
+        latency=0.0,
+        cost_usd=cost * BATCH_PRICE_FACTOR,
+    )
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+
+@dataclass
+class BatchStatus:
+    """État d'un batch soumis."""
+    batch_id: str
+    status: str
+    output_ref: Optional[str] = None
+    error_ref: Optional[str] = None
+
+    @property
+    def is_final(self) -> bool:
+        return self.status in BATCH_FINAL_STATUSES
+
+
+class OpenAIBatchBackend:
+    """Backend Batch API d'OpenAI (Files + Batches)."""
+
+    def submit(self, input_path: Path) -> str:
+        client = _get_client()
+        with open(input_path, "rb") as f:
+            uploaded = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> BatchStatus:
+        batch = _get_client().batches.retrieve(batch_id)
+        return BatchStatus(
+            batch_id=batch.id,
+            status=batch.status,
+            output_ref=batch.output_file_id,
+            error_ref=batch.error_file_id,
+        )
+
+    def read_lines(self, ref: str) -> Iterator[str]:
+        content = _get_client().files.content(ref)
+        for line in content.text.splitlines():
+            if line.strip():
+                yield line
+
+
+class LocalBatchBackend:
+    """
+    Stand-in local de l'API Batch basé sur un répertoire.
+
+    submit() copie le fichier d'entrée en <batch_id>.input.jsonl ; le batch est
+    terminé dès qu'un fichier <batch_id>.output.jsonl existe. Si un responder
+    est fourni, il reçoit chaque requête (dict) et renvoie le texte de sortie
+    du modèle : le fichier de sortie est alors écrit immédiatement.
+    """
+
+    def __init__(self, directory: Path, responder: Optional[Callable[[Dict[str, Any]], str]] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.responder = responder
+
+    def _path(self, batch_id: str, kind: str) -> Path:
+        return self.directory / f"{batch_id}.{kind}.jsonl"
+
+    def submit(self, input_path: Path) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        shutil.copyfile(input_path, self._path(batch_id, "input"))
+        if self.responder is not None:
+            self._respond(batch_id)
+        return batch_id
+
+    def _respond(self, batch_id: str) -> None:
+        with open(self._path(batch_id, "input"), encoding="utf-8") as src, \
+                open(self._path(batch_id, "output"), "w", encoding="utf-8") as dst:
+            for line in src:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                output_text = self.responder(request)
+                record = {
+                    "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "output_text": output_text,
+                            "usage": {
+                                "input_tokens": estimate_messages_tokens(
+                                    *(message["content"] for message in request["body"]["input"])
+                                ),
+                                "output_tokens": estimate_tokens(output_text),
+                            },
+                        },
+                    },
+                    "error": None,
+                }
+                dst.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def status(self, batch_id: str) -> BatchStatus:
+        output = self._path(batch_id, "output")
+        if output.exists():
+            return BatchStatus(batch_id=batch_id, status="completed", output_ref=str(output))
+        return BatchStatus(batch_id=batch_id, status="in_progress")
+
+    def read_lines(self, ref: str) -> Iterator[str]:
+        with open(ref, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+# =============================================================================
+# Pipeline helpers
+# =============================================================================
+
+def write_batch_file(path: Path, requests: Iterable[Dict[str, Any]]) -> int:
+    """Écrit les requêtes en JSONL et retourne le nombre de lignes écrites."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def wait_for_batch(
+    backend: Any,
+    batch_id: str,
+    poll_interval: float = 30.0,
+    timeout: Optional[float] = None,
+) -> BatchStatus:
+    """Poll le batch jusqu'à un statut terminal (ou TimeoutError)."""
+    started = time.monotonic()
+    while True:
+        status = backend.status(batch_id)
+        if status.is_final:
+            return status
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(f"Batch {batch_id} still {status.status} after {timeout:.0f}s")
+        logger.info(f"Batch {batch_id} is {status.status}, polling again in {poll_interval:.0f}s")
+        time.sleep(poll_interval)
+
+
+def iter_batch_results(
+    backend: Any, status: BatchStatus, chunk_size: int = 500
+) -> Iterator[List[BatchResult]]:
+    """Lit le fichier de sortie par paquets de BatchResult."""
+    if not status.output_ref:
+        return
+    chunk: List[BatchResult] = []
+    for line in backend.read_lines(status.output_ref):
+        chunk.append(parse_batch_output_line(line))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
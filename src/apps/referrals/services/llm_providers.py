@@ -0,0 +1,281 @@
+"""
+Fournisseurs LLM derrière une interface commune.
+
+Le scoring et l'extraction LinkedIn ne dépendent que de LLMProvider.complete :
+- OpenAIProvider : Responses API via le SDK OpenAI ;
+- HTTPStubProvider : même contrat HTTP (/v1/responses) vers un serveur local
+  déterministe (commande run_llm_stub), pour benchmarker et tester les modes
+  de panne sans clé API.
+
+Les erreurs sont traduites en trois exceptions, que l'appelant distingue pour
+le disjoncteur et le limiteur de concurrence : LLMRateLimited (429),
+LLMUnavailable (timeout, connexion, 5xx) et LLMRequestError (requête rejetée,
+le fournisseur lui-même est sain).
+
+stream() produit la même réponse que complete() en transmettant le texte au
+fil de l'eau (on_delta), pour l'affichage progressif de l'analyse.
+
+Sélection par LLM_PROVIDER ("openai" par défaut, ou "stub" avec LLM_STUB_URL).
+"""
+
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    InternalServerError,
+    OpenAI,
+    OpenAIError,
+    RateLimitError,
+)
+
+from apps.referrals.services.llm_resilience import parse_retry_after
+
+LLM_PROVIDER = os.environ.get("LLM_PROVIDER", "openai")
+LLM_STUB_URL = os.environ.get("LLM_STUB_URL", "http://127.0.0.1:8765")
+
+# Appels synchrones : pas de retry dans le thread de requête (le SDK en fait
+# 2 par défaut, avec sleep). Un échec bascule immédiatement sur le fallback.
+OPENAI_TIMEOUT = float(os.environ.get("OPENAI_TIMEOUT", "30"))
+
+
+class LLMProviderError(Exception):
+    """Échec d'un appel fournisseur."""
+
+
+class LLMRateLimited(LLMProviderError):
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMUnavailable(LLMProviderError):
+    """Timeout, erreur de connexion ou 5xx."""
+
+
+class LLMRequestError(LLMProviderError):
+    """Requête rejetée (4xx hors 429, authentification...)."""
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+def _retry_after_from_headers(headers: Any) -> Optional[float]:
+    """Délai Retry-After (secondes) d'une réponse 429."""
+    headers = headers or {}
+    retry_after_ms = parse_retry_after(headers.get("retry-after-ms"))
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000
+    return parse_retry_after(headers.get("retry-after"))
+
+
+class LLMProvider(ABC):
+    """Interface commune : un appel texte, réponse attendue en JSON."""
+
+    name = "base"
+
+    def is_configured(self) -> bool:
+        return True
+
+    @abstractmethod
+    def complete(self, messages: List[Dict[str, str]], model: str) -> LLMResponse:
+        """Appel non streamé ; lève une LLMProviderError en cas d'échec."""
+
+    def stream(
+        self, messages: List[Dict[str, str]], model: str, on_delta: Callable[[str], None]
+    ) -> LLMResponse:
+        """Comme complete(), en appelant on_delta à chaque fragment de texte reçu."""
+        response = self.complete(messages, model)
+        on_delta(response.text)
+        return response
+
+
+@contextmanager
+def _openai_errors():
+    """Traduit les exceptions du SDK OpenAI en LLMProviderError."""
+    try:
+        yield
+    except RateLimitError as e:
+        raise LLMRateLimited(str(e), _retry_after_from_headers(getattr(e.response, "headers", None))) from e
+    except (APITimeoutError, APIConnectionError, InternalServerError) as e:
+        raise LLMUnavailable(str(e)) from e
+    except APIStatusError as e:
+        if e.status_code >= 500:
+            raise LLMUnavailable(str(e)) from e
+        raise LLMRequestError(str(e)) from e
+    except OpenAIError as e:
+        raise LLMRequestError(str(e)) from e
+
+
+def _usage_tokens(usage: Any) -> Dict[str, int]:
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+    }
+
+
+class OpenAIProvider(LLMProvider):
+    """Responses API d'OpenAI."""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None, timeout: float = OPENAI_TIMEOUT):
+        self.api_key = os.environ.get("OPENAI_API_KEY", "") if api_key is None else api_key
+        self.timeout = timeout
+        self._client: Optional[OpenAI] = None
+        self._lock = threading.Lock()
+
+    def is_configured(self) -> bool:
+        return bool(self.api_key)
+
+    @property
+    def client(self) -> OpenAI:
+        with self._lock:
+            if self._client is None:
+                self._client = OpenAI(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+        return self._client
+
+    def complete(self, messages: List[Dict[str, str]], model: str) -> LLMResponse:
+        with _openai_errors():
+            response = self.client.responses.create(model=model, input=messages)
+
+        try:
+            text = response.output_text
+        except (KeyError, IndexError, AttributeError) as e:
+            raise LLMRequestError(f"Unexpected OpenAI API response structure: {e}") from e
+        return LLMResponse(text=text, **_usage_tokens(getattr(response, "usage", None)))
+
+    def stream(
+        self, messages: List[Dict[str, str]], model: str, on_delta: Callable[[str], None]
+    ) -> LLMResponse:
+        parts: List[str] = []
+        usage = None
+        with _openai_errors():
+            for event in self.client.responses.create(model=model, input=messages, stream=True):
+                if event.type == "response.output_text.delta":
+                    parts.append(event.delta)
+                    on_delta(event.delta)
+                elif event.type == "response.completed":
+                    usage = getattr(event.response, "usage", None)
+                elif event.type in ("response.failed", "error"):
+                    raise LLMUnavailable(f"OpenAI stream failed: {event.type}")
+        return LLMResponse(text="".join(parts), **_usage_tokens(usage))
+
+
+class HTTPStubProvider(LLMProvider):
+    """Serveur compatible /v1/responses (voir llm_stub et la commande run_llm_stub)."""
+
+    name = "stub"
+
+    def __init__(self, base_url: str = LLM_STUB_URL, timeout: float = OPENAI_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        # requests.Session is not thread-safe: one per thread
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _post(self, messages: List[Dict[str, str]], model: str, stream: bool = False) -> requests.Response:
+        try:
+            response = self.session.post(
+                f"{self.base_url}/v1/responses",
+                json={"model": model, "input": messages, "stream": stream},
+                timeout=self.timeout,
+                stream=stream,
+            )
+        except requests.RequestException as e:
+            raise LLMUnavailable(str(e)) from e
+
+        if response.status_code == 429:
+            raise LLMRateLimited(response.text, _retry_after_from_headers(response.headers))
+        if response.status_code >= 500:
+            raise LLMUnavailable(f"Stub returned {response.status_code}")
+        if response.status_code >= 400:
+            raise LLMRequestError(f"Stub returned {response.status_code}: {response.text}")
+        return response
+
+    @staticmethod
+    def _from_body(body: Dict[str, Any]) -> LLMResponse:
+        try:
+            usage = body.get("usage") or {}
+            return LLMResponse(
+                text=body["output_text"],
+                input_tokens=usage.get("input_tokens", 0),
+                output_tokens=usage.get("output_tokens", 0),
+            )
+        except (KeyError, AttributeError) as e:
+            raise LLMRequestError(f"Unexpected stub response structure: {e}") from e
+
+    def complete(self, messages: List[Dict[str, str]], model: str) -> LLMResponse:
+        response = self._post(messages, model)
+        try:
+            return self._from_body(response.json())
+        except ValueError as e:
+            raise LLMRequestError(f"Unexpected stub response structure: {e}") from e
+
+    def stream(
+        self, messages: List[Dict[str, str]], model: str, on_delta: Callable[[str], None]
+    ) -> LLMResponse:
+        # Same server-sent events as the Responses API (delta, then completed)
+        response = self._post(messages, model, stream=True)
+        response.encoding = "utf-8"  # text/event-stream is always UTF-8
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data: "):
+                    continue
+                event = json.loads(line[len("data: "):])
+                if event.get("type") == "response.output_text.delta":
+                    on_delta(event["delta"])
+                elif event.get("type") == "response.completed":
+                    return self._from_body(event["response"])
+        except requests.RequestException as e:
+            raise LLMUnavailable(str(e)) from e
+        except (ValueError, KeyError) as e:
+            raise LLMRequestError(f"Unexpected stub stream event: {e}") from e
+        finally:
+            response.close()
+        raise LLMUnavailable("Stub stream ended before completion")
+
+
+_provider: Optional[LLMProvider] = None
+_provider_lock = threading.Lock()
+
+
+def build_provider(name: str = LLM_PROVIDER) -> LLMProvider:
+    if name == "openai":
+        return OpenAIProvider()
+    if name == "stub":
+        return HTTPStubProvider()
+    raise ValueError(f"Unknown LLM provider: {name!r}")
+
+
+def get_llm_provider() -> LLMProvider:
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = build_provider()
+        return _provider
+
+
+def set_llm_provider(provider: Optional[LLMProvider]) -> None:
+    """Remplace le fournisseur du process (benchmarks, tests) ; None = LLM_PROVIDER."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
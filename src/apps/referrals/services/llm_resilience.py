@@ -0,0 +1,226 @@
+"""
+Protection des appels LLM : disjoncteur et limite de concurrence adaptative.
+
+Objectif : une panne ou un rate-limit d'OpenAI ne doit pas bloquer les
+threads de requête. Les deux mécanismes sont partagés par tout le process.
+
+- CircuitBreaker : s'ouvre après N échecs consécutifs ou si le p95 de latence
+  dépasse un seuil ; tant qu'il est ouvert, les appels échouent immédiatement
+  (score de fallback). Après reset_timeout, il passe en half-open et laisse
+  passer quelques requêtes sondes : un succès le referme, un échec le rouvre.
+- AdaptiveConcurrencyLimiter : limite AIMD du nombre d'appels simultanés
+  (+1/limite par succès, ×decrease_factor sur 429 ou timeout) qui respecte
+  le Retry-After renvoyé par l'API.
+
+États et transitions sont publiés dans common.metrics.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from common import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Disjoncteur closed / open / half-open."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    # Valeur de la jauge llm_circuit_state
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        latency_threshold: float = 20.0,
+        latency_percentile: float = 0.95,
+        latency_window: int = 50,
+        min_latency_samples: int = 20,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.latency_percentile = latency_percentile
+        self.min_latency_samples = min_latency_samples
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        metrics.set_gauge("llm_circuit_state", self.STATE_VALUES[self.CLOSED], breaker=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """True si un appel peut partir (à suivre de record_success/record_failure/cancel)."""
+        with self._lock:
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._transition(self.HALF_OPEN, "reset timeout elapsed")
+
+            if self._state == self.HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_max_calls:
+                    return False
+                self._probes_in_flight += 1
+            return True
+
+    def cancel(self) -> None:
+        """Libère une autorisation obtenue par allow() sans avoir appelé l'API."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes_in_flight:
+                self._probes_in_flight -= 1
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            if self._state == self.HALF_OPEN:
+                self._transition(self.CLOSED, "probe succeeded")
+                return
+            if self._state == self.OPEN:
+                return  # appel parti avant l'ouverture
+            self._latencies.append(latency)
+            p = self._latency_percentile()
+            if p is not None and p > self.latency_threshold:
+                self._transition(
+                    self.OPEN,
+                    f"p{int(self.latency_percentile * 100)} latency {p:.1f}s "
+                    f"> {self.latency_threshold:.1f}s",
+                )
+
+    def record_failure(self, latency: Optional[float] = None) -> None:
+        with self._lock:
+            if latency is not None:
+                self._latencies.append(latency)
+            if self._state == self.HALF_OPEN:
+                self._transition(self.OPEN, "probe failed")
+                return
+            self._consecutive_failures += 1
+            if self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._transition(self.OPEN, f"{self._consecutive_failures} consecutive failures")
+
+    def _latency_percentile(self) -> Optional[float]:
+        if len(self._latencies) < self.min_latency_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, math.ceil(self.latency_percentile * len(ordered)) - 1)
+        return ordered[index]
+
+    def _transition(self, state: str, reason: str) -> None:
+        """À appeler sous self._lock."""
+        previous, self._state = self._state, state
+        self._probes_in_flight = 0
+        if state == self.OPEN:
+            self._opened_at = self._clock()
+        else:
+            self._consecutive_failures = 0
+        if state != self.HALF_OPEN:
+            self._latencies.clear()
+
+        log = logger.warning if state == self.OPEN else logger.info
+        log(f"Circuit breaker {self.name}: {previous} -> {state} ({reason})")
+        metrics.increment(
+            "llm_circuit_transitions_total", breaker=self.name, from_state=previous, to_state=state
+        )
+        metrics.set_gauge("llm_circuit_state", self.STATE_VALUES[state], breaker=self.name)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limite de concurrence AIMD (additive increase, multiplicative decrease)."""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: float = 8,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_acquire(self) -> bool:
+        """Réserve un slot sans attendre. False si saturé ou sous Retry-After."""
+        with self._lock:
+            if self._clock() < self._blocked_until:
+                return False
+            if self._in_flight >= int(self._limit):
+                return False
+            self._in_flight += 1
+            self._publish()
+            return True
+
+    def release(self) -> None:
+        """Libère un slot sans ajuster la limite (appel non effectué ou erreur client)."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._publish()
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._publish()
+
+    def on_overload(self, retry_after: Optional[float] = None) -> None:
+        """429 / timeout : réduit la limite et suspend les appels pendant retry_after."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, self._clock() + retry_after)
+            self._publish()
+
+    def _publish(self) -> None:
+        metrics.set_gauge("llm_concurrency_limit", int(self._limit), limiter=self.name)
+        metrics.set_gauge("llm_in_flight", self._in_flight, limiter=self.name)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After en secondes (le format date HTTP n'est pas utilisé par OpenAI)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
@@ -0,0 +1,180 @@
+"""
+Serveur LLM local déterministe, compatible avec HTTPStubProvider.
+
+Répond à POST /v1/responses avec un JSON valide pour chaque type de prompt
+de l'application, dérivé d'un hash du prompt (même prompt, même réponse) :
+- prompt comparatif (« # DOSSIER Dn ») : tableau d'évaluations par dossier ;
+- extraction LinkedIn : champs candidat ;
+- sinon : évaluation {score, strengths, gaps, summary}.
+
+Latence, taux d'erreurs 500 et de 429 (avec Retry-After) sont configurables
+pour reproduire les modes de panne. Avec "stream": true, la réponse est
+envoyée en événements SSE (output_text.delta puis completed), comme la
+Responses API. Lancé par la commande run_llm_stub (voir common/stub_server).
+"""
+
+import hashlib
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
+
+from apps.referrals.services.linkedin_profile_parser import VALID_EXPERTISE_DOMAINS
+from apps.referrals.services.prompt_budget import estimate_tokens
+from common.stub_server import BaseStubConfig, BaseStubHandler, BaseStubServer
+
+DOSSIER_PATTERN = re.compile(r"^# DOSSIER (D\d+)$", re.MULTILINE)
+NAME_PATTERN = re.compile(r"^Nom : (.*)$", re.MULTILINE)
+
+STRENGTHS = [
+    "Expertise métier alignée",
+    "Parcours de direction confirmé",
+    "Recommandation crédible",
+    "Compétences techniques pertinentes",
+]
+GAPS = [
+    "Expérience sectorielle limitée",
+    "Peu d'éléments sur le management",
+    "Profil LinkedIn peu détaillé",
+]
+
+
+# Taille des fragments de texte en mode stream
+STREAM_CHUNK_CHARS = 12
+
+
+@dataclass
+class StubConfig(BaseStubConfig):
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+
+    failure_rates: ClassVar[Tuple[str, ...]] = ("error_rate", "rate_limit_rate")
+
+
+def _digest(text: str) -> int:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:12], 16)
+
+
+def _evaluation(text: str) -> Dict[str, Any]:
+    digest = _digest(text)
+    score = digest % 101
+    return {
+        "score": score,
+        "strengths": [STRENGTHS[digest % len(STRENGTHS)], STRENGTHS[(digest // 7) % len(STRENGTHS)]],
+        "gaps": [GAPS[digest % len(GAPS)]],
+        "summary": f"Évaluation simulée (score {score}). Réponse déterministe du serveur de test.",
+    }
+
+
+def _extraction(prompt: str) -> Dict[str, Any]:
+    digest = _digest(prompt)
+    name = NAME_PATTERN.search(prompt)
+    domains = sorted(VALID_EXPERTISE_DOMAINS)
+    return {
+        "fullName": (name.group(1).strip() or None) if name else None,
+        "yearsExperience": 10 + digest % 20,
+        "expertiseDomain": domains[digest % len(domains)],
+        "technicalSkills": ["Pilotage budgétaire", "Reporting"],
+        "interpersonalSkills": ["Leadership"],
+        "searchCriteria": "Recherche un poste de direction avec davantage de responsabilités stratégiques",
+    }
+
+
+def stub_output(messages: List[Dict[str, str]]) -> Any:
+    """Réponse JSON déterministe pour les messages d'une requête /v1/responses."""
+    prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") == "user")
+
+    dossiers = DOSSIER_PATTERN.split(prompt)
+    if len(dossiers) > 1:
+        # [preamble, id1, text1, id2, text2, ...]
+        return [
+            {"id": dossier_id, **_evaluation(text)}
+            for dossier_id, text in zip(dossiers[1::2], dossiers[2::2])
+        ]
+    if '"fullName"' in prompt:
+        return _extraction(prompt)
+    return _evaluation(prompt)
+
+
+def stub_response_body(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Corps de réponse au format Responses API (output_text + usage)."""
+    messages = request.get("input") or []
+    output_text = json.dumps(stub_output(messages), ensure_ascii=False)
+    return {
+        "object": "response",
+        "model": request.get("model", "stub"),
+        "output_text": output_text,
+        "usage": {
+            "input_tokens": sum(estimate_tokens(m.get("content", "")) for m in messages),
+            "output_tokens": estimate_tokens(output_text),
+        },
+    }
+
+
+class StubRequestHandler(BaseStubHandler):
+    server: "StubServer"
+    service_name = "LLM"
+
+    def route_post(self, body: bytes):
+        if self.path != "/v1/responses":
+            self.send_not_found()
+            return
+
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            self.send_json(400, {"error": "invalid JSON body"})
+            return
+
+        config = self.server.config
+        self.server.count_request()
+        time.sleep(self.server.latency())
+
+        draw = self.server.draw()
+        if draw < config.rate_limit_rate:
+            self.send_json(
+                429,
+                {"error": {"type": "rate_limit_exceeded", "message": "Simulated rate limit"}},
+                {"Retry-After": f"{config.retry_after:g}"},
+            )
+            return
+        if draw < config.rate_limit_rate + config.error_rate:
+            self.send_json(500, {"error": {"type": "server_error", "message": "Simulated failure"}})
+            return
+
+        body = stub_response_body(request)
+        if request.get("stream"):
+            self._send_stream(body)
+        else:
+            self.send_json(200, body)
+
+    def _send_stream(self, body: Dict[str, Any]):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        text = body["output_text"]
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+        # Spread half of the configured latency over the chunks, like token generation
+        pause = self.server.latency() / 2 / max(1, len(chunks))
+        for chunk in chunks:
+            self._send_event({"type": "response.output_text.delta", "delta": chunk})
+            time.sleep(pause)
+        self._send_event({"type": "response.completed", "response": body})
+
+    def _send_event(self, event: Dict[str, Any]):
+        self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+class StubServer(BaseStubServer):
+    handler_class = StubRequestHandler
+
+
+def make_stub_server(host: str = "127.0.0.1", port: int = 8765, config: Optional[StubConfig] = None) -> StubServer:
+    """Serveur prêt à servir (serve_forever) ; port 0 = port libre."""
+    return StubServer((host, port), config or StubConfig())
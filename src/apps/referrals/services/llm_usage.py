@@ -0,0 +1,185 @@
+"""
+Comptage de la consommation LLM par organisation, et quotas mensuels.
+
+Chaque appel abouti (voir candidate_scoring._call_llm) ajoute une ligne à
+LLMUsageRecord et incrémente l'agrégat du jour (LLMUsageDaily) pour
+(organisation, fonctionnalité, modèle). Un échec d'écriture est journalisé,
+jamais propagé : le comptage ne doit pas faire échouer un scoring.
+
+Les quotas (LLMQuota) portent sur les tokens du mois calendaire (UTC).
+get_quota_status lit un compteur en cache dans le process : rechargé depuis
+les agrégats toutes les LLM_QUOTA_CACHE_TTL secondes, et incrémenté
+localement à chaque appel entre deux rechargements. Les autres process ne
+voient la consommation d'un worker qu'au rechargement : le quota hard peut
+être dépassé d'au plus quelques appels.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from apps.referrals.models import LLMQuota, LLMUsageDaily, LLMUsageRecord
+
+logger = logging.getLogger(__name__)
+
+LLM_QUOTA_CACHE_TTL = float(os.environ.get("LLM_QUOTA_CACHE_TTL", "30"))
+
+# Fonctionnalités appelantes
+FEATURE_SCORING = "scoring"
+FEATURE_LINKEDIN_EXTRACTION = "linkedin_extraction"
+
+
+@dataclass
+class QuotaStatus:
+    """Consommation du mois et quotas d'une organisation (None = pas de limite)."""
+    used_tokens: int = 0
+    soft_limit: Optional[int] = None
+    hard_limit: Optional[int] = None
+
+    @property
+    def soft_exceeded(self) -> bool:
+        return self.soft_limit is not None and self.used_tokens >= self.soft_limit
+
+    @property
+    def hard_exceeded(self) -> bool:
+        return self.hard_limit is not None and self.used_tokens >= self.hard_limit
+
+
+# organization_id -> (expiry, month start, status)
+_cache: Dict[int, Tuple[float, date, QuotaStatus]] = {}
+_cache_lock = threading.Lock()
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _load_quota_status(organization_id: int, month: date) -> QuotaStatus:
+    quota = LLMQuota.objects.filter(organization_id=organization_id).first()
+    if quota is None or (quota.monthly_soft_tokens is None and quota.monthly_hard_tokens is None):
+        return QuotaStatus()
+    totals = LLMUsageDaily.objects.filter(
+        organization_id=organization_id, day__gte=month
+    ).aggregate(input=Sum("input_tokens"), output=Sum("output_tokens"))
+    return QuotaStatus(
+        used_tokens=(totals["input"] or 0) + (totals["output"] or 0),
+        soft_limit=quota.monthly_soft_tokens,
+        hard_limit=quota.monthly_hard_tokens,
+    )
+
+
+def get_quota_status(organization_id: Optional[int]) -> QuotaStatus:
+    """État du quota de l'organisation, depuis le cache du process."""
+    if organization_id is None:
+        return QuotaStatus()
+
+    now = time.monotonic()
+    month = _month_start(timezone.now().date())
+    with _cache_lock:
+        cached = _cache.get(organization_id)
+    if cached is not None and cached[0] > now and cached[1] == month:
+        return cached[2]
+
+    status = _load_quota_status(organization_id, month)
+    if status.soft_exceeded:
+        logger.warning(
+            f"Organization {organization_id} is over its LLM soft quota "
+            f"({status.used_tokens}/{status.soft_limit} tokens this month)"
+        )
+    with _cache_lock:
+        _cache[organization_id] = (now + LLM_QUOTA_CACHE_TTL, month, status)
+    return status
+
+
+def invalidate_quota_cache(organization_id: Optional[int] = None) -> None:
+    with _cache_lock:
+        if organization_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(organization_id, None)
+
+
+def _count_locally(organization_id: int, tokens: int) -> None:
+    """Reporte un appel dans le compteur en cache, sans attendre le rechargement."""
+    with _cache_lock:
+        cached = _cache.get(organization_id)
+        if cached is not None:
+            cached[2].used_tokens += tokens
+
+
+def _add_to_daily(
+    organization_id: Optional[int],
+    feature: str,
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    latency_ms: int,
+    cost_usd: float,
+) -> None:
+    keys = {
+        "organization_id": organization_id,
+        "day": timezone.now().date(),
+        "feature": feature,
+        "model": model,
+    }
+    increments = {
+        "calls": F("calls") + 1,
+        "input_tokens": F("input_tokens") + input_tokens,
+        "output_tokens": F("output_tokens") + output_tokens,
+        "latency_ms_total": F("latency_ms_total") + latency_ms,
+        "cost_usd": F("cost_usd") + cost_usd,
+    }
+    if LLMUsageDaily.objects.filter(**keys).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            LLMUsageDaily.objects.create(
+                **keys,
+                calls=1,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                latency_ms_total=latency_ms,
+                cost_usd=cost_usd,
+            )
+    except IntegrityError:
+        # Created concurrently since the update above
+        LLMUsageDaily.objects.filter(**keys).update(**increments)
+
+
+def record_llm_usage(
+    organization_id: Optional[int],
+    feature: str,
+    model: str,
+    tier: str,
+    input_tokens: int,
+    output_tokens: int,
+    latency: float,
+    cost_usd: float = 0.0,
+) -> None:
+    """Enregistre un appel LLM abouti (audit + agrégat du jour + compteur de quota)."""
+    latency_ms = int(latency * 1000)
+    try:
+        with transaction.atomic():
+            LLMUsageRecord.objects.create(
+                organization_id=organization_id,
+                feature=feature,
+                model=model,
+                tier=tier,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                latency_ms=latency_ms,
+            )
+            _add_to_daily(organization_id, feature, model, input_tokens, output_tokens, latency_ms, cost_usd)
+    except Exception:
+        logger.exception(f"Failed to record LLM usage ({feature}, {model})")
+
+    if organization_id is not None:
+        _count_locally(organization_id, input_tokens + output_tokens)
@@ -0,0 +1,57 @@
+"""
+Budget de tokens des prompts LLM.
+
+Estimation locale du nombre de tokens (sans tokenizer du fournisseur) et
+troncature des sections de prompt à un budget. L'estimation découpe le texte
+en mots et ponctuation, chaque mot comptant pour un token par tranche de
+CHARS_PER_TOKEN caractères : elle surestime légèrement les tokenizers BPE
+récents sur du français, ce qui est le sens sûr pour un budget.
+"""
+
+import math
+import re
+
+# Longueur moyenne d'un token BPE sur un mot français/anglais
+CHARS_PER_TOKEN = 4
+
+# Surcoût par message du format chat (rôle, séparateurs)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+TRUNCATION_MARKER = " […]"
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _piece_tokens(piece: str) -> int:
+    return max(1, math.ceil(len(piece) / CHARS_PER_TOKEN))
+
+
+def estimate_tokens(text: str) -> int:
+    """Nombre de tokens estimé d'un texte."""
+    if not text:
+        return 0
+    return sum(_piece_tokens(m.group()) for m in _PIECE_RE.finditer(text))
+
+
+def estimate_messages_tokens(*contents: str) -> int:
+    """Nombre de tokens estimé d'une suite de messages chat."""
+    return sum(estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS for content in contents)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Tronque un texte à max_tokens (estimés), sur une frontière de mot.
+    Le texte est retourné inchangé s'il tient dans le budget.
+    """
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text
+
+    budget = max_tokens - estimate_tokens(TRUNCATION_MARKER)
+    used = 0
+    end = 0
+    for match in _PIECE_RE.finditer(text):
+        used += _piece_tokens(match.group())
+        if used > budget:
+            break
+        end = match.end()
+    return text[:end].rstrip() + TRUNCATION_MARKER
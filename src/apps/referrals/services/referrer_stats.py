@@ -0,0 +1,125 @@
+"""
+Historique des recommandeurs (taux d'acceptation et d'embauche).
+
+Les compteurs de ReferrerStats sont incrémentés à chaque ReferralStatusEvent
+créé (signal post_save, voir apps.referrals.signals) : un referral compte une
+fois dans referrals_count à son événement initial, une fois dans
+accepted_count quand il atteint ACCEPTED ou HIRED, une fois dans hired_count,
+et une fois dans rejected_count s'il est refusé par le recruteur avant d'avoir
+été accepté. Le refus de consentement du candidat n'est pas imputé au
+recommandeur.
+
+Le scoring lit une seule ligne par (organisation, recommandeur) : taux
+d'acceptation lissé vers REFERRER_PRIOR_RATE tant que l'historique est court,
+converti en ajustement de la composante referral_quality (au plus
+±REFERRER_TRACK_RECORD_POINTS).
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from django.db.models import F
+
+from apps.referrals.models import Referral, ReferralStatusEvent, ReferrerStats
+
+logger = logging.getLogger(__name__)
+
+REFERRER_PRIOR_RATE = float(os.environ.get("REFERRER_PRIOR_RATE", "0.5"))
+# Poids du prior, en nombre de referrals décidés fictifs
+REFERRER_PRIOR_WEIGHT = float(os.environ.get("REFERRER_PRIOR_WEIGHT", "4"))
+REFERRER_TRACK_RECORD_POINTS = int(os.environ.get("REFERRER_TRACK_RECORD_POINTS", "6"))
+
+ACCEPTED_STATUSES = {Referral.Status.ACCEPTED, Referral.Status.HIRED}
+# Refus imputables au recommandeur (décision du recruteur)
+REVIEW_STATUSES = {Referral.Status.SUBMITTED, Referral.Status.REVIEWED}
+
+
+@dataclass(frozen=True)
+class TrackRecord:
+    """Compteurs d'un recommandeur dans une organisation."""
+    referrals_count: int = 0
+    accepted_count: int = 0
+    hired_count: int = 0
+    rejected_count: int = 0
+
+    @property
+    def decided_count(self) -> int:
+        return self.accepted_count + self.rejected_count
+
+    @property
+    def acceptance_rate(self) -> Optional[float]:
+        """Part des referrals décidés ayant atteint ACCEPTED ou HIRED."""
+        if not self.decided_count:
+            return None
+        return self.accepted_count / self.decided_count
+
+    @property
+    def hire_rate(self) -> Optional[float]:
+        if not self.decided_count:
+            return None
+        return self.hired_count / self.decided_count
+
+    def quality_adjustment(self) -> int:
+        """Points ajoutés (ou retirés) à referral_quality ; 0 sans historique."""
+        smoothed = (
+            (self.accepted_count + REFERRER_PRIOR_RATE * REFERRER_PRIOR_WEIGHT)
+            / (self.decided_count + REFERRER_PRIOR_WEIGHT)
+        )
+        spread = max(REFERRER_PRIOR_RATE, 1 - REFERRER_PRIOR_RATE)
+        return round((smoothed - REFERRER_PRIOR_RATE) / spread * REFERRER_TRACK_RECORD_POINTS)
+
+
+EMPTY_TRACK_RECORD = TrackRecord()
+
+
+def track_record_from_model(stats: ReferrerStats) -> TrackRecord:
+    return TrackRecord(
+        referrals_count=stats.referrals_count,
+        accepted_count=stats.accepted_count,
+        hired_count=stats.hired_count,
+        rejected_count=stats.rejected_count,
+    )
+
+
+def get_track_record(organization_id: Optional[int], referrer_id: Optional[int]) -> TrackRecord:
+    """Compteurs du recommandeur (une lecture par clé unique), vides sans historique."""
+    if organization_id is None or referrer_id is None:
+        return EMPTY_TRACK_RECORD
+    stats = ReferrerStats.objects.filter(
+        organization_id=organization_id, referrer_id=referrer_id
+    ).first()
+    return track_record_from_model(stats) if stats else EMPTY_TRACK_RECORD
+
+
+def status_event_deltas(from_status: Optional[str], to_status: str) -> Dict[str, int]:
+    """Incréments des compteurs pour une transition from_status → to_status."""
+    from_status = (from_status or "").upper() or None
+    to_status = (to_status or "").upper()
+    deltas = {}
+    if from_status is None:
+        deltas["referrals_count"] = 1
+    if to_status in ACCEPTED_STATUSES and from_status not in ACCEPTED_STATUSES:
+        deltas["accepted_count"] = 1
+    if to_status == Referral.Status.HIRED and from_status != Referral.Status.HIRED:
+        deltas["hired_count"] = 1
+    if to_status == Referral.Status.REJECTED and from_status in REVIEW_STATUSES:
+        deltas["rejected_count"] = 1
+    return deltas
+
+
+def record_status_event(event: ReferralStatusEvent) -> None:
+    """Applique un événement de statut aux compteurs de son recommandeur."""
+    deltas = status_event_deltas(event.from_status, event.to_status)
+    if not deltas:
+        return
+
+    stats, _ = ReferrerStats.objects.get_or_create(
+        organization_id=event.organization_id,
+        referrer_id=event.referral.referrer_id,
+    )
+    # F() increments: concurrent events never lose an update
+    ReferrerStats.objects.filter(pk=stats.pk).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
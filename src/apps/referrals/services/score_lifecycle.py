@@ -0,0 +1,269 @@
+"""
+Point d'entrée unique pour obtenir ou recalculer le CandidateScore d'un referral.
+
+Tous les chemins qui déclenchent un scoring (soumission, consentement,
+requêtes et mutations GraphQL) passent par ici, ce qui garantit :
+- un seul calcul (et un seul appel LLM) par referral à la fois : dans le
+  process via single-flight, entre process via une réservation
+  (ScoringClaim, bail de SCORE_CLAIM_LEASE_SECONDS) prise sous verrou
+  consultatif puis validée. Aucune transaction ni aucun verrou ne restent
+  ouverts pendant l'appel LLM : un appelant d'un autre process trouve la
+  réservation, attend sa libération (au plus SCORE_WAIT_SECONDS, sinon
+  ScoreInProgress) et reçoit le score calculé entre-temps, recalculé
+  seulement s'il reste périmé ;
+- une seule écriture : sous verrou, le résultat n'est enregistré que si le
+  score persisté n'a pas changé depuis sa lecture avant le calcul ; sinon
+  le score écrit entre-temps est retourné tel quel.
+
+Le mode comparatif (ensure_referral_scores) réserve de même chaque referral
+et attend de même les referrals réservés ailleurs.
+"""
+
+import logging
+import os
+import time
+import uuid
+from datetime import timedelta
+from typing import Any, Callable, Iterable, List, Optional, Set
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.referrals.models import CandidateScore, Referral, ScoringClaim
+from apps.referrals.services.candidate_scoring import compute_candidate_score, is_score_stale
+from common.errors import TropicalCornerError
+from common.locks import LOCK_POLL_SECONDS, advisory_lock
+from common.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+SCORE_LOCK_NAMESPACE = "candidate_score"
+SCORE_CLAIM_LEASE_SECONDS = int(os.environ.get("SCORE_CLAIM_LEASE_SECONDS", "300"))
+# Attente max d'un score en cours de calcul dans un autre process
+SCORE_WAIT_SECONDS = float(os.environ.get("SCORE_WAIT_SECONDS", "60"))
+
+_score_flight = SingleFlight()
+
+
+class ScoreInProgress(TropicalCornerError):
+    """Le score est en cours de calcul dans un autre process."""
+
+    def __init__(self) -> None:
+        super().__init__("Score is being computed, retry shortly", code="SCORE_IN_PROGRESS")
+
+
+def _existing_score(referral_id: int):
+    return CandidateScore.objects.filter(referral_id=referral_id).first()
+
+
+def _claim(referral_id: int) -> Optional[uuid.UUID]:
+    """Réserve le calcul du score ; None si un autre process le détient déjà."""
+    now = timezone.now()
+    token = uuid.uuid4()
+    with advisory_lock(SCORE_LOCK_NAMESPACE, referral_id):
+        # An expired claim belongs to a process that stopped: take it over
+        ScoringClaim.objects.filter(referral_id=referral_id, expires_at__lte=now).delete()
+        try:
+            with transaction.atomic():
+                ScoringClaim.objects.create(
+                    referral_id=referral_id,
+                    token=token,
+                    expires_at=now + timedelta(seconds=SCORE_CLAIM_LEASE_SECONDS),
+                )
+        except IntegrityError:
+            return None
+    return token
+
+
+def _release(referral_id: int, token: uuid.UUID) -> None:
+    ScoringClaim.objects.filter(referral_id=referral_id, token=token).delete()
+
+
+def _held_claims(referral_ids: Iterable[int]) -> Set[int]:
+    """Referrals réservés par un process (bail en cours)."""
+    return set(
+        ScoringClaim.objects.filter(referral_id__in=list(referral_ids), expires_at__gt=timezone.now())
+        .values_list("referral_id", flat=True)
+    )
+
+
+def _wait_for_claim(referral_id: int) -> uuid.UUID:
+    """Réserve le referral, en attendant la fin d'un calcul en cours ailleurs."""
+    deadline = time.monotonic() + SCORE_WAIT_SECONDS
+    token = _claim(referral_id)
+    while token is None:
+        if time.monotonic() >= deadline:
+            raise ScoreInProgress()
+        time.sleep(LOCK_POLL_SECONDS)
+        if referral_id not in _held_claims([referral_id]):
+            token = _claim(referral_id)
+    return token
+
+
+def _version(score: Optional[CandidateScore]) -> Any:
+    if score is None:
+        return None
+    return score.updated_at, score.rule_fingerprint, score.llm_fingerprint
+
+
+def _save_result(referral: Referral, previous: Optional[CandidateScore], result) -> CandidateScore:
+    """
+    Enregistre result sous verrou, sauf si le score persisté a changé depuis
+    la lecture de previous (écrit par un autre process) : il est alors retourné.
+    """
+    with advisory_lock(SCORE_LOCK_NAMESPACE, referral.id):
+        current = _existing_score(referral.id)
+        if current is not None and _version(current) != _version(previous):
+            logger.info(f"Score for referral {referral.id} written concurrently, result discarded")
+            return current
+
+        if current is None:
+            try:
+                with transaction.atomic():
+                    return CandidateScore.objects.create(
+                        organization_id=referral.organization_id,
+                        referral=referral,
+                        **result.to_model_fields(),
+                    )
+            except IntegrityError:
+                # No advisory lock outside PostgreSQL: the unique constraint decides
+                logger.info(f"Score for referral {referral.id} created concurrently")
+                return _existing_score(referral.id)
+
+        for field, value in result.to_model_fields().items():
+            setattr(current, field, value)
+        current.save()
+        return current
+
+
+def _claim_and_score(
+    referral: Referral, compute: Callable[[Optional[CandidateScore]], Any]
+) -> CandidateScore:
+    """
+    Réserve le referral, appelle compute(score persisté) hors transaction
+    (None : le score persisté est à jour) puis enregistre le résultat.
+    Après l'attente d'un calcul fait ailleurs, compute() reçoit son résultat.
+    """
+    token = _wait_for_claim(referral.id)
+    try:
+        previous = _existing_score(referral.id)
+        result = compute(previous)
+        if result is None:
+            return previous
+        return _save_result(referral, previous, result)
+    finally:
+        _release(referral.id, token)
+
+
+def ensure_referral_score(
+    referral: Referral,
+    use_llm: bool = True,
+    gate_margin: Optional[int] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> CandidateScore:
+    """
+    Retourne le score du referral, en le calculant et le persistant s'il n'existe pas.
+    Les appels concurrents pour un même referral partagent le même calcul ;
+    lève ScoreInProgress s'il est en cours dans un autre process au-delà de
+    SCORE_WAIT_SECONDS.
+    gate_margin : voir candidate_scoring.is_grade_decided.
+    on_delta : reçoit la réponse LLM en streaming, si c'est cet appel qui la déclenche.
+    """
+    score = _existing_score(referral.id)
+    if score is not None:
+        return score
+
+    def compute(previous):
+        if previous is not None:
+            return None  # Persisted by another process meanwhile
+        return compute_candidate_score(
+            referral, use_llm=use_llm, gate_margin=gate_margin, on_delta=on_delta
+        )
+
+    return _score_flight.do(("score", referral.id), lambda: _claim_and_score(referral, compute))
+
+
+def refresh_referral_score(
+    referral: Referral,
+    use_llm: bool = True,
+    only_if_stale: bool = False,
+    gate_margin: Optional[int] = None,
+) -> CandidateScore:
+    """
+    Recalcule le score d'un referral (seules les composantes dont les entrées
+    ont changé) et le persiste. Crée le score s'il n'existe pas encore.
+    Si un autre process le recalcule déjà, attend son résultat et ne le
+    recalcule que s'il est périmé (ScoreInProgress au-delà de SCORE_WAIT_SECONDS).
+
+    Args:
+        only_if_stale: ne rien recalculer si le score persisté est à jour
+        gate_margin: voir candidate_scoring.is_grade_decided
+    """
+    read_version = _version(_existing_score(referral.id))
+
+    def compute(previous):
+        # Written by another process while we waited: kept unless stale
+        if (
+            previous is not None
+            and (only_if_stale or _version(previous) != read_version)
+            and not is_score_stale(previous, referral, use_llm=use_llm, gate_margin=gate_margin)
+        ):
+            return None
+        return compute_candidate_score(
+            referral, use_llm=use_llm, previous=previous, gate_margin=gate_margin
+        )
+
+    return _score_flight.do(("score", referral.id), lambda: _claim_and_score(referral, compute))
+
+
+def ensure_referral_scores(
+    referrals: Iterable[Referral],
+    use_llm: bool = True,
+    gate_margin: Optional[int] = None,
+    comparative: bool = False,
+) -> List[CandidateScore]:
+    """
+    ensure_referral_score pour plusieurs referrals. En mode comparatif, les
+    referrals sans score sont réservés, analysés à plusieurs par appel LLM
+    (voir comparative_scoring), puis persistés un par un.
+    Les referrals en cours de calcul dans un autre process sont attendus
+    (au plus SCORE_WAIT_SECONDS), puis omis s'ils sont encore sans score.
+    """
+    referrals = list(referrals)
+    if not comparative:
+        scores = []
+        for referral in referrals:
+            try:
+                scores.append(ensure_referral_score(referral, use_llm=use_llm, gate_margin=gate_margin))
+            except ScoreInProgress:
+                continue
+        return scores
+
+    from apps.referrals.services.comparative_scoring import score_referrals_comparatively
+
+    scores = CandidateScore.objects.in_bulk([r.id for r in referrals], field_name="referral_id")
+    missing = [r for r in referrals if r.id not in scores]
+    claims = {}
+    for referral in missing:
+        token = _claim(referral.id)
+        if token is not None:
+            claims[referral.id] = token
+
+    try:
+        # Scored by another process between the bulk read and the claim
+        scores.update(CandidateScore.objects.in_bulk(list(claims), field_name="referral_id"))
+        to_score = [r for r in missing if r.id in claims and r.id not in scores]
+        results = score_referrals_comparatively(to_score, use_llm=use_llm, gate_margin=gate_margin)
+        for referral in to_score:
+            scores[referral.id] = _save_result(referral, None, results[referral.id])
+    finally:
+        for referral_id, token in claims.items():
+            _release(referral_id, token)
+
+    pending = {r.id for r in missing if r.id not in scores}
+    deadline = time.monotonic() + SCORE_WAIT_SECONDS
+    while pending and _held_claims(pending) and time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_SECONDS)
+    if pending:
+        scores.update(CandidateScore.objects.in_bulk(list(pending), field_name="referral_id"))
+    return [scores[r.id] for r in referrals if r.id in scores]
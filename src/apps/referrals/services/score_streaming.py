@@ -0,0 +1,143 @@
+"""
+Scoring d'un referral avec affichage progressif (flux SSE, voir views).
+
+Séquence d'événements produite par stream_referral_score :
+- ("rules", ScoringBreakdown) : score par règles, immédiatement ;
+- ("summary", {"delta": str}) : fragments de llm_summary à mesure que le LLM
+  les génère ;
+- ("score", CandidateScore) : score final persisté, puis fin du flux ;
+- ("error", {...}) en cas d'échec, puis fin du flux ;
+- ("keepalive", None) pendant les attentes.
+
+Le calcul passe par ensure_referral_score (single-flight, réservation, persistance)
+dans un thread dédié : si le client se déconnecte, le score est tout de même
+enregistré. Le résumé streamé est celui du modèle rapide ; en cas d'escalade
+ou de fallback, seul l'événement final fait foi.
+"""
+
+import logging
+import queue
+import re
+import threading
+from typing import Any, Iterator, Optional, Tuple
+
+from django.db import connections
+
+from apps.referrals.models import Referral
+from apps.referrals.services.candidate_scoring import _rule_breakdown
+from apps.referrals.services.score_lifecycle import _existing_score, ensure_referral_score
+from common.errors import TropicalCornerError
+from common.sse import KEEPALIVE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+JSON_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonStringFieldStream:
+    """
+    Extrait au fil de l'eau la valeur (chaîne) d'un champ d'un objet JSON en
+    cours de génération. feed() retourne le texte décodé depuis l'appel précédent.
+    Sur un échappement invalide, l'extraction s'arrête : seul l'aperçu est
+    perdu, la réponse complète est parsée normalement.
+    """
+
+    def __init__(self, field: str):
+        self._key = re.compile(rf'"{re.escape(field)}"\s*:\s*"')
+        self._buffer = ""
+        self._pos: Optional[int] = None
+        self._done = False
+
+    def feed(self, text: str) -> str:
+        self._buffer += text
+        if self._done:
+            return ""
+        if self._pos is None:
+            match = self._key.search(self._buffer)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        try:
+            return self._decode()
+        except ValueError as e:
+            logger.debug(f"Malformed JSON string in streamed response, preview stopped: {e}")
+            self._done = True
+            return ""
+
+    def _decode(self) -> str:
+        buffer, i, out = self._buffer, self._pos, []
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self._done = True
+                break
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+            # Escape sequence: wait for the rest if it is split across deltas
+            if i + 1 >= len(buffer):
+                break
+            if buffer[i + 1] != "u":
+                out.append(JSON_ESCAPES.get(buffer[i + 1], buffer[i + 1]))
+                i += 2
+                continue
+            if i + 6 > len(buffer):
+                break
+            code = int(buffer[i + 2:i + 6], 16)
+            if 0xD800 <= code < 0xDC00:
+                # Surrogate pair: needs the low half too
+                if i + 12 > len(buffer):
+                    break
+                low = int(buffer[i + 8:i + 12], 16)
+                if buffer[i + 6:i + 8] != "\\u" or not 0xDC00 <= low < 0xE000:
+                    raise ValueError(f"invalid surrogate pair {buffer[i:i + 12]!r}")
+                out.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                i += 12
+                continue
+            out.append(chr(code))
+            i += 6
+        self._pos = i
+        return "".join(out)
+
+
+def stream_referral_score(referral: Referral, use_llm: bool = True) -> Iterator[Tuple[str, Any]]:
+    """Événements (type, contenu) du scoring de referral ; voir le docstring du module."""
+    score = _existing_score(referral.id)
+    if score is not None:
+        yield "score", score
+        return
+
+    yield "rules", _rule_breakdown(referral, None)
+
+    events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+    summary = JsonStringFieldStream("summary")
+
+    def on_delta(text: str) -> None:
+        chunk = summary.feed(text)
+        if chunk:
+            events.put(("summary", {"delta": chunk}))
+
+    def run() -> None:
+        try:
+            events.put(("score", ensure_referral_score(referral, use_llm=use_llm, on_delta=on_delta)))
+        except TropicalCornerError as e:
+            events.put(("error", {"message": e.message, "code": e.code}))
+        except Exception:
+            logger.exception(f"Streaming score failed for referral {referral.id}")
+            events.put(("error", {"message": "Scoring failed", "code": "SCORING_FAILED"}))
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=run, name=f"score-stream-{referral.id}", daemon=True).start()
+
+    while True:
+        try:
+            kind, payload = events.get(timeout=KEEPALIVE_INTERVAL)
+        except queue.Empty:
+            yield "keepalive", None
+            continue
+        yield kind, payload
+        if kind in ("score", "error"):
+            return
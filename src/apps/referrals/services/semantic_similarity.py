@@ -0,0 +1,145 @@
+"""
+Similarité lexicale-sémantique locale entre un poste et un candidat.
+
+Alternative rapide et hors réseau à l'analyse LLM : les textes sont projetés
+dans un espace de n-grammes hachés (mots, bigrammes de mots et trigrammes de
+caractères, pondération TF sous-linéaire), puis comparés par similarité cosinus.
+Sert de score dégradé quand l'API OpenAI est indisponible, et de pré-filtre
+pour décider quels referrals méritent un appel LLM.
+"""
+
+import re
+import unicodedata
+import zlib
+from functools import lru_cache
+from typing import Iterable, List
+
+import numpy as np
+
+from apps.jobs.models import JobOpening
+from apps.referrals.models import Candidate
+
+# Dimension de l'espace haché (puissance de 2)
+HASH_DIM = 2 ** 14
+
+# Calibration similarité cosinus -> score 0-100 : les trigrammes de caractères
+# donnent un bruit de fond (~0.1) même entre textes sans rapport, et un profil
+# très aligné dépasse rarement 0.8.
+SIMILARITY_FLOOR = 0.1
+SIMILARITY_SATURATION = 0.8
+
+# En dessous, un profil (sans LinkedIn par ex.) est trop pauvre pour être comparé
+MIN_INFORMATIVE_TOKENS = 8
+
+LOCAL_SIMILARITY_MODEL = "local-similarity"
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+_STOPWORDS = frozenset(
+    """
+    a au aux avec ce ces dans de des du elle en et eux il je la le les leur lui ma mais me
+    meme mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te
+    tes toi ton tu un une vos votre vous c d j l m n s t y est sont ete etre avoir chez
+    the and or of to in for on with at by from as is are be an this that it its our your
+    """.split()
+)
+
+
+def _normalize(text: str) -> str:
+    """Minuscules sans accents."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(_normalize(text)) if t not in _STOPWORDS]
+
+
+def _features(tokens: List[str]) -> Iterable[str]:
+    """Mots, bigrammes de mots et trigrammes de caractères."""
+    for token in tokens:
+        yield token
+        padded = f"#{token}#"
+        for i in range(len(padded) - 2):
+            yield "c:" + padded[i:i + 3]
+    for left, right in zip(tokens, tokens[1:]):
+        yield f"b:{left}_{right}"
+
+
+def _hash(feature: str) -> int:
+    # crc32 est stable d'un process à l'autre (contrairement à hash())
+    return zlib.crc32(feature.encode("utf-8")) & (HASH_DIM - 1)
+
+
+@lru_cache(maxsize=1024)
+def vectorize(text: str) -> np.ndarray:
+    """Vecteur TF sous-linéaire normalisé (L2) d'un texte."""
+    indices = [_hash(f) for f in _features(_tokens(text))]
+    if not indices:
+        empty = np.zeros(HASH_DIM, dtype=np.float32)
+        empty.setflags(write=False)
+        return empty
+
+    counts = np.bincount(np.asarray(indices, dtype=np.int64), minlength=HASH_DIM).astype(np.float32)
+    nonzero = counts > 0
+    counts[nonzero] = 1.0 + np.log(counts[nonzero])
+    norm = float(np.linalg.norm(counts))
+    if norm:
+        counts /= norm
+    counts.setflags(write=False)  # shared through the LRU cache
+    return counts
+
+
+def similarity_to_score(similarity: float) -> int:
+    """Convertit une similarité cosinus en score 0-100."""
+    scaled = (similarity - SIMILARITY_FLOOR) / (SIMILARITY_SATURATION - SIMILARITY_FLOOR)
+    return max(0, min(100, int(round(100 * scaled))))
+
+
+def text_similarity(left: str, right: str) -> float:
+    """Similarité cosinus (0-1) entre deux textes."""
+    return float(np.dot(vectorize(left), vectorize(right)))
+
+
+# =============================================================================
+# Job / candidate texts
+# =============================================================================
+
+def _choice_label(choices, value: str) -> str:
+    try:
+        return choices(value).label
+    except ValueError:
+        return value
+
+
+def job_text(job: JobOpening) -> str:
+    """Texte du poste : titre, description et enjeux clés."""
+    challenges = [
+        _choice_label(JobOpening.KeyChallenge, value) for value in (job.key_challenges or [])
+    ]
+    return "\n".join(filter(None, [job.title, job.description, *challenges]))
+
+
+def candidate_text(candidate: Candidate) -> str:
+    """Texte du candidat : headline, résumé, intitulés de postes et compétences LinkedIn."""
+    experiences = candidate.linkedin_experience if isinstance(candidate.linkedin_experience, list) else []
+    titles = [exp.get("title") or "" for exp in experiences if isinstance(exp, dict)]
+    linkedin_skills = candidate.linkedin_skills if isinstance(candidate.linkedin_skills, list) else []
+    skills = [*(candidate.technical_skills or []), *linkedin_skills]
+
+    return "\n".join(filter(None, [
+        candidate.linkedin_headline,
+        candidate.linkedin_summary,
+        *titles,
+        ", ".join(str(s) for s in skills),
+    ]))
+
+
+def compute_similarity_score(candidate: Candidate, job: JobOpening) -> int:
+    """Score de similarité locale poste/candidat (0-100)."""
+    return similarity_to_score(text_similarity(job_text(job), candidate_text(candidate)))
+
+
+def is_informative(candidate: Candidate) -> bool:
+    """True si le profil contient assez de texte pour que la similarité soit significative."""
+    return len(_tokens(candidate_text(candidate))) >= MIN_INFORMATIVE_TOKENS
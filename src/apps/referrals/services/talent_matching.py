@@ -0,0 +1,319 @@
+"""
+Rapprochement inverse poste → vivier de candidats de l'organisation.
+
+À la création d'un poste (ou à la modification de ses critères), tous les
+candidats ayant donné leur consentement sont scorés contre le poste avec les
+règles de candidate_scoring, puis les TALENT_MATCH_TOP_K meilleurs sont
+enregistrés dans JobCandidateMatch (JobOpening.suggestedCandidates).
+
+Le calcul est vectorisé avec NumPy : le vivier est encodé une fois
+(CandidatePool : domaines et compétences en identifiants entiers, format CSR),
+puis chaque poste se score en quelques opérations sur des tableaux, sans
+boucle Python par candidat. Un vivier de 100k candidats se score en quelques
+dizaines de millisecondes ; le chargement depuis la base domine.
+
+Les composantes sont identiques à compute_expertise_match,
+compute_experience_match, compute_interpersonal_skills_match et
+compute_technical_skills_match (vérifié par les tests). La qualité du
+referral n'a pas de sens sans referral : le score de correspondance est la
+somme pondérée (profil actif) des quatre autres composantes, ramenée sur 100.
+
+Les nouveaux candidats n'entrent dans les suggestions qu'au prochain calcul
+(commande refresh_job_matches).
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from apps.jobs.models import JobOpening
+from apps.referrals.models import Candidate, JobCandidateMatch, Referral
+from apps.referrals.services.candidate_scoring import WEIGHTS, _fingerprint
+from apps.referrals.services.weight_profiles import WeightProfile, get_active_profile
+from common.locks import advisory_lock
+
+logger = logging.getLogger(__name__)
+
+TALENT_MATCH_TOP_K = int(os.environ.get("TALENT_MATCH_TOP_K", "50"))
+MATCH_LOCK_NAMESPACE = "job_candidate_matches"
+POOL_CHUNK_SIZE = 5000
+
+MATCH_COMPONENTS = (
+    "expertise_match",
+    "experience_match",
+    "interpersonal_skills_match",
+    "technical_skills_match",
+)
+
+
+class _Vocabulary:
+    """Attribue un identifiant entier stable à chaque valeur rencontrée."""
+
+    def __init__(self):
+        self.ids: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        return self.ids.setdefault(value, len(self.ids))
+
+    def mask(self, values: Iterable[Any]) -> np.ndarray:
+        """Masque booléen sur le vocabulaire des valeurs connues parmi values."""
+        mask = np.zeros(len(self.ids), dtype=bool)
+        known = [self.ids[value] for value in set(values) if value in self.ids]
+        mask[known] = True
+        return mask
+
+
+@dataclass
+class _SkillMatrix:
+    """Ensembles de compétences par candidat, au format CSR (row, skill)."""
+    rows: np.ndarray
+    skills: np.ndarray
+
+    def count_matches(self, mask: np.ndarray, n: int) -> np.ndarray:
+        """Nombre de compétences de chaque candidat présentes dans mask."""
+        hits = mask[self.skills]
+        return np.bincount(self.rows, weights=hits, minlength=n).astype(np.int64)
+
+
+class _SkillMatrixBuilder:
+    def __init__(self, vocabulary: _Vocabulary):
+        self.vocabulary = vocabulary
+        self.rows: List[int] = []
+        self.skills: List[int] = []
+
+    def add(self, row: int, skills: Iterable[Any]) -> None:
+        for skill in set(skills):
+            self.rows.append(row)
+            self.skills.append(self.vocabulary.encode(skill))
+
+    def build(self) -> _SkillMatrix:
+        return _SkillMatrix(
+            rows=np.asarray(self.rows, dtype=np.int64),
+            skills=np.asarray(self.skills, dtype=np.int64),
+        )
+
+
+def _technical_skills(technical_skills: Any, linkedin_skills: Any) -> List[str]:
+    """Compétences techniques comparées par compute_technical_skills_match (minuscules, + LinkedIn)."""
+    skills = [s.lower() for s in (technical_skills or [])]
+    if isinstance(linkedin_skills, list):
+        skills.extend(s.lower() for s in linkedin_skills)
+    return skills
+
+
+class CandidatePool:
+    """Vivier de candidats encodé pour le scoring vectorisé."""
+
+    def __init__(self, rows: Iterable[Tuple[int, str, int, Any, Any, Any]]):
+        """rows : (id, expertise_domain, years_experience, interpersonal_skills, technical_skills, linkedin_skills)."""
+        self.domains = _Vocabulary()
+        self.interpersonal_vocabulary = _Vocabulary()
+        self.technical_vocabulary = _Vocabulary()
+        interpersonal = _SkillMatrixBuilder(self.interpersonal_vocabulary)
+        technical = _SkillMatrixBuilder(self.technical_vocabulary)
+
+        ids, domain_ids, years = [], [], []
+        for row, (candidate_id, domain, years_experience, interpersonal_skills, technical_skills, linkedin_skills) in enumerate(rows):
+            ids.append(candidate_id)
+            domain_ids.append(self.domains.encode(domain))
+            years.append(years_experience or 0)
+            interpersonal.add(row, interpersonal_skills or [])
+            technical.add(row, _technical_skills(technical_skills, linkedin_skills))
+
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.domain_ids = np.asarray(domain_ids, dtype=np.int64)
+        self.years = np.asarray(years, dtype=np.int64)
+        self.interpersonal = interpersonal.build()
+        self.technical = technical.build()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, organization_id: int) -> "CandidatePool":
+        """Candidats de l'organisation ayant donné leur consentement."""
+        rows = Candidate.objects.filter(
+            organization_id=organization_id, consent_confirmed=True
+        ).values_list(
+            "id",
+            "expertise_domain",
+            "years_experience",
+            "interpersonal_skills",
+            "technical_skills",
+            "linkedin_skills",
+        ).order_by().iterator(chunk_size=POOL_CHUNK_SIZE)
+        return cls(rows)
+
+
+def score_pool(
+    pool: CandidatePool,
+    job: JobOpening,
+    experience_ranges: Dict[str, Tuple[int, int]],
+) -> Dict[str, np.ndarray]:
+    """Composantes règles (poids par défaut) de chaque candidat du vivier pour job."""
+    n = len(pool)
+
+    job_domain = pool.domains.ids.get(job.expertise_domain)
+    expertise = np.where(pool.domain_ids == job_domain, WEIGHTS["expertise_match"], 0)
+
+    experience_weight = WEIGHTS["experience_match"]
+    experience_range = experience_ranges.get(job.experience_level) if job.experience_level else None
+    if not experience_range:
+        experience = np.full(n, experience_weight // 2)
+    else:
+        min_years, max_years = experience_range
+        perfect = (pool.years >= min_years) & (pool.years <= max_years)
+        close = (pool.years >= min_years - 2) & (pool.years <= max_years + 3)
+        experience = np.where(perfect, experience_weight, np.where(close, experience_weight // 2, 0))
+
+    interpersonal_weight = WEIGHTS["interpersonal_skills_match"]
+    job_interpersonal = set(job.interpersonal_skills or [])
+    if not job_interpersonal:
+        interpersonal = np.full(n, interpersonal_weight // 2)
+    else:
+        common = pool.interpersonal.count_matches(pool.interpersonal_vocabulary.mask(job_interpersonal), n)
+        interpersonal = np.minimum(common * (interpersonal_weight // 3), interpersonal_weight)
+
+    technical_weight = WEIGHTS["technical_skills_match"]
+    job_technical = set(s.lower() for s in (job.technical_skills or []))
+    if not job_technical:
+        technical = np.full(n, technical_weight // 2)
+    else:
+        common = pool.technical.count_matches(pool.technical_vocabulary.mask(job_technical), n)
+        technical = ((common / len(job_technical)) * technical_weight).astype(np.int64)
+
+    return {
+        "expertise_match": expertise.astype(np.int64),
+        "experience_match": experience.astype(np.int64),
+        "interpersonal_skills_match": interpersonal.astype(np.int64),
+        "technical_skills_match": technical,
+    }
+
+
+def match_scores(components: Dict[str, np.ndarray], profile: WeightProfile) -> np.ndarray:
+    """Score de correspondance 0-100 : composantes pondérées par le profil, ramenées sur 100."""
+    factors = {c: profile.component_factor(c) for c in MATCH_COMPONENTS}
+    maximum = sum(WEIGHTS[c] * factors[c] for c in MATCH_COMPONENTS)
+    if not maximum:
+        return np.zeros(len(components["expertise_match"]), dtype=np.int64)
+    weighted = sum(components[c] * factors[c] for c in MATCH_COMPONENTS)
+    return np.floor(weighted * 100 / maximum + 0.5).astype(np.int64)
+
+
+@dataclass
+class PoolMatch:
+    candidate_id: int
+    rank: int
+    match_score: int
+    components: Dict[str, int]
+
+
+def rank_pool(
+    pool: CandidatePool,
+    job: JobOpening,
+    profile: WeightProfile,
+    top_k: int = TALENT_MATCH_TOP_K,
+    exclude_ids: Sequence[int] = (),
+) -> List[PoolMatch]:
+    """Les top_k candidats du vivier pour job (score décroissant, puis id croissant)."""
+    if not len(pool) or top_k <= 0:
+        return []
+
+    components = score_pool(pool, job, profile.experience_ranges)
+    scores = match_scores(components, profile)
+
+    eligible = np.flatnonzero(~np.isin(pool.ids, np.asarray(list(exclude_ids), dtype=np.int64)))
+    if not len(eligible):
+        return []
+    if len(eligible) > top_k:
+        # O(n) selection of the k-th best score; ties on it are kept so that
+        # the id tie-break below stays deterministic
+        threshold = np.partition(scores[eligible], len(eligible) - top_k)[len(eligible) - top_k]
+        eligible = eligible[scores[eligible] >= threshold]
+    order = eligible[np.lexsort((pool.ids[eligible], -scores[eligible]))][:top_k]
+
+    return [
+        PoolMatch(
+            candidate_id=int(pool.ids[i]),
+            rank=rank,
+            match_score=int(scores[i]),
+            components={c: int(components[c][i]) for c in MATCH_COMPONENTS},
+        )
+        for rank, i in enumerate(order, start=1)
+    ]
+
+
+def job_match_fingerprint(job: JobOpening, profile: WeightProfile) -> str:
+    """Empreinte des critères du poste lus par le rapprochement (et du profil actif)."""
+    return _fingerprint({
+        "profile_version": profile.version,
+        "expertise_domain": job.expertise_domain,
+        "experience_level": job.experience_level,
+        "interpersonal_skills": job.interpersonal_skills or [],
+        "technical_skills": job.technical_skills or [],
+    })
+
+
+def _store_matches(job: JobOpening, matches: List[PoolMatch], fingerprint: str) -> None:
+    with advisory_lock(MATCH_LOCK_NAMESPACE, job.id):
+        JobCandidateMatch.objects.filter(job_opening_id=job.id).delete()
+        JobCandidateMatch.objects.bulk_create([
+            JobCandidateMatch(
+                organization_id=job.organization_id,
+                job_opening_id=job.id,
+                candidate_id=match.candidate_id,
+                rank=match.rank,
+                match_score=match.match_score,
+                job_fingerprint=fingerprint,
+                **match.components,
+            )
+            for match in matches
+        ])
+
+
+def refresh_job_matches(
+    job_opening_id: int,
+    pool: Optional[CandidatePool] = None,
+    top_k: int = TALENT_MATCH_TOP_K,
+) -> int:
+    """
+    Recalcule les suggestions d'un poste ; retourne le nombre de candidats retenus.
+    pool : vivier déjà chargé (plusieurs postes de la même organisation).
+    Un poste non ouvert n'a pas de suggestions.
+    """
+    job = JobOpening.objects.filter(id=job_opening_id).first()
+    if job is None:
+        return 0
+    if job.status != JobOpening.Status.OPEN:
+        JobCandidateMatch.objects.filter(job_opening_id=job.id).delete()
+        return 0
+
+    started = time.monotonic()
+    if pool is None:
+        pool = CandidatePool.load(job.organization_id)
+    loaded = time.monotonic()
+
+    profile = get_active_profile(job.organization_id)
+    referred = Referral.objects.filter(job_opening_id=job.id).values_list("candidate_id", flat=True)
+    matches = rank_pool(pool, job, profile, top_k=top_k, exclude_ids=list(referred))
+    ranked = time.monotonic()
+
+    _store_matches(job, matches, job_match_fingerprint(job, profile))
+    logger.info(
+        f"Job {job.id}: {len(matches)} suggested candidates out of {len(pool)} "
+        f"(load {loaded - started:.2f}s, rank {ranked - loaded:.2f}s, store {time.monotonic() - ranked:.2f}s)"
+    )
+    return len(matches)
+
+
+def refresh_organization_matches(organization_id: int, top_k: int = TALENT_MATCH_TOP_K) -> Dict[int, int]:
+    """Recalcule les suggestions de tous les postes ouverts d'une organisation (vivier chargé une fois)."""
+    pool = CandidatePool.load(organization_id)
+    job_ids = JobOpening.objects.filter(
+        organization_id=organization_id, status=JobOpening.Status.OPEN
+    ).values_list("id", flat=True)
+    return {job_id: refresh_job_matches(job_id, pool=pool, top_k=top_k) for job_id in job_ids}
@@ -0,0 +1,303 @@
+"""
+Profils de pondération du scoring, par organisation.
+
+Les composantes règles sont persistées dans CandidateScore à l'échelle des
+poids par défaut (WEIGHTS). Un profil actif ne les recalcule pas : il les
+repondère à la lecture, en SQL pour rankedReferrals (voir
+weighted_score_annotations) et en Python pour les autres lectures et les
+composantes affichées (voir apply_weight_profile), si bien que changer ou ajuster un profil reclasse
+instantanément tous les referrals, sans recalcul ni appel LLM. Le gating
+LLM (candidate_scoring.should_skip_llm) utilise lui aussi le profil actif.
+
+Seules les fourchettes d'expérience du profil interviennent au calcul :
+elles entrent dans l'empreinte règles, et refreshStaleJobScores recalcule
+alors les seules composantes règles.
+
+Le profil actif de chaque organisation est mis en cache dans le process
+(PROFILE_CACHE_TTL secondes) ; l'activation invalide le cache local, les
+autres process le relisent à expiration.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Max, When
+from django.db.models.expressions import ExpressionWrapper
+from django.db.models.functions import Floor
+
+from apps.jobs.models import JobOpening
+from apps.organizations.models import Organization, OrganizationMember
+from apps.referrals.models import ScoringWeightProfile
+from apps.referrals.services.candidate_scoring import EXPERIENCE_RANGES, WEIGHTS
+from common.errors import TropicalCornerError
+from common.locks import advisory_lock
+
+logger = logging.getLogger(__name__)
+
+PROFILE_CACHE_TTL = float(os.environ.get("SCORING_PROFILE_CACHE_TTL", "60"))
+PROFILE_LOCK_NAMESPACE = "scoring_weight_profile"
+
+RULE_COMPONENTS = (
+    "expertise_match",
+    "experience_match",
+    "interpersonal_skills_match",
+    "technical_skills_match",
+    "referral_quality",
+)
+HYBRID_WEIGHTS = ("rule_score_weight", "llm_score_weight")
+
+
+@dataclass(frozen=True)
+class WeightProfile:
+    """Pondération effective d'une organisation (version 0 = constantes du code)."""
+    version: int
+    weights: Dict[str, float]
+    experience_ranges: Dict[str, Tuple[int, int]]
+
+    def component_factor(self, component: str) -> float:
+        """Facteur appliqué à une composante persistée à l'échelle de WEIGHTS."""
+        return self.weights[component] / WEIGHTS[component]
+
+    def weighted_rule_score(self, components: Any) -> int:
+        """rule_score repondéré depuis les composantes (CandidateScore ou ScoringBreakdown)."""
+        return math.floor(sum(
+            getattr(components, component) * self.component_factor(component)
+            for component in RULE_COMPONENTS
+        ))
+
+    def weighted_components(self, components: Any, rule_score: Optional[int] = None) -> Dict[str, int]:
+        """
+        Composantes règles repondérées, entières et de somme rule_score (par
+        défaut weighted_rule_score) : les parties entières, plus un point pour
+        les plus grandes parties décimales.
+        """
+        scaled = {
+            component: getattr(components, component) * self.component_factor(component)
+            for component in RULE_COMPONENTS
+        }
+        weighted = {component: math.floor(value) for component, value in scaled.items()}
+        if rule_score is None:
+            rule_score = self.weighted_rule_score(components)
+        remainder = rule_score - sum(weighted.values())
+        for component in sorted(scaled, key=lambda c: scaled[c] - weighted[c], reverse=True)[:max(0, remainder)]:
+            weighted[component] += 1
+        return weighted
+
+    def weighted_final_score(self, rule_score: int, llm_score: int, llm_skipped: bool = False) -> int:
+        """
+        final_score repondéré. Score gaté (llm_skipped) : le score LLM persisté
+        est le rule_score par défaut ; il est remplacé par rule_score repondéré.
+        """
+        if llm_skipped:
+            llm_score = rule_score
+        return math.floor(
+            rule_score * self.weights["rule_score_weight"] + llm_score * self.weights["llm_score_weight"]
+        )
+
+
+def default_profile() -> WeightProfile:
+    return WeightProfile(
+        version=0,
+        weights={key: WEIGHTS[key] for key in RULE_COMPONENTS + HYBRID_WEIGHTS},
+        experience_ranges=dict(EXPERIENCE_RANGES),
+    )
+
+
+def profile_from_model(profile: ScoringWeightProfile) -> WeightProfile:
+    experience_ranges = dict(EXPERIENCE_RANGES)
+    experience_ranges.update({
+        level: (int(bounds[0]), int(bounds[1]))
+        for level, bounds in (profile.experience_ranges or {}).items()
+    })
+    return WeightProfile(
+        version=profile.version,
+        weights={key: getattr(profile, key) for key in RULE_COMPONENTS + HYBRID_WEIGHTS},
+        experience_ranges=experience_ranges,
+    )
+
+
+# =============================================================================
+# In-process cache
+# =============================================================================
+
+_cache: Dict[int, Tuple[float, WeightProfile]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_active_profile(organization_id: Optional[int]) -> WeightProfile:
+    """Profil actif de l'organisation, ou les constantes du code s'il n'y en a pas."""
+    if organization_id is None:
+        return default_profile()
+
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(organization_id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    active = ScoringWeightProfile.objects.filter(
+        organization_id=organization_id, is_active=True
+    ).first()
+    profile = profile_from_model(active) if active else default_profile()
+    with _cache_lock:
+        _cache[organization_id] = (now + PROFILE_CACHE_TTL, profile)
+    return profile
+
+
+def invalidate_profile_cache(organization_id: Optional[int] = None) -> None:
+    with _cache_lock:
+        if organization_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(organization_id, None)
+
+
+# =============================================================================
+# Validation & lifecycle
+# =============================================================================
+
+def validate_weights(weights: Dict[str, Any], experience_ranges: Optional[Dict[str, Any]] = None) -> None:
+    """Lève INVALID_WEIGHT_PROFILE si les poids ou les fourchettes sont incohérents."""
+    def invalid(message: str) -> TropicalCornerError:
+        return TropicalCornerError(message, code="INVALID_WEIGHT_PROFILE")
+
+    missing = [key for key in RULE_COMPONENTS + HYBRID_WEIGHTS if weights.get(key) is None]
+    if missing:
+        raise invalid(f"Missing weights: {', '.join(missing)}")
+    if any(weights[key] < 0 for key in RULE_COMPONENTS + HYBRID_WEIGHTS):
+        raise invalid("Weights must be positive")
+    if sum(weights[key] for key in RULE_COMPONENTS) != 100:
+        raise invalid("Rule component weights must add up to 100")
+    if abs(weights["rule_score_weight"] + weights["llm_score_weight"] - 1) > 1e-6:
+        raise invalid("Rule and LLM score weights must add up to 1")
+
+    levels = set(JobOpening.ExperienceLevel.values)
+    for level, bounds in (experience_ranges or {}).items():
+        if level not in levels:
+            raise invalid(f"Unknown experience level: {level}")
+        if (
+            not isinstance(bounds, (list, tuple)) or len(bounds) != 2
+            or not all(isinstance(b, int) and b >= 0 for b in bounds)
+            or bounds[0] > bounds[1]
+        ):
+            raise invalid(f"Invalid experience range for {level}: expected [min, max] years")
+
+
+def create_weight_profile(
+    organization: Organization,
+    weights: Dict[str, Any],
+    experience_ranges: Optional[Dict[str, Any]] = None,
+    name: str = "",
+    created_by: Optional[OrganizationMember] = None,
+    activate: bool = False,
+) -> ScoringWeightProfile:
+    """Crée la version suivante du profil de l'organisation (et l'active si demandé)."""
+    validate_weights(weights, experience_ranges)
+
+    with advisory_lock(PROFILE_LOCK_NAMESPACE, organization.id):
+        last_version = ScoringWeightProfile.objects.filter(
+            organization=organization
+        ).aggregate(last=Max("version"))["last"] or 0
+        profile = ScoringWeightProfile.objects.create(
+            organization=organization,
+            version=last_version + 1,
+            name=name,
+            experience_ranges={
+                level: list(bounds) for level, bounds in (experience_ranges or {}).items()
+            },
+            created_by=created_by,
+            **{key: weights[key] for key in RULE_COMPONENTS + HYBRID_WEIGHTS},
+        )
+        if activate:
+            activate_weight_profile(organization, profile)
+    return profile
+
+
+def activate_weight_profile(
+    organization: Organization, profile: Optional[ScoringWeightProfile] = None
+) -> Optional[ScoringWeightProfile]:
+    """Active profile pour l'organisation ; sans profile, revient aux constantes du code."""
+    with advisory_lock(PROFILE_LOCK_NAMESPACE, organization.id):
+        ScoringWeightProfile.objects.filter(
+            organization=organization, is_active=True
+        ).update(is_active=False)
+        if profile is not None:
+            profile.is_active = True
+            profile.save(update_fields=["is_active"])
+        transaction.on_commit(lambda: invalidate_profile_cache(organization.id))
+
+    logger.info(
+        f"Scoring weight profile for organization {organization.id}: "
+        f"{f'v{profile.version}' if profile else 'defaults'}"
+    )
+    return profile
+
+
+# =============================================================================
+# SQL re-ranking
+# =============================================================================
+
+def weighted_score_annotations(profile: WeightProfile, prefix: str = "") -> Dict[str, Any]:
+    """
+    Annotations ORM recalculant rule_score et final_score depuis les
+    composantes persistées, selon profile.
+
+    Mêmes arrondis que combine_scores (troncature) : avec le profil par
+    défaut, les valeurs annotées égalent les scores persistés.
+
+    Args:
+        prefix: chemin vers CandidateScore (ex. "score__" depuis Referral)
+    """
+    weighted_rule = sum(
+        F(f"{prefix}{component}") * profile.component_factor(component)
+        for component in RULE_COMPONENTS
+    )
+    rule_score = Floor(ExpressionWrapper(weighted_rule, output_field=FloatField()))
+    # Gated scores: reweighted rule score as the LLM stand-in (see WeightProfile.weighted_final_score)
+    llm_score = Case(
+        When(**{f"{prefix}llm_skipped": True}, then=rule_score),
+        default=F(f"{prefix}llm_score"),
+        output_field=FloatField(),
+    )
+    final_score = Floor(ExpressionWrapper(
+        rule_score * profile.weights["rule_score_weight"] + llm_score * profile.weights["llm_score_weight"],
+        output_field=FloatField(),
+    ))
+    return {
+        "weighted_rule_score": rule_score,
+        "weighted_final_score": final_score,
+    }
+
+
+def apply_weight_profile(score: Any, profile: Optional[WeightProfile] = None) -> Any:
+    """
+    Renseigne weighted_rule_score, weighted_final_score et
+    weighted_components sur un CandidateScore, selon profile (par défaut le
+    profil actif de son organisation) ; les valeurs déjà annotées en SQL sont
+    conservées.
+    """
+    if getattr(score, "weighted_final_score", None) is None:
+        profile = profile or get_active_profile(score.organization_id)
+        score.weighted_rule_score = profile.weighted_rule_score(score)
+        score.weighted_final_score = profile.weighted_final_score(
+            score.weighted_rule_score, score.llm_score, score.llm_skipped
+        )
+    if getattr(score, "weighted_components", None) is None:
+        profile = profile or get_active_profile(score.organization_id)
+        score.weighted_components = profile.weighted_components(score, int(score.weighted_rule_score))
+    return score
+
+
+def sort_by_weighted_score(scores: Iterable[Any], profile: WeightProfile) -> List[Any]:
+    """Scores du plus haut au plus bas final_score repondéré (même ordre que rankedReferrals)."""
+    return sorted(
+        (apply_weight_profile(score, profile) for score in scores),
+        key=lambda score: score.weighted_final_score,
+        reverse=True,
+    )
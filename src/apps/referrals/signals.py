@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.referrals.models import ReferralStatusEvent
+from apps.referrals.services.referrer_stats import record_status_event
+
+
+@receiver(post_save, sender=ReferralStatusEvent, dispatch_uid="referrer_stats_on_status_event")
+def update_referrer_stats(sender, instance, created, raw=False, **kwargs):
+    """Événements immuables : seule la création compte (pas les fixtures)."""
+    if created and not raw:
+        record_status_event(instance)
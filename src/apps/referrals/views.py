@@ -132,10 +132,10 @@ class ConsentConfirmView(View):
             reason_note="Consentement confirmé par le candidat via email.",
         )
 
-        # Trigger scoring now that the candidate is confirmed
+        # Score now that the candidate is confirmed (no-op if already scored at submission)
         try:
-            from apps.referrals.services import compute_candidate_score
-            compute_candidate_score(referral)
+            from apps.referrals.services.score_lifecycle import ensure_referral_score
+            ensure_referral_score(referral)
         except Exception as e:
             logger.error(f"Failed to score referral after consent confirmation: {e}")
 
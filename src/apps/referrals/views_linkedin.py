@@ -0,0 +1,40 @@
+"""
+Vue HTTP d'import progressif d'un profil LinkedIn (Server-Sent Events).
+
+Endpoint:
+    GET /api/linkedin/import/stream/?url=<URL du profil>
+
+Authentification JWT (Authorization: Bearer …) comme pour /graphql/ : côté
+navigateur, utiliser fetch() plutôt qu'EventSource, qui n'envoie pas d'en-têtes.
+
+Événements : validated (URL acceptée), profile (nom, titre et compétences
+LinkedIn, dès la fin du scrape), extraction (champs du formulaire, mêmes clés
+que parseLinkedinProfile) ou error. Voir services/linkedin_import.
+"""
+
+from django.http import JsonResponse
+from django.views import View
+
+from apps.referrals.services.linkedin_import import stream_linkedin_import
+from common.sse import KEEPALIVE, format_event, sse_response
+
+
+def _sse_events(linkedin_url: str, organization_id):
+    for kind, payload in stream_linkedin_import(linkedin_url, organization_id=organization_id):
+        if kind == "keepalive":
+            yield KEEPALIVE
+        else:
+            yield format_event(payload, event=kind)
+
+
+class LinkedInImportStreamView(View):
+    """
+    GET /api/linkedin/import/stream/?url=…
+    Profil LinkedIn et extraction IA en flux SSE, pour pré-remplir le formulaire.
+    """
+
+    def get(self, request):
+        if not request.user.is_authenticated:
+            return JsonResponse({"error": "Authentication required", "code": "UNAUTHENTICATED"}, status=401)
+
+        return sse_response(_sse_events(request.GET.get("url", ""), request.user.active_organization_id))
@@ -0,0 +1,104 @@
+"""
+Vue HTTP de scoring en streaming (Server-Sent Events), réservée aux recruteurs.
+
+Endpoint:
+    GET /api/referrals/<referral_id>/score/stream/[?useLlm=false]
+
+Authentification JWT (Authorization: Bearer …) comme pour /graphql/ : côté
+navigateur, utiliser fetch() plutôt qu'EventSource, qui n'envoie pas d'en-têtes.
+
+Événements : rules (breakdown règles, immédiat), summary (fragments de
+llmSummary), score (CandidateScore final, mêmes champs que GraphQL) ou error.
+"""
+
+import logging
+
+from django.http import JsonResponse
+from django.views import View
+
+from apps.referrals.models import Referral
+from apps.referrals.services.candidate_scoring import score_to_grade
+from apps.referrals.services.score_streaming import stream_referral_score
+from apps.referrals.services.weight_profiles import WeightProfile, apply_weight_profile, get_active_profile
+from common.errors import TropicalCornerError
+from common.permissions import require_recruiter_or_admin
+from common.sse import KEEPALIVE, format_event, sse_response
+from common.tenancy import get_tenant_context
+from gql.node import decode_global_id, encode_global_id
+
+logger = logging.getLogger(__name__)
+
+
+def _breakdown_payload(source, profile: WeightProfile) -> dict:
+    """Composantes règles et rule_score repondérés selon profile, comme en GraphQL."""
+    rule_score = profile.weighted_rule_score(source)
+    components = profile.weighted_components(source, rule_score)
+    return {
+        "expertiseMatch": components["expertise_match"],
+        "experienceMatch": components["experience_match"],
+        "interpersonalSkillsMatch": components["interpersonal_skills_match"],
+        "technicalSkillsMatch": components["technical_skills_match"],
+        "referralQuality": components["referral_quality"],
+        "ruleScore": rule_score,
+    }
+
+
+def _score_payload(score) -> dict:
+    profile = get_active_profile(score.organization_id)
+    apply_weight_profile(score, profile)
+    rule_score, final_score = int(score.weighted_rule_score), int(score.weighted_final_score)
+    return {
+        "id": encode_global_id("CandidateScore", score.id),
+        "finalScore": final_score,
+        "grade": score_to_grade(final_score),
+        "ruleScore": rule_score,
+        "llmScore": score.llm_score,
+        "breakdown": {**_breakdown_payload(score, profile), "llmScore": score.llm_score},
+        "llmStrengths": score.llm_strengths,
+        "llmGaps": score.llm_gaps,
+        "llmSummary": score.llm_summary,
+        "scoredAt": score.scored_at.isoformat(),
+        "llmModelUsed": score.llm_model_used,
+        "llmSkipped": score.llm_skipped,
+    }
+
+
+def _sse_events(referral: Referral, use_llm: bool):
+    for kind, payload in stream_referral_score(referral, use_llm=use_llm):
+        if kind == "keepalive":
+            yield KEEPALIVE
+        elif kind == "rules":
+            profile = get_active_profile(referral.organization_id)
+            yield format_event(_breakdown_payload(payload, profile), event="rules")
+        elif kind == "score":
+            yield format_event(_score_payload(payload), event="score")
+        else:
+            yield format_event(payload, event=kind)
+
+
+class ReferralScoreStreamView(View):
+    """
+    GET /api/referrals/<referral_id>/score/stream/
+    Score d'un referral en flux SSE ; le calcule et le persiste s'il n'existe pas.
+    """
+
+    def get(self, request, referral_id):
+        if not request.user.is_authenticated:
+            return JsonResponse({"error": "Authentication required", "code": "UNAUTHENTICATED"}, status=401)
+
+        try:
+            tenant_ctx = get_tenant_context(request.user)
+            require_recruiter_or_admin(tenant_ctx)
+            org = tenant_ctx.require_organization()
+            _, referral_db_id = decode_global_id(referral_id)
+        except TropicalCornerError as e:
+            return JsonResponse({"error": e.message, "code": e.code}, status=403)
+
+        referral = Referral.objects.select_related(
+            "candidate", "job_opening"
+        ).filter(id=referral_db_id, organization=org).first()
+        if referral is None:
+            return JsonResponse({"error": "Referral not found", "code": "REFERRAL_NOT_FOUND"}, status=404)
+
+        use_llm = request.GET.get("useLlm", "true").lower() not in ("false", "0", "no")
+        return sse_response(_sse_events(referral, use_llm))
@@ -0,0 +1,84 @@
+"""
+Tâches d'arrière-plan légères, exécutées dans le process web.
+
+Usage:
+    submit_after_commit(refresh_job_matches, job.id)
+
+La tâche est soumise au commit de la transaction courante (immédiatement hors
+transaction) : elle ne voit jamais de données non commitées, et n'est pas
+lancée en cas de rollback. Elle s'exécute dans un pool de BACKGROUND_WORKERS
+threads ; ses exceptions sont journalisées, jamais propagées.
+
+Une tâche courte qui ne doit pas attendre derrière les calculs longs du pool
+partagé (enrichissement, scoring) utilise son propre BackgroundPool (ex.
+l'envoi des emails, voir apps.notifications).
+
+Pas de file persistante : une tâche en cours est perdue si le process
+s'arrête. Ne l'utiliser que pour des calculs recalculables (commande de
+rattrapage à prévoir).
+
+BACKGROUND_TASKS_SYNC=true exécute les tâches dans le thread appelant
+(tests, scripts).
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from django.db import close_old_connections, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_WORKERS = int(os.environ.get("BACKGROUND_WORKERS", "2"))
+BACKGROUND_TASKS_SYNC = os.environ.get("BACKGROUND_TASKS_SYNC", "false").lower() in ("true", "1", "yes")
+
+def _run(func: Callable[..., Any], args, kwargs) -> Any:
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        logger.exception(f"Background task {func.__qualname__} failed")
+    finally:
+        # Worker threads keep their own connections: release them between tasks
+        connections.close_all()
+
+
+class BackgroundPool:
+    """Pool de threads nommé, créé au premier usage."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+            return self._executor
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> Optional[Future]:
+        """Exécute func(*args, **kwargs) dans le pool (ou tout de suite en mode synchrone)."""
+        if BACKGROUND_TASKS_SYNC:
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception(f"Background task {func.__qualname__} failed")
+            return None
+        return self._get_executor().submit(_run, func, args, kwargs)
+
+
+_default_pool = BackgroundPool("background", BACKGROUND_WORKERS)
+
+
+def submit(func: Callable[..., Any], *args, **kwargs) -> Optional[Future]:
+    """Exécute func(*args, **kwargs) dans le pool partagé (ou tout de suite en mode synchrone)."""
+    return _default_pool.submit(func, *args, **kwargs)
+
+
+def submit_after_commit(func: Callable[..., Any], *args, **kwargs) -> None:
+    """Comme submit, mais au commit de la transaction courante."""
+    transaction.on_commit(lambda: submit(func, *args, **kwargs))
@@ -0,0 +1,111 @@
+"""
+Verrous inter-process basés sur la base de données.
+
+advisory_lock() prend un verrou consultatif PostgreSQL de transaction
+(pg_advisory_xact_lock) : il est relâché au commit / rollback de la
+transaction englobante. À réserver aux sections courtes, sans appel réseau.
+
+Pour un appel externe (Coresignal, LLM), compute_once() prend un verrou de
+session sans attente (pg_try_advisory_lock), hors de toute transaction : les
+autres process relisent le résultat au lieu de bloquer en SQL.
+
+Hors PostgreSQL (SQLite en dev), les verrous sont des no-op : les
+contraintes d'unicité restent le dernier garde-fou.
+"""
+
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, TypeVar
+
+from django.db import connection, transaction
+
+T = TypeVar("T")
+
+# Intervalle de relecture des process qui attendent un calcul en cours
+LOCK_POLL_SECONDS = 0.2
+
+
+class LockTimeout(TimeoutError):
+    """Le calcul détenu par un autre process n'a pas abouti dans le délai."""
+
+
+def _int32(value: int) -> int:
+    """Ramène un entier dans l'intervalle int4 signé de PostgreSQL."""
+    value &= 0xFFFFFFFF
+    return value - 0x100000000 if value >= 0x80000000 else value
+
+
+def _lock_args(namespace: str, key: int):
+    return [_int32(zlib.crc32(namespace.encode("utf-8"))), _int32(key)]
+
+
+@contextmanager
+def advisory_lock(namespace: str, key: int):
+    """
+    Ouvre une transaction et y prend le verrou (namespace, key).
+    Bloque tant qu'une autre transaction détient le même verrou.
+    """
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", _lock_args(namespace, key))
+        yield
+
+
+@contextmanager
+def try_session_lock(namespace: str, key: int) -> Iterator[bool]:
+    """
+    Tente de prendre le verrou (namespace, key) au niveau de la session, sans
+    attendre ni ouvrir de transaction ; fournit True s'il est pris (relâché
+    en sortie), False s'il est détenu ailleurs.
+    """
+    if connection.vendor != "postgresql":
+        yield True
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s, %s)", _lock_args(namespace, key))
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s, %s)", _lock_args(namespace, key))
+
+
+def compute_once(
+    namespace: str,
+    key: int,
+    read: Callable[[], Optional[T]],
+    compute: Callable[[], T],
+    wait_timeout: float,
+) -> Optional[T]:
+    """
+    Entre process, un seul compute() à la fois pour (namespace, key), sans
+    transaction ouverte pendant le calcul.
+
+    Le process qui prend le verrou relit read() puis, à défaut, appelle
+    compute() (qui stocke son résultat là où read() le trouve). Les autres
+    relisent read() toutes les LOCK_POLL_SECONDS et retournent le résultat
+    du calcul en cours ; None si ce calcul a échoué (verrou libéré, rien à
+    relire). Lève LockTimeout au-delà de wait_timeout secondes d'attente.
+    """
+    deadline = time.monotonic() + wait_timeout
+    waited = False
+    while True:
+        with try_session_lock(namespace, key) as acquired:
+            if acquired:
+                result = read()
+                if result is not None or waited:
+                    return result
+                return compute()
+
+        waited = True
+        result = read()
+        if result is not None:
+            return result
+        if time.monotonic() >= deadline:
+            raise LockTimeout(f"{namespace}:{key} still locked after {wait_timeout:g}s")
+        time.sleep(LOCK_POLL_SECONDS)
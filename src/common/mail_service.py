@@ -3,25 +3,55 @@ Service d'envoi d'emails via Resend.
 Centralisé ici pour être réutilisé par toutes les apps
 (consentement candidat, inscription, notifications, etc.)
 
+Les emails passent par l'outbox (apps.notifications) : send_email,
+send_email_batch et les send_*_email les mettent en file ; le worker de
+l'outbox les envoie par appels batch Resend (deliver_email_batch).
+
 Tous les emails utilisent un template HTML de base commun
-(templates/email_base.html) ; seul le contenu central change.
+(templates/email_base.html) ; seul le contenu central change. Chaque email
+a une fonction render_*_email (paramètres de send_email, sans envoi) et une
+fonction send_*_email qui le met en file.
+
+Les templates sont compilés au premier usage puis gardés en mémoire
+(rechargés à chaud en DEBUG s'ils changent sur le disque).
 """
 
+import hashlib
 import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
 from html import escape
 from pathlib import Path
 from typing import Optional
 
 import resend
+import resend.exceptions
 from django.conf import settings
 
+from common.ratelimit import RateLimiter
+
 logger = logging.getLogger(__name__)
 
-# Chemin du template de base (à côté de ce fichier)
-_BASE_TEMPLATE_PATH = Path(__file__).resolve().parent / "templates" / "email_base.html"
+# Templates HTML (à côté de ce fichier)
 _TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+_BASE_TEMPLATE_NAME = "email_base.html"
 _DEFAULT_FOOTER = "© 2026 Korum · La cooptation simplifiée 🌴"
 
+# Resend: 100 emails max per batch call, 2 requests/s by default per team
+RESEND_BATCH_SIZE = 100
+RESEND_REQUESTS_PER_SECOND = float(os.environ.get("RESEND_REQUESTS_PER_SECOND", "2"))
+RESEND_RATE_LIMIT_RETRIES = int(os.environ.get("RESEND_RATE_LIMIT_RETRIES", "3"))
+RESEND_MAX_RETRY_AFTER = 30.0
+
+_resend_limiter = RateLimiter(RESEND_REQUESTS_PER_SECOND)
+
+_PLACEHOLDER_RE = re.compile(r"\{\{([A-Z0-9_]+)\}\}")
+_template_cache: dict[str, "_CompiledTemplate"] = {}
+_template_lock = threading.Lock()
+
 
 # ---------------------------------------------------------------------------
 # Helpers internes
@@ -29,7 +59,7 @@ _DEFAULT_FOOTER = "© 2026 Korum · La cooptation simplifiée 🌴"
 
 
 def _get_client():
-    """Initialise la clé API Resend."""
+    """Initialise la clé API et l'URL de l'API Resend."""
     api_key = getattr(settings, "RESEND_API_KEY", "")
     if not api_key:
         raise RuntimeError(
@@ -37,6 +67,51 @@ def _get_client():
             "Set it in your environment or Django settings."
         )
     resend.api_key = api_key
+    resend.api_url = getattr(settings, "RESEND_API_URL", resend.api_url)
+
+
+class _CompiledTemplate:
+    """
+    Template HTML découpé une fois pour toutes en segments littéraux et
+    placeholders {{KEY}} : le rendu est un seul join, sans relire le fichier
+    ni rebalayer le document pour chaque placeholder.
+    """
+
+    __slots__ = ("literals", "names", "mtime")
+
+    def __init__(self, source: str, mtime: float = 0.0):
+        parts = _PLACEHOLDER_RE.split(source)
+        # split() alternates literal, name, literal, ..., literal
+        self.literals = parts[0::2]
+        self.names = parts[1::2]
+        self.mtime = mtime
+
+    def render(self, context: dict[str, str]) -> str:
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            value = context.get(name)
+            # Unknown placeholders are left as is
+            out.append(f"{{{{{name}}}}}" if value is None else value)
+            out.append(literal)
+        return "".join(out)
+
+
+def _get_template(template_name: str) -> _CompiledTemplate:
+    """
+    Template compilé, chargé au premier usage. En DEBUG, il est recompilé
+    si le fichier a été modifié depuis (rechargement à chaud).
+    """
+    template = _template_cache.get(template_name)
+    if template is not None and not settings.DEBUG:
+        return template
+
+    path = _TEMPLATES_DIR / template_name
+    mtime = path.stat().st_mtime
+    if template is None or template.mtime != mtime:
+        template = _CompiledTemplate(path.read_text(encoding="utf-8"), mtime)
+        with _template_lock:
+            _template_cache[template_name] = template
+    return template
 
 
 def _render_email(content: str, footer: str | None = None) -> str:
@@ -44,19 +119,14 @@ def _render_email(content: str, footer: str | None = None) -> str:
     Injecte *content* (HTML) et un *footer* optionnel dans le template
     de base et renvoie le HTML complet prêt à l'envoi.
     """
-    template = _BASE_TEMPLATE_PATH.read_text(encoding="utf-8")
-    html = template.replace("{{CONTENT}}", content)
-    html = html.replace("{{FOOTER_TEXT}}", footer or _DEFAULT_FOOTER)
-    return html
+    return _get_template(_BASE_TEMPLATE_NAME).render(
+        {"CONTENT": content, "FOOTER_TEXT": footer or _DEFAULT_FOOTER}
+    )
 
 
 def _render_content_template(template_name: str, context: dict[str, str]) -> str:
     """Rend un template HTML de contenu en remplaçant des placeholders {{KEY}}."""
-    template_path = _TEMPLATES_DIR / template_name
-    html = template_path.read_text(encoding="utf-8")
-    for key, value in context.items():
-        html = html.replace(f"{{{{{key}}}}}", value)
-    return html
+    return _get_template(template_name).render(context)
 
 
 def _cta_button(href: str, label: str) -> str:
@@ -99,15 +169,38 @@ def _build_info_section(title: str, rows: list[tuple[str, str]]) -> str:
 # ---------------------------------------------------------------------------
 
 
+def _outbox_fields(
+    to: str | list[str],
+    subject: str,
+    html: str,
+    from_email: Optional[str] = None,
+    reply_to: Optional[str] = None,
+    kind: str = "",
+) -> dict:
+    return {
+        "to": [to] if isinstance(to, str) else to,
+        "subject": subject,
+        "html": html,
+        "from_email": from_email or getattr(settings, "RESEND_FROM_EMAIL", "noreply@korumklub.app"),
+        "reply_to": reply_to,
+        "kind": kind,
+    }
+
+
 def send_email(
     to: str | list[str],
     subject: str,
     html: str,
     from_email: Optional[str] = None,
     reply_to: Optional[str] = None,
+    kind: str = "",
 ) -> dict:
     """
-    Envoie un email via Resend.
+    Met un email en file d'envoi (outbox, voir apps.notifications).
+
+    L'email est écrit dans la transaction courante et envoyé via Resend après
+    son commit, en arrière-plan, avec nouveaux essais : l'appelant n'attend
+    pas Resend, et l'email n'est pas envoyé si la transaction est annulée.
 
     Args:
         to: adresse(s) destinataire(s)
@@ -115,41 +208,188 @@ def send_email(
         html: contenu HTML du mail
         from_email: expéditeur (défaut: RESEND_FROM_EMAIL dans settings)
         reply_to: adresse de réponse optionnelle
+        kind: type d'email (suivi et métriques)
 
     Returns:
-        dict avec l'id du mail envoyé
+        dict avec l'id de l'email dans l'outbox
+    """
+    from apps.notifications.services.email_outbox import enqueue_emails
 
-    Raises:
-        RuntimeError si la clé API n'est pas configurée
-        resend.exceptions.ResendError en cas d'erreur API
+    email, = enqueue_emails([_outbox_fields(to, subject, html, from_email, reply_to, kind)])
+    return {"outbox_id": email.id}
+
+
+def send_email_batch(messages: list[dict]) -> list[dict]:
     """
-    _get_client()
+    Met en file plusieurs emails (chacun avec les paramètres de send_email,
+    par exemple le résultat d'un render_*_email) en une seule écriture.
+
+    Le worker de l'outbox les envoie par appels batch Resend de
+    RESEND_BATCH_SIZE emails (voir deliver_email_batch).
 
-    if isinstance(to, str):
-        to = [to]
+    Returns:
+        un dict {"outbox_id": ...} par email, dans l'ordre
+    """
+    from apps.notifications.services.email_outbox import enqueue_emails
+
+    emails = enqueue_emails([_outbox_fields(**message) for message in messages])
+    return [{"outbox_id": email.id} for email in emails]
+
+
+# ---------------------------------------------------------------------------
+# Appels Resend (worker de l'outbox)
+# ---------------------------------------------------------------------------
 
+
+def _resend_params(
+    to: list[str],
+    subject: str,
+    html: str,
+    from_email: str,
+    reply_to: Optional[str] = None,
+) -> dict:
     params: dict = {
-        "from": from_email or getattr(settings, "RESEND_FROM_EMAIL", "noreply@korumklub.app"),
+        "from": from_email,
         "to": to,
         "subject": subject,
         "html": html,
     }
-
     if reply_to:
         params["reply_to"] = reply_to
+    return params
+
+
+def _retry_after(exc: Exception) -> float:
+    headers = {name.lower(): value for name, value in (getattr(exc, "headers", None) or {}).items()}
+    try:
+        delay = float(headers.get("retry-after", 1))
+    except ValueError:
+        delay = 1.0
+    return min(max(delay, 0.0), RESEND_MAX_RETRY_AFTER)
+
+
+def _call_resend(call):
+    """
+    Appel Resend au débit autorisé (RESEND_REQUESTS_PER_SECOND, partagé par
+    les threads du process). Sur un 429 de débit, attend retry-after puis
+    réessaie, au plus RESEND_RATE_LIMIT_RETRIES fois ; les quotas journaliers
+    ou mensuels épuisés ne sont pas réessayés ici.
+    """
+    for attempt in range(RESEND_RATE_LIMIT_RETRIES + 1):
+        _resend_limiter.acquire()
+        try:
+            return call()
+        except resend.exceptions.RateLimitError as exc:
+            if attempt == RESEND_RATE_LIMIT_RETRIES or exc.error_type != "rate_limit_exceeded":
+                raise
+            delay = _retry_after(exc)
+            logger.warning("Resend rate limit reached, retrying in %.2fs", delay)
+            time.sleep(delay)
+
+
+def deliver_email(
+    to: list[str],
+    subject: str,
+    html: str,
+    from_email: str,
+    reply_to: Optional[str] = None,
+) -> dict:
+    """
+    Envoie immédiatement un email via Resend.
+
+    Returns:
+        dict avec l'id du mail envoyé
+
+    Raises:
+        RuntimeError si la clé API n'est pas configurée
+        resend.exceptions.ResendError en cas d'erreur API
+    """
+    _get_client()
+    params = _resend_params(to, subject, html, from_email, reply_to)
 
     logger.info("Sending email to %s — subject: %s", to, subject)
-    result = resend.Emails.send(params)
+    result = _call_resend(lambda: resend.Emails.send(params))
     logger.info("Email sent successfully: %s", result)
     return result
 
 
+@dataclass
+class BatchDelivery:
+    """Résultat d'un email d'un envoi batch : id Resend, ou erreur."""
+
+    id: Optional[str] = None
+    error: Optional[Exception] = None
+
+
+def deliver_email_batch(messages: list[dict], keys: Optional[list[str]] = None) -> list[BatchDelivery]:
+    """
+    Envoie des emails (paramètres de deliver_email) par appels batch Resend
+    de RESEND_BATCH_SIZE emails au plus.
+
+    keys : identifiant stable de chaque email (id d'outbox). La clé
+    d'idempotence de chaque appel en dérive : un lot renvoyé après un
+    timeout, alors que Resend l'avait accepté, n'est pas envoyé deux fois.
+
+    Validation permissive : un email rejeté par Resend (adresse invalide…)
+    n'empêche pas l'envoi des autres ; son erreur est une ValidationError
+    (code 422, définitive). Un appel en échec (réseau, 5xx, quota) donne la
+    même erreur à tous les emails de son lot.
+
+    Returns:
+        un BatchDelivery par email, dans l'ordre de messages
+
+    Raises:
+        RuntimeError si la clé API n'est pas configurée
+    """
+    _get_client()
+    results: list[BatchDelivery] = []
+    for start in range(0, len(messages), RESEND_BATCH_SIZE):
+        chunk_keys = keys[start:start + RESEND_BATCH_SIZE] if keys is not None else None
+        results.extend(_deliver_chunk(messages[start:start + RESEND_BATCH_SIZE], chunk_keys))
+    return results
+
+
+def _batch_idempotency_key(keys: list[str]) -> str:
+    return "batch-" + hashlib.sha256("\n".join(keys).encode("utf-8")).hexdigest()
+
+
+def _deliver_chunk(chunk: list[dict], keys: Optional[list[str]] = None) -> list[BatchDelivery]:
+    params = [_resend_params(**message) for message in chunk]
+    options: dict = {"batch_validation": "permissive"}
+    if keys:
+        options["idempotency_key"] = _batch_idempotency_key(keys)
+    logger.info("Sending batch of %s emails", len(params))
+    try:
+        response = _call_resend(lambda: resend.Batch.send(params, options))
+    except Exception as exc:
+        logger.warning("Resend batch of %s emails failed: %s", len(params), exc)
+        return [BatchDelivery(error=exc) for _ in chunk]
+
+    rejected = {error["index"]: error.get("message", "") for error in response.get("errors") or []}
+    data = response.get("data") or []
+    if len(data) == len(chunk):
+        ids = [item.get("id") for item in data]
+    else:
+        # Permissive mode lists the ids of accepted emails only, in order
+        accepted = iter(item.get("id") for item in data)
+        ids = [None if index in rejected else next(accepted, None) for index in range(len(chunk))]
+
+    results = [
+        BatchDelivery(error=resend.exceptions.ValidationError(rejected[index], "validation_error", "422"))
+        if index in rejected
+        else BatchDelivery(id=ids[index])
+        for index in range(len(chunk))
+    ]
+    logger.info("Resend batch sent: %s accepted, %s rejected", len(chunk) - len(rejected), len(rejected))
+    return results
+
+
 # ---------------------------------------------------------------------------
 # Emails spécifiques de l'application
 # ---------------------------------------------------------------------------
 
 
-def send_candidate_consent_email(
+def render_candidate_consent_email(
     candidate_name: str,
     candidate_email: str,
     job_title: str,
@@ -165,8 +405,8 @@ def send_candidate_consent_email(
     job_description: str | None = None,
 ) -> dict:
     """
-    Envoie un email au candidat référé pour lui demander de confirmer
-    ou refuser sa candidature.
+    Email au candidat référé pour lui demander de confirmer ou refuser sa
+    candidature (paramètres de send_email).
 
     Le lien pointe vers la page frontend /confirm-consent/<token>.
     """
@@ -220,17 +460,23 @@ def send_candidate_consent_email(
         "vous a recommandé sur notre plateforme."
     )
 
-    return send_email(
-        to=candidate_email,
-        subject=subject,
-        html=_render_email(content, footer=footer),
-    )
+    return {
+        "to": candidate_email,
+        "subject": subject,
+        "html": _render_email(content, footer=footer),
+        "kind": "candidate_consent",
+    }
 
 
-def send_account_activation_email(display_name: str, email: str) -> dict:
+def send_candidate_consent_email(*args, **kwargs) -> dict:
+    """Met en file l'email de consentement (voir render_candidate_consent_email)."""
+    return send_email(**render_candidate_consent_email(*args, **kwargs))
+
+
+def render_account_activation_email(display_name: str, email: str) -> dict:
     """
-    Envoie un email à l'utilisateur pour l'informer que son compte a été activé
-    et qu'il peut maintenant se connecter.
+    Email informant l'utilisateur que son compte a été activé et qu'il peut
+    maintenant se connecter (paramètres de send_email).
     """
     frontend_url = getattr(settings, "FRONTEND_URL", "http://localhost:5173")
     login_url = f"{frontend_url}/login"
@@ -246,21 +492,27 @@ def send_account_activation_email(display_name: str, email: str) -> dict:
         },
     )
 
-    return send_email(
-        to=email,
-        subject=subject,
-        html=_render_email(content, footer="© 2026 Korum · Bienvenue dans la communauté 🌴"),
-    )
+    return {
+        "to": email,
+        "subject": subject,
+        "html": _render_email(content, footer="© 2026 Korum · Bienvenue dans la communauté 🌴"),
+        "kind": "account_activation",
+    }
+
 
+def send_account_activation_email(display_name: str, email: str) -> dict:
+    """Met en file l'email d'activation de compte."""
+    return send_email(**render_account_activation_email(display_name, email))
 
-def send_new_opportunity_email(
+
+def render_new_opportunity_email(
     contact_name: str,
     contact_email: str,
     job_title: str,
     job_sector: str,
     job_location: str,
 ) -> dict:
-    """Envoie un email pour informer un contact d'une nouvelle opportunite."""
+    """Email informant un contact d'une nouvelle opportunite (paramètres de send_email)."""
     frontend_url = getattr(settings, "FRONTEND_URL", "http://localhost:5173")
     login_url = f"{frontend_url}/login"
 
@@ -278,11 +530,17 @@ def send_new_opportunity_email(
         },
     )
 
-    return send_email(
-        to=contact_email,
-        subject=subject,
-        html=_render_email(
+    return {
+        "to": contact_email,
+        "subject": subject,
+        "html": _render_email(
             content,
             footer="© 2026 Korum · Merci de faire vivre un reseau d'exception.",
         ),
-    )
+        "kind": "new_opportunity",
+    }
+
+
+def send_new_opportunity_email(*args, **kwargs) -> dict:
+    """Met en file l'email de nouvelle opportunite (voir render_new_opportunity_email)."""
+    return send_email(**render_new_opportunity_email(*args, **kwargs))
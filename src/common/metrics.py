@@ -0,0 +1,115 @@
+"""
+Métriques applicatives en mémoire (par process).
+
+Compteurs et jauges étiquetés, exposés au format texte Prometheus par
+metrics_view. Chaque worker gunicorn a son propre registre : le scraper
+doit interroger chaque instance (ou agréger par label d'instance).
+
+Usage:
+    from common import metrics
+    metrics.increment("llm_calls_total", outcome="success")
+    metrics.set_gauge("llm_circuit_state", 2, breaker="openai")
+"""
+
+import hmac
+import threading
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Registre thread-safe de compteurs et jauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelSet, float]] = {}
+        self._gauges: Dict[str, Dict[LabelSet, float]] = {}
+
+    @staticmethod
+    def _labels(labels: Dict[str, object]) -> LabelSet:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        key = self._labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        key = self._labels(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def get(self, name: str, **labels) -> float:
+        """Valeur courante d'un compteur ou d'une jauge (0 si absente)."""
+        key = self._labels(labels)
+        with self._lock:
+            for store in (self._counters, self._gauges):
+                if name in store:
+                    return store[name].get(key, 0)
+        return 0
+
+    def series(self, name: str) -> Dict[LabelSet, float]:
+        """Toutes les séries d'un compteur ou d'une jauge, par jeu de labels."""
+        with self._lock:
+            for store in (self._counters, self._gauges):
+                if name in store:
+                    return dict(store[name])
+        return {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+    def render(self) -> str:
+        """Exposition au format texte Prometheus."""
+        lines = []
+        with self._lock:
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(store):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for labels, value in sorted(store[name].items()):
+                        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+registry = MetricsRegistry()
+
+increment = registry.increment
+set_gauge = registry.set_gauge
+
+
+def _is_authorized(request) -> bool:
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated and user.is_staff:
+        return True
+
+    # Dedicated header: "Authorization: Bearer" is consumed by the JWT middleware
+    token = getattr(settings, "METRICS_TOKEN", "")
+    provided = request.headers.get("X-Metrics-Token", "")
+    return bool(token and provided) and hmac.compare_digest(provided, token)
+
+
+def metrics_view(request):
+    """
+    GET /metrics/
+    Réservé au staff (session admin) ou à un scraper envoyant METRICS_TOKEN dans X-Metrics-Token.
+    """
+    if not _is_authorized(request):
+        return HttpResponse("Forbidden", status=403, content_type="text/plain")
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4")
@@ -0,0 +1,43 @@
+"""
+Limite de débit partagée entre threads (requêtes par seconde).
+
+Les acquisitions sont espacées régulièrement de 1/rate secondes, sans
+rafale : N threads qui appellent acquire() en même temps partent l'un
+après l'autre au rythme fixé.
+
+Usage:
+    limiter = RateLimiter(5)   # 5 appels / seconde au plus
+    limiter.acquire()
+    call_api()
+"""
+
+import threading
+import time
+from typing import Callable
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.interval = 1.0 / rate
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> float:
+        """Attend le prochain créneau libre ; retourne le temps attendu (secondes)."""
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            self._sleep(wait)
+        return wait
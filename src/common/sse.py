@@ -0,0 +1,39 @@
+"""
+Réponses Server-Sent Events (text/event-stream).
+
+Usage:
+    def events():
+        yield format_event({"step": 1}, event="progress")
+    return sse_response(events())
+
+Chaque flux occupe un worker pendant toute sa durée : le garder court.
+"""
+
+import json
+from typing import Any, Iterable, Optional
+
+from django.http import StreamingHttpResponse
+
+# Commentaire SSE envoyé pendant les attentes, pour que les proxys ne coupent pas la connexion
+KEEPALIVE = ": keep-alive\n\n"
+KEEPALIVE_INTERVAL = 15
+
+
+def format_event(data: Any, event: Optional[str] = None, event_id: Optional[str] = None) -> str:
+    """Sérialise un événement SSE (data en JSON)."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    # JSON has no raw newline: a single data line is enough
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def sse_response(events: Iterable[str]) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Disable response buffering in nginx-style reverse proxies
+    response["X-Accel-Buffering"] = "no"
+    return response
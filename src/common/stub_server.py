@@ -0,0 +1,170 @@
+"""
+Base commune des serveurs locaux qui simulent une API externe (LLM,
+Coresignal, Resend) pour les tests et les mesures.
+
+Chaque service ne garde que ses routes (route_get / route_post de son
+handler), ses réponses et sa configuration de pannes ; ce module fournit :
+- BaseStubConfig : latence, variation, taux d'erreurs, graine ;
+- BaseStubServer : serveur multi-thread, tirages aléatoires reproductibles,
+  compteurs de requêtes et de connexions ;
+- BaseStubHandler : HTTP/1.1 keep-alive comme les API réelles, JSON, /health ;
+- BaseStubCommand : options communes et boucle de service des commandes run_*_stub.
+"""
+
+import json
+import logging
+import random
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, ClassVar, Dict, Iterator, Optional, Tuple, Type
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+@dataclass
+class BaseStubConfig:
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+    # Rates drawn from the same number: their sum must not exceed 1
+    failure_rates: ClassVar[Tuple[str, ...]] = ("error_rate",)
+
+
+class BaseStubHandler(BaseHTTPRequestHandler):
+    server: "BaseStubServer"
+    # Keep-alive, like the real APIs; headers and body are separate writes
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    service_name = "Stub"
+
+    def send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_not_found(self):
+        self.send_json(404, {"error": "not found"})
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, {"status": "ok"})
+        else:
+            self.route_get()
+
+    def do_POST(self):
+        # Always read the body: an unread body would be parsed as the next request
+        self.route_post(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+
+    def route_get(self):
+        self.send_not_found()
+
+    def route_post(self, body: bytes):
+        self.send_not_found()
+
+    def log_message(self, format, *args):
+        logging.getLogger(type(self).__module__).debug(f"{self.service_name} stub: {format % args}")
+
+
+class BaseStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    handler_class: Type[BaseStubHandler] = BaseStubHandler
+
+    def __init__(self, address, config: BaseStubConfig):
+        super().__init__(address, self.handler_class)
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.requests_count = 0
+        self.connections_count = 0
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests_count += 1
+
+    def draw(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def latency(self) -> float:
+        with self._lock:
+            jitter = self._random.uniform(-self.config.jitter, self.config.jitter)
+        return max(0.0, self.config.latency + jitter)
+
+    def process_request_thread(self, request, client_address):
+        with self._lock:
+            self.connections_count += 1
+        super().process_request_thread(request, client_address)
+
+
+@contextmanager
+def serving(server: BaseStubServer) -> Iterator[str]:
+    """Sert en tâche de fond le temps du bloc ; fournit l'URL de base."""
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class BaseStubCommand(BaseCommand, ABC):
+    """
+    Commande run_*_stub : une option par champ de config_class (--host et
+    --port en plus), puis sert jusqu'à Ctrl-C. Avec une option --benchmark N
+    ajoutée par la sous-classe, appelle benchmark() à la place.
+    Une sous-classe doit fournir make_server().
+    """
+
+    service_name = "Stub"
+    default_port = 8765
+    config_class: Type[BaseStubConfig] = BaseStubConfig
+    error_rate_help = "Part de réponses en erreur (0-1)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=self.default_port)
+        parser.add_argument("--latency", type=float, default=0.0, help="Latence moyenne (secondes)")
+        parser.add_argument("--jitter", type=float, default=0.0, help="Variation de latence ± (secondes)")
+        parser.add_argument("--error-rate", type=float, default=0.0, help=self.error_rate_help)
+        parser.add_argument("--seed", type=int, help="Graine des tirages latence / erreurs")
+
+    @abstractmethod
+    def make_server(self, host: str, port: int, config: BaseStubConfig) -> BaseStubServer:
+        """Serveur du service, non démarré."""
+
+    def benchmark(self, count: int, config: BaseStubConfig, options: Dict[str, Any]) -> None:
+        raise CommandError(f"The {self.service_name} stub has no benchmark")
+
+    def build_config(self, options: Dict[str, Any]) -> BaseStubConfig:
+        rates = [options[name] for name in self.config_class.failure_rates]
+        if any(rate < 0 for rate in rates) or sum(rates) > 1:
+            names = " + ".join(f"--{name.replace('_', '-')}" for name in self.config_class.failure_rates)
+            raise CommandError(f"{names} must be between 0 and 1")
+        return self.config_class(**{field.name: options[field.name] for field in fields(self.config_class)})
+
+    def handle(self, *args, **options):
+        config = self.build_config(options)
+        if options.get("benchmark"):
+            self.benchmark(options["benchmark"], config, options)
+            return
+
+        server = self.make_server(options["host"], options["port"], config)
+        host, port = server.server_address[:2]
+        self.stdout.write(self.style.SUCCESS(f"{self.service_name} stub listening on http://{host}:{port}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -84,6 +84,14 @@ def require_auth(info: Any) -> User:
     return user
 
 
+def require_staff(info: Any) -> User:
+    """Require an authenticated staff user (cross-organization back-office)."""
+    user = require_auth(info)
+    if not user.is_authenticated or not user.is_staff:
+        raise TropicalCornerError("Staff access required", code="INSUFFICIENT_PERMISSIONS")
+    return user
+
+
 def require_tenant(info: Any) -> TenantContext:
     """Require authentication and an active organization."""
     require_auth(info)
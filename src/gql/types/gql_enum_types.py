@@ -248,6 +248,19 @@ class RelationshipTypeEnum(EnumType):
     )
 
 
+class EnrichmentStatusEnum(EnumType):
+    __schema__ = gql(
+        """
+        enum EnrichmentStatus {
+            PENDING
+            ENRICHED
+            FAILED
+            NO_PROFILE
+        }
+        """
+    )
+
+
 types = [
     ReferralStatusEnum,
     JobStatusEnum,
@@ -262,4 +275,5 @@ types = [
     ExperienceLevelEnum,
     ContractTypeEnum,
     RelationshipTypeEnum,
+    EnrichmentStatusEnum,
 ]
@@ -4,9 +4,17 @@ from ariadne_graphql_modules import ObjectType, gql, DeferredType, InputType, co
 
 from apps.jobs.models import JobOpening
 from apps.organizations.models import OrganizationMember, Organization
-from apps.referrals.models import Referral
+from apps.referrals.models import JobCandidateMatch, Referral
+from apps.referrals.services.talent_matching import (
+    TALENT_MATCH_TOP_K,
+    job_match_fingerprint,
+    refresh_job_matches,
+)
+from apps.referrals.services.weight_profiles import get_active_profile
+from common.background import submit_after_commit
 from common.errors import TropicalCornerError
-from gql.auth import require_auth
+from common.permissions import require_recruiter_or_admin
+from gql.auth import require_auth, require_tenant
 from gql.node import encode_global_id, decode_global_id, fetch_node
 
 
@@ -107,6 +115,8 @@ class JobOpeningType(ObjectType):
             rewardDisplay: String!
             referralCount: Int!
             referrals: [Referral!]!
+            "Candidats du vivier correspondant au poste (recruteurs)"
+            suggestedCandidates(first: Int = 10): [JobCandidateMatch!]!
             createdAt: String!
             updatedAt: String!
             
@@ -126,6 +136,7 @@ class JobOpeningType(ObjectType):
         DeferredType('Organization'),
         DeferredType('JobStatus'),
         DeferredType('Referral'),
+        DeferredType('JobCandidateMatch'),
         DeferredType('CompanyContext'),
         DeferredType('ShareholderStructure'),
         DeferredType('MandateContext'),
@@ -152,6 +163,19 @@ class JobOpeningType(ObjectType):
         """Return the referrals for this job opening."""
         return Referral.objects.filter(job_opening_id=job_opening.id)
 
+    @staticmethod
+    def resolve_suggested_candidates(job_opening, info, first=10):
+        """Return the best matching candidates of the organization pool (recruiters only)."""
+        tenant_ctx = require_tenant(info)
+        require_recruiter_or_admin(tenant_ctx)
+        org = tenant_ctx.require_organization()
+        if job_opening.organization_id != org.id:
+            return []
+        first = max(0, min(first, TALENT_MATCH_TOP_K))
+        return JobCandidateMatch.objects.filter(
+            job_opening_id=job_opening.id
+        ).select_related("candidate").order_by("rank")[:first]
+
     @staticmethod
     def resolve_location_display(job_opening, info):
         """Return formatted location string."""
@@ -505,6 +529,9 @@ class Mutation(ObjectType):
         )
         job.reward_display = format_points(job.reward_points)
         job.save(update_fields=["reward_display"])
+
+        # Suggest matching candidates from the organization pool
+        submit_after_commit(refresh_job_matches, job.id)
         return job
 
     @staticmethod
@@ -534,6 +561,10 @@ class Mutation(ObjectType):
         if membership is None:
             raise TropicalCornerError("You are not a member of this organization", code="NOT_MEMBER")
 
+        profile = get_active_profile(job.organization_id)
+        previous_fingerprint = job_match_fingerprint(job, profile)
+        previous_status = job.status
+
         # Update fields
         if "companyContext" in input:
             job.company_context = input["companyContext"]
@@ -612,6 +643,10 @@ class Mutation(ObjectType):
             job.status = input["status"]
 
         job.save()
+
+        # Matching criteria changed, or job (re)opened / closed: refresh suggestions
+        if job_match_fingerprint(job, profile) != previous_fingerprint or job.status != previous_status:
+            submit_after_commit(refresh_job_matches, job.id)
         return job
 
 
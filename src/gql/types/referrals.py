@@ -2,6 +2,7 @@ import re
 
 from ariadne_graphql_modules import ObjectType, gql, DeferredType, InputType, convert_case
 
+from django.db import transaction
 from django.utils import timezone
 
 
@@ -24,6 +25,8 @@ def format_points_display(amount: int) -> str:
 from apps.jobs.models import JobOpening
 from apps.referrals.models import Candidate, Referral, ReferralStatusEvent, RewardOutcome, CandidateConsentToken
 from apps.referrals.services import scrape_linkedin_profile
+from apps.referrals.services.candidate_enrichment import enrich_candidate
+from common.background import submit_after_commit
 from common.errors import TropicalCornerError
 from common.mail_service import send_candidate_consent_email
 from gql.auth import require_auth
@@ -66,6 +69,7 @@ class CandidateType(ObjectType):
             linkedinEducation: GenericScalar
             linkedinSkills: GenericScalar
             linkedinScrapedAt: String
+            enrichmentStatus: EnrichmentStatus!
             consentConfirmed: Boolean!
             createdAt: String!
         }
@@ -78,6 +82,7 @@ class CandidateType(ObjectType):
         DeferredType('Organization'),
         DeferredType('GenericScalar'),
         DeferredType('ExpertiseDomain'),
+        DeferredType('EnrichmentStatus'),
     ]
 
     @staticmethod
@@ -106,6 +111,7 @@ class ReferralType(ObjectType):
             status: ReferralStatus!
             statusHistory: [ReferralStatusEvent!]!
             score: CandidateScore
+            referrerTrackRecord: ReferrerTrackRecord!
             createdAt: String!
             updatedAt: String!
         }
@@ -115,6 +121,7 @@ class ReferralType(ObjectType):
 
     __requires__ = [
         DeferredType('Node'),
+        DeferredType('ReferrerTrackRecord'),
         DeferredType('User'),
         DeferredType('Organization'),
         DeferredType('JobOpening'),
@@ -144,6 +151,38 @@ class ReferralType(ObjectType):
         except CandidateScore.DoesNotExist:
             return None
 
+    @staticmethod
+    def resolve_referrer_track_record(referral, info):
+        """Historique du recommandeur dans l'organisation du referral."""
+        from apps.referrals.services.referrer_stats import get_track_record
+        return get_track_record(referral.organization_id, referral.referrer_id)
+
+
+class ReferrerTrackRecordType(ObjectType):
+    """ """
+
+    __schema__ = gql(
+        '''
+        """
+           Track record of a referrer in an organization (counters kept up to date on each status change).
+        """
+        type ReferrerTrackRecord {
+            referralsCount: Int!
+            acceptedCount: Int!
+            hiredCount: Int!
+            rejectedCount: Int!
+            acceptanceRate: Float
+            hireRate: Float
+            qualityAdjustment: Int!
+        }
+        '''
+    )
+    __aliases__ = convert_case
+
+    @staticmethod
+    def resolve_quality_adjustment(track_record, info):
+        return track_record.quality_adjustment()
+
 
 class ReferralStatusEventType(ObjectType):
     """ """
@@ -524,7 +563,7 @@ class Query(ObjectType):
         import logging as _logging
         _logger = _logging.getLogger(__name__)
 
-        require_auth(info)
+        user = require_auth(info)
 
         _empty = {
             "success": False,
@@ -559,7 +598,9 @@ class Query(ObjectType):
 
         try:
             from apps.referrals.services.linkedin_profile_parser import extract_candidate_from_linkedin_profile
-            extracted = extract_candidate_from_linkedin_profile(raw_profile)
+            extracted = extract_candidate_from_linkedin_profile(
+                raw_profile, organization_id=user.active_organization_id
+            )
         except Exception as exc:
             _logger.error(f"AI extraction failed: {exc}")
             return {**_empty, "error_message": "L'extraction automatique a échoué. Remplissez le formulaire manuellement."}
@@ -597,8 +638,9 @@ class Mutation(ObjectType):
     ]
     
     @staticmethod
+    @transaction.atomic
     def resolve_submit_referral(obj, info, input):
-        """Submit a candidate referral."""
+        """Submit a candidate referral (the consent email is queued in the same transaction)."""
         user = info.context.get("request").user
 
         _, job_db_id = decode_global_id(input["jobOpeningId"])
@@ -626,6 +668,7 @@ class Mutation(ObjectType):
             raise TropicalCornerError("At least one interpersonal skill is required", code="VALIDATION_ERROR")
 
         candidate_email = input.get("candidateEmail", "").strip() or None
+        linkedin_url = input.get("linkedinUrl", "").strip() or None
 
         # If candidate has an email → needs consent first (PENDING_CONSENT)
         # If no email → auto-confirm consent (legacy behaviour)
@@ -637,7 +680,7 @@ class Mutation(ObjectType):
             organization=job.organization,
             full_name=input["candidateFullName"].strip(),
             email=candidate_email,
-            linkedin_url=input.get("linkedinUrl", "").strip() or None,
+            linkedin_url=linkedin_url,
             years_experience=input["yearsExperience"],
             expertise_domain=input["expertiseDomain"],
             search_criteria=search_criteria,
@@ -645,24 +688,12 @@ class Mutation(ObjectType):
             interpersonal_skills=interpersonal_skills,
             consent_confirmed=not needs_consent and input["consentConfirmed"],
             consent_confirmed_at=timezone.now() if (not needs_consent and input["consentConfirmed"]) else None,
+            enrichment_status=(
+                Candidate.EnrichmentStatus.PENDING if linkedin_url else Candidate.EnrichmentStatus.NO_PROFILE
+            ),
+            enrichment_updated_at=timezone.now(),
         )
 
-        # Scrape LinkedIn profile si une URL est fournie
-        if candidate.linkedin_url:
-            try:
-                profile_data = scrape_linkedin_profile(candidate.linkedin_url)
-                candidate.linkedin_headline = profile_data.get("headline")
-                candidate.linkedin_summary = profile_data.get("summary")
-                candidate.linkedin_experience = profile_data.get("experience")
-                candidate.linkedin_education = profile_data.get("education")
-                candidate.linkedin_skills = profile_data.get("skills")
-                candidate.linkedin_scraped_at = timezone.now()
-                candidate.save()
-            except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f"Failed to scrape LinkedIn profile: {e}")
-
         referral = Referral.objects.create(
             organization=job.organization,
             job_opening=job,
@@ -684,19 +715,10 @@ class Mutation(ObjectType):
             changed_by=None,
         )
 
-        # Compute score immediately after referral creation
-        try:
-            from gql.types.scoring import create_score_for_referral
-            referral_with_relations = Referral.objects.select_related(
-                'candidate', 'job_opening'
-            ).get(id=referral.id)
-            create_score_for_referral(referral_with_relations, job.organization, use_llm=True)
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Failed to compute score for referral {referral.id}: {e}")
-
-        # Send consent email if candidate has an email
+        # LinkedIn enrichment then scoring, in the background (see candidate_enrichment)
+        submit_after_commit(enrich_candidate, candidate.id)
+
+        # Queue the consent email if candidate has an email (sent after commit, see apps.notifications)
         if needs_consent:
             consent_token = CandidateConsentToken.objects.create(referral=referral)
             contract_type_labels = []
@@ -711,26 +733,28 @@ class Mutation(ObjectType):
                 job_description_preview = f"{job_description_preview[:277].rstrip()}..."
 
             try:
-                job_reward_points = job.reward_points or parse_reward_points(job.reward_display)
-                send_candidate_consent_email(
-                    candidate_name=candidate.full_name,
-                    candidate_email=candidate.email,
-                    job_title=job.title,
-                    referrer_name=user.display_name or user.email,
-                    organization_name=job.organization.name,
-                    consent_token=str(consent_token.token),
-                    referrer_email=user.email,
-                    referrer_experience_years=user.years_of_experience,
-                    job_location=job.location_display,
-                    job_contract_types=contract_type_labels,
-                    job_experience_level=job.get_experience_level_display() if job.experience_level else None,
-                    job_reward=format_points_display(job_reward_points),
-                    job_description=job_description_preview,
-                )
+                # Savepoint: a failed render or enqueue must not roll back the referral
+                with transaction.atomic():
+                    job_reward_points = job.reward_points or parse_reward_points(job.reward_display)
+                    send_candidate_consent_email(
+                        candidate_name=candidate.full_name,
+                        candidate_email=candidate.email,
+                        job_title=job.title,
+                        referrer_name=user.display_name or user.email,
+                        organization_name=job.organization.name,
+                        consent_token=str(consent_token.token),
+                        referrer_email=user.email,
+                        referrer_experience_years=user.years_of_experience,
+                        job_location=job.location_display,
+                        job_contract_types=contract_type_labels,
+                        job_experience_level=job.get_experience_level_display() if job.experience_level else None,
+                        job_reward=format_points_display(job_reward_points),
+                        job_description=job_description_preview,
+                    )
             except Exception as e:
                 import logging
                 logger = logging.getLogger(__name__)
-                logger.error(f"Failed to send consent email: {e}")
+                logger.error(f"Failed to queue consent email: {e}")
 
         return referral
 
@@ -836,6 +860,7 @@ class Mutation(ObjectType):
 types = [
     CandidateType,
     ReferralType,
+    ReferrerTrackRecordType,
     LinkedInProfileDataType,
     ReferralStatusEventType,
     RewardOutcomeType,
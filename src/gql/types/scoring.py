@@ -2,67 +2,56 @@
 Types GraphQL pour le scoring des candidats.
 """
 
+from datetime import date, timedelta
+
 from ariadne_graphql_modules import ObjectType, gql, DeferredType, InputType, convert_case
+from django.db.models import F
+from django.utils import timezone
 
-from apps.referrals.models import CandidateScore, Referral
-from apps.referrals.services.candidate_scoring import (
-    compute_candidate_score,
-    score_referrals_for_job,
-    OPENAI_MODEL,
+from apps.referrals.models import CandidateScore, LLMUsageDaily, Referral, ScoringWeightProfile
+from apps.referrals.services.candidate_scoring import score_to_grade
+from apps.referrals.services.score_lifecycle import (
+    ScoreInProgress,
+    ensure_referral_score,
+    ensure_referral_scores,
+    refresh_referral_score,
+)
+from apps.referrals.services.weight_profiles import (
+    activate_weight_profile,
+    apply_weight_profile,
+    create_weight_profile,
+    get_active_profile,
+    sort_by_weighted_score,
+    weighted_score_annotations,
 )
 from common.errors import TropicalCornerError
-from gql.auth import require_auth, require_tenant
+from gql.auth import require_auth, require_staff, require_tenant
 from gql.node import encode_global_id, decode_global_id
 from common.permissions import require_recruiter_or_admin
 
 
-def create_score_for_referral(referral, org, use_llm: bool = True) -> "CandidateScore":
-    """
-    Calcule et persiste le score d'un referral.
-    Retourne le CandidateScore créé.
-    """
-    result = compute_candidate_score(referral, use_llm=True)
-
-    score = CandidateScore.objects.create(
-        organization=org,
-        referral=referral,
-        final_score=result.score,
-        rule_score=result.breakdown.rule_score,
-        llm_score=result.breakdown.llm_score,
-        grade=result.grade,
-        expertise_match=result.breakdown.expertise_match,
-        experience_match=result.breakdown.experience_match,
-        interpersonal_skills_match=result.breakdown.interpersonal_skills_match,
-        technical_skills_match=result.breakdown.technical_skills_match,
-        referral_quality=result.breakdown.referral_quality,
-        llm_strengths=result.breakdown.llm_strengths,
-        llm_gaps=result.breakdown.llm_gaps,
-        llm_summary=result.breakdown.llm_summary,
-        llm_model_used=OPENAI_MODEL if use_llm else "",
-    )
-    return score
-
-
 class ScoreBreakdownType(ObjectType):
     """Détail du breakdown du score."""
     
     __schema__ = gql(
         '''
         """
-        Breakdown détaillé du score d'un candidat.
+        Breakdown détaillé du score d'un candidat. Les composantes règles sont
+        repondérées selon le profil de pondération actif : chacune va de 0 à
+        son poids (valeurs par défaut indiquées) et leur somme est ruleScore.
         """
         type ScoreBreakdown {
-            "Score d'alignement expertise métier (0-30)"
+            "Score d'alignement expertise métier (0-30 par défaut)"
             expertiseMatch: Int!
-            "Score d'alignement niveau d'expérience (0-20)"
+            "Score d'alignement niveau d'expérience (0-20 par défaut)"
             experienceMatch: Int!
-            "Score compétences relationnelles (0-15)"
+            "Score compétences relationnelles (0-15 par défaut)"
             interpersonalSkillsMatch: Int!
-            "Score compétences techniques (0-15)"
+            "Score compétences techniques (0-15 par défaut)"
             technicalSkillsMatch: Int!
-            "Score qualité du referral (0-20)"
+            "Score qualité du referral (0-20 par défaut)"
             referralQuality: Int!
-            "Score total règles (0-100)"
+            "Score total règles (0-100), somme des composantes"
             ruleScore: Int!
             "Score analyse LLM (0-100)"
             llmScore: Int!
@@ -108,6 +97,8 @@ class CandidateScoreType(ObjectType):
             scoredAt: String!
             "Modèle LLM utilisé"
             llmModelUsed: String
+            "Analyse LLM non lancée : le score par règles suffisait à fixer le grade"
+            llmSkipped: Boolean!
         }
         '''
     )
@@ -123,15 +114,25 @@ class CandidateScoreType(ObjectType):
     def resolve_id(score, info):
         return encode_global_id("CandidateScore", score.id)
     
+    # Scores repondérés selon le profil actif (annotés en SQL par rankedReferrals)
+    @staticmethod
+    def resolve_final_score(score, info):
+        return int(apply_weight_profile(score).weighted_final_score)
+    
+    @staticmethod
+    def resolve_grade(score, info):
+        return score_to_grade(int(apply_weight_profile(score).weighted_final_score))
+    
+    @staticmethod
+    def resolve_rule_score(score, info):
+        return int(apply_weight_profile(score).weighted_rule_score)
+    
     @staticmethod
     def resolve_breakdown(score, info):
+        apply_weight_profile(score)
         return {
-            "expertise_match": score.expertise_match,
-            "experience_match": score.experience_match,
-            "interpersonal_skills_match": score.interpersonal_skills_match,
-            "technical_skills_match": score.technical_skills_match,
-            "referral_quality": score.referral_quality,
-            "rule_score": score.rule_score,
+            **score.weighted_components,
+            "rule_score": int(score.weighted_rule_score),
             "llm_score": score.llm_score,
         }
 
@@ -148,6 +149,8 @@ class RankedReferralType(ObjectType):
             referral: Referral!
             score: CandidateScore
             rank: Int!
+            "Version du profil de pondération appliqué (0 = pondération par défaut)"
+            weightProfileVersion: Int!
         }
         '''
     )
@@ -159,6 +162,108 @@ class RankedReferralType(ObjectType):
     ]
 
 
+class JobCandidateMatchType(ObjectType):
+    """Candidat du vivier suggéré pour un poste."""
+    
+    __schema__ = gql(
+        '''
+        """
+        Candidat du vivier de l'organisation suggéré pour un poste (rapprochement par règles).
+        """
+        type JobCandidateMatch {
+            candidate: Candidate!
+            rank: Int!
+            "Score de correspondance (0-100), hors qualité du referral"
+            matchScore: Int!
+            "Score d'alignement expertise métier (0-30)"
+            expertiseMatch: Int!
+            "Score d'alignement niveau d'expérience (0-20)"
+            experienceMatch: Int!
+            "Score compétences relationnelles (0-15)"
+            interpersonalSkillsMatch: Int!
+            "Score compétences techniques (0-15)"
+            technicalSkillsMatch: Int!
+            computedAt: String!
+        }
+        '''
+    )
+    __aliases__ = convert_case
+    
+    __requires__ = [
+        DeferredType('Candidate'),
+    ]
+
+
+class ScoringWeightProfileType(ObjectType):
+    """Profil de pondération du scoring d'une organisation."""
+    
+    __schema__ = gql(
+        '''
+        """
+        Pondération versionnée du scoring. Les poids des composantes règles
+        sont en points (total 100), les poids hybrides en fraction (total 1).
+        """
+        type ScoringWeightProfile implements Node {
+            id: ID!
+            version: Int!
+            name: String!
+            isActive: Boolean!
+            expertiseMatch: Int!
+            experienceMatch: Int!
+            interpersonalSkillsMatch: Int!
+            technicalSkillsMatch: Int!
+            referralQuality: Int!
+            ruleScoreWeight: Float!
+            llmScoreWeight: Float!
+            "Fourchettes d'années par niveau d'expérience, ex. {C_LEVEL: [18, 25]}"
+            experienceRanges: GenericScalar
+            createdAt: String!
+        }
+        '''
+    )
+    __aliases__ = convert_case
+    
+    __requires__ = [
+        DeferredType('Node'),
+        DeferredType('GenericScalar'),
+    ]
+    
+    @staticmethod
+    def resolve_id(profile, info):
+        return encode_global_id("ScoringWeightProfile", profile.id)
+    
+    @staticmethod
+    def resolve_created_at(profile, info):
+        return profile.created_at.isoformat()
+
+
+class CreateScoringWeightProfileInput(InputType):
+    """Input pour créer une version de profil de pondération."""
+    
+    __schema__ = gql(
+        """
+        input CreateScoringWeightProfileInput {
+            name: String
+            "Poids des composantes règles, en points (total: 100)"
+            expertiseMatch: Int!
+            experienceMatch: Int!
+            interpersonalSkillsMatch: Int!
+            technicalSkillsMatch: Int!
+            referralQuality: Int!
+            "Poids hybrides (total: 1)"
+            ruleScoreWeight: Float!
+            llmScoreWeight: Float!
+            "Fourchettes d'années par niveau, ex. {C_LEVEL: [18, 25]} (défaut: fourchettes standard)"
+            experienceRanges: GenericScalar
+            "Activer le profil dès sa création (défaut: false)"
+            activate: Boolean
+        }
+        """
+    )
+    
+    __requires__ = [DeferredType('GenericScalar')]
+
+
 class ScoreReferralInput(InputType):
     """Input pour scorer un referral."""
     
@@ -184,11 +289,63 @@ class ScoreJobReferralsInput(InputType):
             jobOpeningId: ID!
             "Utiliser l'analyse LLM (défaut: true)"
             useLlm: Boolean
+            "Pas d'appel LLM si le grade est stable pour un score LLM à ±gateMargin du score règles (défaut: 0-100)"
+            gateMargin: Int
+            "Analyser plusieurs candidats par appel LLM (scoreJobReferrals, défaut: false)"
+            comparative: Boolean
         }
         """
     )
 
 
+class LlmUsageDayType(ObjectType):
+    """Consommation LLM agrégée d'une journée."""
+    
+    __schema__ = gql(
+        '''
+        """
+        Consommation LLM d'une organisation pour un jour, une fonctionnalité et un modèle.
+        """
+        type LlmUsageDay {
+            "Organisation imputée (null : appel hors organisation)"
+            organization: Organization
+            day: String!
+            "Fonctionnalité appelante (scoring, linkedin_extraction)"
+            feature: String!
+            model: String!
+            calls: Int!
+            inputTokens: Int!
+            outputTokens: Int!
+            averageLatencyMs: Int!
+            "Coût estimé (USD), selon les prix connus du modèle"
+            costUsd: Float!
+        }
+        '''
+    )
+    __aliases__ = convert_case
+    
+    __requires__ = [
+        DeferredType('Organization'),
+    ]
+    
+    @staticmethod
+    def resolve_day(usage, info):
+        return usage.day.isoformat()
+    
+    @staticmethod
+    def resolve_average_latency_ms(usage, info):
+        return usage.latency_ms_total // usage.calls if usage.calls else 0
+
+
+def _parse_day(value, default: date) -> date:
+    if not value:
+        return default
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise TropicalCornerError(f"Invalid date: {value}", code="VALIDATION_ERROR")
+
+
 class ScoringQuery(ObjectType):
     """Queries pour le scoring."""
     
@@ -204,6 +361,16 @@ class ScoringQuery(ObjectType):
             Récupère tous les referrals d'un job classés par score.
             """
             rankedReferrals(jobOpeningId: ID!, status: ReferralStatus): [RankedReferral!]!
+            
+            """
+            Versions des profils de pondération de l'organisation (la plus récente d'abord).
+            """
+            scoringWeightProfiles: [ScoringWeightProfile!]!
+            
+            """
+            Consommation LLM par jour, organisation, fonctionnalité et modèle (staff). Dates AAAA-MM-JJ, 30 derniers jours par défaut.
+            """
+            llmUsage(organizationId: ID, since: String, until: String, feature: String): [LlmUsageDay!]!
         }
         '''
     )
@@ -212,6 +379,8 @@ class ScoringQuery(ObjectType):
     __requires__ = [
         CandidateScoreType,
         RankedReferralType,
+        ScoringWeightProfileType,
+        LlmUsageDayType,
         DeferredType('ReferralStatus'),
     ]
     
@@ -241,9 +410,8 @@ class ScoringQuery(ObjectType):
         if not referral:
             raise TropicalCornerError("Referral not found", code="REFERRAL_NOT_FOUND")
         
-        # Compute and save score
-        score = create_score_for_referral(referral, org, use_llm=True)
-        return score
+        # Compute and save score (shared with concurrent callers)
+        return ensure_referral_score(referral, use_llm=True)
     
     @staticmethod
     def resolve_ranked_referrals(obj, info, jobOpeningId, status=None):
@@ -254,52 +422,60 @@ class ScoringQuery(ObjectType):
         
         _, job_db_id = decode_global_id(jobOpeningId)
         
-        # Get referrals for this job
+        # Re-rank in SQL from the stored components and the active weight profile
+        profile = get_active_profile(org.id)
         referrals_qs = Referral.objects.select_related(
-            'candidate', 'job_opening'
+            'candidate', 'job_opening', 'score'
         ).filter(
             job_opening_id=job_db_id,
             organization=org
-        )
+        ).annotate(
+            **weighted_score_annotations(profile, prefix="score__")
+        ).order_by(F("weighted_final_score").desc(nulls_last=True), "id")
         
         if status:
             referrals_qs = referrals_qs.filter(status=status)
         
-        referrals = list(referrals_qs)
-        
-        if not referrals:
-            return []
-        
-        # Get existing scores
-        referral_ids = [r.id for r in referrals]
-        existing_scores = {
-            s.referral_id: s 
-            for s in CandidateScore.objects.filter(referral_id__in=referral_ids)
-        }
-        
-        # Build results with scores
-        results = []
-        for referral in referrals:
-            score = existing_scores.get(referral.id)
-            results.append({
-                "referral": referral,
-                "score": score,
-                "final_score": score.final_score if score else 0,
-            })
-        
-        # Sort by score descending
-        results.sort(key=lambda x: x["final_score"], reverse=True)
-        
-        # Add rank
         ranked_results = []
-        for idx, result in enumerate(results, start=1):
+        for idx, referral in enumerate(referrals_qs, start=1):
+            score = getattr(referral, "score", None)
+            if score is not None:
+                score.weighted_rule_score = referral.weighted_rule_score
+                score.weighted_final_score = referral.weighted_final_score
             ranked_results.append({
-                "referral": result["referral"],
-                "score": result["score"],
+                "referral": referral,
+                "score": score,
                 "rank": idx,
+                "weight_profile_version": profile.version,
             })
         
         return ranked_results
+    
+    @staticmethod
+    def resolve_scoring_weight_profiles(obj, info):
+        """Liste les versions de profils de pondération de l'organisation."""
+        tenant_ctx = require_tenant(info)
+        require_recruiter_or_admin(tenant_ctx)
+        org = tenant_ctx.require_organization()
+        
+        return list(ScoringWeightProfile.objects.filter(organization=org))
+    
+    @staticmethod
+    def resolve_llm_usage(obj, info, organizationId=None, since=None, until=None, feature=None):
+        """Agrégats journaliers de consommation LLM, toutes organisations (staff uniquement)."""
+        require_staff(info)
+        
+        today = timezone.now().date()
+        rows = LLMUsageDaily.objects.select_related("organization").filter(
+            day__gte=_parse_day(since, today - timedelta(days=30)),
+            day__lte=_parse_day(until, today),
+        )
+        if organizationId:
+            _, org_db_id = decode_global_id(organizationId)
+            rows = rows.filter(organization_id=org_db_id)
+        if feature:
+            rows = rows.filter(feature=feature)
+        return list(rows)
 
 
 class ScoringMutation(ObjectType):
@@ -319,9 +495,26 @@ class ScoringMutation(ObjectType):
             scoreJobReferrals(input: ScoreJobReferralsInput!): [CandidateScore!]!
             
             """
-            Recalcule le score d'un referral (force le recalcul même si déjà scoré).
+            Recalcule le score d'un referral. Seules les composantes (règles / LLM)
+            dont les entrées ont changé sont recalculées.
             """
             rescoreReferral(input: ScoreReferralInput!): CandidateScore!
+            
+            """
+            Rafraîchit les scores obsolètes d'un job (les referrals inchangés sont ignorés).
+            """
+            refreshStaleJobScores(input: ScoreJobReferralsInput!): [CandidateScore!]!
+            
+            """
+            Crée une nouvelle version du profil de pondération de l'organisation.
+            """
+            createScoringWeightProfile(input: CreateScoringWeightProfileInput!): ScoringWeightProfile!
+            
+            """
+            Active un profil de pondération (sans profileId : pondération par défaut).
+            rankedReferrals reflète immédiatement le changement, sans recalcul.
+            """
+            activateScoringWeightProfile(profileId: ID): ScoringWeightProfile
         }
         '''
     )
@@ -329,8 +522,10 @@ class ScoringMutation(ObjectType):
     
     __requires__ = [
         CandidateScoreType,
+        ScoringWeightProfileType,
         ScoreReferralInput,
         ScoreJobReferralsInput,
+        CreateScoringWeightProfileInput,
     ]
     
     @staticmethod
@@ -350,12 +545,7 @@ class ScoringMutation(ObjectType):
         if not referral:
             raise TropicalCornerError("Referral not found", code="REFERRAL_NOT_FOUND")
         
-        # Check if already scored
-        existing_score = CandidateScore.objects.filter(referral=referral).first()
-        if existing_score:
-            return existing_score
-        
-        return create_score_for_referral(referral, org, use_llm=use_llm)
+        return ensure_referral_score(referral, use_llm=use_llm)
     
     @staticmethod
     def resolve_score_job_referrals(obj, info, input):
@@ -371,23 +561,19 @@ class ScoringMutation(ObjectType):
             'candidate', 'job_opening'
         ).filter(job_opening_id=job_db_id, organization=org)
         
-        scores = []
-        for referral in referrals:
-            # Check if already scored
-            existing_score = CandidateScore.objects.filter(referral=referral).first()
-            if existing_score:
-                scores.append(existing_score)
-                continue
-            
-            score = create_score_for_referral(referral, org, use_llm=use_llm)
-            scores.append(score)
+        scores = ensure_referral_scores(
+            referrals,
+            use_llm=use_llm,
+            gate_margin=input.get("gateMargin"),
+            comparative=input.get("comparative") or False,
+        )
         
-        # Return sorted by score
-        return sorted(scores, key=lambda s: s.final_score, reverse=True)
+        # Return sorted by score, as rankedReferrals
+        return sort_by_weighted_score(scores, get_active_profile(org.id))
     
     @staticmethod
     def resolve_rescore_referral(obj, info, input):
-        """Recalcule le score d'un referral (force le recalcul)."""
+        """Recalcule le score d'un referral (seules les parties modifiées)."""
         tenant_ctx = require_tenant(info)
         require_recruiter_or_admin(tenant_ctx)
         org = tenant_ctx.require_organization()
@@ -402,18 +588,88 @@ class ScoringMutation(ObjectType):
         if not referral:
             raise TropicalCornerError("Referral not found", code="REFERRAL_NOT_FOUND")
         
-        # Delete existing score if any
-        CandidateScore.objects.filter(referral=referral).delete()
-        
-        return create_score_for_referral(referral, org, use_llm=use_llm)
+        return refresh_referral_score(referral, use_llm=use_llm)
+
+    @staticmethod
+    def resolve_refresh_stale_job_scores(obj, info, input):
+        """Rafraîchit uniquement les scores dont les entrées ont changé."""
+        tenant_ctx = require_tenant(info)
+        require_recruiter_or_admin(tenant_ctx)
+        org = tenant_ctx.require_organization()
+
+        _, job_db_id = decode_global_id(input["jobOpeningId"])
+        use_llm = input.get("useLlm", True)
+
+        referrals = Referral.objects.select_related(
+            'candidate', 'job_opening'
+        ).filter(job_opening_id=job_db_id, organization=org)
+
+        gate_margin = input.get("gateMargin")
+
+        scores = []
+        for referral in referrals:
+            try:
+                scores.append(refresh_referral_score(
+                    referral, use_llm=use_llm, only_if_stale=True, gate_margin=gate_margin
+                ))
+            except ScoreInProgress:
+                # First score being computed by another process
+                continue
+
+        return sort_by_weighted_score(scores, get_active_profile(org.id))
+
+    @staticmethod
+    def resolve_create_scoring_weight_profile(obj, info, input):
+        """Crée une version de profil de pondération."""
+        tenant_ctx = require_tenant(info)
+        require_recruiter_or_admin(tenant_ctx)
+        org = tenant_ctx.require_organization()
+
+        weights = {
+            "expertise_match": input["expertiseMatch"],
+            "experience_match": input["experienceMatch"],
+            "interpersonal_skills_match": input["interpersonalSkillsMatch"],
+            "technical_skills_match": input["technicalSkillsMatch"],
+            "referral_quality": input["referralQuality"],
+            "rule_score_weight": input["ruleScoreWeight"],
+            "llm_score_weight": input["llmScoreWeight"],
+        }
+
+        return create_weight_profile(
+            org,
+            weights,
+            experience_ranges=input.get("experienceRanges"),
+            name=input.get("name") or "",
+            created_by=tenant_ctx.membership,
+            activate=input.get("activate") or False,
+        )
+
+    @staticmethod
+    def resolve_activate_scoring_weight_profile(obj, info, profileId=None):
+        """Active un profil de pondération, ou revient à la pondération par défaut."""
+        tenant_ctx = require_tenant(info)
+        require_recruiter_or_admin(tenant_ctx)
+        org = tenant_ctx.require_organization()
+
+        profile = None
+        if profileId:
+            _, profile_db_id = decode_global_id(profileId)
+            profile = ScoringWeightProfile.objects.filter(id=profile_db_id, organization=org).first()
+            if not profile:
+                raise TropicalCornerError("Weight profile not found", code="WEIGHT_PROFILE_NOT_FOUND")
 
+        return activate_weight_profile(org, profile)
 
 types = [
     ScoreBreakdownType,
     CandidateScoreType,
     RankedReferralType,
+    JobCandidateMatchType,
+    LlmUsageDayType,
+    ScoringWeightProfileType,
     ScoreReferralInput,
     ScoreJobReferralsInput,
+    CreateScoringWeightProfileInput,
     ScoringQuery,
     ScoringMutation,
 ]
@@ -0,0 +1,70 @@
+"""
+Test d'intégration : client Coresignal contre le serveur local déterministe
+(services/coresignal_stub), sans clé ni réseau.
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from apps.referrals.services import linkedin_scraper
+from apps.referrals.services.coresignal_stub import CoresignalStubConfig, make_coresignal_stub_server
+from common.stub_server import serving
+
+PROFILE_URL = "https://www.linkedin.com/in/jane-doe"
+
+
+@pytest.fixture
+def coresignal_stub(monkeypatch, settings):
+    """Démarre le stub sur un port libre et y branche le client ; retourne le serveur."""
+    server = make_coresignal_stub_server(port=0, config=CoresignalStubConfig(seed=1))
+    with serving(server) as url:
+        settings.CORESIGNAL_BASE_URL = url
+        settings.CORESIGNAL_API_KEY = "stub"
+        # Fresh sessions, without backoff sleeps
+        monkeypatch.setattr(linkedin_scraper, "_local", threading.local())
+        monkeypatch.setattr(linkedin_scraper, "CORESIGNAL_BACKOFF", 0)
+        yield server
+
+
+def test_profiles_are_deterministic_and_reuse_one_connection(coresignal_stub, capsys):
+    first = linkedin_scraper._scrape_with_coresignal(PROFILE_URL)
+    for _ in range(4):
+        assert linkedin_scraper._scrape_with_coresignal(PROFILE_URL)["name"] == first["name"]
+
+    assert first["headline"] and first["experience"] and first["skills"]
+    assert coresignal_stub.connections_count == 1
+    assert capsys.readouterr().out == ""
+
+
+def test_server_errors_are_retried_then_give_an_empty_profile(coresignal_stub):
+    coresignal_stub.config.error_rate = 1.0
+
+    profile = linkedin_scraper._scrape_with_coresignal(PROFILE_URL)
+
+    assert profile["headline"] is None
+    assert coresignal_stub.requests_count == 1 + linkedin_scraper.CORESIGNAL_MAX_RETRIES
+
+
+def test_connection_resets_are_retried(coresignal_stub):
+    coresignal_stub.config.reset_rate = 1.0
+
+    assert linkedin_scraper._scrape_with_coresignal(PROFILE_URL)["headline"] is None
+    assert coresignal_stub.requests_count == 1 + linkedin_scraper.CORESIGNAL_MAX_RETRIES
+
+    coresignal_stub.config.reset_rate = 0.0
+    assert linkedin_scraper._scrape_with_coresignal(PROFILE_URL)["headline"]
+
+
+@pytest.mark.parametrize("payload", [["not", "a", "profile"], {"experience": ["Directeur financier"]}])
+def test_unexpected_payload_gives_an_empty_profile(monkeypatch, settings, payload):
+    response = SimpleNamespace(status_code=200, json=lambda: payload)
+    monkeypatch.setattr(linkedin_scraper, "_coresignal_session", lambda: SimpleNamespace(get=lambda *a, **kw: response))
+    settings.CORESIGNAL_API_KEY = "stub"
+
+    profile = linkedin_scraper._scrape_with_coresignal(PROFILE_URL)
+    empty = linkedin_scraper._get_empty_profile()
+
+    assert profile.keys() == empty.keys()
+    assert (profile["headline"], profile["experience"], profile["skills"]) == (None, [], [])
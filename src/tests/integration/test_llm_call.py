@@ -1,17 +1,24 @@
 """
-Test d'intégration réel : appel à l'API OpenAI via call_openai_api.
+Test d'intégration : appel LLM via call_openai_api.
 
 Lance avec :
     docker compose exec backend pytest tests/integration/test_llm_call.py -v
 
-Ignoré automatiquement si OPENAI_API_KEY n'est pas configuré.
+Les tests « stub » passent par HTTP contre le serveur local déterministe
+(services/llm_stub) et tournent toujours. Les tests réels sont ignorés si
+OPENAI_API_KEY n'est pas configuré.
 """
 
 import os
+
 import pytest
 
-# call_openai_api n'a aucune dépendance Django — import direct possible
+from apps.referrals.services import candidate_scoring, llm_providers
 from apps.referrals.services.candidate_scoring import call_openai_api
+from apps.referrals.services.llm_providers import HTTPStubProvider, OpenAIProvider
+from apps.referrals.services.llm_resilience import AdaptiveConcurrencyLimiter, CircuitBreaker
+from apps.referrals.services.llm_stub import StubConfig, make_stub_server
+from common.stub_server import serving
 
 
 # ---------------------------------------------------------------------------
@@ -43,6 +50,57 @@ Réponds UNIQUEMENT avec un JSON valide (sans markdown, sans ```):
 """
 
 
+# ---------------------------------------------------------------------------
+# Serveur stub local
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def llm_stub(monkeypatch):
+    """Démarre le stub sur un port libre et y branche call_openai_api ; retourne sa config."""
+    config = StubConfig(seed=1)
+    with serving(make_stub_server(port=0, config=config)) as url:
+        monkeypatch.setattr(llm_providers, "_provider", HTTPStubProvider(url, timeout=5))
+        monkeypatch.setattr(candidate_scoring, "openai_breaker", CircuitBreaker("stub", failure_threshold=2))
+        monkeypatch.setattr(candidate_scoring, "openai_limiter", AdaptiveConcurrencyLimiter("stub", initial_limit=4))
+        yield config
+
+
+def test_stub_returns_deterministic_valid_structure(llm_stub):
+    result = call_openai_api(MINIMAL_PROMPT)
+
+    assert result == call_openai_api(MINIMAL_PROMPT)
+    assert 0 <= result["score"] <= 100
+    assert isinstance(result["strengths"], list)
+    assert isinstance(result["gaps"], list)
+    assert isinstance(result["summary"], str)
+
+
+def test_stub_answers_comparative_prompts(llm_stub):
+    prompt = f"{MINIMAL_PROMPT}\n# DOSSIER D1\n## CANDIDAT\nA\n# DOSSIER D2\n## CANDIDAT\nB\n"
+
+    result = call_openai_api(prompt)
+
+    assert [entry["id"] for entry in result] == ["D1", "D2"]
+
+
+def test_stub_rate_limit_honours_retry_after(llm_stub):
+    llm_stub.rate_limit_rate = 1.0
+    llm_stub.retry_after = 2
+
+    assert candidate_scoring._call_llm(MINIMAL_PROMPT, "stub", "default") == (None, "rate_limited")
+    # No new call until Retry-After has elapsed
+    assert candidate_scoring._call_llm(MINIMAL_PROMPT, "stub", "default") == (None, "throttled")
+
+
+def test_stub_server_errors_open_the_circuit(llm_stub):
+    llm_stub.error_rate = 1.0
+
+    assert candidate_scoring._call_llm(MINIMAL_PROMPT, "stub", "default") == (None, "unavailable")
+    assert candidate_scoring._call_llm(MINIMAL_PROMPT, "stub", "default") == (None, "unavailable")
+    assert candidate_scoring.openai_breaker.state == CircuitBreaker.OPEN
+    assert candidate_scoring._call_llm(MINIMAL_PROMPT, "stub", "default") == (None, "circuit_open")
+
+
 # ---------------------------------------------------------------------------
 # Tests réels (skippés sans clé API)
 # ---------------------------------------------------------------------------
@@ -96,8 +154,6 @@ def test_call_openai_api_lists_are_lists():
 
 def test_call_openai_api_returns_none_without_key(monkeypatch):
     """Sans clé API, call_openai_api retourne None sans lever d'exception."""
-    monkeypatch.setattr(
-        "apps.referrals.services.candidate_scoring.OPENAI_API_KEY", ""
-    )
+    monkeypatch.setattr(llm_providers, "_provider", OpenAIProvider(api_key=""))
     result = call_openai_api(MINIMAL_PROMPT)
     assert result is None
@@ -0,0 +1,73 @@
+"""
+Test d'intégration : envoi par lots Resend contre le serveur local
+(notifications/services/resend_stub), sans clé ni réseau.
+"""
+
+import pytest
+
+from apps.notifications.services.resend_stub import ResendStubConfig, make_resend_stub_server
+from common import mail_service
+from common.ratelimit import RateLimiter
+from common.stub_server import serving
+
+
+def _message(i, domain="example.com"):
+    return {
+        "to": [f"user{i}@{domain}"],
+        "subject": "Votre compte a été activé",
+        "html": f"<p>Bonjour {i}</p>",
+        "from_email": "Korum <noreply@example.com>",
+    }
+
+
+@pytest.fixture
+def resend_stub(monkeypatch, settings):
+    """Démarre le stub sur un port libre et y branche le client ; retourne le serveur."""
+    server = make_resend_stub_server(port=0, config=ResendStubConfig(seed=1))
+    with serving(server) as url:
+        settings.RESEND_API_URL = url
+        settings.RESEND_API_KEY = "stub"
+        monkeypatch.setattr(mail_service, "_resend_limiter", RateLimiter(1000))
+        yield server
+
+
+def test_batch_sends_one_call_per_hundred_emails(resend_stub):
+    deliveries = mail_service.deliver_email_batch([_message(i) for i in range(250)])
+
+    assert resend_stub.requests_count == 3
+    assert all(delivery.error is None and delivery.id for delivery in deliveries)
+    assert [email["to"] for email in resend_stub.sent] == [[f"user{i}@example.com"] for i in range(250)]
+
+
+def test_invalid_recipient_fails_alone(resend_stub):
+    messages = [_message(0), _message(1, domain="invalid.test"), _message(2)]
+
+    deliveries = mail_service.deliver_email_batch(messages)
+
+    assert deliveries[0].id and deliveries[2].id
+    assert deliveries[1].id is None
+    assert str(deliveries[1].error.code) == "422"
+    assert len(resend_stub.sent) == 2
+
+
+def test_batch_resent_with_the_same_keys_is_not_sent_twice(resend_stub):
+    messages = [_message(i) for i in range(3)]
+    keys = [f"outbox-{i}" for i in range(3)]
+
+    first = mail_service.deliver_email_batch(messages, keys=keys)
+    # Retried after a timeout: Resend had already accepted the batch
+    second = mail_service.deliver_email_batch(messages, keys=keys)
+
+    assert [d.id for d in second] == [d.id for d in first]
+    assert len(resend_stub.sent) == 3
+
+
+def test_rate_limited_call_is_retried(resend_stub):
+    resend_stub.config.rate_limit = 1
+
+    first = mail_service.deliver_email_batch([_message(0)])
+    second = mail_service.deliver_email_batch([_message(1)])
+
+    assert first[0].error is None and second[0].error is None
+    assert resend_stub.rate_limited_count >= 1
+    assert len(resend_stub.sent) == 2
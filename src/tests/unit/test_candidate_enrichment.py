@@ -0,0 +1,88 @@
+"""
+Tests unitaires du pipeline d'enrichissement des candidats (sans base de données).
+"""
+
+import pytest
+
+from apps.referrals.models import Candidate
+from apps.referrals.services import candidate_enrichment
+from apps.referrals.services.candidate_enrichment import EnrichmentError, normalize_profile, run_enrichment
+
+PROFILE = {
+    "name": "Jane Doe",
+    "headline": "CFO " * 200,
+    "summary": "Finance",
+    "experience": [{"title": "CFO", "company": "Acme"}, "not a dict"],
+    "education": None,
+    "skills": ["IFRS", 3],
+}
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Remplace les écritures et le scoring ; retourne les mises à jour et les scorings."""
+    updates, scored = [], []
+    monkeypatch.setattr(candidate_enrichment, "_update", lambda candidate, **fields: updates.append(fields))
+    monkeypatch.setattr(candidate_enrichment, "_score_referrals", lambda candidate: scored.append(candidate.id))
+    return updates, scored
+
+
+def test_normalize_profile_keeps_well_typed_fields():
+    fields = normalize_profile(PROFILE)
+
+    assert len(fields["linkedin_headline"]) == 500
+    assert fields["linkedin_experience"] == [{"title": "CFO", "company": "Acme"}]
+    assert fields["linkedin_education"] == []
+    assert fields["linkedin_skills"] == ["IFRS"]
+
+
+def test_normalize_profile_rejects_empty_profile():
+    with pytest.raises(EnrichmentError):
+        normalize_profile({"headline": None, "summary": None, "experience": [], "skills": []})
+
+
+def test_enriched_candidate_is_persisted_then_scored(pipeline, monkeypatch):
+    updates, scored = pipeline
+    monkeypatch.setattr(candidate_enrichment, "scrape_linkedin_profile", lambda url: PROFILE)
+
+    status = run_enrichment(Candidate(id=1, linkedin_url="https://www.linkedin.com/in/jane-doe"))
+
+    assert status == Candidate.EnrichmentStatus.ENRICHED
+    assert updates[-1]["enrichment_status"] == Candidate.EnrichmentStatus.ENRICHED
+    assert updates[-1]["linkedin_skills"] == ["IFRS"]
+    assert scored == [1]
+
+
+def test_failed_scrape_is_recorded_and_candidate_still_scored(pipeline, monkeypatch):
+    updates, scored = pipeline
+
+    def scrape(url):
+        raise ConnectionError("Coresignal down")
+
+    monkeypatch.setattr(candidate_enrichment, "scrape_linkedin_profile", scrape)
+
+    status = run_enrichment(Candidate(id=2, linkedin_url="https://www.linkedin.com/in/jane-doe"))
+
+    assert status == Candidate.EnrichmentStatus.FAILED
+    assert updates[-1]["enrichment_error"] == "Coresignal down"
+    assert scored == [2]
+
+
+def test_attempt_start_resets_the_pending_timeout(pipeline, monkeypatch):
+    updates, _ = pipeline
+    monkeypatch.setattr(candidate_enrichment, "scrape_linkedin_profile", lambda url: PROFILE)
+
+    run_enrichment(Candidate(id=4, linkedin_url="https://www.linkedin.com/in/jane-doe"), score=False)
+
+    assert updates[0]["enrichment_updated_at"] is not None
+    assert "enrichment_status" not in updates[0]
+
+
+def test_candidate_without_linkedin_url_skips_scraping(pipeline, monkeypatch):
+    updates, scored = pipeline
+    monkeypatch.setattr(candidate_enrichment, "scrape_linkedin_profile", pytest.fail)
+
+    status = run_enrichment(Candidate(id=3, linkedin_url=None), score=False)
+
+    assert status == Candidate.EnrichmentStatus.NO_PROFILE
+    assert scored == []
@@ -0,0 +1,267 @@
+"""
+Tests unitaires du service de scoring (sans base de données ni appel LLM).
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from apps.jobs.models import JobOpening
+from apps.referrals.models import Candidate, Referral
+from apps.referrals.services import candidate_scoring
+from apps.referrals.services.candidate_scoring import (
+    PROMPT_SECTION_BUDGETS,
+    build_job_prompt_prefix,
+    build_llm_prompt,
+    compute_candidate_score,
+    compute_rule_fingerprint,
+    gated_score,
+    is_grade_decided,
+    is_score_stale,
+)
+from apps.referrals.services.prompt_budget import estimate_tokens, truncate_to_tokens
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def make_referral(**job_overrides) -> Referral:
+    """Construit un referral non persisté avec son candidat et son job."""
+    job = JobOpening(
+        title="Directeur Financier",
+        description="Pilotage de la fonction finance du groupe.",
+        expertise_domain="FINANCE",
+        experience_level="C_LEVEL",
+        interpersonal_skills=["EMOTIONAL_INTELLIGENCE"],
+        key_challenges=["COMPLIANCE"],
+        **job_overrides,
+    )
+    candidate = Candidate(
+        full_name="Jean Dupont",
+        years_experience=20,
+        expertise_domain="FINANCE",
+        technical_skills=["SAP", "Consolidation"],
+        interpersonal_skills=["EMOTIONAL_INTELLIGENCE"],
+    )
+    return Referral(
+        job_opening=job,
+        candidate=candidate,
+        relationship_context="Ancien collègue chez ACME.",
+        relationship_type="COMPANY",
+        profile_motivation="Jean a dirigé notre équipe finance pendant 5 ans avec excellence.",
+        supporting_materials=[],
+    )
+
+
+def stored_score(referral: Referral) -> SimpleNamespace:
+    """Simule un CandidateScore persisté à partir d'un calcul complet."""
+    breakdown = compute_candidate_score(referral, use_llm=True).breakdown
+    return SimpleNamespace(
+        llm_model_used=breakdown.llm_model,
+        **{
+            field: getattr(breakdown, field)
+            for field in (
+                "expertise_match", "experience_match", "interpersonal_skills_match",
+                "technical_skills_match", "referral_quality", "rule_score",
+                "llm_score", "llm_strengths", "llm_gaps", "llm_summary",
+                "rule_fingerprint", "llm_fingerprint", "llm_skipped",
+            )
+        },
+    )
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Remplace l'appel OpenAI par une réponse fixe et compte les appels (sans escalade)."""
+    calls = []
+
+    def fake_call(prompt, model, tier, on_delta=None, organization_id=None):
+        calls.append(prompt)
+        return {"score": 90, "strengths": ["Finance"], "gaps": [], "summary": "Solide."}, "success"
+
+    monkeypatch.setattr(candidate_scoring, "_call_llm", fake_call)
+    monkeypatch.setattr(candidate_scoring, "LLM_ESCALATION_MARGIN", 0)
+    return calls
+
+
+# ---------------------------------------------------------------------------
+# Fingerprints et rescoring incrémental
+# ---------------------------------------------------------------------------
+
+def test_rule_fingerprint_ignores_non_scoring_fields():
+    referral = make_referral()
+    before = compute_rule_fingerprint(referral.candidate, referral.job_opening, referral)
+
+    referral.job_opening.salary_other = "Voiture de fonction"
+    assert compute_rule_fingerprint(referral.candidate, referral.job_opening, referral) == before
+
+    referral.candidate.years_experience = 3
+    assert compute_rule_fingerprint(referral.candidate, referral.job_opening, referral) != before
+
+
+def test_rescore_reuses_llm_part_when_prompt_unchanged(llm_calls):
+    referral = make_referral()
+    previous = stored_score(referral)
+    assert len(llm_calls) == 1
+
+    referral.job_opening.salary_other = "Bonus annuel"
+    assert not is_score_stale(previous, referral)
+
+    result = compute_candidate_score(referral, previous=previous)
+    assert len(llm_calls) == 1
+    assert result.breakdown.llm_score == 90
+
+
+def test_rescore_calls_llm_when_prompt_changes(llm_calls):
+    referral = make_referral()
+    previous = stored_score(referral)
+
+    referral.job_opening.description = "Nouvelle description du poste."
+    assert is_score_stale(previous, referral)
+
+    compute_candidate_score(referral, previous=previous)
+    assert len(llm_calls) == 2
+
+
+# ---------------------------------------------------------------------------
+# Prompt : préfixe stable et budgets de tokens
+# ---------------------------------------------------------------------------
+
+def test_prompt_starts_with_job_prefix_shared_by_candidates():
+    first = make_referral()
+    second = make_referral()
+    second.job_opening = first.job_opening
+    second.candidate.full_name = "Marie Curie"
+    second.relationship_context = "Alumni de l'EPFL."
+
+    prefix = build_job_prompt_prefix(first.job_opening)
+    prompts = [build_llm_prompt(r.candidate, r.job_opening, r) for r in (first, second)]
+
+    assert all(prompt.startswith(prefix) for prompt in prompts)
+    assert prompts[0] != prompts[1]
+    assert "Jean Dupont" not in prefix
+
+
+def test_prompt_sections_are_truncated_to_budget():
+    referral = make_referral()
+    referral.job_opening.description = "finance " * 5000
+    prefix = build_job_prompt_prefix(referral.job_opening)
+
+    assert estimate_tokens(prefix) < PROMPT_SECTION_BUDGETS["job_description"] + 400
+    assert truncate_to_tokens("court texte", 50) == "court texte"
+
+
+def test_score_records_prompt_tokens(llm_calls):
+    result = compute_candidate_score(make_referral())
+    fields = result.to_model_fields()
+
+    assert 0 < fields["llm_prompt_prefix_tokens"] < fields["llm_prompt_tokens"]
+
+
+# ---------------------------------------------------------------------------
+# Gating par le score règles
+# ---------------------------------------------------------------------------
+
+def test_strict_gate_depends_on_weights(monkeypatch):
+    # 50/50: the LLM half always spans at least one grade boundary
+    assert not any(is_grade_decided(rule) for rule in range(101))
+
+    monkeypatch.setitem(candidate_scoring.WEIGHTS, "rule_score_weight", 0.9)
+    monkeypatch.setitem(candidate_scoring.WEIGHTS, "llm_score_weight", 0.1)
+    assert is_grade_decided(100)
+    assert is_grade_decided(10)
+    assert not is_grade_decided(62)
+
+
+def test_gate_margin_skips_llm_for_clear_cut_referral(llm_calls):
+    referral = make_referral()
+    referral.candidate.expertise_domain = "TECH"
+    referral.candidate.years_experience = 2
+
+    result = compute_candidate_score(referral, gate_margin=10)
+
+    assert result.breakdown.rule_score < 40
+    assert llm_calls == []
+    assert result.breakdown.llm_skipped
+    assert result.breakdown.llm_fingerprint == ""
+    assert result.grade == "D"
+
+
+def test_gated_score_matches_live_gating_without_llm(llm_calls):
+    referral = make_referral()
+    referral.candidate.expertise_domain = "TECH"
+    referral.candidate.years_experience = 2
+    live = compute_candidate_score(referral, gate_margin=10)
+
+    offline = gated_score(referral, candidate_scoring._rule_breakdown(referral, None))
+
+    assert llm_calls == []
+    assert offline.to_model_fields() == live.to_model_fields()
+
+
+def test_gated_score_is_not_stale(llm_calls):
+    referral = make_referral()
+    referral.candidate.expertise_domain = "TECH"
+    referral.candidate.years_experience = 2
+    previous = SimpleNamespace(**compute_candidate_score(referral, gate_margin=10).to_model_fields())
+
+    assert previous.llm_skipped and previous.llm_fingerprint == ""
+    assert not is_score_stale(previous, referral, gate_margin=10)
+    # Strict gating can no longer rule the LLM out: the score needs an analysis
+    assert is_score_stale(previous, referral)
+    assert llm_calls == []
+
+
+# ---------------------------------------------------------------------------
+# Routage par paliers
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def tiered_llm(monkeypatch):
+    """Réponses par modèle : {model: (résultat, outcome)}, et journal des modèles appelés."""
+    answers = {}
+    called = []
+
+    def fake_call(prompt, model, tier, on_delta=None, organization_id=None):
+        called.append(model)
+        return answers[model]
+
+    monkeypatch.setattr(candidate_scoring, "_call_llm", fake_call)
+    monkeypatch.setattr(candidate_scoring, "OPENAI_MODEL_FAST", "fast-model")
+    monkeypatch.setattr(candidate_scoring, "OPENAI_MODEL_STRONG", "strong-model")
+    monkeypatch.setattr(candidate_scoring, "LLM_ESCALATION_MARGIN", 5)
+    return answers, called
+
+
+def test_clear_score_stays_on_fast_model(tiered_llm):
+    answers, called = tiered_llm
+    answers["fast-model"] = ({"score": 20, "strengths": [], "gaps": [], "summary": ""}, "success")
+
+    result, model = candidate_scoring.route_llm_call("prompt", rule_score=20)
+
+    assert called == ["fast-model"]
+    assert (result["score"], model) == (20, "fast-model")
+
+
+def test_borderline_score_escalates_to_strong_model(tiered_llm):
+    answers, called = tiered_llm
+    answers["fast-model"] = ({"score": 82, "strengths": [], "gaps": [], "summary": ""}, "success")
+    answers["strong-model"] = ({"score": 70, "strengths": [], "gaps": [], "summary": ""}, "success")
+
+    # (78 + 82) / 2 = 80: right on the A/B boundary
+    result, model = candidate_scoring.route_llm_call("prompt", rule_score=78)
+
+    assert called == ["fast-model", "strong-model"]
+    assert (result["score"], model) == (70, "strong-model")
+
+
+def test_invalid_answer_escalates_and_records_model(tiered_llm):
+    answers, called = tiered_llm
+    answers["fast-model"] = (None, "invalid_json")
+    answers["strong-model"] = ({"score": 35, "strengths": [], "gaps": [], "summary": "Ok"}, "success")
+
+    result = compute_candidate_score(make_referral())
+
+    assert called == ["fast-model", "strong-model"]
+    assert result.to_model_fields()["llm_model_used"] == "strong-model"
@@ -0,0 +1,75 @@
+"""
+Tests unitaires du scoring comparatif (plusieurs candidats par appel LLM).
+"""
+
+import pytest
+
+from apps.referrals.services import candidate_scoring, comparative_scoring
+from apps.referrals.services.comparative_scoring import (
+    build_comparative_prompt,
+    parse_comparative_response,
+    score_referrals_comparatively,
+)
+from tests.unit.test_candidate_scoring import make_referral
+
+
+def make_job_referrals(count):
+    referrals = [make_referral() for _ in range(count)]
+    job = referrals[0].job_opening
+    job.id = 1
+    for i, referral in enumerate(referrals):
+        referral.id = i + 1
+        referral.job_opening = job
+        referral.candidate.full_name = f"Candidat {i + 1}"
+    return referrals
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Réponse comparative configurable ; les prompts individuels renvoient 55."""
+    state = {"comparative": None, "calls": []}
+
+    def fake_call(prompt, model, tier, on_delta=None, organization_id=None):
+        state["calls"].append(tier)
+        if tier == "comparative":
+            return state["comparative"], "success"
+        return {"score": 55, "strengths": [], "gaps": [], "summary": "Individuel"}, "success"
+
+    monkeypatch.setattr(comparative_scoring, "_call_llm", fake_call)
+    monkeypatch.setattr(candidate_scoring, "_call_llm", fake_call)
+    monkeypatch.setattr(candidate_scoring, "LLM_ESCALATION_MARGIN", 0)
+    return state
+
+
+def test_comparative_prompt_has_single_job_section():
+    prompt = build_comparative_prompt(make_job_referrals(3))
+
+    assert prompt.count("## POSTE") == 1
+    assert prompt.count("## CANDIDAT") == 3
+    assert "# DOSSIER D3" in prompt
+
+
+def test_parse_ignores_invalid_duplicate_and_unknown_entries():
+    entries = parse_comparative_response([
+        {"id": "D1", "score": 70},
+        {"id": "D1", "score": 10},
+        {"id": "D2", "score": "n/a"},
+        {"id": "D9", "score": 50},
+    ], count=3)
+
+    assert list(entries) == [0]
+    assert entries[0]["score"] == 70
+
+
+def test_invalid_entries_fall_back_to_single_prompts(fake_llm):
+    fake_llm["comparative"] = [
+        {"id": "D1", "score": 81, "strengths": ["Finance"], "gaps": [], "summary": "A"},
+        {"id": "D2", "score": 150},
+        {"id": "D3", "score": 40, "strengths": [], "gaps": [], "summary": "C"},
+    ]
+
+    results = score_referrals_comparatively(make_job_referrals(3), group_size=8)
+
+    assert fake_llm["calls"] == ["comparative", "fast"]
+    assert [results[i].breakdown.llm_score for i in (1, 2, 3)] == [81, 55, 40]
+    assert all(results[i].breakdown.llm_fingerprint for i in (1, 2, 3))
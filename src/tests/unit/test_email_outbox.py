@@ -0,0 +1,105 @@
+"""
+Tests unitaires de l'outbox des emails (nouveaux essais, abandon, mise en file).
+"""
+
+import threading
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from resend.exceptions import RateLimitError, ValidationError
+
+from apps.notifications.models import EmailOutbox
+from apps.notifications.services import email_outbox
+from apps.notifications.services.email_outbox import EMAIL_OUTBOX_MAX_ATTEMPTS, deliver_batch
+from common import background, mail_service
+from common.mail_service import BatchDelivery
+
+
+@pytest.fixture
+def finished(monkeypatch):
+    """Remplace les écritures de statut ; retourne les champs enregistrés."""
+    rows = []
+    monkeypatch.setattr(email_outbox, "_finish", lambda email, **fields: rows.append(fields))
+    return rows
+
+
+def make_email(attempts=1):
+    return EmailOutbox(id=1, kind="account_activation", to=["jane@example.com"], subject="Hi", html="<p>Hi</p>",
+                       from_email="noreply@example.com", attempts=attempts)
+
+
+def deliver_with(*deliveries):
+    """Faux deliver_email_batch : un BatchDelivery (ou une erreur) par email."""
+    def deliver_email_batch(messages, keys=None):
+        assert len(messages) == len(deliveries)
+        return [d if isinstance(d, BatchDelivery) else BatchDelivery(error=d) for d in deliveries]
+    return deliver_email_batch
+
+
+def deliver(email):
+    return deliver_batch([email])[0]
+
+
+def test_partial_batch_failure_is_recorded_per_email(finished, monkeypatch):
+    monkeypatch.setattr(mail_service, "deliver_email_batch", deliver_with(
+        BatchDelivery(id="re_1"),
+        ValidationError("bad address", "validation_error", "422"),
+        BatchDelivery(id="re_3"),
+    ))
+
+    assert deliver_batch([make_email(), make_email(), make_email()]) == ["sent", "dead", "sent"]
+    assert [row["status"] for row in finished] == ["SENT", "DEAD", "SENT"]
+    assert finished[2]["provider_id"] == "re_3"
+
+
+def test_transient_error_is_retried_with_backoff(finished, monkeypatch):
+    monkeypatch.setattr(
+        mail_service, "deliver_email_batch", deliver_with(RateLimitError("slow down", "rate_limit_exceeded", "429"))
+    )
+
+    before = timezone.now()
+    assert deliver(make_email(attempts=3)) == "retry"
+
+    fields = finished[0]
+    assert fields["status"] == EmailOutbox.Status.PENDING
+    # 30 s * 2^2, with jitter in [50 %, 100 %]
+    assert before + timedelta(seconds=59) <= fields["next_attempt_at"] <= timezone.now() + timedelta(seconds=120)
+    assert "slow down" in fields["last_error"]
+
+
+def test_last_attempt_is_dead(finished, monkeypatch):
+    monkeypatch.setattr(mail_service, "deliver_email_batch", deliver_with(ConnectionError("Resend down")))
+
+    assert deliver(make_email(attempts=EMAIL_OUTBOX_MAX_ATTEMPTS)) == "dead"
+
+
+def test_send_email_only_enqueues(monkeypatch):
+    queued = []
+
+    def enqueue_emails(messages):
+        queued.extend(messages)
+        return [EmailOutbox(id=7, **message) for message in messages]
+
+    monkeypatch.setattr(email_outbox, "enqueue_emails", enqueue_emails)
+    monkeypatch.setattr(mail_service, "deliver_email_batch", pytest.fail)
+
+    result = mail_service.send_account_activation_email(display_name="Jane", email="jane@example.com")
+
+    assert result == {"outbox_id": 7}
+    assert queued[0]["to"] == ["jane@example.com"]
+    assert queued[0]["kind"] == "account_activation"
+
+
+def test_drain_does_not_wait_for_the_shared_background_pool(monkeypatch):
+    release, drained = threading.Event(), threading.Event()
+    monkeypatch.setattr(background, "BACKGROUND_TASKS_SYNC", False)
+    monkeypatch.setattr(email_outbox, "_drain_requested", False)
+    monkeypatch.setattr(email_outbox, "send_pending_emails", drained.set)
+    for _ in range(background.BACKGROUND_WORKERS):
+        background.submit(release.wait, 5)
+    try:
+        email_outbox._request_drain()
+        assert drained.wait(2)
+    finally:
+        release.set()
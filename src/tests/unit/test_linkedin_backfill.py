@@ -0,0 +1,72 @@
+"""
+Tests unitaires du backfill LinkedIn en masse (débit, déduplication des URLs).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from apps.referrals.models import Candidate
+from apps.referrals.services import candidate_enrichment
+from apps.referrals.services.candidate_enrichment import backfill_profiles
+from common.ratelimit import RateLimiter
+
+PROFILE = {"headline": "CFO", "summary": None, "experience": [], "education": [], "skills": ["IFRS"]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_rate_limiter_spaces_calls():
+    clock = FakeClock()
+    limiter = RateLimiter(4, clock=clock, sleep=clock.sleep)
+
+    waits = [limiter.acquire() for _ in range(5)]
+
+    assert waits == [0, 0.25, 0.25, 0.25, 0.25]
+    clock.now += 10
+    assert limiter.acquire() == 0
+
+
+@pytest.fixture
+def written(monkeypatch):
+    rows = []
+    monkeypatch.setattr(Candidate.objects, "bulk_update", lambda objs, fields: rows.extend(objs))
+    return rows
+
+
+def test_backfill_fetches_each_profile_once(monkeypatch, written):
+    fetched = []
+
+    def fetch(url, limiter):
+        fetched.append(url)
+        if "broken" in url:
+            return "error", TimeoutError("read timeout")
+        return "fetched", PROFILE
+
+    monkeypatch.setattr(candidate_enrichment, "_fetch_profile", fetch)
+    candidates = [
+        Candidate(id=1, linkedin_url="https://www.linkedin.com/in/jane-doe"),
+        Candidate(id=2, linkedin_url="https://fr.linkedin.com/in/Jane-Doe/"),
+        Candidate(id=3, linkedin_url="https://www.linkedin.com/in/broken"),
+        Candidate(id=4, linkedin_url="https://example.com/jane"),
+    ]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        stats = backfill_profiles(candidates, executor)
+
+    assert sorted(fetched) == ["https://www.linkedin.com/in/broken", "https://www.linkedin.com/in/jane-doe"]
+    assert (stats.candidates, stats.urls, stats.fetched, stats.enriched, stats.failed) == (4, 2, 1, 2, 1)
+    statuses = [c.enrichment_status for c in written]
+    assert statuses == ["ENRICHED", "ENRICHED", "FAILED", "NO_PROFILE"]
+    assert candidates[0].linkedin_skills == candidates[1].linkedin_skills == ["IFRS"]
+    assert candidates[2].enrichment_error == "read timeout"
+    assert all(c.enrichment_attempts == 1 for c in candidates)
@@ -0,0 +1,48 @@
+"""
+Tests unitaires de l'import LinkedIn progressif (ordre et contenu des événements).
+"""
+
+import pytest
+
+from apps.referrals.services import linkedin_import
+from apps.referrals.services.linkedin_import import stream_linkedin_import
+
+URL = "https://www.linkedin.com/in/jane-doe"
+PROFILE = {"name": "Jane Doe", "headline": "CFO", "summary": None, "experience": [], "skills": ["IFRS", None]}
+
+
+def test_profile_is_streamed_before_extraction(monkeypatch):
+    monkeypatch.setattr(linkedin_import, "scrape_linkedin_profile", lambda url: PROFILE)
+    monkeypatch.setattr(
+        linkedin_import,
+        "extract_candidate_from_linkedin_profile",
+        lambda profile, organization_id: {"fullName": "Jane Doe", "expertiseDomain": "FINANCE"},
+    )
+
+    events = list(stream_linkedin_import(f" {URL} ", organization_id=3))
+
+    assert [kind for kind, _ in events] == ["validated", "profile", "extraction"]
+    assert events[0][1] == {"linkedinUrl": URL}
+    assert events[1][1] == {"fullName": "Jane Doe", "headline": "CFO", "skills": ["IFRS"]}
+    assert events[2][1]["expertiseDomain"] == "FINANCE"
+
+
+def test_invalid_url_is_rejected_without_scraping(monkeypatch):
+    monkeypatch.setattr(linkedin_import, "scrape_linkedin_profile", pytest.fail)
+
+    events = list(stream_linkedin_import("https://example.com/jane"))
+
+    assert events == [("error", {"message": "Cette URL n'est pas un profil LinkedIn.", "code": "INVALID_LINKEDIN_URL"})]
+
+
+def test_failed_extraction_keeps_profile_event(monkeypatch):
+    def extract(profile, organization_id):
+        raise RuntimeError("LLM down")
+
+    monkeypatch.setattr(linkedin_import, "scrape_linkedin_profile", lambda url: PROFILE)
+    monkeypatch.setattr(linkedin_import, "extract_candidate_from_linkedin_profile", extract)
+
+    events = list(stream_linkedin_import(URL))
+
+    assert [kind for kind, _ in events] == ["validated", "profile", "error"]
+    assert events[-1][1]["code"] == "EXTRACTION_FAILED"
@@ -0,0 +1,202 @@
+"""
+Tests unitaires du cache des profils LinkedIn et des extractions (clé
+canonique, lecture via le cache, un seul appel pour des demandes concurrentes).
+"""
+
+import threading
+import time
+from contextlib import nullcontext
+
+import pytest
+
+from apps.referrals.services import candidate_scoring, linkedin_profile_parser, linkedin_scraper
+from apps.referrals.services.linkedin_profile_cache import canonicalize_linkedin_url
+from apps.referrals.services.linkedin_profile_parser import extract_candidate_from_linkedin_profile
+from common import locks, metrics
+
+PROFILE = {"headline": "CFO", "summary": None, "experience": [], "education": [], "skills": ["IFRS"]}
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.linkedin.com/in/jane-doe",
+    "http://fr.linkedin.com/in/Jane-Doe/",
+    "https://linkedin.com/in/jane-doe?trk=public_profile#about",
+    "linkedin.com/in/JANE-DOE",
+])
+def test_equivalent_urls_share_a_key(url):
+    assert canonicalize_linkedin_url(url) == "linkedin.com/in/jane-doe"
+
+
+@pytest.mark.parametrize("url", ["", "https://example.com/in/jane-doe", "https://notlinkedin.com/in/x", "https://linkedin.com/"])
+def test_non_profile_urls_have_no_key(url):
+    assert canonicalize_linkedin_url(url) is None
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    store = {}
+    calls = []
+
+    def scrape(url):
+        calls.append(url)
+        time.sleep(0.05)
+        return dict(PROFILE)
+
+    monkeypatch.setattr(linkedin_scraper, "get_cached_profile", lambda url: store.get(canonicalize_linkedin_url(url)))
+    monkeypatch.setattr(
+        linkedin_scraper, "store_profile", lambda url, profile: store.setdefault(canonicalize_linkedin_url(url), profile)
+    )
+    monkeypatch.setattr(linkedin_scraper, "_scrape_with_coresignal", scrape)
+    monkeypatch.setattr(locks, "try_session_lock", lambda namespace, key: nullcontext(True))
+    return calls
+
+
+@pytest.fixture
+def locked_elsewhere(monkeypatch):
+    """Verrou de session détenu par un autre process pour les N premières tentatives."""
+    attempts = []
+
+    def set_held_for(count):
+        def try_session_lock(namespace, key):
+            attempts.append(key)
+            return nullcontext(len(attempts) > count)
+
+        monkeypatch.setattr(locks, "try_session_lock", try_session_lock)
+        monkeypatch.setattr(locks, "LOCK_POLL_SECONDS", 0)
+
+    return set_held_for
+
+
+def run_concurrently(fn, count=8):
+    barrier = threading.Barrier(count)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(fn())
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_profile_is_scraped_once_for_equivalent_urls(cache):
+    first = linkedin_scraper.scrape_linkedin_profile("https://www.linkedin.com/in/jane-doe/")
+    second = linkedin_scraper.scrape_linkedin_profile("https://fr.linkedin.com/in/Jane-Doe")
+
+    assert first == second == PROFILE
+    assert cache == ["https://www.linkedin.com/in/jane-doe/"]
+
+
+def test_invalid_url_is_not_scraped(cache):
+    profile = linkedin_scraper.scrape_linkedin_profile("https://example.com/jane")
+
+    assert profile["headline"] is None
+    assert cache == []
+
+
+def test_concurrent_scrapes_share_one_call(cache, monkeypatch):
+    # Nothing cached yet: every caller misses before the first scrape returns
+    monkeypatch.setattr(linkedin_scraper, "get_cached_profile", lambda url: None)
+
+    results = run_concurrently(lambda: linkedin_scraper.scrape_linkedin_profile("https://www.linkedin.com/in/jane-doe"))
+
+    assert results == [PROFILE] * 8
+    assert len(cache) == 1
+
+
+def test_waiter_reads_the_profile_fetched_by_another_process(cache, locked_elsewhere, monkeypatch):
+    reads = []
+
+    def get_cached_profile(url):
+        # Fetched and cached by the lock holder after our second read
+        reads.append(url)
+        return PROFILE if len(reads) > 2 else None
+
+    monkeypatch.setattr(linkedin_scraper, "get_cached_profile", get_cached_profile)
+    locked_elsewhere(100)
+
+    assert linkedin_scraper.scrape_linkedin_profile("https://www.linkedin.com/in/jane-doe") == PROFILE
+    assert cache == []
+
+
+def test_waiter_gets_an_empty_profile_when_the_other_fetch_fails(cache, locked_elsewhere, monkeypatch):
+    monkeypatch.setattr(linkedin_scraper, "get_cached_profile", lambda url: None)
+    locked_elsewhere(2)
+
+    profile = linkedin_scraper.scrape_linkedin_profile("https://www.linkedin.com/in/jane-doe")
+
+    assert profile["headline"] is None and profile["experience"] == []
+    assert cache == []
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Cache d'extraction en mémoire et faux LLM ; retourne les appels LLM."""
+    store = {}
+    calls = []
+
+    def fake_call(prompt, organization_id=None, feature=None):
+        calls.append(organization_id)
+        time.sleep(0.05)
+        return {"fullName": "Jane Doe", "yearsExperience": 20, "expertiseDomain": "FINANCE"}
+
+    monkeypatch.setattr(candidate_scoring, "call_openai_api", fake_call)
+    monkeypatch.setattr(linkedin_profile_parser, "get_cached_extraction", store.get)
+    monkeypatch.setattr(
+        linkedin_profile_parser, "store_extraction", lambda key, version, result: store.setdefault(key, result)
+    )
+    monkeypatch.setattr(locks, "try_session_lock", lambda namespace, key: nullcontext(True))
+    metrics.registry.reset()
+    return calls
+
+
+def test_concurrent_extractions_share_one_llm_call(llm, monkeypatch):
+    # Nothing cached yet: every caller misses before the first extraction returns
+    monkeypatch.setattr(linkedin_profile_parser, "get_cached_extraction", lambda key: None)
+
+    results = run_concurrently(lambda: extract_candidate_from_linkedin_profile(PROFILE, organization_id=3))
+
+    assert all(r["fullName"] == "Jane Doe" and r["expertiseDomain"] == "FINANCE" for r in results)
+    assert llm == [3]
+
+
+def test_failed_extraction_elsewhere_is_not_retried_by_each_waiter(llm, locked_elsewhere, monkeypatch):
+    monkeypatch.setattr(linkedin_profile_parser, "get_cached_extraction", lambda key: None)
+    locked_elsewhere(2)
+
+    result = extract_candidate_from_linkedin_profile(PROFILE, organization_id=3)
+
+    assert result["fullName"] is None
+    assert llm == []
+
+
+def test_unchanged_profile_is_extracted_once(llm):
+    first = extract_candidate_from_linkedin_profile(PROFILE, organization_id=3)
+    second = extract_candidate_from_linkedin_profile(dict(PROFILE, education=["HEC"]), organization_id=4)
+
+    assert first == second
+    assert llm == [3]
+    assert metrics.registry.get("linkedin_extraction_cache_total", outcome="hit") == 1
+    assert metrics.registry.get("linkedin_extraction_cache_total", outcome="miss") == 1
+
+
+def test_changed_profile_or_prompt_version_is_extracted_again(llm, monkeypatch):
+    extract_candidate_from_linkedin_profile(PROFILE)
+    extract_candidate_from_linkedin_profile(dict(PROFILE, headline="CFO & COO"))
+    monkeypatch.setattr(linkedin_profile_parser, "EXTRACTION_PROMPT_VERSION", 2)
+    extract_candidate_from_linkedin_profile(PROFILE)
+
+    assert len(llm) == 3
+
+
+def test_failed_extraction_is_not_cached(llm, monkeypatch):
+    monkeypatch.setattr(candidate_scoring, "call_openai_api", lambda prompt, **kwargs: None)
+
+    assert extract_candidate_from_linkedin_profile(PROFILE)["fullName"] is None
+    assert linkedin_profile_parser.get_cached_extraction(
+        linkedin_profile_parser.extraction_cache_key(linkedin_profile_parser._build_extraction_prompt(PROFILE))
+    ) is None
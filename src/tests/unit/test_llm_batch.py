@@ -0,0 +1,60 @@
+"""
+Tests du format JSONL Batch API et du backend local (sans réseau).
+"""
+
+import json
+
+from apps.referrals.services.llm_batch import (
+    BatchResult,
+    LocalBatchBackend,
+    build_batch_request,
+    iter_batch_results,
+    make_custom_id,
+    parse_batch_output_line,
+    parse_custom_id,
+    wait_for_batch,
+    write_batch_file,
+)
+
+
+def test_custom_id_round_trip():
+    custom_id = make_custom_id(42, "abc123")
+    assert parse_custom_id(custom_id) == (42, "abc123")
+
+
+def test_local_backend_round_trip(tmp_path):
+    def responder(request):
+        assert request["url"] == "/v1/responses"
+        return '```json\n{"score": 81, "strengths": [], "gaps": [], "summary": "ok"}\n```'
+
+    input_path = tmp_path / "input.jsonl"
+    count = write_batch_file(input_path, [
+        build_batch_request(make_custom_id(i, "fp"), f"prompt {i}", "gpt-4o-mini")
+        for i in range(3)
+    ])
+    assert count == 3
+
+    backend = LocalBatchBackend(tmp_path / "batches", responder=responder)
+    status = wait_for_batch(backend, backend.submit(input_path), poll_interval=0)
+    assert status.status == "completed"
+
+    results = [item for chunk in iter_batch_results(backend, status, chunk_size=2) for item in chunk]
+    assert [parse_custom_id(line.custom_id)[0] for line in results] == [0, 1, 2]
+    assert all(line.result["score"] == 81 for line in results)
+    assert all(line.input_tokens > 0 and line.output_tokens > 0 for line in results)
+
+
+def test_failed_output_lines_yield_none():
+    error_line = json.dumps({"custom_id": "referral-1:fp", "response": None, "error": {"code": "x"}})
+    invalid_line = json.dumps({
+        "custom_id": "referral-2:fp",
+        "response": {
+            "status_code": 200,
+            "body": {"output_text": "pas du json", "usage": {"input_tokens": 900, "output_tokens": 12}},
+        },
+        "error": None,
+    })
+
+    assert parse_batch_output_line(error_line) == BatchResult("referral-1:fp", None)
+    # The tokens of an unusable answer are still billed
+    assert parse_batch_output_line(invalid_line) == BatchResult("referral-2:fp", None, 900, 12)
@@ -0,0 +1,130 @@
+"""
+Tests unitaires du disjoncteur et de la limite de concurrence LLM.
+"""
+
+import pytest
+
+from apps.referrals.services import candidate_scoring, llm_providers
+from apps.referrals.services.llm_providers import LLMProvider
+from apps.referrals.services.llm_resilience import AdaptiveConcurrencyLimiter, CircuitBreaker
+from common import metrics
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_breaker_opens_after_consecutive_failures_and_half_opens(clock):
+    breaker = CircuitBreaker("test-failures", failure_threshold=3, reset_timeout=30, clock=clock)
+
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()          # probe
+    assert not breaker.allow()      # a single probe at a time
+    breaker.record_success(0.5)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert metrics.registry.get(
+        "llm_circuit_transitions_total", breaker="test-failures", from_state="half_open", to_state="closed"
+    ) == 1
+
+
+def test_breaker_reopens_when_probe_fails(clock):
+    breaker = CircuitBreaker("test-probe", failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.allow()
+    breaker.record_failure()
+
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_opens_on_high_latency_percentile(clock):
+    breaker = CircuitBreaker(
+        "test-latency", latency_threshold=5.0, min_latency_samples=10, clock=clock
+    )
+    for _ in range(9):
+        breaker.record_success(1.0)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_success(12.0)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_limiter_aimd_and_retry_after(clock):
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=4, max_limit=8, clock=clock)
+
+    assert all(limiter.try_acquire() for _ in range(4))
+    assert not limiter.try_acquire()
+
+    limiter.on_overload(retry_after=5)
+    assert limiter.limit == 2
+    assert not limiter.try_acquire()  # Retry-After still running
+
+    clock.now += 5
+    for _ in range(3):
+        limiter.on_success()
+    assert limiter.in_flight == 0
+    assert limiter.try_acquire()
+
+
+def test_call_openai_api_fails_fast_when_circuit_open(monkeypatch):
+    breaker = CircuitBreaker("test-call", failure_threshold=1)
+    breaker.allow()
+    breaker.record_failure()
+
+    class FailingProvider(LLMProvider):
+        def complete(self, messages, model):
+            raise AssertionError("The provider should not be called while the circuit is open")
+
+    monkeypatch.setattr(candidate_scoring, "openai_breaker", breaker)
+    monkeypatch.setattr(llm_providers, "_provider", FailingProvider())
+
+    assert candidate_scoring.call_openai_api("prompt") is None
+    assert candidate_scoring.openai_limiter.in_flight == 0
+
+
+def test_unexpected_provider_error_releases_slot_and_probe(monkeypatch, clock):
+    breaker = CircuitBreaker("test-unexpected", failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.allow()
+    breaker.record_failure()
+    clock.now += 10
+
+    class BrokenProvider(LLMProvider):
+        def complete(self, messages, model):
+            raise KeyError("output")
+
+    limiter = AdaptiveConcurrencyLimiter("test-unexpected", initial_limit=1, max_limit=1)
+    monkeypatch.setattr(candidate_scoring, "openai_breaker", breaker)
+    monkeypatch.setattr(candidate_scoring, "openai_limiter", limiter)
+    monkeypatch.setattr(llm_providers, "_provider", BrokenProvider())
+
+    assert candidate_scoring.call_openai_api("prompt") is None
+    assert limiter.in_flight == 0
+    # The half-open probe failed: the breaker reopens, then lets a new probe through
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 10
+    assert breaker.allow()
+
+
+def test_provider_must_implement_complete():
+    class IncompleteProvider(LLMProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        IncompleteProvider()
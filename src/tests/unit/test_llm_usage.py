@@ -0,0 +1,112 @@
+"""
+Tests unitaires du comptage de consommation LLM et des quotas par organisation.
+"""
+
+import pytest
+
+from apps.referrals.management.commands.backfill_scores import Command as BackfillCommand
+from apps.referrals.services import candidate_scoring, llm_batch, llm_providers
+from apps.referrals.services.llm_batch import BatchResult
+from apps.referrals.services.llm_providers import LLMProvider, LLMResponse
+from apps.referrals.services.llm_resilience import AdaptiveConcurrencyLimiter, CircuitBreaker
+from apps.referrals.services.llm_usage import FEATURE_LINKEDIN_EXTRACTION, QuotaStatus
+
+
+class JsonProvider(LLMProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def complete(self, messages, model):
+        self.calls += 1
+        return LLMResponse(text='{"score": 10}', input_tokens=1200, output_tokens=300)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = JsonProvider()
+    monkeypatch.setattr(llm_providers, "_provider", provider)
+    monkeypatch.setattr(candidate_scoring, "openai_breaker", CircuitBreaker("test-usage"))
+    monkeypatch.setattr(candidate_scoring, "openai_limiter", AdaptiveConcurrencyLimiter("test-usage"))
+    return provider
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    calls = []
+    monkeypatch.setattr(candidate_scoring, "record_llm_usage", lambda **kwargs: calls.append(kwargs))
+    return calls
+
+
+def set_quota(monkeypatch, status):
+    monkeypatch.setattr(candidate_scoring, "get_quota_status", lambda organization_id: status)
+
+
+def test_quota_status_limits():
+    assert not QuotaStatus(used_tokens=10**9).soft_exceeded
+    assert not QuotaStatus(used_tokens=10**9).hard_exceeded
+
+    status = QuotaStatus(used_tokens=500, soft_limit=500, hard_limit=1000)
+    assert status.soft_exceeded
+    assert not status.hard_exceeded
+
+    status.used_tokens = 1000
+    assert status.hard_exceeded
+
+
+def test_successful_call_is_recorded_for_the_organization(provider, recorded, monkeypatch):
+    set_quota(monkeypatch, QuotaStatus())
+
+    result = candidate_scoring.call_openai_api(
+        "prompt", model="gpt-4o-mini", organization_id=7, feature=FEATURE_LINKEDIN_EXTRACTION
+    )
+
+    assert result == {"score": 10}
+    assert len(recorded) == 1
+    usage = recorded[0]
+    assert usage["organization_id"] == 7
+    assert usage["feature"] == FEATURE_LINKEDIN_EXTRACTION
+    assert (usage["input_tokens"], usage["output_tokens"]) == (1200, 300)
+    assert usage["cost_usd"] > 0
+
+
+def test_hard_quota_skips_the_provider(provider, recorded, monkeypatch):
+    set_quota(monkeypatch, QuotaStatus(used_tokens=2000, hard_limit=1000))
+
+    assert candidate_scoring._call_llm("prompt", "gpt-4o-mini", "fast", organization_id=7) == (None, "quota_exceeded")
+    assert provider.calls == 0
+    assert recorded == []
+
+
+def test_soft_quota_only_blocks_strong_tier(provider, recorded, monkeypatch):
+    set_quota(monkeypatch, QuotaStatus(used_tokens=600, soft_limit=500))
+
+    assert candidate_scoring._call_llm("prompt", "gpt-4o", "strong", organization_id=7) == (None, "quota_soft_exceeded")
+    assert candidate_scoring._call_llm("prompt", "gpt-4o-mini", "fast", organization_id=7) == ({"score": 10}, "success")
+    assert provider.calls == 1
+
+
+def test_batch_usage_is_recorded_at_the_batch_price(monkeypatch):
+    calls = []
+    monkeypatch.setattr(llm_batch, "record_llm_usage", lambda **kwargs: calls.append(kwargs))
+
+    llm_batch.record_batch_usage(7, "gpt-4o-mini", BatchResult("referral-1:fp", None, 1_000_000, 0))
+
+    assert calls[0]["organization_id"] == 7
+    assert (calls[0]["model"], calls[0]["tier"]) == ("gpt-4o-mini", "batch")
+    assert calls[0]["cost_usd"] == pytest.approx(0.075)
+
+
+def test_backfill_stops_queueing_at_the_hard_quota(monkeypatch):
+    monkeypatch.setattr(
+        "apps.referrals.management.commands.backfill_scores.get_quota_status",
+        lambda organization_id: QuotaStatus(used_tokens=900, hard_limit=1000),
+    )
+    command = BackfillCommand()
+    command._pending_tokens = {}
+
+    prompt = "x" * 200
+    accepted = [command._reserve_tokens(7, prompt) for _ in range(5)]
+
+    assert accepted[0]
+    assert not accepted[-1]
+    assert command._pending_tokens[7] >= 100
@@ -0,0 +1,48 @@
+"""
+Tests unitaires des templates d'emails compilés (rendu, cache, rechargement en DEBUG).
+"""
+
+import os
+
+import pytest
+
+from common import mail_service
+
+
+@pytest.fixture
+def templates(tmp_path, monkeypatch):
+    monkeypatch.setattr(mail_service, "_TEMPLATES_DIR", tmp_path)
+    monkeypatch.setattr(mail_service, "_template_cache", {})
+    return tmp_path
+
+
+def test_render_replaces_every_placeholder_in_one_pass(templates):
+    (templates / "t.html").write_text("<p>{{NAME}} · {{URL}} · {{URL}} · {{MISSING}}</p>", encoding="utf-8")
+
+    html = mail_service._render_content_template("t.html", {"NAME": "{{URL}}", "URL": "https://x"})
+
+    # Values are not re-scanned; unknown placeholders are kept
+    assert html == "<p>{{URL}} · https://x · https://x · {{MISSING}}</p>"
+
+
+def test_template_is_read_once_outside_debug(templates, settings):
+    settings.DEBUG = False
+    path = templates / "t.html"
+    path.write_text("v1 {{X}}", encoding="utf-8")
+    assert mail_service._render_content_template("t.html", {"X": "a"}) == "v1 a"
+
+    path.unlink()
+
+    assert mail_service._render_content_template("t.html", {"X": "b"}) == "v1 b"
+
+
+def test_modified_template_is_reloaded_in_debug(templates, settings):
+    settings.DEBUG = True
+    path = templates / "t.html"
+    path.write_text("v1 {{X}}", encoding="utf-8")
+    assert mail_service._render_content_template("t.html", {"X": "a"}) == "v1 a"
+
+    path.write_text("v2 {{X}}", encoding="utf-8")
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 5))
+
+    assert mail_service._render_content_template("t.html", {"X": "a"}) == "v2 a"
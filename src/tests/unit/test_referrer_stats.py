@@ -0,0 +1,64 @@
+"""
+Tests unitaires de l'historique des recommandeurs (compteurs et ajustement du scoring).
+"""
+
+from apps.referrals.services import candidate_scoring
+from apps.referrals.services.candidate_scoring import compute_candidate_score, is_score_stale
+from apps.referrals.services.referrer_stats import (
+    REFERRER_TRACK_RECORD_POINTS,
+    TrackRecord,
+    status_event_deltas,
+)
+from tests.unit.test_candidate_scoring import make_referral, stored_score
+
+
+def test_status_event_deltas_count_each_referral_once():
+    assert status_event_deltas(None, "PENDING_CONSENT") == {"referrals_count": 1}
+    assert status_event_deltas("REVIEWED", "accepted") == {"accepted_count": 1}
+    # HIRED only comes after ACCEPTED: the referral is already counted as accepted
+    assert status_event_deltas("ACCEPTED", "HIRED") == {"hired_count": 1}
+    assert status_event_deltas("SUBMITTED", "REJECTED") == {"rejected_count": 1}
+    # Consent declined by the candidate, or rejection after acceptance
+    assert status_event_deltas("PENDING_CONSENT", "REJECTED") == {}
+    assert status_event_deltas("ACCEPTED", "REJECTED") == {}
+
+
+def test_quality_adjustment_is_neutral_without_history():
+    assert TrackRecord().acceptance_rate is None
+    assert TrackRecord().quality_adjustment() == 0
+    assert TrackRecord(referrals_count=2, accepted_count=1, rejected_count=1).quality_adjustment() == 0
+
+
+def test_quality_adjustment_grows_with_track_record():
+    strong = TrackRecord(referrals_count=10, accepted_count=8, hired_count=5, rejected_count=0)
+    weak = TrackRecord(referrals_count=10, accepted_count=0, rejected_count=8)
+
+    assert strong.acceptance_rate == 1
+    assert strong.hire_rate == 5 / 8
+    assert 0 < strong.quality_adjustment() <= REFERRER_TRACK_RECORD_POINTS
+    assert weak.quality_adjustment() < 0
+    assert TrackRecord(accepted_count=1).quality_adjustment() < strong.quality_adjustment()
+
+
+def test_referral_quality_blends_track_record(monkeypatch):
+    referral = make_referral()
+    referral.profile_motivation = "Court"
+    baseline = compute_candidate_score(referral, use_llm=False).breakdown.referral_quality
+
+    monkeypatch.setattr(candidate_scoring, "_referrer_adjustment", lambda referral: 3)
+    boosted = compute_candidate_score(referral, use_llm=False).breakdown.referral_quality
+    monkeypatch.setattr(candidate_scoring, "_referrer_adjustment", lambda referral: -50)
+    floored = compute_candidate_score(referral, use_llm=False).breakdown.referral_quality
+
+    assert boosted == baseline + 3
+    assert floored == 0
+
+
+def test_track_record_change_makes_score_stale(monkeypatch):
+    referral = make_referral()
+    score = stored_score(referral)
+    assert not is_score_stale(score, referral, use_llm=False)
+
+    monkeypatch.setattr(candidate_scoring, "_referrer_adjustment", lambda referral: 2)
+
+    assert is_score_stale(score, referral, use_llm=False)
@@ -0,0 +1,165 @@
+"""
+Tests unitaires du point d'entrée de scoring (déduplication des appels concurrents).
+"""
+
+import threading
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import pytest
+
+from apps.referrals.services import score_lifecycle
+from common.singleflight import SingleFlight
+
+SCORE = SimpleNamespace(referral_id=7, final_score=40, updated_at=1, rule_fingerprint="r", llm_fingerprint="a")
+
+
+def test_single_flight_shares_result_between_concurrent_callers():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "score"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    started.wait(5)
+
+    waiters = [
+        threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        for _ in range(3)
+    ]
+    for thread in waiters:
+        thread.start()
+    release.set()
+    for thread in [leader, *waiters]:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["score"] * 4
+    assert not flight.in_flight("k")
+
+
+@pytest.fixture
+def claims(monkeypatch):
+    """Réservations en mémoire (referral_id -> token), sans base de données."""
+    held = {}
+
+    def claim(referral_id):
+        if referral_id in held:
+            return None
+        held[referral_id] = object()
+        return held[referral_id]
+
+    def release(referral_id, token):
+        if held.get(referral_id) is token:
+            del held[referral_id]
+
+    monkeypatch.setattr(score_lifecycle, "_claim", claim)
+    monkeypatch.setattr(score_lifecycle, "_release", release)
+    monkeypatch.setattr(score_lifecycle, "_held_claims", lambda ids: {i for i in ids if i in held})
+    monkeypatch.setattr(score_lifecycle, "LOCK_POLL_SECONDS", 0.01)
+    return held
+
+
+def test_ensure_referral_score_persists_once(monkeypatch, claims):
+    stored = {}
+    created = []
+    gate = threading.Event()
+
+    def compute(referral, **kwargs):
+        gate.wait(5)
+        return "result"
+
+    def save(referral, previous, result):
+        created.append(referral.id)
+        stored[referral.id] = SimpleNamespace(referral_id=referral.id, final_score=72)
+        return stored[referral.id]
+
+    monkeypatch.setattr(score_lifecycle, "_existing_score", stored.get)
+    monkeypatch.setattr(score_lifecycle, "compute_candidate_score", compute)
+    monkeypatch.setattr(score_lifecycle, "_save_result", save)
+
+    referral = SimpleNamespace(id=7)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(score_lifecycle.ensure_referral_score(referral)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert created == [7]
+    assert len(results) == 4
+    assert all(score is stored[7] for score in results)
+    assert claims == {}
+
+
+def test_waiter_gets_the_score_computed_by_another_process(monkeypatch, claims):
+    stored = {}
+    monkeypatch.setattr(score_lifecycle, "_existing_score", stored.get)
+    monkeypatch.setattr(score_lifecycle, "is_score_stale", lambda *args, **kwargs: False)
+    monkeypatch.setattr(
+        score_lifecycle, "compute_candidate_score",
+        lambda *args, **kwargs: pytest.fail("scored twice"),
+    )
+    claims[7] = object()
+    referral = SimpleNamespace(id=7)
+
+    def other_process_finishes():
+        stored[7] = SCORE
+        del claims[7]
+
+    timer = threading.Timer(0.05, other_process_finishes)
+    timer.start()
+    try:
+        assert score_lifecycle.ensure_referral_score(referral) is stored[7]
+    finally:
+        timer.cancel()
+
+    claims[7] = object()
+    threading.Timer(0.05, claims.pop, args=(7,)).start()
+    assert score_lifecycle.refresh_referral_score(referral, only_if_stale=True) is stored[7]
+
+
+def test_waiter_rescores_when_the_other_result_is_stale(monkeypatch, claims):
+    stored = {7: SCORE}
+    monkeypatch.setattr(score_lifecycle, "_existing_score", stored.get)
+    # New LinkedIn data arrived while another process was scoring
+    monkeypatch.setattr(score_lifecycle, "is_score_stale", lambda *args, **kwargs: True)
+    monkeypatch.setattr(score_lifecycle, "compute_candidate_score", lambda *args, **kwargs: "result")
+    monkeypatch.setattr(score_lifecycle, "_save_result", lambda referral, previous, result: "rescored")
+    claims[7] = object()
+    threading.Timer(0.05, claims.pop, args=(7,)).start()
+
+    assert score_lifecycle.refresh_referral_score(SimpleNamespace(id=7), only_if_stale=True) == "rescored"
+
+
+def test_waiting_is_bounded(monkeypatch, claims):
+    monkeypatch.setattr(score_lifecycle, "_existing_score", lambda referral_id: None)
+    monkeypatch.setattr(score_lifecycle, "SCORE_WAIT_SECONDS", 0.05)
+    claims[7] = object()
+
+    with pytest.raises(score_lifecycle.ScoreInProgress):
+        score_lifecycle.ensure_referral_score(SimpleNamespace(id=7))
+
+
+def test_result_is_discarded_when_score_changed_during_computation(monkeypatch):
+    read = SimpleNamespace(updated_at=1, rule_fingerprint="r", llm_fingerprint="a")
+    written_meanwhile = SimpleNamespace(updated_at=2, rule_fingerprint="r", llm_fingerprint="b")
+    monkeypatch.setattr(score_lifecycle, "advisory_lock", lambda *args: nullcontext())
+    monkeypatch.setattr(score_lifecycle, "_existing_score", lambda referral_id: written_meanwhile)
+    result = SimpleNamespace(to_model_fields=lambda: pytest.fail("stale result written"))
+
+    saved = score_lifecycle._save_result(SimpleNamespace(id=7), read, result)
+
+    assert saved is written_meanwhile
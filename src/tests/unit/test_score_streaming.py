@@ -0,0 +1,57 @@
+"""
+Tests unitaires du scoring en streaming.
+"""
+
+import json
+from types import SimpleNamespace
+
+from apps.referrals.services import score_streaming
+from apps.referrals.services.score_streaming import JsonStringFieldStream, stream_referral_score
+from tests.unit.test_candidate_scoring import make_referral
+
+
+def test_summary_is_decoded_across_split_deltas():
+    text = json.dumps({
+        "score": 72,
+        "strengths": ["A"],
+        "summary": 'Profil "solide"\nen finance 🚀',
+    })
+    stream = JsonStringFieldStream("summary")
+
+    decoded = "".join(stream.feed(text[i:i + 3]) for i in range(0, len(text), 3))
+
+    assert decoded == 'Profil "solide"\nen finance 🚀'
+    assert stream.feed('"ignored"') == ""
+
+
+def test_malformed_escape_stops_the_preview():
+    stream = JsonStringFieldStream("summary")
+
+    assert stream.feed('{"summary": "Bon profil') == "Bon profil"
+    assert stream.feed(r" \uZZ") == " "  # waits for the rest of the escape
+    assert stream.feed(r'ZZ suite", "score": 70}') == ""
+    assert stream.feed(" encore") == ""
+
+    lone_surrogate = JsonStringFieldStream("summary")
+    assert lone_surrogate.feed(r'{"summary": "\ud83d\u0041 ok"}') == ""
+
+
+def test_stream_emits_rules_then_summary_then_score(monkeypatch):
+    referral = make_referral()
+    referral.id = 5
+    stored = SimpleNamespace(referral_id=5, final_score=64)
+
+    def ensure(referral, use_llm, on_delta):
+        for chunk in ['{"score": 70, "summary": "Bon ', 'profil."}']:
+            on_delta(chunk)
+        return stored
+
+    monkeypatch.setattr(score_streaming, "_existing_score", lambda referral_id: None)
+    monkeypatch.setattr(score_streaming, "ensure_referral_score", ensure)
+
+    events = list(stream_referral_score(referral))
+
+    assert [kind for kind, _ in events] == ["rules", "summary", "summary", "score"]
+    assert events[0][1].rule_score > 0
+    assert "".join(payload["delta"] for kind, payload in events if kind == "summary") == "Bon profil."
+    assert events[-1][1] is stored
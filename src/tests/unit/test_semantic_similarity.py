@@ -0,0 +1,88 @@
+"""
+Tests du score de similarité locale poste/candidat.
+"""
+
+import time
+
+from apps.jobs.models import JobOpening
+from apps.referrals.models import Candidate
+from apps.referrals.services import candidate_scoring
+from apps.referrals.services.semantic_similarity import (
+    LOCAL_SIMILARITY_MODEL,
+    compute_similarity_score,
+    text_similarity,
+)
+
+JOB = JobOpening(
+    title="Directeur Financier (CFO)",
+    description="Pilotage de la consolidation, du reporting financier et de la trésorerie du groupe.",
+    key_challenges=["COMPLIANCE", "DATA_GOVERNANCE"],
+)
+
+
+def make_candidate(headline, summary, skills):
+    return Candidate(
+        full_name="Test",
+        technical_skills=skills,
+        linkedin_headline=headline,
+        linkedin_summary=summary,
+        linkedin_experience=[{"title": headline, "company": "ACME"}],
+    )
+
+
+FINANCE_CANDIDATE = make_candidate(
+    "Directeur financier groupe",
+    "15 ans en finance d'entreprise : consolidation IFRS, reporting financier, trésorerie et compliance.",
+    ["Consolidation", "IFRS", "Trésorerie"],
+)
+DESIGN_CANDIDATE = make_candidate(
+    "Directrice artistique",
+    "Création d'identités visuelles, typographie et direction de shootings photo pour des marques de mode.",
+    ["Photoshop", "Illustrator", "Typographie"],
+)
+
+
+def test_similarity_ranks_aligned_profile_higher():
+    aligned = compute_similarity_score(FINANCE_CANDIDATE, JOB)
+    unrelated = compute_similarity_score(DESIGN_CANDIDATE, JOB)
+
+    assert 0 <= unrelated < aligned <= 100
+
+
+def test_similarity_is_accent_and_case_insensitive():
+    assert text_similarity("Trésorerie GROUPE", "tresorerie groupe") > 0.99
+
+
+def test_similarity_is_fast():
+    started = time.perf_counter()
+    for i in range(200):
+        # Distinct texts so that the vector cache is not hit
+        text_similarity(f"{FINANCE_CANDIDATE.linkedin_summary} {i}", f"{JOB.description} {i}")
+    assert (time.perf_counter() - started) / 200 < 0.005
+
+
+def test_llm_unavailable_falls_back_to_local_similarity(monkeypatch):
+    monkeypatch.setattr(candidate_scoring, "call_openai_api", lambda *args, **kwargs: None)
+
+    result = candidate_scoring.compute_llm_score(FINANCE_CANDIDATE, JOB, referral=None, prompt="...")
+
+    assert result["model"] == LOCAL_SIMILARITY_MODEL
+    assert result["fallback"] is True
+    assert result["score"] == compute_similarity_score(FINANCE_CANDIDATE, JOB)
+
+
+def test_prefilter_score_is_reanalysed_once_the_threshold_changes(monkeypatch):
+    monkeypatch.setattr(candidate_scoring, "LLM_PREFILTER_MIN_SIMILARITY", 101)
+    result = candidate_scoring.compute_llm_score(DESIGN_CANDIDATE, JOB, referral=None, prompt="...")
+    assert result["model"] == LOCAL_SIMILARITY_MODEL
+    assert result["fallback"] is False
+
+    llm_fingerprint = candidate_scoring.compute_llm_fingerprint("...", "gpt-4o-mini")
+    breakdown = candidate_scoring.ScoringBreakdown()
+    candidate_scoring._apply_llm_result(breakdown, result, llm_fingerprint)
+
+    assert breakdown.llm_fingerprint != llm_fingerprint
+    assert candidate_scoring.is_llm_result_current(breakdown.llm_fingerprint, llm_fingerprint)
+
+    monkeypatch.setattr(candidate_scoring, "LLM_PREFILTER_MIN_SIMILARITY", 0)
+    assert not candidate_scoring.is_llm_result_current(breakdown.llm_fingerprint, llm_fingerprint)
@@ -0,0 +1,91 @@
+"""
+Tests unitaires du rapprochement poste → vivier (scoring vectorisé, sans base de données).
+"""
+
+import random
+
+import pytest
+
+from apps.jobs.models import JobOpening
+from apps.referrals.models import Candidate
+from apps.referrals.services.candidate_scoring import (
+    compute_expertise_match,
+    compute_experience_match,
+    compute_interpersonal_skills_match,
+    compute_technical_skills_match,
+)
+from apps.referrals.services.talent_matching import CandidatePool, rank_pool, score_pool
+from apps.referrals.services.weight_profiles import default_profile
+
+TECHNICAL = ["SAP", "sap", "Consolidation", "IFRS", "Python", "M&A", "Reporting"]
+
+
+def random_candidates(count, seed=0):
+    rng = random.Random(seed)
+    candidates = []
+    for candidate_id in range(1, count + 1):
+        candidates.append(Candidate(
+            id=candidate_id,
+            expertise_domain=rng.choice(JobOpening.ExpertiseDomain.values[:3]),
+            years_experience=rng.randint(0, 35),
+            interpersonal_skills=rng.sample(JobOpening.InterpersonalSkill.values, rng.randint(0, 3)),
+            technical_skills=rng.sample(TECHNICAL, rng.randint(0, 4)),
+            linkedin_skills=rng.choice([None, "not a list", rng.sample(TECHNICAL, 2)]),
+        ))
+    return candidates
+
+
+def make_pool(candidates):
+    return CandidatePool(
+        (c.id, c.expertise_domain, c.years_experience, c.interpersonal_skills, c.technical_skills, c.linkedin_skills)
+        for c in candidates
+    )
+
+
+@pytest.mark.parametrize("job", [
+    JobOpening(
+        expertise_domain=JobOpening.ExpertiseDomain.values[0],
+        experience_level="C_LEVEL",
+        interpersonal_skills=JobOpening.InterpersonalSkill.values[:2],
+        technical_skills=["SAP", "ifrs", "Kubernetes"],
+    ),
+    JobOpening(expertise_domain="UNKNOWN", experience_level=None, interpersonal_skills=[], technical_skills=[]),
+])
+def test_vectorized_components_match_rule_engine(job):
+    candidates = random_candidates(300)
+    experience_ranges = default_profile().experience_ranges
+
+    components = score_pool(make_pool(candidates), job, experience_ranges)
+
+    for i, candidate in enumerate(candidates):
+        assert components["expertise_match"][i] == compute_expertise_match(candidate, job)
+        assert components["experience_match"][i] == compute_experience_match(candidate, job, experience_ranges)
+        assert components["interpersonal_skills_match"][i] == compute_interpersonal_skills_match(candidate, job)
+        assert components["technical_skills_match"][i] == compute_technical_skills_match(candidate, job)
+
+
+def test_rank_pool_keeps_top_k_and_skips_excluded():
+    candidates = random_candidates(500, seed=1)
+    job = JobOpening(
+        expertise_domain=JobOpening.ExpertiseDomain.values[1],
+        experience_level="TOP_MANAGEMENT",
+        interpersonal_skills=JobOpening.InterpersonalSkill.values[:3],
+        technical_skills=["Python", "Reporting"],
+    )
+    pool = make_pool(candidates)
+
+    everyone = rank_pool(pool, job, default_profile(), top_k=len(candidates))
+    best = rank_pool(pool, job, default_profile(), top_k=10, exclude_ids=[everyone[0].candidate_id])
+
+    assert [m.rank for m in best] == list(range(1, 11))
+    assert [(m.match_score, m.candidate_id) for m in best] == [
+        (m.match_score, m.candidate_id) for m in everyone[1:11]
+    ]
+    assert all(a.match_score >= b.match_score for a, b in zip(everyone, everyone[1:]))
+    assert everyone[0].match_score <= 100
+
+
+def test_rank_pool_handles_empty_pool():
+    job = JobOpening(expertise_domain="FINANCE")
+
+    assert rank_pool(make_pool([]), job, default_profile()) == []
@@ -0,0 +1,145 @@
+"""
+Tests unitaires des profils de pondération du scoring.
+"""
+
+import pytest
+
+from apps.referrals.models import CandidateScore, ScoringWeightProfile
+from apps.referrals.services import weight_profiles
+from apps.referrals.services.candidate_scoring import compute_candidate_score
+from apps.referrals.services.weight_profiles import (
+    apply_weight_profile,
+    default_profile,
+    profile_from_model,
+    sort_by_weighted_score,
+    validate_weights,
+)
+from common.errors import TropicalCornerError
+from tests.unit.test_candidate_scoring import llm_calls, make_referral  # noqa: F401 (fixture)
+
+
+def make_weights(**overrides):
+    weights = dict(default_profile().weights)
+    weights.update(overrides)
+    return weights
+
+
+def test_default_profile_keeps_stored_components():
+    profile = default_profile()
+
+    assert profile.version == 0
+    assert all(profile.component_factor(c) == 1 for c in weight_profiles.RULE_COMPONENTS)
+
+
+@pytest.mark.parametrize("overrides", [
+    {"expertise_match": 40},
+    {"referral_quality": -20, "expertise_match": 70},
+    {"rule_score_weight": 0.7},
+])
+def test_validate_rejects_inconsistent_weights(overrides):
+    with pytest.raises(TropicalCornerError):
+        validate_weights(make_weights(**overrides))
+
+
+def test_validate_rejects_invalid_experience_ranges():
+    validate_weights(make_weights(), {"C_LEVEL": [15, 22]})
+    with pytest.raises(TropicalCornerError):
+        validate_weights(make_weights(), {"C_LEVEL": [22, 15]})
+    with pytest.raises(TropicalCornerError):
+        validate_weights(make_weights(), {"INTERN": [0, 2]})
+
+
+def test_profile_experience_ranges_drive_rule_score(monkeypatch):
+    referral = make_referral()
+    referral.candidate.years_experience = 14
+    baseline = compute_candidate_score(referral, use_llm=False).breakdown
+
+    profile = profile_from_model(ScoringWeightProfile(
+        version=2, experience_ranges={"C_LEVEL": [12, 20]}, **make_weights()
+    ))
+    monkeypatch.setattr(weight_profiles, "get_active_profile", lambda organization_id: profile)
+    tuned = compute_candidate_score(referral, use_llm=False).breakdown
+
+    assert profile.experience_ranges["BOARD"] == (25, 50)
+    assert (baseline.experience_match, tuned.experience_match) == (0, 20)
+    assert tuned.rule_fingerprint != baseline.rule_fingerprint
+
+
+def make_profile(**overrides):
+    return profile_from_model(ScoringWeightProfile(version=3, experience_ranges={}, **make_weights(**overrides)))
+
+
+def test_scores_are_read_with_the_active_profile():
+    profile = make_profile(expertise_match=50, referral_quality=0, rule_score_weight=0.8, llm_score_weight=0.2)
+    strong_expertise = CandidateScore(
+        expertise_match=30, experience_match=0, interpersonal_skills_match=0,
+        technical_skills_match=0, referral_quality=0, rule_score=30, llm_score=50, final_score=40,
+    )
+    strong_referral = CandidateScore(
+        expertise_match=0, experience_match=0, interpersonal_skills_match=0,
+        technical_skills_match=0, referral_quality=20, rule_score=20, llm_score=80, final_score=50,
+    )
+
+    ranked = sort_by_weighted_score([strong_referral, strong_expertise], profile)
+
+    assert ranked == [strong_expertise, strong_referral]
+    assert (strong_expertise.weighted_rule_score, strong_expertise.weighted_final_score) == (50, 50)
+    assert (strong_referral.weighted_rule_score, strong_referral.weighted_final_score) == (0, 16)
+
+
+def test_weighted_components_add_up_to_the_rule_score():
+    profile = make_profile(
+        expertise_match=35, experience_match=17, interpersonal_skills_match=13,
+        technical_skills_match=13, referral_quality=22,
+    )
+    score = CandidateScore(
+        expertise_match=29, experience_match=13, interpersonal_skills_match=7,
+        technical_skills_match=11, referral_quality=9, rule_score=69, llm_score=60, final_score=64,
+    )
+
+    apply_weight_profile(score, profile)
+
+    assert sum(score.weighted_components.values()) == score.weighted_rule_score == 70
+    assert score.weighted_components["expertise_match"] <= 35
+    assert default_profile().weighted_components(score) == {
+        component: getattr(score, component) for component in weight_profiles.RULE_COMPONENTS
+    }
+
+
+def test_default_profile_reads_stored_scores():
+    score = CandidateScore(
+        expertise_match=30, experience_match=20, interpersonal_skills_match=7,
+        technical_skills_match=10, referral_quality=15, rule_score=82, llm_score=65, final_score=73,
+    )
+
+    apply_weight_profile(score, default_profile())
+
+    assert (score.weighted_rule_score, score.weighted_final_score) == (82, 73)
+
+
+def test_gated_scores_use_the_reweighted_rule_score():
+    profile = make_profile(expertise_match=50, referral_quality=0)
+    gated = CandidateScore(
+        expertise_match=30, experience_match=0, interpersonal_skills_match=0,
+        technical_skills_match=0, referral_quality=10, rule_score=40, llm_score=40, final_score=40,
+        llm_skipped=True,
+    )
+
+    apply_weight_profile(gated, profile)
+
+    assert (gated.weighted_rule_score, gated.weighted_final_score) == (50, 50)
+
+
+def test_gating_follows_the_active_profile(monkeypatch, llm_calls):
+    referral = make_referral()
+
+    # 50/50 by default: the LLM can always move the grade
+    assert not compute_candidate_score(referral).breakdown.llm_skipped
+    assert len(llm_calls) == 1
+
+    profile = make_profile(rule_score_weight=1.0, llm_score_weight=0.0)
+    monkeypatch.setattr(weight_profiles, "get_active_profile", lambda organization_id: profile)
+    result = compute_candidate_score(referral)
+
+    assert result.breakdown.llm_skipped
+    assert len(llm_calls) == 1
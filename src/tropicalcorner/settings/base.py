@@ -36,6 +36,7 @@ INSTALLED_APPS = [
     "apps.organizations",
     "apps.jobs",
     "apps.referrals",
+    "apps.notifications",
 ]
 
 MIDDLEWARE = [
@@ -134,6 +135,8 @@ JWT_REFRESH_EXPIRATION_DAYS = int(os.environ.get("JWT_REFRESH_EXPIRATION_DAYS",
 # OpenAI settings (for candidate scoring)
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_MODEL_FAST = os.environ.get("OPENAI_MODEL_FAST", OPENAI_MODEL)
+OPENAI_MODEL_STRONG = os.environ.get("OPENAI_MODEL_STRONG", "gpt-4o")
 
 # Logging
 LOGGING = {
@@ -171,10 +174,15 @@ LOGGING = {
 
 
 CORESIGNAL_API_KEY = os.environ.get("CORESIGNAL_API_KEY")
+CORESIGNAL_BASE_URL = os.environ.get("CORESIGNAL_BASE_URL", "https://api.coresignal.com")
 
 # Resend email settings
 RESEND_API_KEY = os.environ.get("RESEND_API_KEY", "")
 RESEND_FROM_EMAIL = os.environ.get("RESEND_FROM_EMAIL", "TropicalCorner <onboarding@resend.dev>")
+RESEND_API_URL = os.environ.get("RESEND_API_URL", "https://api.resend.com")
+
+# Metrics endpoint (/metrics/): scraper token sent as X-Metrics-Token (staff sessions always allowed)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
 
 # Frontend URL (for building consent links, etc.)
 FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://localhost:5173")
\ No newline at end of file
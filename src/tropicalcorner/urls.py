@@ -10,14 +10,28 @@ from ariadne_django.views import GraphQLView
 from gql import MyGraphQLView
 
 from apps.referrals.views import ConsentInfoView, ConsentConfirmView, ConsentDeclineView
+from apps.referrals.views_linkedin import LinkedInImportStreamView
+from apps.referrals.views_scoring import ReferralScoreStreamView
+from common.metrics import metrics_view
 
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("graphql/", MyGraphQLView.as_view(schema=schema), name="graphql"),
+    path("metrics/", metrics_view, name="metrics"),
 
     # Consent endpoints (public, no auth required)
     path("api/consent/<uuid:token>/", ConsentInfoView.as_view(), name="consent-info"),
     path("api/consent/<uuid:token>/confirm/", ConsentConfirmView.as_view(), name="consent-confirm"),
     path("api/consent/<uuid:token>/decline/", ConsentDeclineView.as_view(), name="consent-decline"),
+
+    # Scoring stream (SSE, recruiters)
+    path(
+        "api/referrals/<str:referral_id>/score/stream/",
+        ReferralScoreStreamView.as_view(),
+        name="referral-score-stream",
+    ),
+
+    # Progressive LinkedIn import for the referral form (SSE)
+    path("api/linkedin/import/stream/", LinkedInImportStreamView.as_view(), name="linkedin-import-stream"),
 ]